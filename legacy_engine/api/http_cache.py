@@ -0,0 +1,54 @@
+"""
+HTTP 条件请求（ETag / If-None-Match）
+
+ETag 由每个用户的数据变更计数（change_counters 表，触发器维护）生成，
+命中 If-None-Match 时直接返回 304，不再执行列表/详情查询和序列化。
+"""
+
+from typing import Optional
+
+from fastapi import Request, Response
+
+# 各路由的 Cache-Control
+# - 列表/详情：前端轮询处理状态，允许缓存但每次都要重新验证
+# - 统计：按时间窗口计算，短时间内允许直接用缓存
+CACHE_CONTROL = {
+    'item': 'private, no-cache',
+    'list': 'private, no-cache',
+    'stats': 'private, max-age=60',
+}
+
+
+def make_etag(*parts) -> str:
+    """生成弱 ETag"""
+    return 'W/"' + '-'.join(str(p) for p in parts) + '"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith('W/') else tag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match 是否命中（弱比较）"""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+
+    current = _opaque(etag)
+    return any(_opaque(tag) == current for tag in header.split(','))
+
+
+def not_modified_response(etag: str, route: str) -> Response:
+    """304 响应"""
+    return Response(status_code=304, headers=cache_headers(etag, route))
+
+
+def cache_headers(etag: Optional[str], route: str) -> dict:
+    """缓存相关响应头"""
+    headers = {'Cache-Control': CACHE_CONTROL[route]}
+    if etag:
+        headers['ETag'] = etag
+    return headers
@@ -2,16 +2,50 @@
 FastAPI 主应用
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Header, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi.responses import StreamingResponse
+from typing import Dict, Optional, List
+import asyncio
+import base64
+import json
 import logging
+import sqlite3
+import time
+from datetime import datetime, timezone
 
+from api.http_cache import make_etag, is_not_modified, not_modified_response, cache_headers
+from api.responses import FastJSONResponse, embed_metadata
+from api.sse import format_sse, KEEPALIVE_SECONDS, SSE_HEADERS
+from api.users import current_user
+from api.schemas import (
+    SaveItemRequest,
+    SaveItemResponse,
+    ItemListResponse,
+    TopItemsResponse,
+    ItemDetailResponse,
+    StatsResponse,
+    KeywordsResponse,
+    DomainsResponse,
+    CreateTagRequest,
+    TagItemsRequest,
+    TagDetailResponse,
+    TagListResponse,
+    TagItemsResponse,
+    TaggedItemsResponse,
+    ProcessResponse,
+)
+from core.cache import MISSING, read_cache_stats
 from core.config import Config
-from core.database import get_db
+from core.database import get_db, COMPACT_FIELDS, LIST_FIELDS
+from core.events import event_bus
+from core.metrics import metrics
 from core.fetcher import web_fetcher
+from core.stages import pipeline, FETCH_TARGETS, AI_TARGETS
 from core.processor import ai_processor, process_item_async
+from core.profiler import profiler, ORDERS
+from core.writer import writer_stats
 
 # 配置日志
 logging.basicConfig(
@@ -24,7 +58,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="NeoFeed API",
     description="个人信息中枢 API",
-    version="0.2.0"
+    version="0.2.0",
+    default_response_class=FastJSONResponse
 )
 
 # 配置 CORS
@@ -34,35 +69,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 
-# ============================================
-# 数据模型
-# ============================================
-
-class SaveItemRequest(BaseModel):
-    """保存信息请求"""
-    content: str
-    title: Optional[str] = None
-    url: Optional[str] = None
-    enable_ai: bool = False
-
-
-class ItemResponse(BaseModel):
-    """信息条目响应"""
-    id: int
-    title: Optional[str]
-    content: str
-    url: Optional[str]
-    source_type: str
-    status: str
-    created_at: str
-    # AI 结果
-    summary: Optional[str] = None
-    category: Optional[str] = None
-    keywords: Optional[str] = None
-    importance_score: Optional[float] = None
+@app.on_event("startup")
+async def recover_pipeline():
+    """继续上次退出时未完成的处理阶段（抓取、AI 处理）"""
+    try:
+        pipeline.recover()
+    except Exception as e:
+        logger.error(f"Failed to recover pipeline: {e}")
 
 
 # ============================================
@@ -81,10 +98,10 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """健康检查"""
+    """健康检查（只读查询，不创建默认用户）"""
     db = get_db()
     try:
-        user = db.get_or_create_default_user()
+        db.cursor.execute("SELECT 1 FROM users LIMIT 1")
         db_status = "ok"
     except Exception as e:
         db_status = f"error: {str(e)}"
@@ -98,72 +115,138 @@ async def health_check():
     }
 
 
-@app.post("/api/items", response_model=dict)
-async def save_item(request: SaveItemRequest):
+def _duplicate_response(
+    db, user_id: int, item_id: int, idempotency_key: Optional[str], resaved: bool = True
+) -> FastJSONResponse:
+    """
+    重复保存时返回已有条目（不再抓取、不再触发 AI）
+    
+    用户再次保存同一内容时累计 duplicate_count（重要性评分特征）；幂等重试不计。
+    """
+    if idempotency_key:
+        db.save_idempotency_key(user_id, idempotency_key, item_id)
+    if resaved:
+        db.increment_duplicate_count(item_id)
+    
+    logger.info(f"Duplicate save, returning existing item: {item_id}")
+    
+    return FastJSONResponse({
+        "success": True,
+        "item_id": item_id,
+        "duplicate": True,
+        "message": "已保存过，未重复创建"
+    })
+
+
+@app.post("/api/items", response_model=SaveItemResponse)
+def save_item(
+    request: SaveItemRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    user: Dict = Depends(current_user)
+):
     """
     保存信息条目
     
     支持：
     1. 纯文本
-    2. URL（自动抓取）
+    2. URL（后台抓取）
     3. 带标题的内容
+    
+    URL 不在请求内抓取：先写入 fetch_status=queued 的 pending 条目，
+    抓取、重试和后续 AI 处理交给处理流水线（core.stages）。有后台任务时返回 202，
+    进度通过 GET /api/events 推送。
+    
+    去重：
+    - 带 Idempotency-Key 头的重试直接返回首次创建的 item_id
+    - 同一用户下规范化 URL 或内容相同的条目不会重复创建
     """
     db = get_db()
     
     try:
-        # 获取默认用户（MVP 单用户）
-        user = db.get_or_create_default_user()
         user_id = user['id']
         
+        # 幂等重试
+        if idempotency_key:
+            existing_id = db.get_idempotent_item(user_id, idempotency_key)
+            if existing_id:
+                return _duplicate_response(db, user_id, existing_id, None, resaved=False)
+        
         content = request.content.strip()
         title = request.title
         url = request.url
         source_type = 'manual'
         source_metadata = {}
+        fetch_status = None
         
         # 判断是否为 URL
         if web_fetcher.is_url(content):
             extracted_url = web_fetcher.extract_url(content)
             
+            # 已保存过的链接无需再次抓取
+            existing_id = db.find_duplicate_item(user_id, url=extracted_url)
+            if existing_id:
+                return _duplicate_response(db, user_id, existing_id, idempotency_key)
+            
             if Config.ENABLE_WEB_SCRAPING:
-                logger.info(f"Fetching URL: {extracted_url}")
-                
-                fetch_result = web_fetcher.fetch(extracted_url)
-                
-                if fetch_result['content']:
-                    content = fetch_result['content']
-                    title = fetch_result['title'] or title
-                    url = extracted_url
-                    source_type = 'web'
-                    source_metadata = {
-                        'domain': web_fetcher.get_domain(extracted_url),
-                        'original_url': extracted_url
-                    }
-                else:
-                    logger.warning(f"Failed to fetch URL: {fetch_result.get('error')}")
+                # 正文先用原始文本占位，抓取完成后覆盖
+                url = extracted_url
+                source_type = 'web'
+                source_metadata = {
+                    'domain': web_fetcher.get_domain(extracted_url),
+                    'original_url': extracted_url
+                }
+                fetch_status = 'queued'
+        
+        existing_id = db.find_duplicate_item(user_id, url=url, content=content)
+        if existing_id:
+            return _duplicate_response(db, user_id, existing_id, idempotency_key)
         
         # 保存到数据库
-        item_id = db.create_item(
-            user_id=user_id,
-            content=content,
-            title=title,
-            url=url,
-            source_type=source_type,
-            source_metadata=source_metadata
-        )
+        try:
+            item_id = db.create_item(
+                user_id=user_id,
+                content=content,
+                title=title,
+                url=url,
+                source_type=source_type,
+                source_metadata=source_metadata,
+                fetch_status=fetch_status
+            )
+        except sqlite3.IntegrityError:
+            # 并发保存同一内容时由唯一索引兜底
+            existing_id = db.find_duplicate_item(
+                user_id, url=url, content=content, use_filter=False
+            )
+            if not existing_id:
+                raise
+            return _duplicate_response(db, user_id, existing_id, idempotency_key)
+        
+        if idempotency_key:
+            db.save_idempotency_key(user_id, idempotency_key, item_id)
         
         logger.info(f"Item saved: {item_id}")
+        event_bus.publish(user_id, 'item.status', {'item_id': item_id, 'status': 'pending'})
         
-        # AI 处理（异步）
-        if request.enable_ai and Config.ENABLE_AI_PROCESSING:
+        run_ai = request.enable_ai and Config.ENABLE_AI_PROCESSING
+        
+        if fetch_status:
+            # 抓取完成后由流水线接着做 AI 处理
+            pipeline.submit(item_id, user_id, targets=AI_TARGETS if run_ai else FETCH_TARGETS)
+            message = "已接收，正在后台抓取" + (" - 完成后 AI 处理" if run_ai else "")
+        elif run_ai:
             logger.info(f"Starting AI processing for item {item_id}")
-            process_item_async(item_id, user_id)
+            pipeline.submit(item_id, user_id, targets=AI_TARGETS)
+            message = "保存成功 - AI 处理中..."
+        else:
+            message = "保存成功"
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "item_id": item_id,
-            "message": "保存成功" + (" - AI 处理中..." if request.enable_ai else "")
-        }
+            "status": "pending",
+            "fetch_status": fetch_status,
+            "message": message
+        }, status_code=202 if (fetch_status or run_ai) else 200)
     
     except Exception as e:
         logger.error(f"Failed to save item: {e}")
@@ -173,11 +256,36 @@ async def save_item(request: SaveItemRequest):
         db.close()
 
 
-@app.get("/api/items", response_model=dict)
+def _parse_time(value: Optional[str], name: str) -> Optional[str]:
+    """ISO 日期 / 时间 → 数据库里的 'YYYY-MM-DD HH:MM:SS'（UTC）"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {value}")
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+@app.get("/api/items", response_model=ItemListResponse)
 async def get_items(
+    http_request: Request,
     limit: int = 20,
     offset: int = 0,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None,
+    keyword: Optional[str] = None,
+    category: Optional[str] = None,
+    source_type: Optional[str] = None,
+    domain: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    min_importance: Optional[float] = None,
+    facets: Optional[str] = None,
+    user: Dict = Depends(current_user)
 ):
     """
     获取信息列表
@@ -186,30 +294,85 @@ async def get_items(
     - limit: 每页数量
     - offset: 偏移量
     - status: 筛选状态（pending/processing/processed/failed）
+    - keyword: 按关键词 / 主题筛选
+    - category / source_type / domain: 按分类、来源、网页域名筛选
+    - since / until: 保存时间范围（ISO 日期或时间，含 since 不含 until，UTC）
+    - min_importance: 重要性下限
+    - facets: 逗号分隔的分面维度（status/source_type/domain/category），返回各取值计数
+    - view: full（默认，含完整 content）/ compact（仅卡片字段 + 预览）
+    - fields: 逗号分隔的字段列表，优先于 view
+    
+    支持 If-None-Match：数据未变化时返回 304。
     """
+    filters = {
+        'keyword': keyword,
+        'category': category,
+        'source_type': source_type,
+        'domain': domain,
+        'since': _parse_time(since, 'since'),
+        'until': _parse_time(until, 'until'),
+        'min_importance': min_importance,
+    }
+    dimensions = [d.strip() for d in facets.split(',') if d.strip()] if facets else []
+    
+    if fields:
+        selected = [f.strip() for f in fields.split(',') if f.strip()]
+    elif view == 'compact':
+        selected = COMPACT_FIELDS
+    elif view in (None, 'full'):
+        selected = None
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown view: {view}")
+    
     db = get_db()
     
     try:
-        user = db.get_or_create_default_user()
         user_id = user['id']
         
-        items = db.get_items(
-            user_id=user_id,
-            limit=limit,
-            offset=offset,
-            status=status
-        )
+        # 先取版本再查数据：并发写入时最多返回一个偏旧的 ETag，不会误判 304
+        version = db.get_change_version(user_id)
+        etag = make_etag('items', user_id, version)
+        if is_not_modified(http_request, etag):
+            return not_modified_response(etag, 'list')
+        
+        # 首页走读缓存（按版本校验，见 core.cache）
+        cache_key = None
+        if offset == 0:
+            cache_key = (user_id, limit, status, tuple(selected) if selected else None,
+                         tuple(filters.values()), tuple(dimensions))
+            payload = db.read_cache.pages.get(cache_key, version)
+            if payload is not MISSING:
+                return FastJSONResponse(payload, headers=cache_headers(etag, 'list'))
         
-        total = db.get_items_count(user_id, status)
+        try:
+            items = db.get_items(
+                user_id=user_id,
+                limit=limit,
+                offset=offset,
+                status=status,
+                fields=selected,
+                **filters
+            )
+            facet_counts = db.get_facets(user_id, dimensions, status=status, **filters) if dimensions else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        return {
+        total = db.get_items_count(user_id, status, **filters)
+        
+        payload = {
             "success": True,
-            "items": items,
+            "items": embed_metadata(items),
             "total": total,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "facets": facet_counts
         }
+        if cache_key:
+            db.read_cache.pages.set(cache_key, payload, version)
+        return FastJSONResponse(payload, headers=cache_headers(etag, 'list'))
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get items: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -218,32 +381,130 @@ async def get_items(
         db.close()
 
 
-@app.get("/api/items/{item_id}", response_model=dict)
-async def get_item(item_id: int):
-    """获取单个条目详情"""
+def _encode_cursor(rank_key: float, item_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank_key, item_id]).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        rank_key, item_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return float(rank_key), int(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@app.get("/api/items/top", response_model=TopItemsResponse)
+async def get_top_items(
+    http_request: Request,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    source_type: Optional[str] = None,
+    fields: Optional[str] = None,
+    user: Dict = Depends(current_user)
+):
+    """
+    精选条目：按重要性叠加时间衰减排序（半衰期 RANK_HALF_LIFE_DAYS）
+    
+    参数:
+    - limit: 每页数量（最多 100）
+    - cursor: 上一页返回的 next_cursor
+    - category / source_type: 筛选
+    - fields: 逗号分隔的字段列表（默认精简视图字段）
+    
+    支持 If-None-Match：数据未变化时返回 304。
+    """
+    limit = max(1, min(limit, 100))
+    after = _decode_cursor(cursor) if cursor else None
+    selected = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+    
     db = get_db()
     
     try:
-        item = db.get_item(item_id)
+        user_id = user['id']
         
-        if not item:
-            raise HTTPException(status_code=404, detail="Item not found")
+        etag = make_etag('top', user_id, db.get_change_version(user_id))
+        if is_not_modified(http_request, etag):
+            return not_modified_response(etag, 'list')
         
-        # 获取 AI 结果
-        ai_result = db.get_ai_result_by_item(item_id)
+        try:
+            items = db.get_top_items(
+                user_id=user_id,
+                limit=limit,
+                after=after,
+                category=category,
+                source_type=source_type,
+                fields=selected
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        if ai_result:
-            item.update({
-                'summary': ai_result.get('summary'),
-                'category': ai_result.get('category'),
-                'keywords': ai_result.get('keywords'),
-                'importance_score': ai_result.get('importance_score')
-            })
+        next_cursor = None
+        for item in items:
+            last = (item.pop('_rank_key'), item.pop('_item_id'))
+        if len(items) == limit:
+            next_cursor = _encode_cursor(*last)
         
-        return {
+        return FastJSONResponse({
+            "success": True,
+            "items": embed_metadata(items),
+            "limit": limit,
+            "next_cursor": next_cursor
+        }, headers=cache_headers(etag, 'list'))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get top items: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        db.close()
+
+
+@app.get("/api/items/{item_id}", response_model=ItemDetailResponse)
+async def get_item(item_id: int, http_request: Request):
+    """
+    获取单个条目详情
+    
+    支持 If-None-Match：数据未变化时返回 304。详情走读缓存（见 core.cache）。
+    """
+    db = get_db()
+    
+    try:
+        version = db.get_change_version()
+        etag = make_etag('item', item_id, version)
+        if is_not_modified(http_request, etag):
+            return not_modified_response(etag, 'item')
+        
+        item = db.read_cache.items.get(item_id, version)
+        if item is MISSING:
+            item = db.get_item(item_id)
+            
+            if not item:
+                raise HTTPException(status_code=404, detail="Item not found")
+            # 只返回对外字段（同列表的完整视图），去重哈希、抓取重试等内部列不出现在响应里
+            item = {field: item[field] for field in LIST_FIELDS if field in item}
+            
+            # 获取 AI 结果
+            ai_result = db.get_ai_result_by_item(item_id)
+            
+            if ai_result:
+                item.update({
+                    'summary': ai_result.get('summary'),
+                    'category': ai_result.get('category'),
+                    'keywords': ai_result.get('keywords'),
+                    'topics': ai_result.get('topics'),
+                    'importance_score': ai_result.get('importance_score')
+                })
+            
+            item = embed_metadata([item])[0]
+            db.read_cache.items.set(item_id, item, version)
+        
+        return FastJSONResponse({
             "success": True,
             "item": item
-        }
+        }, headers=cache_headers(etag, 'item'))
     
     except HTTPException:
         raise
@@ -255,22 +516,29 @@ async def get_item(item_id: int):
         db.close()
 
 
-@app.get("/api/stats", response_model=dict)
-async def get_stats(days: int = 7):
-    """获取统计数据"""
+@app.get("/api/stats", response_model=StatsResponse)
+async def get_stats(http_request: Request, days: int = 7, user: Dict = Depends(current_user)):
+    """
+    获取统计数据
+    
+    统计窗口随时间滑动，ETag 额外带上分钟数。
+    """
     db = get_db()
     
     try:
-        user = db.get_or_create_default_user()
         user_id = user['id']
         
+        etag = make_etag('stats', user_id, db.get_change_version(user_id), int(time.time() // 60))
+        if is_not_modified(http_request, etag):
+            return not_modified_response(etag, 'stats')
+        
         stats = db.get_user_stats(user_id, days)
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "stats": stats,
             "period_days": days
-        }
+        }, headers=cache_headers(etag, 'stats'))
     
     except Exception as e:
         logger.error(f"Failed to get stats: {e}")
@@ -280,8 +548,253 @@ async def get_stats(days: int = 7):
         db.close()
 
 
-@app.post("/api/items/{item_id}/process", response_model=dict)
-async def process_item(item_id: int):
+@app.get("/api/keywords", response_model=KeywordsResponse)
+async def get_keywords(
+    http_request: Request,
+    limit: int = 50,
+    kind: str = 'keyword',
+    user: Dict = Depends(current_user)
+):
+    """
+    关键词统计：条目数最多的前 N 个关键词（kind=keyword）或主题（kind=topic）
+    
+    支持 If-None-Match：数据未变化时返回 304。
+    """
+    limit = max(1, min(limit, 500))
+    db = get_db()
+    
+    try:
+        user_id = user['id']
+        
+        etag = make_etag('keywords', user_id, db.get_change_version(user_id))
+        if is_not_modified(http_request, etag):
+            return not_modified_response(etag, 'list')
+        
+        try:
+            keywords = db.get_top_keywords(user_id, limit, kind)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        return FastJSONResponse({
+            "success": True,
+            "kind": kind,
+            "keywords": keywords
+        }, headers=cache_headers(etag, 'list'))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get keywords: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        db.close()
+
+
+@app.get("/api/domains", response_model=DomainsResponse)
+async def get_domains(http_request: Request, limit: int = 50, user: Dict = Depends(current_user)):
+    """
+    来源域名统计：条目数最多的前 N 个域名，含最近保存时间
+    
+    支持 If-None-Match：数据未变化时返回 304。
+    """
+    limit = max(1, min(limit, 500))
+    db = get_db()
+    
+    try:
+        user_id = user['id']
+        
+        etag = make_etag('domains', user_id, db.get_change_version(user_id))
+        if is_not_modified(http_request, etag):
+            return not_modified_response(etag, 'list')
+        
+        return FastJSONResponse({
+            "success": True,
+            "domains": db.get_domains(user_id, limit)
+        }, headers=cache_headers(etag, 'list'))
+    
+    except Exception as e:
+        logger.error(f"Failed to get domains: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        db.close()
+
+
+@app.get("/api/tags", response_model=TagListResponse)
+async def list_tags(user: Dict = Depends(current_user)):
+    """标签列表（含条目数）"""
+    db = get_db()
+    
+    try:
+        return FastJSONResponse({
+            "success": True,
+            "tags": db.get_tags(user['id'])
+        })
+    
+    except Exception as e:
+        logger.error(f"Failed to list tags: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        db.close()
+
+
+# 写接口用普通 def：FastAPI 放到线程池执行。开启 GROUP_COMMIT 时写方法要等写线程提交，
+# 写在 async def 里会卡住事件循环上的所有请求。
+
+@app.post("/api/tags", response_model=TagDetailResponse, status_code=201)
+def create_tag(request: CreateTagRequest, user: Dict = Depends(current_user)):
+    """创建标签（同名标签已存在时返回 409）"""
+    db = get_db()
+    
+    try:
+        try:
+            tag_id = db.create_tag(
+                user_id=user['id'],
+                name=request.name.strip(),
+                category=request.category,
+                color=request.color,
+                description=request.description
+            )
+        except sqlite3.IntegrityError:
+            raise HTTPException(status_code=409, detail="Tag already exists")
+        
+        return FastJSONResponse({
+            "success": True,
+            "tag": db.get_tag(user['id'], tag_id)
+        }, status_code=201)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to create tag: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        db.close()
+
+
+@app.delete("/api/tags/{tag_id}")
+def delete_tag(tag_id: int, user: Dict = Depends(current_user)):
+    """删除标签（条目本身不受影响）"""
+    db = get_db()
+    
+    try:
+        if not db.delete_tag(user['id'], tag_id):
+            raise HTTPException(status_code=404, detail="Tag not found")
+        return FastJSONResponse({"success": True, "tag_id": tag_id})
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to delete tag: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        db.close()
+
+
+def _bulk_tag(user: Dict, tag_id: int, item_ids: List[int], remove: bool):
+    db = get_db()
+    
+    try:
+        if not db.get_tag(user['id'], tag_id):
+            raise HTTPException(status_code=404, detail="Tag not found")
+        
+        if remove:
+            changed = db.untag_items(tag_id, item_ids)
+        else:
+            changed = db.tag_items(user['id'], tag_id, item_ids)
+        
+        return FastJSONResponse({
+            "success": True,
+            "tag_id": tag_id,
+            "changed": changed,
+            "item_count": db.get_tag(user['id'], tag_id)['item_count']
+        })
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to {'untag' if remove else 'tag'} items: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        db.close()
+
+
+@app.post("/api/tags/{tag_id}/items", response_model=TagItemsResponse)
+def tag_items(tag_id: int, request: TagItemsRequest, user: Dict = Depends(current_user)):
+    """
+    批量打标签（单条 INSERT ... SELECT，一个事务）
+    
+    不存在或不属于当前用户的条目、已有的关联会被忽略，changed 为实际新增数。
+    """
+    return _bulk_tag(user, tag_id, request.item_ids, remove=False)
+
+
+@app.post("/api/tags/{tag_id}/items/remove", response_model=TagItemsResponse)
+def untag_items(tag_id: int, request: TagItemsRequest, user: Dict = Depends(current_user)):
+    """批量移除标签（单条 DELETE，一个事务），changed 为实际删除数"""
+    return _bulk_tag(user, tag_id, request.item_ids, remove=True)
+
+
+@app.get("/api/tags/{tag_id}/items", response_model=TaggedItemsResponse)
+async def get_tagged_items(
+    tag_id: int,
+    limit: int = 20,
+    before: Optional[int] = None,
+    fields: Optional[str] = None,
+    user: Dict = Depends(current_user)
+):
+    """
+    标签下的条目，从新到旧
+    
+    参数:
+    - limit: 每页数量（最多 100）
+    - before: 上一页返回的 next_before
+    - fields: 逗号分隔的字段列表（默认精简视图字段）
+    """
+    limit = max(1, min(limit, 100))
+    selected = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+    
+    db = get_db()
+    
+    try:
+        tag = db.get_tag(user['id'], tag_id)
+        if not tag:
+            raise HTTPException(status_code=404, detail="Tag not found")
+        
+        try:
+            items = db.get_items_by_tag(tag_id, limit=limit, before=before, fields=selected)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        last_id = None
+        for item in items:
+            last_id = item.pop('_item_id')
+        
+        return FastJSONResponse({
+            "success": True,
+            "tag": tag,
+            "items": embed_metadata(items),
+            "limit": limit,
+            "next_before": last_id if len(items) == limit else None
+        })
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get tagged items: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        db.close()
+
+
+@app.post("/api/items/{item_id}/process", response_model=ProcessResponse)
+def process_item(item_id: int):
     """手动触发 AI 处理"""
     if not Config.ENABLE_AI_PROCESSING:
         raise HTTPException(status_code=400, detail="AI processing is disabled")
@@ -294,17 +807,17 @@ async def process_item(item_id: int):
         if not item:
             raise HTTPException(status_code=404, detail="Item not found")
         
-        # 更新状态
-        db.update_item_status(item_id, 'processing')
+        # 重新排队（items.status 没有 processing 状态，处理进度通过事件推送）
+        db.update_item_status(item_id, 'pending')
         
         # 开始处理
         process_item_async(item_id, item['user_id'])
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "message": "AI 处理已开始",
             "item_id": item_id
-        }
+        })
     
     except HTTPException:
         raise
@@ -316,6 +829,157 @@ async def process_item(item_id: int):
         db.close()
 
 
+@app.get("/api/events")
+async def stream_events(
+    http_request: Request,
+    item_id: Optional[int] = None,
+    user: Dict = Depends(current_user)
+):
+    """
+    订阅处理状态（Server-Sent Events）
+    
+    事件:
+    - item.status: {"item_id", "status"}，status 变化时推送
+    - item.processed: {"item_id", "status", "ai_result"}，AI 处理完成时推送
+    
+    参数:
+    - item_id: 只订阅单个条目
+    """
+    user_id = user['id']
+    
+    async def stream():
+        # 在生成器内订阅：客户端未开始读取就断开时不会留下订阅
+        sub = event_bus.subscribe(user_id, item_id)
+        try:
+            yield "retry: 3000\n\n"
+            while not await http_request.is_disconnected():
+                event = await sub.get(timeout=KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield format_sse(event['data'], event['event'], event['id'])
+        finally:
+            event_bus.unsubscribe(sub)
+    
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.get("/api/items/{item_id}/summary/stream")
+async def stream_summary(item_id: int, refresh: bool = False):
+    """
+    流式生成摘要（Server-Sent Events）
+    
+    事件:
+    - token: {"text"}，模型每产出一段就推送
+    - done: {"summary", "ttft_ms", "total_ms"}，完整摘要已写入 ai_results
+    - error: {"error"}
+    
+    已有摘要且未指定 refresh 时直接返回 done。客户端中途断开会取消上游请求，
+    不保存不完整的摘要。
+    """
+    if not Config.ENABLE_AI_PROCESSING or not Config.OPENAI_API_KEY:
+        raise HTTPException(status_code=400, detail="AI processing is disabled")
+    
+    db = get_db()
+    try:
+        item = db.get_item(item_id)
+        if not item:
+            raise HTTPException(status_code=404, detail="Item not found")
+        existing = None if refresh else db.get_ai_result_by_item(item_id)
+    finally:
+        db.close()
+    
+    async def stream():
+        if existing and existing.get('summary'):
+            yield format_sse({'summary': existing['summary'], 'cached': True}, 'done')
+            return
+        
+        start = time.perf_counter()
+        ttft_ms = None
+        parts = []
+        
+        try:
+            async for token in ai_processor.stream_summary(item['content']):
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - start) * 1000, 1)
+                parts.append(token)
+                yield format_sse({'text': token}, 'token')
+        except asyncio.CancelledError:
+            metrics.incr('summary.stream_cancelled')
+            logger.info(f"Summary stream cancelled by client: {item_id}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to stream summary for item {item_id}: {e}")
+            yield format_sse({'error': str(e)}, 'error')
+            return
+        
+        summary = ''.join(parts).strip()
+        total_ms = int((time.perf_counter() - start) * 1000)
+        
+        def save():
+            db = get_db()
+            try:
+                db.save_summary(item_id, item['user_id'], summary, processing_time_ms=total_ms)
+            finally:
+                db.close()
+        
+        # 写入可能要等写线程提交（GROUP_COMMIT），放到线程池，不阻塞事件循环
+        await run_in_threadpool(save)
+        
+        yield format_sse({'summary': summary, 'ttft_ms': ttft_ms, 'total_ms': total_ms}, 'done')
+    
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """进程内指标（计数器、耗时分布、读缓存命中率、合并提交批大小、SQL 剖析汇总）"""
+    snapshot = metrics.snapshot()
+    snapshot['gauges'] = {'pipeline.pending': pipeline.pending}
+    snapshot['caches'] = read_cache_stats()
+    snapshot['writers'] = writer_stats()
+    snapshot['queries'] = profiler.summary()
+    return {
+        "success": True,
+        "metrics": snapshot
+    }
+
+
+@app.get("/api/metrics/queries")
+async def get_query_metrics(limit: int = 20, order: str = 'total_ms'):
+    """
+    SQL 剖析（QUERY_PROFILING=true 时记录，见 core.profiler）
+
+    参数:
+    - limit: 返回前 N 条规范化语句
+    - order: 排序字段（total_ms / count / mean_ms / max_ms / rows），默认总耗时
+
+    只读；清空统计用 DELETE /api/metrics/queries。
+    """
+    if order not in ORDERS:
+        raise HTTPException(status_code=400, detail=f"order must be one of: {', '.join(ORDERS)}")
+    limit = max(1, min(limit, 200))
+    return {
+        "success": True,
+        "enabled": Config.QUERY_PROFILING,
+        "slow_ms": Config.QUERY_SLOW_MS,
+        "summary": profiler.summary(),
+        "queries": profiler.top(limit, order),
+        "slow": list(profiler.slow),
+    }
+
+
+@app.delete("/api/metrics/queries")
+async def reset_query_metrics():
+    """清空 SQL 剖析的统计和最近慢查询（对比某段时间的负载），返回清空前的汇总"""
+    summary = profiler.summary()
+    profiler.reset()
+    return {
+        "success": True,
+        "summary": summary
+    }
+
+
 # ============================================
 # 启动命令
 # ============================================
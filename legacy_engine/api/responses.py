@@ -0,0 +1,55 @@
+"""
+快速 JSON 响应
+
+orjson 可用时用 orjson 序列化（比标准库 json 快一个数量级），否则退回 json。
+路由直接返回 FastJSONResponse 时，FastAPI 会跳过 response_model 校验和
+jsonable_encoder，只适用于来自数据库的可信数据。
+"""
+
+import json
+from typing import Any, Dict, List
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 序列化的 JSON 响应"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+def raw_json(text: str) -> Any:
+    """
+    嵌入数据库里存的 JSON 文本
+
+    text 必须是合法 JSON：DatabaseManager 读出的 source_metadata 已在 SQL 里保证
+    （非法 JSON 转成 JSON 字符串，见 core.database.SOURCE_METADATA_JSON）。orjson 支持
+    Fragment（≥ 3.9）时原样写入响应，不解析也不重新序列化；否则解析，解析失败退回原字符串。
+    """
+    if orjson is not None and hasattr(orjson, 'Fragment'):
+        return orjson.Fragment(text)
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def embed_metadata(items: List[Dict]) -> List[Dict]:
+    """条目中的 source_metadata（JSON 文本）按 raw_json 嵌入"""
+    for item in items:
+        if item.get('source_metadata'):
+            item['source_metadata'] = raw_json(item['source_metadata'])
+    return items
@@ -0,0 +1,197 @@
+"""
+API 数据模型（Pydantic v2）
+
+响应模型用于 OpenAPI 文档；路由对可信的数据库输出直接返回
+FastJSONResponse，不再逐字段校验。
+"""
+
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+
+# ============================================
+# 请求
+# ============================================
+
+class SaveItemRequest(BaseModel):
+    """保存信息请求"""
+    content: str
+    title: Optional[str] = None
+    url: Optional[str] = None
+    enable_ai: bool = False
+
+
+class CreateTagRequest(BaseModel):
+    """创建标签请求"""
+    name: str = Field(min_length=1, max_length=50)
+    category: Optional[str] = None
+    color: Optional[str] = None
+    description: Optional[str] = None
+
+
+class TagItemsRequest(BaseModel):
+    """批量打标签 / 移除标签请求"""
+    item_ids: List[int] = Field(min_length=1, max_length=10000)
+
+
+# ============================================
+# 响应
+# ============================================
+
+class ItemResponse(BaseModel):
+    """
+    信息条目响应
+    
+    列表接口支持 fields / view=compact 投影，除 id 外的字段都可能缺省。
+    """
+    id: int
+    user_id: Optional[int] = None
+    title: Optional[str] = None
+    content: Optional[str] = None
+    preview: Optional[str] = None
+    url: Optional[str] = None
+    source_type: Optional[str] = None
+    source_metadata: Optional[Union[Dict[str, Any], str]] = None
+    domain: Optional[str] = None
+    original_url: Optional[str] = None
+    word_count: Optional[int] = None
+    language: Optional[str] = None
+    status: Optional[str] = None
+    fetch_status: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    # AI 结果
+    summary: Optional[str] = None
+    category: Optional[str] = None
+    keywords: Optional[str] = None
+    topics: Optional[str] = None
+    importance_score: Optional[float] = None
+
+
+class SaveItemResponse(BaseModel):
+    """保存结果"""
+    success: bool
+    item_id: int
+    message: str
+    duplicate: bool = False
+    status: Optional[str] = None
+    fetch_status: Optional[str] = None
+
+
+class FacetCount(BaseModel):
+    """分面取值计数"""
+    value: str
+    count: int
+
+
+class ItemListResponse(BaseModel):
+    """信息列表"""
+    success: bool
+    items: List[ItemResponse]
+    total: int
+    limit: int
+    offset: int
+    facets: Optional[Dict[str, List[FacetCount]]] = None
+
+
+class TopItemsResponse(BaseModel):
+    """精选条目（游标分页）"""
+    success: bool
+    items: List[ItemResponse]
+    limit: int
+    next_cursor: Optional[str] = None
+
+
+class ItemDetailResponse(BaseModel):
+    """条目详情"""
+    success: bool
+    item: ItemResponse
+
+
+class UserStats(BaseModel):
+    """用户统计"""
+    total: int = 0
+    processed: Optional[int] = None
+    pending: Optional[int] = None
+    failed: Optional[int] = None
+
+
+class StatsResponse(BaseModel):
+    """统计数据"""
+    success: bool
+    stats: UserStats
+    period_days: int
+
+
+class KeywordCount(BaseModel):
+    """关键词及其条目数"""
+    name: str
+    count: int
+
+
+class KeywordsResponse(BaseModel):
+    """关键词统计"""
+    success: bool
+    kind: str
+    keywords: List[KeywordCount]
+
+
+class DomainCount(BaseModel):
+    """来源域名及其条目数"""
+    domain: str
+    count: int
+    last_seen: str
+
+
+class DomainsResponse(BaseModel):
+    """来源域名统计"""
+    success: bool
+    domains: List[DomainCount]
+
+
+class TagResponse(BaseModel):
+    """标签"""
+    id: int
+    name: str
+    category: Optional[str] = None
+    color: Optional[str] = None
+    description: Optional[str] = None
+    item_count: int = 0
+    created_at: Optional[str] = None
+
+
+class TagDetailResponse(BaseModel):
+    """单个标签"""
+    success: bool
+    tag: TagResponse
+
+
+class TagListResponse(BaseModel):
+    """标签列表"""
+    success: bool
+    tags: List[TagResponse]
+
+
+class TagItemsResponse(BaseModel):
+    """批量打标签 / 移除标签结果"""
+    success: bool
+    tag_id: int
+    changed: int
+    item_count: int
+
+
+class TaggedItemsResponse(BaseModel):
+    """标签下的条目（游标分页）"""
+    success: bool
+    tag: TagResponse
+    items: List[ItemResponse]
+    limit: int
+    next_before: Optional[int] = None
+
+
+class ProcessResponse(BaseModel):
+    """AI 处理触发结果"""
+    success: bool
+    message: str
+    item_id: int
@@ -0,0 +1,28 @@
+"""
+Server-Sent Events 工具
+"""
+
+import json
+from typing import Any, Optional
+
+# 空闲连接的心跳间隔（秒），防止代理断开长连接
+KEEPALIVE_SECONDS = 15
+
+# 响应头：禁止缓存和 nginx 缓冲
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no',
+}
+
+
+def format_sse(data: Any, event: Optional[str] = None, event_id: Optional[int] = None) -> str:
+    """格式化一条 SSE 消息"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    payload = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+    for line in payload.splitlines() or ['']:
+        lines.append(f"data: {line}")
+    return '\n'.join(lines) + '\n\n'
@@ -0,0 +1,45 @@
+"""
+请求用户解析
+
+所有需要用户的路由都通过 current_user 依赖取得用户，这里是接入真正认证
+（Token / Session → 用户）的唯一位置。
+
+目前是单用户 MVP：默认用户在进程内首次请求时解析一次（必要时创建，见
+DatabaseManager.get_or_create_default_user），按数据库路径缓存，之后的请求
+不再查 users 表。缓存的只是身份（id / email），偏好等可变字段应现查。
+"""
+
+import threading
+from typing import Dict
+
+from fastapi import Request
+
+from core.config import Config
+from core.database import get_db
+
+_users: Dict[str, Dict] = {}
+_users_lock = threading.Lock()
+
+
+def default_user() -> Dict:
+    """默认用户（进程内缓存）"""
+    path = Config.DATABASE_PATH
+    user = _users.get(path)
+    if user is not None:
+        return user
+
+    with _users_lock:
+        user = _users.get(path)
+        if user is None:
+            db = get_db()
+            try:
+                row = db.get_or_create_default_user()
+            finally:
+                db.close()
+            user = _users[path] = {'id': row['id'], 'email': row['email']}
+    return user
+
+
+async def current_user(request: Request) -> Dict:
+    """FastAPI 依赖：当前请求的用户"""
+    return default_user()
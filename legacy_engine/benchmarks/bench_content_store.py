@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文压缩存储基准：inline vs compressed vs compressed + 字典
+
+对比数据库文件大小、get_item 读延迟、create_item 写入成本，
+以及压缩存储下列表查询（compact）的延迟。
+
+用法:
+    python benchmarks/bench_content_store.py --items 2000 --content-length 8000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from common import SCHEMA_PATH, measure, print_table, random_content
+from core.config import Config
+from core.database import DatabaseManager, COMPACT_FIELDS
+
+
+def build(mode: str, items: int, content_length: int, seed: int = 7) -> dict:
+    """按指定模式写入数据，返回统计"""
+    path = os.path.join(tempfile.mkdtemp(prefix='neofeed_cs_'), 'neofeed.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_PATH.read_text(encoding='utf-8'))
+    conn.close()
+
+    Config.CONTENT_STORE = 'inline' if mode == 'inline' else 'compressed'
+    rng = random.Random(seed)
+    contents = [
+        f"#{n} " + random_content(rng, max(200, int(rng.gauss(content_length, content_length * 0.3))))
+        for n in range(items)
+    ]
+
+    db = DatabaseManager(path)
+    user_id = db.get_or_create_default_user()['id']
+
+    if mode == 'compressed+dict':
+        db.content_store.train_dictionary(contents[:min(len(contents), 500)])
+        db.conn.commit()
+
+    start = time.perf_counter()
+    for n, content in enumerate(contents):
+        db.create_item(user_id=user_id, content=content, title=f"条目 {n}", source_type='web')
+    ingest_ms = (time.perf_counter() - start) * 1000 / items
+
+    ids = [r[0] for r in db.conn.execute("SELECT id FROM items").fetchall()]
+    sample = [rng.choice(ids) for _ in range(200)]
+    read = measure(lambda: [db.get_item(i) for i in sample], repeat=5)
+    page = measure(lambda: db.get_items(user_id, limit=50, fields=COMPACT_FIELDS), repeat=20)
+    db.close()
+
+    return {
+        'mode': mode,
+        'db_mb': os.path.getsize(path) / 1024 / 1024,
+        'ingest_ms': ingest_ms,
+        'get_item_ms': read['mean_ms'] / len(sample),
+        'page_ms': page['mean_ms'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--content-length', type=int, default=8000)
+    args = parser.parse_args()
+
+    modes = ['inline', 'compressed']
+    from core.content_store import zstandard
+    if zstandard is not None:
+        modes.append('compressed+dict')
+    else:
+        print("⚠️  未安装 zstandard，压缩使用 zlib，跳过字典模式")
+
+    rows = [build(mode, args.items, args.content_length) for mode in modes]
+
+    print(f"\n📊 {args.items} 条，平均正文 {args.content_length} 字:")
+    print_table(rows, ['mode', 'db_mb', 'ingest_ms', 'get_item_ms', 'page_ms'])
+
+
+if __name__ == '__main__':
+    main()
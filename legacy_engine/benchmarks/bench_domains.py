@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+来源域名基准：Python 端逐行解析 source_metadata / SQL 现算 json_extract vs 生成列 + 索引
+
+在百万级数据集上对比按域名筛选（计数 + 首页）和域名统计（条目数 + 最近保存时间）
+的延迟，并对比列表页 source_metadata 解析后再序列化 vs 原样嵌入响应。
+域名按 Zipf 分布抽取，既有热门域名也有长尾域名。
+
+用法:
+    python benchmarks/bench_domains.py --items 1000000
+    python benchmarks/bench_domains.py --items 200000 --domains 2000
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from common import SCHEMA_PATH, measure, print_table
+
+SOURCES = ['web', 'web', 'web', 'wechat', 'telegram', 'manual']
+
+
+def build_db(items: int, domains: int, seed: int) -> str:
+    """直接批量写入；网页条目带 domain / original_url，公众号条目带公众号 / 作者"""
+    from core.database import DatabaseManager
+
+    path = os.path.join(tempfile.mkdtemp(prefix='neofeed_bench_'), 'neofeed.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_PATH.read_text(encoding='utf-8'))
+    conn.close()
+
+    db = DatabaseManager(path)
+    user_id = db.get_or_create_default_user()['id']
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    names = [f"site{n}.com" for n in range(domains)]
+    cum_weights = list(itertools.accumulate(1 / (n + 1) for n in range(domains)))
+
+    batch = 50000
+    for start in range(0, items, batch):
+        rows = []
+        for n in range(start, min(start + batch, items)):
+            created = (now - timedelta(seconds=rng.random() * 365 * 86400)).strftime('%Y-%m-%d %H:%M:%S')
+            source = rng.choice(SOURCES)
+            if source == 'web':
+                domain = rng.choices(names, cum_weights=cum_weights)[0]
+                metadata = json.dumps({'domain': domain, 'original_url': f"https://{domain}/post/{n}"})
+            elif source == 'wechat':
+                metadata = json.dumps({'公众号': '产品洞察', '作者': '李四'}, ensure_ascii=False)
+            else:
+                metadata = None
+            rows.append((n + 1, user_id, f"条目 {n}", "正文" * 100, "正文", source, metadata, 200,
+                         'processed', created))
+        with db.conn:
+            db.conn.executemany("""
+                INSERT INTO items (id, user_id, title, content, preview, source_type, source_metadata,
+                                   word_count, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+    db.conn.execute("ANALYZE")
+    db.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=1000000)
+    parser.add_argument('--domains', type=int, default=5000, help='域名数')
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"📦 生成测试数据: {args.items} 条，{args.domains} 个域名...")
+    start = time.perf_counter()
+    db_path = build_db(args.items, args.domains, seed=42)
+    print(f"   完成，{time.perf_counter() - start:.0f}s，库大小 {os.path.getsize(db_path) / 1024 / 1024:.0f} MB")
+
+    from api.responses import FastJSONResponse, embed_metadata, orjson
+    from core.database import DatabaseManager
+
+    db = DatabaseManager(db_path)
+    user_id = db.get_or_create_default_user()['id']
+    limit = args.page_size
+
+    def python_filter(domain: str):
+        # 旧做法：取出该用户全部条目，逐行解析 JSON 再比对
+        total, page = 0, []
+        for row in db.conn.execute("""
+            SELECT id, title, source_metadata FROM items WHERE user_id = ? ORDER BY created_at DESC
+        """, (user_id,)):
+            if row['source_metadata'] and json.loads(row['source_metadata']).get('domain') == domain:
+                total += 1
+                if len(page) < limit:
+                    page.append(row)
+        return total, page
+
+    def sql_filter(domain: str):
+        # SQL 里现算 json_extract，没有可用索引
+        total = db.conn.execute("""
+            SELECT COUNT(*) FROM items NOT INDEXED
+            WHERE user_id = ? AND json_extract(source_metadata, '$.domain') = ?
+        """, (user_id, domain)).fetchone()[0]
+        page = db.conn.execute("""
+            SELECT id, title FROM items NOT INDEXED
+            WHERE user_id = ? AND json_extract(source_metadata, '$.domain') = ?
+            ORDER BY created_at DESC LIMIT ?
+        """, (user_id, domain, limit)).fetchall()
+        return total, page
+
+    def column_filter(domain: str):
+        total = db.get_items_count(user_id, domain=domain)
+        page = db.get_items(user_id, limit=limit, fields=['id', 'title'], domain=domain)
+        return total, page
+
+    def python_stats():
+        counts, last_seen = Counter(), {}
+        for row in db.conn.execute("""
+            SELECT source_metadata, created_at FROM items WHERE user_id = ? AND source_metadata IS NOT NULL
+        """, (user_id,)):
+            domain = json.loads(row[0]).get('domain')
+            if domain:
+                counts[domain] += 1
+                last_seen[domain] = max(last_seen.get(domain, ''), row[1])
+        top = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:50]
+        return [(d, c, last_seen[d]) for d, c in top]
+
+    def sql_stats():
+        return db.conn.execute("""
+            SELECT json_extract(source_metadata, '$.domain') AS domain, COUNT(*) AS count,
+                   MAX(created_at) AS last_seen
+            FROM items NOT INDEXED
+            WHERE user_id = ? AND domain IS NOT NULL
+            GROUP BY domain ORDER BY count DESC LIMIT 50
+        """, (user_id,)).fetchall()
+
+    ranked = db.get_domains(user_id, limit=args.domains)
+    probes = [('热门', ranked[0]), ('长尾', ranked[len(ranked) // 2])]
+    expected = [(d['domain'], d['count'], d['last_seen']) for d in ranked[:50]]
+    print(f"   域名统计与 Python 解析一致: {'✅' if python_stats() == expected else '❌'}")
+
+    rows = []
+    for label, domain in probes:
+        for name, fn in (('Python 解析', python_filter), ('json_extract', sql_filter), ('生成列 + 索引', column_filter)):
+            repeat = args.repeat if name == '生成列 + 索引' else max(3, args.repeat // 5)
+            rows.append({
+                'query': f"筛选 {label}域名 {name}",
+                'matches': domain['count'],
+                **measure(lambda: fn(domain['domain']), repeat=repeat, warmup=1),
+            })
+    for name, fn in (('Python 解析', python_stats), ('json_extract', sql_stats),
+                     ('生成列 + 索引', lambda: db.get_domains(user_id, 50))):
+        repeat = args.repeat if name == '生成列 + 索引' else max(3, args.repeat // 5)
+        rows.append({'query': f"域名统计 Top 50 {name}", 'matches': len(ranked),
+                     **measure(fn, repeat=repeat, warmup=1)})
+
+    print(f"\n📊 {args.items} 条，每页 {limit} 条（筛选 = 总数 + 首页）:")
+    print_table(rows, ['query', 'matches', 'mean_ms', 'p50_ms', 'p95_ms'])
+
+    # 列表页响应：逐条 json.loads 后再序列化 vs 原样嵌入（orjson.Fragment）
+    page = db.get_items(user_id, limit=100, fields=['id', 'title', 'source_type', 'source_metadata'])
+
+    def decode_render():
+        items = [dict(item) for item in page]
+        for item in items:
+            if item['source_metadata']:
+                item['source_metadata'] = json.loads(item['source_metadata'])
+        return FastJSONResponse({'items': items}).body
+
+    def raw_render():
+        return FastJSONResponse({'items': embed_metadata([dict(item) for item in page])}).body
+
+    render_rows = [
+        {'method': '解析后序列化', **measure(decode_render, repeat=args.repeat * 10)},
+        {'method': '原样嵌入', **measure(raw_render, repeat=args.repeat * 10)},
+    ]
+    fragment = orjson is not None and hasattr(orjson, 'Fragment')
+    print(f"\n📊 列表页 100 条 source_metadata 响应序列化（orjson.Fragment {'可用' if fragment else '不可用，退回解析'}）:")
+    print_table(render_rows, ['method', 'mean_ms', 'p50_ms', 'p95_ms'])
+
+    print("\n🔍 查询计划:")
+    plans = [
+        ('json_extract 筛选', """
+            SELECT id FROM items NOT INDEXED
+            WHERE user_id = ? AND json_extract(source_metadata, '$.domain') = ?
+            ORDER BY created_at DESC LIMIT ?
+        """, (user_id, probes[0][1]['domain'], limit)),
+        ('生成列筛选', """
+            SELECT id FROM items WHERE user_id = ? AND domain = ? ORDER BY created_at DESC LIMIT ?
+        """, (user_id, probes[0][1]['domain'], limit)),
+        ('生成列统计', """
+            SELECT domain, COUNT(*), MAX(created_at) FROM items
+            WHERE user_id = ? AND domain IS NOT NULL GROUP BY domain ORDER BY 2 DESC LIMIT 50
+        """, (user_id,)),
+    ]
+    for name, sql, params in plans:
+        print(f"   {name}:")
+        for row in db.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+            print(f"      {row[3]}")
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
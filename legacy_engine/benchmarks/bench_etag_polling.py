@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+轮询负载测试：有无 If-None-Match 时的数据库查询量
+
+模拟多个标签页轮询 GET /api/items 和 GET /api/items/{id}，
+期间每隔若干轮写入一次（模拟 AI 处理完成），统计每个请求执行的 SQL 条数和延迟。
+
+用法:
+    python benchmarks/bench_etag_polling.py --tabs 10 --rounds 50 --write-every 10
+"""
+
+import argparse
+import time
+
+from common import create_temp_db, print_table
+
+from core.config import Config
+from core.database import DatabaseManager
+
+# 统计每条 SQL（不含 PRAGMA/迁移检查）
+stats = {'queries': 0}
+_original_connect = DatabaseManager._connect
+
+
+def _counting_connect(self):
+    _original_connect(self)
+
+    def trace(sql):
+        if not sql.lstrip().upper().startswith('PRAGMA'):
+            stats['queries'] += 1
+
+    self.conn.set_trace_callback(trace)
+
+
+def run(client, db_path: str, tabs: int, rounds: int, write_every: int, use_etag: bool) -> dict:
+    etags = {}
+    item_ids = list(range(1, tabs + 1))
+    writer = DatabaseManager(db_path)
+    requests = 0
+    not_modified = 0
+
+    stats['queries'] = 0
+    start = time.perf_counter()
+
+    for r in range(rounds):
+        if write_every and r and r % write_every == 0:
+            writer.update_item_status(item_ids[r % len(item_ids)], 'processed')
+
+        for tab in range(tabs):
+            for url in ('/api/items?view=compact', f"/api/items/{item_ids[tab]}"):
+                key = (tab, url)
+                headers = {'If-None-Match': etags[key]} if use_etag and key in etags else {}
+                response = client.get(url, headers=headers)
+                requests += 1
+                if response.status_code == 304:
+                    not_modified += 1
+                elif 'etag' in response.headers:
+                    etags[key] = response.headers['etag']
+
+    elapsed = time.perf_counter() - start
+    writer.close()
+
+    return {
+        'mode': 'etag' if use_etag else 'plain',
+        'requests': requests,
+        'hit_304': not_modified,
+        'queries': stats['queries'],
+        'queries_per_req': stats['queries'] / requests,
+        'mean_ms': elapsed * 1000 / requests,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--content-length', type=int, default=5000)
+    parser.add_argument('--tabs', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--write-every', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"📦 生成测试数据: {args.items} 条...")
+    db_path = create_temp_db(items=args.items, content_length=args.content_length)
+    Config.DATABASE_PATH = db_path
+    DatabaseManager._connect = _counting_connect
+
+    from fastapi.testclient import TestClient
+    from api.main import app
+    client = TestClient(app)
+
+    rows = [
+        run(client, db_path, args.tabs, args.rounds, args.write_every, use_etag=False),
+        run(client, db_path, args.tabs, args.rounds, args.write_every, use_etag=True),
+    ]
+
+    print(f"\n📊 {args.tabs} 个标签页 × {args.rounds} 轮，每 {args.write_every} 轮写入一次:")
+    print_table(rows, ['mode', 'requests', 'hit_304', 'queries', 'queries_per_req', 'mean_ms'])
+
+
+if __name__ == '__main__':
+    main()
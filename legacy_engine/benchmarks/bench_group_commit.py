@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合并提交基准：各写各提交 vs 单写线程合并提交（GROUP_COMMIT）
+
+N 个线程并发模拟保存 + 处理：每个操作保存一条新条目（create_item），再写入 AI 结果
+（create_ai_result）并更新状态（update_item_status）。--workload mixed 时每个操作
+还走一遍请求 / 流水线上的其他写方法：幂等键、抓取状态和正文、流水线检查点、摘要、
+打标签和去重计数。统计不同并发下的每秒写操作数、单次写延迟分布和失败数
+（database is locked），以及合并提交的平均批大小。
+
+用法:
+    python benchmarks/bench_group_commit.py
+    python benchmarks/bench_group_commit.py --concurrency 1,8,32 --seconds 5
+    python benchmarks/bench_group_commit.py --workload mixed
+    python benchmarks/bench_group_commit.py --dir /data/tmp   # 放到真实磁盘上测 fsync
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from common import create_temp_db, print_table
+
+from core.config import Config
+
+
+def run(db_dir: str, threads: int, seconds: float, group: bool, workload: str = 'save') -> dict:
+    Config.GROUP_COMMIT = group
+    db_path = create_temp_db(
+        items=10, content_length=200, with_ai=False,
+        path=os.path.join(tempfile.mkdtemp(prefix='neofeed_bench_', dir=db_dir), 'neofeed.db')
+    )
+
+    from core.database import DatabaseManager
+    from core.writer import writer_stats
+
+    setup = DatabaseManager(db_path)
+    user_id = setup.get_or_create_default_user()['id']
+    tag_id = setup.create_tag(user_id, 'bench')
+    setup.close()
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def worker(n: int):
+        db = DatabaseManager(db_path)
+        local, failed, seq = [], 0, 0
+
+        def timed(fn, *args, **kwargs):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            local.append((time.perf_counter() - start) * 1000)
+            return result
+
+        while time.monotonic() < stop:
+            seq += 1
+            try:
+                item_id = timed(db.create_item, user_id, f"线程 {n} 条目 {seq} 正文", title=f"{n}-{seq}")
+                if workload == 'mixed':
+                    timed(db.save_idempotency_key, user_id, f"{n}-{seq}", item_id)
+                    timed(db.queue_stages, item_id, ['fetch', 'summarize'])
+                    timed(db.start_stage, item_id, 'fetch')
+                    timed(db.update_fetch_status, item_id, 'fetching')
+                    timed(db.update_item_content, item_id, f"线程 {n} 条目 {seq} 抓取到的正文")
+                    timed(db.save_stage_checkpoint, item_id, 'fetch', 'done')
+                    timed(db.save_summary, item_id, user_id, "摘要")
+                    timed(db.tag_items, user_id, tag_id, [item_id])
+                    timed(db.increment_duplicate_count, item_id)
+                timed(db.create_ai_result, item_id, user_id, summary="摘要", category="其他",
+                      keywords="AI", importance_score=0.5)
+                timed(db.update_item_status, item_id, 'processed')
+            except sqlite3.OperationalError:
+                failed += 1
+                if db.conn.in_transaction:
+                    db.conn.rollback()
+        db.close()
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    batch = writer_stats().get(db_path, {})
+    return {
+        'mode': 'group commit' if group else 'per-write commit',
+        'workload': workload,
+        'threads': threads,
+        'writes': len(latencies),
+        'writes_per_s': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] if latencies else 0.0,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] if latencies else 0.0,
+        'locked_errors': sum(errors),
+        'ops_per_batch': batch.get('ops_per_batch', 1.0 if not group else 0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', default='1,4,16,64', help='逗号分隔的并发线程数')
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--dir', default=None, help='数据库所在目录（默认系统临时目录）')
+    parser.add_argument('--workload', choices=('save', 'mixed'), default='save',
+                        help='save：保存 + 处理；mixed：另加请求 / 流水线上的其他写方法')
+    args = parser.parse_args()
+
+    levels = [int(n) for n in args.concurrency.split(',')]
+    print(f"⚙️  窗口 {Config.GROUP_COMMIT_WINDOW_MS}ms，每批最多 {Config.GROUP_COMMIT_MAX_OPS} 个操作，"
+          f"每组 {args.seconds:g}s")
+
+    rows = []
+    for threads in levels:
+        for group in (False, True):
+            rows.append(run(args.dir, threads, args.seconds, group, args.workload))
+
+    print(f"\n📊 并发写入（{args.workload}，每次写方法调用计一次写）:")
+    print_table(rows, ['mode', 'workload', 'threads', 'writes', 'writes_per_s', 'p50_ms', 'p99_ms',
+                       'locked_errors', 'ops_per_batch'])
+
+
+if __name__ == '__main__':
+    main()
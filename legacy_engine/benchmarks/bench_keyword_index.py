@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+关键词索引基准：逗号分隔列上的 LIKE / 现拆分统计 vs keywords + item_keywords
+
+在百万级数据集上对比按关键词筛选（计数 + 首页）和关键词 Top N 统计的延迟，
+并打印查询计划。关键词按 Zipf 分布抽取，既有热门词也有长尾词。
+
+用法:
+    python benchmarks/bench_keyword_index.py --items 1000000
+    python benchmarks/bench_keyword_index.py --items 200000 --vocab 5000
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from common import SCHEMA_PATH, measure, print_table
+
+KEYWORDS_PER_ITEM = 5
+
+
+def build_db(items: int, vocab: int, seed: int) -> str:
+    """直接批量写入，item_keywords 上的计数触发器照常生效"""
+    from core.database import DatabaseManager
+
+    path = os.path.join(tempfile.mkdtemp(prefix='neofeed_bench_'), 'neofeed.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_PATH.read_text(encoding='utf-8'))
+    conn.close()
+
+    db = DatabaseManager(path)
+    user_id = db.get_or_create_default_user()['id']
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    words = [f"词{n}" if n % 3 else f"Term{n}" for n in range(vocab)]
+    cum_weights = list(itertools.accumulate(1 / (n + 1) for n in range(vocab)))
+
+    with db.conn:
+        db.conn.executemany(
+            "INSERT INTO keywords (id, user_id, key, name) VALUES (?, ?, ?, ?)",
+            [(n + 1, user_id, word.lower(), word) for n, word in enumerate(words)]
+        )
+    word_ids = {word: n + 1 for n, word in enumerate(words)}
+
+    batch = 50000
+    for start in range(0, items, batch):
+        item_rows, ai_rows, keyword_rows = [], [], []
+        for n in range(start, min(start + batch, items)):
+            created = (now - timedelta(seconds=rng.random() * 365 * 86400)).strftime('%Y-%m-%d %H:%M:%S')
+            chosen = list(dict.fromkeys(rng.choices(words, cum_weights=cum_weights, k=KEYWORDS_PER_ITEM)))
+            item_rows.append((n + 1, user_id, f"条目 {n}", "正文", "正文", 'web', 2, 'processed', created))
+            ai_rows.append((n + 1, user_id, ','.join(chosen)))
+            keyword_rows.extend((word_ids[word], n + 1) for word in chosen)
+        with db.conn:
+            db.conn.executemany("""
+                INSERT INTO items (id, user_id, title, content, preview, source_type, word_count, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, item_rows)
+            db.conn.executemany("""
+                INSERT INTO ai_results (item_id, user_id, summary, keywords) VALUES (?, ?, '摘要', ?)
+            """, ai_rows)
+            db.conn.executemany(
+                "INSERT INTO item_keywords (keyword_id, item_id) VALUES (?, ?)", keyword_rows
+            )
+    db.conn.execute("ANALYZE")
+    db.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=1000000)
+    parser.add_argument('--vocab', type=int, default=20000, help='关键词词表大小')
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"📦 生成测试数据: {args.items} 条，每条 {KEYWORDS_PER_ITEM} 个关键词，词表 {args.vocab}...")
+    start = time.perf_counter()
+    db_path = build_db(args.items, args.vocab, seed=42)
+    print(f"   完成，{time.perf_counter() - start:.0f}s，库大小 {os.path.getsize(db_path) / 1024 / 1024:.0f} MB")
+
+    from core.database import DatabaseManager
+
+    db = DatabaseManager(db_path)
+    user_id = db.get_or_create_default_user()['id']
+    limit = args.page_size
+
+    # 热门词 / 中等 / 长尾词各取一个
+    ranked = db.get_top_keywords(user_id, limit=args.vocab)
+    probes = [('热门', ranked[0]), ('中等', ranked[len(ranked) // 20]), ('长尾', ranked[len(ranked) // 2])]
+
+    def like_filter(name: str):
+        # 旧做法：LIKE 子串匹配（还会误命中 "词1" ⊂ "词12"）
+        pattern = f"%{name}%"
+        total = db.conn.execute("""
+            SELECT COUNT(*) FROM items i JOIN ai_results a ON a.item_id = i.id
+            WHERE i.user_id = ? AND a.keywords LIKE ?
+        """, (user_id, pattern)).fetchone()[0]
+        rows = db.conn.execute("""
+            SELECT i.id, i.title FROM items i JOIN ai_results a ON a.item_id = i.id
+            WHERE i.user_id = ? AND a.keywords LIKE ?
+            ORDER BY i.created_at DESC LIMIT ?
+        """, (user_id, pattern, limit)).fetchall()
+        return total, rows
+
+    def index_filter(name: str):
+        total = db.get_items_count(user_id, keyword=name)
+        rows = db.get_items(user_id, limit=limit, fields=['id', 'title'], keyword=name)
+        return total, rows
+
+    def split_top_keywords():
+        # 旧做法：每次把逗号分隔列拆开再 GROUP BY
+        return db.conn.execute("""
+            SELECT TRIM(j.value) AS name, COUNT(*) AS count
+            FROM ai_results a,
+                 json_each('["' || REPLACE(REPLACE(a.keywords, '"', ''), ',', '","') || '"]') j
+            WHERE a.user_id = ? AND a.keywords IS NOT NULL
+            GROUP BY name ORDER BY count DESC LIMIT 50
+        """, (user_id,)).fetchall()
+
+    rows = []
+    for label, kw in probes:
+        like_total = like_filter(kw['name'])[0]
+        for name, fn in (('LIKE', like_filter), ('item_keywords', index_filter)):
+            repeat = max(3, args.repeat // 5) if name == 'LIKE' else args.repeat
+            rows.append({
+                'query': f"筛选 {label}词「{kw['name']}」 {name}",
+                'matches': like_total if name == 'LIKE' else kw['count'],
+                **measure(lambda: fn(kw['name']), repeat=repeat, warmup=1),
+            })
+    rows.append({'query': 'Top 50 关键词 现拆分统计', 'matches': '',
+                 **measure(split_top_keywords, repeat=3, warmup=1)})
+    rows.append({'query': 'Top 50 关键词 计数列', 'matches': '',
+                 **measure(lambda: db.get_top_keywords(user_id, 50), repeat=args.repeat)})
+
+    print(f"\n📊 {args.items} 条，每页 {limit} 条（筛选 = 总数 + 首页）:")
+    print_table(rows, ['query', 'matches', 'mean_ms', 'p50_ms', 'p95_ms'])
+
+    print("\n🔍 查询计划:")
+    plans = [
+        ('关键词筛选', """
+            SELECT i.id FROM items i WHERE i.user_id = ? AND i.id IN (
+                SELECT ik.item_id FROM keywords k JOIN item_keywords ik ON ik.keyword_id = k.id
+                WHERE k.user_id = ? AND k.key = ?)
+            ORDER BY i.created_at DESC LIMIT ?
+        """, (user_id, user_id, probes[0][1]['name'].lower(), limit)),
+        ('Top N 关键词', """
+            SELECT name, item_count FROM keywords
+            WHERE user_id = ? AND item_count > 0 ORDER BY item_count DESC LIMIT ?
+        """, (user_id, 50)),
+    ]
+    for name, sql, params in plans:
+        print(f"   {name}:")
+        for row in db.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+            print(f"      {row[3]}")
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
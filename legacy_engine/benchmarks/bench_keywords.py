@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地关键词提取基准
+
+- 吞吐：不同批大小下每秒处理条目数（含语料更新）
+- 一致性：与历史模型关键词（ai_results.keywords）比较的 precision / recall / F1，
+  以及 hybrid 模式下需要回退到模型的比例
+
+默认生成带"历史关键词"的合成条目（每篇围绕一个主题，历史关键词取文中
+出现最多的主题词）；--db 指定真实数据库时与其中已有的模型关键词比较（只读，不写库）。
+
+用法:
+    python benchmarks/bench_keywords.py --items 2000 --batch-sizes 1,32,256
+    python benchmarks/bench_keywords.py --db database/neofeed.db
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from collections import Counter
+
+from common import create_temp_db, print_table, ZH_SENTENCES
+
+TOPICS = {
+    'AI': ['大语言模型', '人工智能', '提示词', '智能体', 'GPT', '推理成本'],
+    '产品': ['产品经理', '用户体验', '需求分析', '原型设计', '用户研究', 'MVP'],
+    '增长': ['用户留存', '增长模型', '转化漏斗', '获客成本', '复购率', 'A/B测试'],
+    '知识管理': ['知识管理', '卡片笔记', '第二大脑', '双向链接', '信息过载', 'Obsidian'],
+    '工程': ['数据库索引', '缓存策略', '并发控制', '性能优化', '消息队列', 'SQLite'],
+}
+
+TEMPLATES = [
+    "{0}是最近讨论最多的话题之一。",
+    "很多团队在{0}上投入了大量精力，但效果参差不齐。",
+    "如果把{0}和{1}结合起来，往往能看到意想不到的收益。",
+    "我们复盘了{0}的实践，发现关键在于{1}。",
+    "关于{0}，最常见的误区是忽视了{1}。",
+    "下一步计划围绕{0}展开，同时关注{1}的变化。",
+]
+
+
+def make_item(rng: random.Random, n: int):
+    """生成一篇围绕某个主题的正文，返回 (正文, 历史关键词)"""
+    topic = rng.choice(list(TOPICS))
+    vocab = TOPICS[topic]
+    others = [w for t, words in TOPICS.items() if t != topic for w in words]
+    used = Counter()
+    parts = [f"#{n} "]
+    for _ in range(rng.randint(8, 30)):
+        if rng.random() < 0.3:
+            parts.append(rng.choice(ZH_SENTENCES))
+            continue
+        words = [rng.choice(vocab) if rng.random() < 0.8 else rng.choice(others) for _ in range(2)]
+        used.update(words)
+        parts.append(rng.choice(TEMPLATES).format(*words))
+    keywords = [w for w, _ in used.most_common(5)]
+    return ''.join(parts), ','.join(keywords)
+
+
+def build_synthetic_db(items: int, seed: int) -> str:
+    from core.database import DatabaseManager
+
+    path = create_temp_db(items=0)
+    rng = random.Random(seed)
+    db = DatabaseManager(path)
+    user = db.get_or_create_default_user()
+    for n in range(items):
+        content, keywords = make_item(rng, n)
+        item_id = db.create_item(user_id=user['id'], content=content, title=f"测试条目 {n}")
+        db.create_ai_result(item_id=item_id, user_id=user['id'], keywords=keywords)
+    db.close()
+    return path
+
+
+def load_items(path: str, limit: int):
+    import sqlite3
+    conn = sqlite3.connect(path)
+    rows = conn.execute("""
+        SELECT i.id, a.keywords FROM items i
+        JOIN ai_results a ON a.item_id = i.id
+        WHERE a.keywords IS NOT NULL AND a.keywords != ''
+        ORDER BY i.id LIMIT ?
+    """, (limit,)).fetchall()
+    conn.close()
+    return rows
+
+
+def fresh_copy(path: str) -> str:
+    """复制一份数据库并清空语料，每轮从零开始建语料"""
+    import sqlite3
+    copy = os.path.join(tempfile.mkdtemp(prefix='neofeed_bench_'), 'neofeed.db')
+    shutil.copy(path, copy)
+    from core.database import DatabaseManager
+    DatabaseManager(copy).close()  # 触发迁移
+    conn = sqlite3.connect(copy)
+    conn.execute("DELETE FROM keyword_df")
+    conn.execute("DELETE FROM keyword_docs")
+    conn.commit()
+    conn.close()
+    return copy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--db', help='使用已有数据库（默认生成合成数据）')
+    parser.add_argument('--items', type=int, default=2000, help='合成条目数 / 最多读取的条目数')
+    parser.add_argument('--batch-sizes', default='1,32,256')
+    parser.add_argument('--top-k', type=int, default=8)
+    parser.add_argument('--threshold', type=float, default=0.3, help='hybrid 回退阈值')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    from core.database import DatabaseManager
+    from core.keywords import extract_batch, keyword_set, jieba
+
+    source = args.db or build_synthetic_db(args.items, args.seed)
+    rows = load_items(source, args.items)
+    if not rows:
+        print("❌ 没有带历史关键词的条目")
+        return
+
+    throughput = []
+    db = None
+    for batch_size in (int(x) for x in args.batch_sizes.split(',')):
+        if db:
+            db.close()
+        db = DatabaseManager(fresh_copy(source))
+        docs = [(item_id, db.get_item(item_id)['content'] or '') for item_id, _ in rows]
+        start = time.perf_counter()
+        for i in range(0, len(docs), batch_size):
+            extract_batch(db, docs[i:i + batch_size], top_k=args.top_k)
+        elapsed = time.perf_counter() - start
+        throughput.append({
+            'batch_size': batch_size,
+            'items': len(docs),
+            'seconds': elapsed,
+            'items_per_sec': len(docs) / elapsed,
+        })
+
+    # 一致性：语料已包含全部条目（相当于先跑过 extract_keywords.py --corpus-only）
+    results = extract_batch(db, docs, top_k=args.top_k, update_corpus=False)
+    db.close()
+
+    tp = fp = fn = 0
+    any_hit = low_confidence = 0
+    for (_, historic), result in zip(rows, results):
+        expected, got = keyword_set(historic), keyword_set(result['keywords'])
+        hits = len(expected & got)
+        tp += hits
+        fp += len(got) - hits
+        fn += len(expected) - hits
+        any_hit += hits > 0
+        low_confidence += result['confidence'] < args.threshold
+
+    precision = tp / max(tp + fp, 1)
+    recall = tp / max(tp + fn, 1)
+    f1 = 2 * precision * recall / max(precision + recall, 1e-9)
+
+    print(f"\n📊 本地关键词提取吞吐（{len(rows)} 条，分词: {'jieba' if jieba else 'n-gram'}）")
+    print_table(throughput, ['batch_size', 'items', 'seconds', 'items_per_sec'])
+
+    print(f"\n📊 与历史模型关键词的一致性（top {args.top_k}）")
+    print_table([{
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'any_hit': f"{any_hit / len(rows):.0%}",
+        'llm_fallback': f"{low_confidence / len(rows):.0%}",
+    }], ['precision', 'recall', 'f1', 'any_hit', 'llm_fallback'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列表投影基准：GET /api/items 完整视图 vs 精简视图
+
+对比长正文数据集下每页响应体大小和延迟。
+
+用法:
+    python benchmarks/bench_list_projection.py --items 2000 --content-length 20000
+"""
+
+import argparse
+
+from common import create_temp_db, measure, print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--content-length', type=int, default=20000)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"📦 生成测试数据: {args.items} 条，平均正文 {args.content_length} 字...")
+    db_path = create_temp_db(items=args.items, content_length=args.content_length)
+
+    from fastapi.testclient import TestClient
+    from core.config import Config
+    Config.DATABASE_PATH = db_path
+    from api.main import app
+
+    client = TestClient(app)
+    cases = [
+        ('full', {}),
+        ('compact', {'view': 'compact'}),
+        ('fields=id,title,preview', {'fields': 'id,title,preview'}),
+    ]
+
+    rows = []
+    for name, params in cases:
+        params = {'limit': args.page_size, **params}
+        size = len(client.get('/api/items', params=params).content)
+        timing = measure(lambda: client.get('/api/items', params=params), repeat=args.repeat)
+        rows.append({'view': name, 'bytes': size, 'kb': size / 1024, **timing})
+
+    print(f"\n📊 每页 {args.page_size} 条:")
+    print_table(rows, ['view', 'kb', 'mean_ms', 'p50_ms', 'p95_ms'])
+
+
+if __name__ == '__main__':
+    main()
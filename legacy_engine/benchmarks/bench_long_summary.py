@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+长文摘要基准（本地 OpenAI 桩服务，无需 API Key）
+
+按文档长度对比三种方式的延迟、模型调用次数和输入 token：
+- truncate：旧做法，只摘要前 3000 字符
+- map-reduce：分块并发摘要后归并（冷缓存）
+- cached：同一文档再摘要一次（分块摘要命中缓存，只剩归并调用）
+
+用法:
+    python benchmarks/bench_long_summary.py --lengths 2000,10000,50000,200000 --concurrency 4
+"""
+
+import argparse
+import random
+import time
+
+from common import create_temp_db, print_table, random_content
+
+from stubs.fake_openai import FakeOpenAIServer
+
+
+def make_document(rng: random.Random, length: int) -> str:
+    """段落带编号，避免不同分块内容相同而互相命中缓存"""
+    paragraphs = []
+    total = 0
+    n = 0
+    while total < length:
+        n += 1
+        paragraph = f"第 {n} 节。" + random_content(rng, 400).replace('\n\n', '')
+        paragraphs.append(paragraph)
+        total += len(paragraph)
+    return '\n\n'.join(paragraphs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lengths', default='2000,10000,50000,200000', help='文档长度（字符），逗号分隔')
+    parser.add_argument('--concurrency', type=int, default=4, help='分块摘要并发数')
+    parser.add_argument('--chunk-tokens', type=int, default=2000)
+    parser.add_argument('--token-delay-ms', type=int, default=10, help='桩服务每 token 间隔')
+    parser.add_argument('--latency-ms', type=int, default=300, help='桩服务首字节延迟')
+    args = parser.parse_args()
+
+    fake = FakeOpenAIServer(latency_ms=args.latency_ms, token_delay_ms=args.token_delay_ms).start()
+
+    from core.config import Config
+    Config.DATABASE_PATH = create_temp_db(items=0)
+    Config.OPENAI_API_KEY = 'sk-fake'
+    Config.SUMMARY_MAP_CONCURRENCY = args.concurrency
+    Config.SUMMARY_CHUNK_TOKENS = args.chunk_tokens
+
+    import openai
+    openai.api_key = 'sk-fake'
+    openai.base_url = fake.base_url + '/'
+
+    from core.metrics import metrics
+    from core.processor import ai_processor
+    from core.tokenizer import count_tokens, tiktoken
+
+    def run(fn) -> dict:
+        metrics.reset()
+        start = time.perf_counter()
+        fn()
+        counters = metrics.snapshot()['counters']
+        return {
+            'ms': (time.perf_counter() - start) * 1000,
+            'calls': counters.get('llm.calls', 0),
+            'input_tokens': counters.get('llm.input_tokens', 0),
+        }
+
+    def truncated(content: str):
+        ai_processor._complete(ai_processor._summary_messages(content[:3000]), 300, 0.7)
+
+    rng = random.Random(42)
+    rows = []
+    for length in (int(x) for x in args.lengths.split(',')):
+        content = make_document(rng, length)
+        tokens = count_tokens(content)
+        for mode, fn in (
+            ('truncate', lambda: truncated(content)),
+            ('map-reduce', lambda: ai_processor.generate_summary(content)),
+            ('cached', lambda: ai_processor.generate_summary(content)),
+        ):
+            result = run(fn)
+            rows.append({
+                'chars': len(content),
+                'doc_tokens': tokens,
+                'mode': mode,
+                'ms': result['ms'],
+                'llm_calls': result['calls'],
+                'input_tokens': result['input_tokens'],
+                'coverage': f"{min(1.0, 3000 / len(content)):.0%}" if mode == 'truncate' else '100%',
+            })
+
+    print(f"\n📊 长文摘要（分块 {args.chunk_tokens} tokens，并发 {args.concurrency}，"
+          f"token 计数: {'tiktoken' if tiktoken else '本地估算'}）")
+    print_table(rows, ['chars', 'doc_tokens', 'mode', 'ms', 'llm_calls', 'input_tokens', 'coverage'])
+
+
+if __name__ == '__main__':
+    main()
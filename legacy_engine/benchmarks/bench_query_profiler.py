@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL 剖析开销：QUERY_PROFILING 关闭 / 开启时常用读查询的延迟
+
+关闭时连接就是 sqlite3.Connection，另测一组直接用 sqlite3.connect 建连的
+DatabaseManager 作为对照；开启时分别测慢查询阈值很高（只汇总）和为 0（每条都
+EXPLAIN 并写慢查询日志，最坏情况）。最后打印开启期间按总耗时排序的前几条语句。
+
+用法:
+    python benchmarks/bench_query_profiler.py
+    python benchmarks/bench_query_profiler.py --items 20000 --repeat 500
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import tempfile
+
+from common import create_temp_db, measure, print_table
+
+from core.cache import get_read_cache
+from core.config import Config
+from core.database import COMPACT_FIELDS, DatabaseManager
+from core.importance import rank_key
+from core.migrations import apply_migrations
+from core.profiler import profiler
+
+QUERIES = {
+    'get_item': lambda db, u: db.get_item(7),
+    'get_items': lambda db, u: db.get_items(u, limit=20, fields=COMPACT_FIELDS),
+    'get_items_count': lambda db, u: db.get_items_count(u, source_type='web'),
+    'get_user_stats': lambda db, u: db.get_user_stats(u, 30),
+    'get_change_version': lambda db, u: db.get_change_version(u),
+}
+
+
+def plain_connect(self):
+    """改动前的建连方式（对照组）"""
+    self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+    self.conn.row_factory = sqlite3.Row
+    self.cursor = self.conn.cursor()
+    self.cursor.execute("PRAGMA foreign_keys = ON;")
+    self.conn.create_function('rank_key', 2, rank_key, deterministic=True)
+    apply_migrations(self.conn, self.db_path)
+
+
+def open_db(db_path: str, mode: str) -> DatabaseManager:
+    Config.QUERY_PROFILING = mode.startswith('on')
+    db = DatabaseManager(db_path)
+    if mode == 'sqlite3.connect':
+        db.close()
+        plain_connect(db)
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args()
+
+    db_path = create_temp_db(items=args.items, content_length=500)
+    get_read_cache(db_path).items.ttl = 0
+
+    modes = ('sqlite3.connect', 'off', 'on', 'on, slow_ms=0')
+    dbs = {mode: open_db(db_path, mode) for mode in modes}
+    user_id = dbs['off'].get_or_create_default_user()['id']
+    Config.QUERY_SLOW_LOG = os.path.join(tempfile.gettempdir(), 'neofeed_bench_slow.jsonl')
+    profiler.reset()
+    # slow_ms=0 时每条都是慢查询，不刷屏
+    logging.getLogger('core.profiler').setLevel(logging.ERROR)
+
+    # 各模式交替测，减少机器状态漂移的影响
+    rows = []
+    for name, call in QUERIES.items():
+        for mode, db in dbs.items():
+            Config.QUERY_SLOW_MS = 0 if mode == 'on, slow_ms=0' else 1e9
+            timing = measure(lambda: call(db, user_id), repeat=args.repeat, warmup=20)
+            rows.append({'mode': mode, 'query': name, 'mean_us': timing['mean_ms'] * 1000,
+                         'p50_us': timing['p50_ms'] * 1000, 'p95_us': timing['p95_ms'] * 1000})
+    for db in dbs.values():
+        db.close()
+    top = profiler.top(5)
+
+    rows.sort(key=lambda r: r['query'])
+    print(f"\n📊 {args.items} 条，每个查询 {args.repeat} 次（微秒）:")
+    print_table(rows, ['query', 'mode', 'mean_us', 'p50_us', 'p95_us'])
+
+    print(f"\n🔝 开启期间总耗时前 5 的语句（慢查询 {len(profiler.slow)} 条最近记录，日志 {Config.QUERY_SLOW_LOG}）:")
+    print_table([dict(r, sql=r['sql'][:70]) for r in top], ['sql', 'count', 'total_ms', 'mean_ms', 'rows', 'share'])
+
+
+if __name__ == '__main__':
+    main()
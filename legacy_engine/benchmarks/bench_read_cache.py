@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+读缓存基准：条目详情 / 首页列表有无进程内缓存时的查询量和延迟
+
+模拟多个标签页不带 If-None-Match 刷新 GET /api/items 和 GET /api/items/{id}，
+期间每隔若干轮写入一次（一半经 DatabaseManager 精确失效，一半用独立连接直接
+写库，模拟另一个 worker，只能靠变更计数发现），统计每个请求的 SQL 条数、延迟
+和缓存命中率，并校验写入后读到的都是新数据。
+
+用法:
+    python benchmarks/bench_read_cache.py --tabs 10 --rounds 50 --write-every 10
+"""
+
+import argparse
+import sqlite3
+import time
+
+from common import create_temp_db, print_table
+
+from core.cache import get_read_cache
+from core.config import Config
+from core.database import DatabaseManager
+
+# 统计每条 SQL（不含 PRAGMA/迁移检查）
+stats = {'queries': 0}
+_original_connect = DatabaseManager._connect
+
+
+def _counting_connect(self):
+    _original_connect(self)
+
+    def trace(sql):
+        if not sql.lstrip().upper().startswith('PRAGMA'):
+            stats['queries'] += 1
+
+    self.conn.set_trace_callback(trace)
+
+
+def run(client, db_path: str, tabs: int, rounds: int, write_every: int, ttl: float) -> dict:
+    cache = get_read_cache(db_path)
+    for lru in (cache.items, cache.pages):
+        lru.ttl = ttl
+        lru.clear()
+        lru.hits = lru.misses = lru.stale = lru.evictions = 0
+
+    item_ids = list(range(1, tabs + 1))
+    writer = DatabaseManager(db_path)
+    other_worker = sqlite3.connect(db_path)
+    requests = 0
+    fresh = True
+
+    stats['queries'] = 0
+    start = time.perf_counter()
+
+    for r in range(rounds):
+        written = None
+        if write_every and r and r % write_every == 0:
+            item_id = item_ids[r % len(item_ids)]
+            status = 'processed' if r % (2 * write_every) else 'failed'
+            if (r // write_every) % 2:
+                writer.update_item_status(item_id, status)
+            else:
+                with other_worker:
+                    other_worker.execute("UPDATE items SET status = ? WHERE id = ?", (status, item_id))
+            written = (item_id, status)
+
+        for tab in range(tabs):
+            for url in ('/api/items?view=compact', f"/api/items/{item_ids[tab]}"):
+                response = client.get(url)
+                requests += 1
+                if written and url.endswith(f"/{written[0]}"):
+                    fresh &= response.json()['item']['status'] == written[1]
+
+    elapsed = time.perf_counter() - start
+    writer.close()
+    other_worker.close()
+
+    return {
+        'mode': f"cache ttl={ttl:g}s" if ttl else 'no cache',
+        'requests': requests,
+        'queries': stats['queries'],
+        'queries_per_req': stats['queries'] / requests,
+        'mean_ms': elapsed * 1000 / requests,
+        'item_hit_rate': cache.items.stats()['hit_rate'],
+        'page_hit_rate': cache.pages.stats()['hit_rate'],
+        'fresh': '✅' if fresh else '❌',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--content-length', type=int, default=5000)
+    parser.add_argument('--tabs', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--write-every', type=int, default=10)
+    parser.add_argument('--ttl', type=float, default=60)
+    args = parser.parse_args()
+
+    print(f"📦 生成测试数据: {args.items} 条...")
+    db_path = create_temp_db(items=args.items, content_length=args.content_length)
+    Config.DATABASE_PATH = db_path
+    DatabaseManager._connect = _counting_connect
+
+    from fastapi.testclient import TestClient
+    from api.main import app
+    client = TestClient(app)
+
+    rows = [
+        run(client, db_path, args.tabs, args.rounds, args.write_every, ttl=0),
+        run(client, db_path, args.tabs, args.rounds, args.write_every, ttl=args.ttl),
+    ]
+
+    print(f"\n📊 {args.tabs} 个标签页 × {args.rounds} 轮，每 {args.write_every} 轮写入一次:")
+    print_table(rows, ['mode', 'requests', 'queries', 'queries_per_req', 'mean_ms',
+                       'item_hit_rate', 'page_hit_rate', 'fresh'])
+
+
+if __name__ == '__main__':
+    main()
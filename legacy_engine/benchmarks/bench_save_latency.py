@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+保存接口延迟负载测试（先入库后抓取）
+
+启动本地慢速 Jina 桩服务和真实的 uvicorn 进程，并发保存大量不同 URL，
+统计 POST /api/items 的延迟分布，再等待后台队列把所有条目抓取完成。
+同步抓取时每次保存至少要等一个 --fetch-latency-ms。
+
+用法:
+    python benchmarks/bench_save_latency.py --requests 500 --concurrency 50 --fetch-latency-ms 2000
+"""
+
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from common import BASE_DIR, create_temp_db, free_port, percentile, print_table, wait_port
+from stubs.fake_jina import FakeJinaServer
+
+
+def fetch_progress(db_path: str) -> dict:
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT fetch_status, COUNT(*) FROM items
+            WHERE fetch_status IS NOT NULL GROUP BY fetch_status
+        """).fetchall()
+    finally:
+        conn.close()
+    return dict(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--fetch-latency-ms', type=int, default=2000)
+    parser.add_argument('--error-rate', type=float, default=0.1, help='桩服务返回 503 的比例')
+    parser.add_argument('--fetch-workers', type=int, default=16)
+    parser.add_argument('--warmup', type=int, default=20, help='预热保存次数（不计入统计）')
+    args = parser.parse_args()
+
+    jina = FakeJinaServer(latency_ms=args.fetch_latency_ms, error_rate=args.error_rate).start()
+    db_path = create_temp_db(items=0)
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_PATH=db_path,
+        JINA_API_URL=jina.base_url,
+        ENABLE_WEB_SCRAPING='true',
+        ENABLE_AI_PROCESSING='false',
+        FETCH_WORKERS=str(args.fetch_workers),
+        FETCH_MAX_ATTEMPTS='5',
+        FETCH_RETRY_BASE_SECONDS='0.2',
+        LOG_LEVEL='WARNING',
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api.main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=BASE_DIR, env=env
+    )
+
+    try:
+        wait_port(port)
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+        session.mount('http://', adapter)
+        url = f"http://127.0.0.1:{port}/api/items"
+
+        def save(n: int):
+            start = time.perf_counter()
+            resp = session.post(url, json={'content': f"https://example.com/article/{n}"})
+            return (time.perf_counter() - start) * 1000, resp.status_code
+
+        # 预热：迁移检查、去重过滤器加载、抓取线程启动
+        for n in range(args.warmup):
+            save(-1 - n)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            results = list(pool.map(save, range(args.requests)))
+        save_s = time.perf_counter() - start
+
+        latencies = [ms for ms, _ in results]
+        statuses = {}
+        for _, code in results:
+            statuses[code] = statuses.get(code, 0) + 1
+
+        # 等后台抓取全部结束（成功或放弃）
+        while True:
+            progress = fetch_progress(db_path)
+            if progress.get('queued', 0) + progress.get('fetching', 0) == 0:
+                break
+            time.sleep(0.2)
+        drain_s = time.perf_counter() - start
+
+        print(f"\n📊 {args.requests} 次保存，并发 {args.concurrency}，"
+              f"抓取延迟 {args.fetch_latency_ms} ms，失败率 {args.error_rate:.0%}")
+        print_table([{
+            'p50_ms': percentile(latencies, 0.5),
+            'p95_ms': percentile(latencies, 0.95),
+            'p99_ms': percentile(latencies, 0.99),
+            'max_ms': max(latencies),
+            'req/s': args.requests / save_s,
+        }], ['p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'req/s'])
+        print(f"\n   状态码: {statuses}")
+        print(f"   抓取结果: {fetch_progress(db_path)}（桩服务请求 {jina.requests} 次，其中 503 {jina.errors} 次）")
+        print(f"   全部抓取完成耗时: {drain_s:.1f}s")
+    finally:
+        server.terminate()
+        server.wait()
+        jina.shutdown()
+
+
+if __name__ == '__main__':
+    main()
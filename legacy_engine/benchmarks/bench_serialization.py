@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应序列化基准：100 条长正文列表页
+
+- before: response_model=dict，经 FastAPI serialize_response + jsonable_encoder + json
+- typed:  response_model=ItemListResponse，完整 Pydantic 校验后再序列化
+- after:  直接返回 FastJSONResponse（orjson，跳过校验）
+
+用法:
+    python benchmarks/bench_serialization.py --items 100 --content-length 20000
+"""
+
+import argparse
+import asyncio
+import random
+
+from common import measure, print_table, random_content
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from api.responses import FastJSONResponse, orjson
+from api.schemas import ItemListResponse
+
+
+def build_page(items: int, content_length: int) -> dict:
+    """构造与 DatabaseManager.get_items 输出同构的列表页"""
+    rng = random.Random(1)
+    rows = []
+    for n in range(items):
+        content = random_content(rng, content_length)
+        rows.append({
+            'id': n + 1,
+            'user_id': 1,
+            'title': f"测试条目 {n}",
+            'content': content,
+            'preview': content[:200],
+            'url': f"https://example.com/post/{n}",
+            'source_type': 'web',
+            'source_metadata': {'domain': 'example.com', 'original_url': f"https://example.com/post/{n}"},
+            'word_count': len(content),
+            'language': 'zh',
+            'status': 'processed',
+            'created_at': '2026-01-01 12:00:00',
+            'updated_at': '2026-01-01 12:00:00',
+            'summary': "这是一段测试摘要。" * 5,
+            'category': 'AI趋势',
+            'keywords': 'AI,产品,增长',
+            'importance_score': 0.7,
+        })
+    return {'success': True, 'items': rows, 'total': items, 'limit': items, 'offset': 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--content-length', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    payload = build_page(args.items, args.content_length)
+    dict_field = create_response_field(name='Response', type_=dict)
+    typed_field = create_response_field(name='Response', type_=ItemListResponse)
+
+    def before():
+        content = asyncio.run(serialize_response(field=dict_field, response_content=payload))
+        return JSONResponse(content).body
+
+    def typed():
+        content = asyncio.run(serialize_response(field=typed_field, response_content=payload))
+        return JSONResponse(content).body
+
+    def after():
+        return FastJSONResponse(payload).body
+
+    rows = []
+    for name, fn in [('before', before), ('typed', typed), ('after', after)]:
+        size = len(fn())
+        rows.append({'mode': name, 'kb': size / 1024, **measure(fn, repeat=args.repeat)})
+
+    print(f"\n📊 {args.items} 条/页，平均正文 {args.content_length} 字"
+          f"（orjson: {'是' if orjson else '否'}）:")
+    print_table(rows, ['mode', 'kb', 'mean_ms', 'p50_ms', 'p95_ms'])
+
+
+if __name__ == '__main__':
+    main()
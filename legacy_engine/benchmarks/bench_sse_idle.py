@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SSE 空闲连接负载测试
+
+启动一个真实的 uvicorn 进程，建立大量空闲的 GET /api/events 连接，
+测量服务进程每个连接的内存占用，然后保存一条条目，验证所有连接都收到推送。
+
+用法:
+    python benchmarks/bench_sse_idle.py --connections 2000
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+from common import BASE_DIR, create_temp_db, free_port
+
+
+def rss_kb(pid: int) -> int:
+    """进程常驻内存（KB）"""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+async def open_stream(port: int):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b"GET /api/events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+    await writer.drain()
+    # 读到响应头和 retry 行即视为订阅成功
+    await reader.readuntil(b"retry: 3000\n\n")
+    return reader, writer
+
+
+async def wait_event(reader, timeout: float) -> bool:
+    try:
+        await asyncio.wait_for(reader.readuntil(b"event: item.status"), timeout)
+        return True
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return False
+
+
+async def run(port: int, pid: int, connections: int, batch: int):
+    base_rss = rss_kb(pid)
+    streams = []
+    start = time.perf_counter()
+    for i in range(0, connections, batch):
+        streams += await asyncio.gather(*(open_stream(port) for _ in range(min(batch, connections - i))))
+    connect_s = time.perf_counter() - start
+    await asyncio.sleep(1)
+    loaded_rss = rss_kb(pid)
+
+    # 触发一次推送
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = b'{"content": "sse load test"}'
+    writer.write(
+        b"POST /api/items HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    start = time.perf_counter()
+    received = await asyncio.gather(*(wait_event(r, 30) for r, _ in streams))
+    fanout_s = time.perf_counter() - start
+    writer.close()
+
+    for _, w in streams:
+        w.close()
+
+    print(f"\n📊 {connections} 个空闲 SSE 连接:")
+    print(f"   建立连接耗时: {connect_s:.2f}s")
+    print(f"   服务进程内存: {base_rss / 1024:.1f} MB → {loaded_rss / 1024:.1f} MB")
+    print(f"   每连接内存:   {(loaded_rss - base_rss) / connections:.1f} KB")
+    print(f"   推送送达:     {sum(received)}/{connections}，全部送达耗时 {fanout_s * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=200)
+    parser.add_argument('--event-bus', default='memory', choices=['memory', 'sqlite'])
+    args = parser.parse_args()
+
+    # 客户端和服务端都需要足够的文件描述符
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.connections * 2 + 100)), hard))
+
+    db_path = create_temp_db(items=10, content_length=1000)
+    port = free_port()
+    env = dict(os.environ, DATABASE_PATH=db_path, EVENT_BUS=args.event_bus, LOG_LEVEL='WARNING')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api.main:app', '--port', str(port),
+         '--log-level', 'warning', '--backlog', '4096'],
+        cwd=BASE_DIR, env=env
+    )
+
+    try:
+        for _ in range(50):
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.2)
+        asyncio.run(run(port, server.pid, args.connections, args.batch))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式摘要基准（本地 OpenAI 桩服务，无需 API Key）
+
+对比非流式 generate_summary 的整体等待时间和流式接口的首 token 时间（TTFT），
+并验证客户端中途断开时上游流被取消、不保存半截摘要。
+
+用法:
+    python benchmarks/bench_summary_stream.py --token-delay-ms 30 --runs 5
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+
+from common import BASE_DIR, create_temp_db, free_port
+
+from stubs.fake_openai import FakeOpenAIServer
+
+
+async def read_stream(port: int, item_id: int, stop_after_tokens: int = None) -> dict:
+    """读取 SSE 流，返回 ttft / total / 是否收到 done"""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(
+        f"GET /api/items/{item_id}/summary/stream?refresh=true HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+    )
+    await writer.drain()
+
+    ttft = None
+    tokens = 0
+    done = False
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if line.startswith(b"event: token"):
+            tokens += 1
+            if ttft is None:
+                ttft = (time.perf_counter() - start) * 1000
+            if stop_after_tokens and tokens >= stop_after_tokens:
+                break
+        elif line.startswith(b"event: done"):
+            done = True
+            break
+
+    writer.close()
+    return {'ttft_ms': ttft, 'total_ms': (time.perf_counter() - start) * 1000, 'done': done}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--token-delay-ms', type=int, default=30)
+    parser.add_argument('--latency-ms', type=int, default=200, help='桩服务首字节延迟')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    fake = FakeOpenAIServer(latency_ms=args.latency_ms, token_delay_ms=args.token_delay_ms).start()
+    db_path = create_temp_db(items=args.runs + 1, content_length=3000, with_ai=False)
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_PATH=db_path,
+        OPENAI_API_KEY='sk-fake',
+        OPENAI_BASE_URL=fake.base_url,
+        ENABLE_AI_PROCESSING='true',
+        LOG_LEVEL='WARNING',
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api.main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=BASE_DIR, env=env
+    )
+
+    try:
+        for _ in range(50):
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.2)
+
+        # 非流式基线（同一个桩服务）
+        from core.config import Config
+        Config.OPENAI_API_KEY = 'sk-fake'
+        import openai
+        openai.api_key = 'sk-fake'
+        openai.base_url = fake.base_url + '/'
+        from core.processor import AIProcessor
+        processor = AIProcessor()
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            processor.generate_summary("测试内容" * 100)
+        blocking_ms = (time.perf_counter() - start) * 1000 / args.runs
+
+        results = [asyncio.run(read_stream(port, i + 1)) for i in range(args.runs)]
+        ttft = sum(r['ttft_ms'] for r in results) / len(results)
+        total = sum(r['total_ms'] for r in results) / len(results)
+
+        # 中途断开
+        cancelled_before = fake.cancelled_streams
+        asyncio.run(read_stream(port, args.runs + 1, stop_after_tokens=3))
+        time.sleep(1)
+        cancelled = fake.cancelled_streams - cancelled_before
+
+        conn = sqlite3.connect(db_path)
+        saved = conn.execute(
+            "SELECT summary FROM ai_results WHERE item_id = ?", (args.runs + 1,)
+        ).fetchone()
+        conn.close()
+
+        print(f"\n📊 桩服务: 首字节 {args.latency_ms} ms，每 token {args.token_delay_ms} ms")
+        print(f"   非流式等待:     {blocking_ms:.0f} ms")
+        print(f"   流式 TTFT:      {ttft:.0f} ms")
+        print(f"   流式完成:       {total:.0f} ms")
+        print(f"   中途断开:       上游取消 {cancelled} 次，半截摘要已保存: {'是' if saved else '否'}")
+    finally:
+        server.terminate()
+        server.wait()
+        fake.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量打标签基准：逐条 INSERT + 提交 vs 单条 INSERT ... SELECT（一个事务）
+
+同时对比标签计数：每次 COUNT(*) vs 触发器维护的 tags.item_count。
+
+用法:
+    python benchmarks/bench_tagging.py --items 20000 --batch 5000
+"""
+
+import argparse
+import time
+
+from common import create_temp_db, measure, print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=5000, help='每次打标签的条目数')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"📦 生成测试数据: {args.items} 条...")
+    db_path = create_temp_db(items=args.items, content_length=200, with_ai=False)
+
+    from core.database import DatabaseManager
+
+    db = DatabaseManager(db_path)
+    user_id = db.get_or_create_default_user()['id']
+    item_ids = list(range(1, args.batch + 1))
+
+    def per_item(tag_id: int):
+        for item_id in item_ids:
+            db.cursor.execute(
+                "INSERT OR IGNORE INTO item_tags (item_id, tag_id) VALUES (?, ?)", (item_id, tag_id)
+            )
+            db.conn.commit()
+
+    def per_item_untag(tag_id: int):
+        for item_id in item_ids:
+            db.cursor.execute("DELETE FROM item_tags WHERE tag_id = ? AND item_id = ?", (tag_id, item_id))
+            db.conn.commit()
+
+    rows = []
+    for name, tag, untag in (
+        ('逐条提交', per_item, per_item_untag),
+        ('INSERT ... SELECT', lambda t: db.tag_items(user_id, t, item_ids), lambda t: db.untag_items(t, item_ids)),
+    ):
+        tag_id = db.create_tag(user_id, f"bench-{name}")
+        start = time.perf_counter()
+        tag(tag_id)
+        tag_ms = (time.perf_counter() - start) * 1000
+        count = db.get_tag(user_id, tag_id)['item_count']
+        start = time.perf_counter()
+        untag(tag_id)
+        untag_ms = (time.perf_counter() - start) * 1000
+        rows.append({'method': name, 'items': count, 'tag_ms': tag_ms, 'untag_ms': untag_ms})
+
+    print(f"\n📊 批量打标签 / 移除 {args.batch} 条:")
+    print_table(rows, ['method', 'items', 'tag_ms', 'untag_ms'])
+
+    tag_id = db.create_tag(user_id, 'bench-count')
+    db.tag_items(user_id, tag_id, range(1, args.items + 1))
+    count_rows = [
+        {'method': 'COUNT(*)', **measure(lambda: db.conn.execute(
+            "SELECT tag_id, COUNT(*) FROM item_tags GROUP BY tag_id").fetchall(), repeat=args.repeat)},
+        {'method': 'tags.item_count', **measure(lambda: db.get_tags(user_id), repeat=args.repeat)},
+    ]
+    print(f"\n📊 标签计数（{args.items} 条关联）:")
+    print_table(count_rows, ['method', 'mean_ms', 'p50_ms', 'p95_ms'])
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+精选信息流基准：查询时计算衰减分数排序 vs 存储的 rank_key 索引范围扫描
+
+在百万级数据集上对比首页、分类 / 来源筛选和深分页（游标 vs OFFSET）的延迟，
+并打印各查询的 EXPLAIN QUERY PLAN。
+
+用法:
+    python benchmarks/bench_top_items.py --items 1000000
+    python benchmarks/bench_top_items.py --items 200000 --repeat 50
+"""
+
+import argparse
+import math
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from common import SCHEMA_PATH, measure, print_table
+
+CATEGORIES = ["AI趋势", "产品思考", "技术分享", "设计", "知识管理", "创业", "其他"]
+SOURCES = ['web', 'wechat', 'telegram', 'manual', 'gpt']
+
+
+def build_db(items: int, days: int, seed: int) -> str:
+    """直接批量写入（不走 create_item），百万条也能在一两分钟内生成"""
+    from core.database import DatabaseManager
+    from core.importance import rank_key
+
+    path = os.path.join(tempfile.mkdtemp(prefix='neofeed_bench_'), 'neofeed.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_PATH.read_text(encoding='utf-8'))
+    conn.close()
+
+    db = DatabaseManager(path)
+    user_id = db.get_or_create_default_user()['id']
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    batch = 50000
+    for start in range(0, items, batch):
+        item_rows, ai_rows = [], []
+        for n in range(start, min(start + batch, items)):
+            created = (now - timedelta(seconds=rng.random() * days * 86400)).strftime('%Y-%m-%d %H:%M:%S')
+            source = rng.choice(SOURCES)
+            importance = round(rng.betavariate(2, 5), 4)
+            item_rows.append((n + 1, user_id, f"条目 {n}", "正文", "正文", source, 2, 'processed', created))
+            ai_rows.append((n + 1, user_id, source, "摘要", rng.choice(CATEGORIES), "AI,产品",
+                            importance, rank_key(importance, created)))
+        with db.conn:
+            db.conn.executemany("""
+                INSERT INTO items (id, user_id, title, content, preview, source_type, word_count, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, item_rows)
+            db.conn.executemany("""
+                INSERT INTO ai_results (item_id, user_id, source_type, summary, category, keywords,
+                                        importance_score, rank_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, ai_rows)
+    db.conn.execute("ANALYZE")
+    db.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=365, help='保存时间分布范围（天）')
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--deep-page', type=int, default=500, help='深分页测试的页码')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"📦 生成测试数据: {args.items} 条...")
+    start = time.perf_counter()
+    db_path = build_db(args.items, args.days, seed=42)
+    print(f"   完成，{time.perf_counter() - start:.0f}s，库大小 {os.path.getsize(db_path) / 1024 / 1024:.0f} MB")
+
+    from core.config import Config
+    from core.database import DatabaseManager
+
+    db = DatabaseManager(db_path)
+    user_id = db.get_or_create_default_user()['id']
+    limit = args.page_size
+    half_life = Config.RANK_HALF_LIFE_DAYS
+
+    # 旧做法：每次查询现算 重要性 × 2^(-距今天数 / 半衰期)，需要全表扫描 + 排序
+    baseline_sql = f"""
+        SELECT i.id, i.title, a.summary, a.importance_score
+        FROM ai_results a JOIN items i ON i.id = a.item_id
+        WHERE a.user_id = ? {{where}}
+        ORDER BY a.importance_score * pow(2, -(julianday('now') - julianday(i.created_at)) / {half_life}) DESC
+        LIMIT ?
+    """
+    try:
+        db.conn.execute("SELECT pow(2, 1)")
+    except sqlite3.OperationalError:  # SQLite 未编译数学函数
+        db.conn.create_function('pow', 2, math.pow, deterministic=True)
+
+    def baseline(where: str = '', params: tuple = ()):
+        return db.conn.execute(baseline_sql.format(where=where), (user_id, *params, limit)).fetchall()
+
+    # 深分页：先用游标翻到目标页前一页，记下游标
+    after = None
+    for _ in range(args.deep_page - 1):
+        page = db.get_top_items(user_id, limit=limit, after=after, fields=['id'])
+        after = (page[-1]['_rank_key'], page[-1]['_item_id'])
+    offset = (args.deep_page - 1) * limit
+
+    def offset_page():
+        return db.conn.execute("""
+            SELECT i.id, i.title, a.summary FROM ai_results a JOIN items i ON i.id = a.item_id
+            WHERE a.user_id = ? AND a.rank_key IS NOT NULL
+            ORDER BY a.rank_key DESC, a.item_id DESC LIMIT ? OFFSET ?
+        """, (user_id, limit, offset)).fetchall()
+
+    # 结果一致性：两种排序的首页应相同（同一时刻计算）
+    expected = [row[0] for row in baseline()]
+    actual = [item['id'] for item in db.get_top_items(user_id, limit=limit)]
+    print(f"   首页与现算排序一致: {'✅' if expected == actual else '❌'}")
+
+    cases = [
+        ('现算衰减 首页', lambda: baseline()),
+        ('rank_key 首页', lambda: db.get_top_items(user_id, limit=limit)),
+        ('现算衰减 分类筛选', lambda: baseline('AND a.category = ?', ('设计',))),
+        ('rank_key 分类筛选', lambda: db.get_top_items(user_id, limit=limit, category='设计')),
+        ('现算衰减 来源筛选', lambda: baseline('AND i.source_type = ?', ('wechat',))),
+        ('rank_key 来源筛选', lambda: db.get_top_items(user_id, limit=limit, source_type='wechat')),
+        (f'OFFSET 第 {args.deep_page} 页', offset_page),
+        (f'游标 第 {args.deep_page} 页', lambda: db.get_top_items(user_id, limit=limit, after=after)),
+    ]
+
+    rows = []
+    for name, fn in cases:
+        # 现算衰减每次几秒，少测几轮
+        repeat = max(3, args.repeat // 5) if name.startswith('现算') else args.repeat
+        rows.append({'query': name, **measure(fn, repeat=repeat, warmup=1)})
+
+    print(f"\n📊 {args.items} 条，每页 {limit} 条:")
+    print_table(rows, ['query', 'mean_ms', 'p50_ms', 'p95_ms'])
+
+    print("\n🔍 查询计划:")
+    plans = [
+        ('现算衰减', baseline_sql.format(where=''), (user_id, limit)),
+        ('rank_key', """
+            SELECT a.item_id FROM ai_results a JOIN items i ON i.id = a.item_id
+            WHERE a.user_id = ? AND a.rank_key IS NOT NULL
+            ORDER BY a.rank_key DESC, a.item_id DESC LIMIT ?
+        """, (user_id, limit)),
+        ('rank_key + 分类 + 游标', """
+            SELECT a.item_id FROM ai_results a JOIN items i ON i.id = a.item_id
+            WHERE a.user_id = ? AND a.rank_key IS NOT NULL AND a.category = ?
+              AND (a.rank_key, a.item_id) < (?, ?)
+            ORDER BY a.rank_key DESC, a.item_id DESC LIMIT ?
+        """, (user_id, '设计', *after, limit)),
+    ]
+    for name, sql, params in plans:
+        print(f"   {name}:")
+        for row in db.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+            print(f"      {row[3]}")
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+基准测试公共工具
+"""
+
+import os
+import random
+import socket
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SCHEMA_PATH = BASE_DIR / 'database' / 'schema.sql'
+
+# 让脚本可以直接 python benchmarks/xxx.py 运行
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+ZH_SENTENCES = [
+    "人工智能正在重塑个人生产力工具的形态。",
+    "产品的核心价值在于解决用户真实的痛点。",
+    "知识管理不是收集信息，而是形成洞察。",
+    "增长是系统性工程，留存比拉新更重要。",
+    "数据驱动的决策需要可靠的指标体系。",
+    "大语言模型让信息处理的成本大幅下降。",
+]
+
+EN_SENTENCES = [
+    "Large language models are changing how we read and write.",
+    "Retention matters more than acquisition for sustainable growth.",
+    "Good tools reduce the cost of capturing information.",
+    "Design is how it works, not just how it looks.",
+]
+
+
+def random_content(rng: random.Random, length: int) -> str:
+    """生成指定长度左右的中英混合正文"""
+    parts = []
+    total = 0
+    while total < length:
+        sentence = rng.choice(ZH_SENTENCES if rng.random() < 0.7 else EN_SENTENCES)
+        parts.append(sentence)
+        total += len(sentence)
+        if rng.random() < 0.1:
+            parts.append("\n\n")
+    return ''.join(parts)
+
+
+def create_temp_db(
+    items: int = 1000,
+    content_length: int = 20000,
+    with_ai: bool = True,
+    seed: int = 42,
+    path: str = None
+) -> str:
+    """用 schema.sql 创建临时数据库并写入测试数据，返回数据库路径"""
+    from core.database import DatabaseManager
+
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix='neofeed_bench_'), 'neofeed.db')
+
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_PATH.read_text(encoding='utf-8'))
+    conn.close()
+
+    rng = random.Random(seed)
+    db = DatabaseManager(path)
+    user = db.get_or_create_default_user()
+    categories = ["AI趋势", "产品思考", "技术分享", "设计", "知识管理"]
+
+    for n in range(items):
+        length = max(200, int(rng.gauss(content_length, content_length * 0.3)))
+        item_id = db.create_item(
+            user_id=user['id'],
+            content=f"#{n} " + random_content(rng, length),
+            title=f"测试条目 {n}",
+            url=f"https://example.com/post/{n}",
+            source_type='web',
+            source_metadata={'domain': 'example.com', 'original_url': f"https://example.com/post/{n}"}
+        )
+        if with_ai:
+            db.create_ai_result(
+                item_id=item_id,
+                user_id=user['id'],
+                summary="这是一段测试摘要。" * 5,
+                category=rng.choice(categories),
+                keywords="AI,产品,增长",
+                importance_score=round(rng.random(), 2)
+            )
+
+    db.close()
+    return path
+
+
+def wait_port(port: int, timeout: float = 10):
+    """等待本地端口可连接（子进程里的 uvicorn 启动完成）"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """分位数（samples 不要求有序）"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def free_port() -> int:
+    """获取一个空闲的本地端口"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def measure(fn: Callable, repeat: int = 20, warmup: int = 2) -> Dict[str, float]:
+    """多次执行并返回耗时统计（毫秒）"""
+    for _ in range(warmup):
+        fn()
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        'mean_ms': statistics.mean(samples),
+        'p50_ms': samples[len(samples) // 2],
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def print_table(rows: List[Dict], columns: List[str]):
+    """打印结果表格"""
+    widths = {c: max(len(c), *(len(_fmt(r.get(c))) for r in rows)) for c in columns}
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    print('  '.join('-' * widths[c] for c in columns))
+    for r in rows:
+        print('  '.join(_fmt(r.get(c)).ljust(widths[c]) for c in columns))
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
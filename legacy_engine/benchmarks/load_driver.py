@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端负载测试
+
+启动本地 OpenAI / Jina 桩服务（可配置延迟、失败率、限流）和真实的 uvicorn 进程，
+按比例回放混合流量：
+- save_text：保存文本（enable_ai，走摘要 / 分类流水线）
+- save_url：保存链接（后台经 Jina 桩服务抓取后再 AI 处理）
+- list：GET /api/items?view=compact（偶尔带分类筛选 / 翻页）
+- detail：GET /api/items/{id}
+- process：POST /api/items/{id}/process
+
+给 --rate 时按固定到达速率发请求（开环，延迟从计划发送时刻算起，不会因服务变慢而少发），
+否则每个并发连接发完一个接着发下一个（闭环）。流量结束后等处理流水线排空（--drain-timeout）。
+
+输出 JSON：各操作的吞吐 / 延迟分位数 / 错误（按状态码），以及按采样间隔的曲线
+（每秒请求数、p50 / p99、错误数、流水线队列深度 pipeline.pending），和桩服务的请求 / 注入故障计数。
+--output 为 .jsonl 时追加一行，便于跟踪历次结果。
+
+用法:
+    python benchmarks/load_driver.py --duration 30 --concurrency 16
+    python benchmarks/load_driver.py --rate 100 --mix save_text=5,save_url=5,list=60,detail=30 --output load.jsonl
+    python benchmarks/load_driver.py --db /tmp/neofeed_1m.db --openai-error-rate 0.05 --openai-rate-limit 20
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import requests
+
+from common import BASE_DIR, create_temp_db, free_port, percentile, wait_port
+from stubs.fake_jina import FakeJinaServer
+from stubs.fake_openai import FakeOpenAIServer
+
+OPERATIONS = ['save_text', 'save_url', 'list', 'detail', 'process']
+DEFAULT_MIX = 'save_text=5,save_url=5,list=50,detail=35,process=5'
+CATEGORIES = ["AI趋势", "产品思考", "技术分享", "设计", "知识管理"]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(f"未知操作: {name}（可选 {', '.join(OPERATIONS)}）")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class Traffic:
+    """各操作的请求构造；已知条目 ID 随保存增长，详情 / 处理从中随机取"""
+
+    def __init__(self, base_url: str, item_ids: List[int], run_id: str):
+        self.base_url = base_url
+        self.item_ids = item_ids
+        self.run_id = run_id
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def _next(self) -> int:
+        with self._lock:
+            self._seq += 1
+            return self._seq
+
+    def _remember(self, response: requests.Response):
+        if response.status_code in (200, 202):
+            item_id = response.json().get('item_id')
+            if item_id:
+                with self._lock:
+                    self.item_ids.append(item_id)
+
+    def save_text(self, session: requests.Session, rng: random.Random) -> requests.Response:
+        n = self._next()
+        response = session.post(f"{self.base_url}/api/items", json={
+            'content': f"负载测试 {self.run_id}-{n}：" + "个人信息管理需要降低输入成本。" * rng.randint(5, 60),
+            'title': f"负载测试 {n}",
+            'enable_ai': True,
+        })
+        self._remember(response)
+        return response
+
+    def save_url(self, session: requests.Session, rng: random.Random) -> requests.Response:
+        n = self._next()
+        response = session.post(f"{self.base_url}/api/items", json={
+            'content': f"https://example.com/load/{self.run_id}/{n}",
+            'enable_ai': True,
+        })
+        self._remember(response)
+        return response
+
+    def list(self, session: requests.Session, rng: random.Random) -> requests.Response:
+        params = {'view': 'compact', 'limit': 20}
+        if rng.random() < 0.2:
+            params['category'] = rng.choice(CATEGORIES)
+        if rng.random() < 0.2:
+            params['offset'] = 20 * rng.randint(1, 10)
+        return session.get(f"{self.base_url}/api/items", params=params)
+
+    def detail(self, session: requests.Session, rng: random.Random) -> requests.Response:
+        return session.get(f"{self.base_url}/api/items/{rng.choice(self.item_ids)}")
+
+    def process(self, session: requests.Session, rng: random.Random) -> requests.Response:
+        return session.post(f"{self.base_url}/api/items/{rng.choice(self.item_ids)}/process")
+
+
+class Recorder:
+    """请求结果 (完成时刻, 操作, 状态码, 延迟毫秒) 和队列深度采样"""
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.results: List[tuple] = []
+        self.samples: List[dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, op: str, status: int, latency_ms: float):
+        with self._lock:
+            self.results.append((time.monotonic() - self.start, op, status, latency_ms))
+
+    def sample(self, base_url: str):
+        try:
+            snapshot = requests.get(f"{base_url}/api/metrics", timeout=5).json()['metrics']
+            pending = snapshot['gauges'].get('pipeline.pending')
+            llm_calls = snapshot['counters'].get('llm.calls', 0)
+        except (requests.RequestException, KeyError, ValueError):
+            pending, llm_calls = None, None
+        self.samples.append({
+            't': round(time.monotonic() - self.start, 2),
+            'pipeline_pending': pending,
+            'llm_calls': llm_calls,
+        })
+        return pending
+
+
+def run_worker(traffic: Traffic, recorder: Recorder, mix: Dict[str, float], stop: float,
+               interval: float, seed: int):
+    """一个并发连接；interval > 0 时按固定间隔（开环）发送"""
+    rng = random.Random(seed)
+    ops, weights = list(mix), list(mix.values())
+    session = requests.Session()
+    next_send = time.monotonic() + (rng.random() * interval if interval else 0)
+
+    while True:
+        if interval:
+            wait = next_send - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            scheduled = next_send
+            next_send += interval
+        else:
+            scheduled = time.monotonic()
+        if scheduled >= stop:
+            break
+
+        op = rng.choices(ops, weights)[0]
+        try:
+            status = getattr(traffic, op)(session, rng).status_code
+        except requests.RequestException:
+            status = 0
+        recorder.record(op, status, (time.monotonic() - scheduled) * 1000)
+    session.close()
+
+
+def summarize(results: List[tuple], elapsed: float) -> Dict:
+    latencies = [r[3] for r in results]
+    errors: Dict[str, int] = {}
+    for _, _, status, _ in results:
+        if not 200 <= status < 400:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+    return {
+        'requests': len(results),
+        'rps': round(len(results) / elapsed, 2) if elapsed else 0.0,
+        'errors': sum(errors.values()),
+        'errors_by_status': errors,
+        'p50_ms': round(percentile(latencies, 0.5), 2),
+        'p90_ms': round(percentile(latencies, 0.9), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(max(latencies), 2) if latencies else 0.0,
+    }
+
+
+def timeline(recorder: Recorder, interval: float) -> List[Dict]:
+    """按采样间隔分桶：请求数 / 延迟 / 错误，合并同一时段的队列深度采样"""
+    buckets: Dict[int, List[tuple]] = {}
+    for result in recorder.results:
+        buckets.setdefault(int(result[0] // interval), []).append(result)
+    depth = {int(s['t'] // interval): s for s in recorder.samples}
+
+    points = []
+    for n in range(max([*buckets, *depth], default=-1) + 1):
+        rows = buckets.get(n, [])
+        latencies = [r[3] for r in rows]
+        sample = depth.get(n, {})
+        points.append({
+            't': round((n + 1) * interval, 2),
+            'rps': round(len(rows) / interval, 2),
+            'p50_ms': round(percentile(latencies, 0.5), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'errors': sum(1 for r in rows if not 200 <= r[2] < 400),
+            'pipeline_pending': sample.get('pipeline_pending'),
+            'llm_calls': sample.get('llm_calls'),
+        })
+    return points
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=30, help='发流量的秒数')
+    parser.add_argument('--concurrency', type=int, default=16, help='并发连接数')
+    parser.add_argument('--rate', type=float, default=0, help='总请求速率（每秒，0 为闭环）')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='操作比例，如 list=60,detail=30,save_text=10')
+    parser.add_argument('--db', help='已有数据库（会被写入，默认生成临时库）')
+    parser.add_argument('--items', type=int, default=2000, help='临时库的初始条目数')
+    parser.add_argument('--sample-interval', type=float, default=1.0, help='曲线采样间隔（秒）')
+    parser.add_argument('--drain-timeout', type=float, default=60, help='流量结束后等待流水线排空的最长秒数')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='结果 JSON 路径（.jsonl 追加一行；默认打印）')
+    parser.add_argument('--openai-latency-ms', type=int, default=300)
+    parser.add_argument('--openai-jitter-ms', type=int, default=100)
+    parser.add_argument('--openai-token-delay-ms', type=int, default=5)
+    parser.add_argument('--openai-error-rate', type=float, default=0.0)
+    parser.add_argument('--openai-rate-limit', type=float, default=0, help='每秒请求数，超出返回 429')
+    parser.add_argument('--jina-latency-ms', type=int, default=500)
+    parser.add_argument('--jina-jitter-ms', type=int, default=200)
+    parser.add_argument('--jina-error-rate', type=float, default=0.02)
+    parser.add_argument('--jina-rate-limit', type=float, default=0, help='每秒请求数，超出返回 429')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    openai_stub = FakeOpenAIServer(
+        latency_ms=args.openai_latency_ms, token_delay_ms=args.openai_token_delay_ms,
+        error_rate=args.openai_error_rate, jitter_ms=args.openai_jitter_ms, rate_limit=args.openai_rate_limit
+    ).start()
+    jina_stub = FakeJinaServer(
+        latency_ms=args.jina_latency_ms, error_rate=args.jina_error_rate, jitter_ms=args.jina_jitter_ms,
+        rate_limit=args.jina_rate_limit
+    ).start()
+
+    if args.db:
+        db_path = args.db
+    else:
+        print(f"📦 生成测试数据: {args.items} 条...", file=sys.stderr)
+        db_path = create_temp_db(items=args.items, content_length=2000, seed=args.seed)
+
+    conn = sqlite3.connect(db_path)
+    item_ids = [row[0] for row in conn.execute("SELECT id FROM items ORDER BY id DESC LIMIT 5000")]
+    conn.close()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ,
+        DATABASE_PATH=db_path,
+        OPENAI_API_KEY='sk-fake',
+        OPENAI_BASE_URL=openai_stub.base_url,
+        JINA_API_URL=jina_stub.base_url,
+        ENABLE_AI_PROCESSING='true',
+        ENABLE_WEB_SCRAPING='true',
+        LOG_LEVEL='WARNING',
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api.main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=BASE_DIR, env=env
+    )
+
+    try:
+        wait_port(port)
+        requests.get(f"{base_url}/api/items", params={'limit': 1}).raise_for_status()
+
+        traffic = Traffic(base_url, item_ids or [1], run_id=f"{int(time.time())}")
+        recorder = Recorder()
+        stop = time.monotonic() + args.duration
+        interval = args.concurrency / args.rate if args.rate else 0
+        print(f"🚀 {args.duration:g}s，{args.concurrency} 个连接，"
+              f"{f'{args.rate:g} req/s' if args.rate else '闭环'}，mix {args.mix}", file=sys.stderr)
+
+        workers = [
+            threading.Thread(target=run_worker, daemon=True,
+                             args=(traffic, recorder, mix, stop, interval, args.seed + n))
+            for n in range(args.concurrency)
+        ]
+        for t in workers:
+            t.start()
+        while any(t.is_alive() for t in workers):
+            recorder.sample(base_url)
+            time.sleep(args.sample_interval)
+        traffic_s = time.monotonic() - recorder.start
+
+        # 等后台抓取 / AI 处理排空，队列深度曲线延续到这里
+        drain_deadline = time.monotonic() + args.drain_timeout
+        while time.monotonic() < drain_deadline:
+            if recorder.sample(base_url) == 0:
+                break
+            time.sleep(args.sample_interval)
+        drain_s = time.monotonic() - recorder.start - traffic_s
+
+        by_op = {
+            op: summarize([r for r in recorder.results if r[1] == op], traffic_s)
+            for op in mix
+        }
+        final = requests.get(f"{base_url}/api/metrics").json()['metrics']
+        report = {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'config': {
+                'duration_s': args.duration,
+                'concurrency': args.concurrency,
+                'rate': args.rate,
+                'mix': mix,
+                'db': args.db or f"temp ({args.items} items)",
+                'openai': {'latency_ms': args.openai_latency_ms, 'jitter_ms': args.openai_jitter_ms,
+                           'error_rate': args.openai_error_rate, 'rate_limit': args.openai_rate_limit},
+                'jina': {'latency_ms': args.jina_latency_ms, 'jitter_ms': args.jina_jitter_ms,
+                         'error_rate': args.jina_error_rate, 'rate_limit': args.jina_rate_limit},
+            },
+            'summary': {
+                **summarize(recorder.results, traffic_s),
+                'drain_s': round(drain_s, 2),
+                'drained': recorder.samples[-1]['pipeline_pending'] == 0,
+            },
+            'operations': by_op,
+            'timeline': timeline(recorder, args.sample_interval),
+            'stubs': {'openai': openai_stub.faults.stats(), 'jina': jina_stub.faults.stats()},
+            'server': {'counters': final['counters'], 'timers': final['timers']},
+        }
+    finally:
+        server.terminate()
+        server.wait()
+        openai_stub.shutdown()
+        jina_stub.shutdown()
+
+    text = json.dumps(report, ensure_ascii=False)
+    if not args.output:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    elif args.output.endswith('.jsonl'):
+        with open(args.output, 'a', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    s = report['summary']
+    print(f"\n📊 {s['requests']} 个请求，{s['rps']} req/s，p50 {s['p50_ms']} ms，p99 {s['p99_ms']} ms，"
+          f"错误 {s['errors']}，排空 {s['drain_s']}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
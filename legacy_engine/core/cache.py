@@ -0,0 +1,144 @@
+"""
+进程内读缓存
+
+条目详情和各用户的首页列表只在保存 / 处理时变化，用有界的 LRU + TTL 缓存
+挡在数据库前面：
+- 本进程写入（create_item / update_item_status / create_ai_result）时精确失效
+- 每个缓存项记下写入时的 change_counters 版本，读取时与当前版本比对；
+  其他 worker 的写入会让版本变化，版本不一致即视为过期，多 worker 下也不会读到旧数据
+- 命中率等统计通过 GET /api/metrics 暴露
+
+READ_CACHE_TTL_SECONDS=0 时关闭。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from core.config import Config
+
+# 未命中（缓存值本身可能是 None）
+MISSING = object()
+
+
+class LRUCache:
+    """有界 LRU + TTL 缓存，缓存项带数据版本"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: Hashable, version: int) -> Any:
+        """取缓存；不存在、已过期或版本不一致时返回 MISSING"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, entry_version, expires = entry
+            if entry_version != version or expires <= time.monotonic():
+                del self._data[key]
+                self.stale += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, version: int):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (value, version, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_prefix(self, prefix: Hashable):
+        """删除元组键首元素为 prefix 的缓存项"""
+        with self._lock:
+            for key in [k for k in self._data if k[0] == prefix]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ReadCache:
+    """
+    一个数据库的读缓存
+
+    - items：条目详情，键为 item_id，版本用全部用户的变更计数之和（与详情 ETag 相同）
+    - pages：首页列表，键为 (user_id, 查询参数...)，版本用该用户的变更计数
+    """
+
+    def __init__(self, ttl: float = None, item_size: int = None, page_size: int = None):
+        ttl = Config.READ_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.items = LRUCache(Config.READ_CACHE_ITEMS if item_size is None else item_size, ttl)
+        self.pages = LRUCache(Config.READ_CACHE_PAGES if page_size is None else page_size, ttl)
+
+    def invalidate_item(self, item_id: int, user_id: Optional[int] = None):
+        """条目变化：详情失效，所属用户的首页失效（不知道用户时全部首页失效）"""
+        self.items.invalidate(item_id)
+        if user_id is None:
+            self.pages.clear()
+        else:
+            self.pages.invalidate_prefix(user_id)
+
+    def invalidate_user(self, user_id: int):
+        """用户有新条目：只影响首页"""
+        self.pages.invalidate_prefix(user_id)
+
+
+_caches: Dict[str, ReadCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_read_cache(db_path: str) -> ReadCache:
+    """获取数据库对应的读缓存"""
+    cache = _caches.get(db_path)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.setdefault(db_path, ReadCache())
+    return cache
+
+
+def read_cache_stats() -> Dict:
+    """各缓存的统计（所有数据库合计）"""
+    totals = {}
+    for name in ('items', 'pages'):
+        stats = [getattr(cache, name).stats() for cache in list(_caches.values())]
+        total = {k: sum(s[k] for s in stats) for k in ('size', 'hits', 'misses', 'stale', 'evictions')}
+        lookups = total['hits'] + total['misses']
+        total['hit_rate'] = round(total['hits'] / lookups, 4) if lookups else 0.0
+        totals[name] = total
+    return totals
@@ -0,0 +1,251 @@
+"""
+本地分类器
+
+用已有的 ai_results.category（模型给出的分类）训练多项式朴素贝叶斯，
+特征为分词结果（core.keywords.segment）哈希到固定桶数的二值特征。
+- 模型序列化为 JSON，默认放在数据库旁（neofeed.db → neofeed.category.json），
+  文件更新后各进程自动重新加载
+- 预测返回 (分类, 置信度)；置信度为后验概率，hybrid 模式下低于阈值才调用模型
+- 只用非本地分类器给出的标签训练（category_source != 'local'），避免自我强化
+- 模型过期（CATEGORY_RETRAIN_HOURS）时在后台线程重新训练
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.config import Config
+from core.keywords import segment
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = [
+    "AI趋势", "产品思考", "技术分享", "设计",
+    "创业", "个人成长", "知识管理", "工作方法", "其他"
+]
+
+FEATURE_BUCKETS = 1 << 18
+# 参与分类的正文长度（标题 + 正文开头足够判断主题）
+MAX_CHARS = 3000
+# 出现次数低于该值的特征不进模型，控制模型大小
+MIN_FEATURE_COUNT = 2
+MODEL_VERSION = 1
+# 训练失败 / 样本不足后，间隔多久再尝试
+RETRAIN_RETRY_SECONDS = 600
+
+
+def features(text: str) -> List[int]:
+    """文本 → 去重后的哈希特征桶（crc32，跨进程稳定）"""
+    words = {word.lower() for word in segment((text or '')[:MAX_CHARS])}
+    return sorted({zlib.crc32(word.encode('utf-8')) % FEATURE_BUCKETS for word in words})
+
+
+def model_path(db_path: str = None) -> str:
+    """模型文件路径（CATEGORY_MODEL_PATH 留空时放在数据库旁）"""
+    if Config.CATEGORY_MODEL_PATH:
+        return Config.CATEGORY_MODEL_PATH
+    base, _ = os.path.splitext(db_path or Config.DATABASE_PATH)
+    return base + '.category.json'
+
+
+class NaiveBayesClassifier:
+    """多项式朴素贝叶斯（Laplace 平滑）"""
+
+    def __init__(self, classes: List[str], log_priors: Dict[str, float],
+                 log_probs: Dict[str, Dict[int, float]], unseen: Dict[str, float],
+                 meta: Dict = None):
+        self.classes = classes
+        self.log_priors = log_priors
+        self.log_probs = log_probs
+        self.unseen = unseen
+        self.meta = meta or {}
+
+    @classmethod
+    def train(cls, samples: Iterable[Tuple[str, str]], alpha: float = 1.0) -> 'NaiveBayesClassifier':
+        """samples 为 (文本, 分类)"""
+        doc_counts: Counter = Counter()
+        feature_counts: Dict[str, Counter] = defaultdict(Counter)
+        for text, label in samples:
+            doc_counts[label] += 1
+            feature_counts[label].update(features(text))
+
+        total_docs = sum(doc_counts.values())
+        if not total_docs:
+            raise ValueError('No training samples')
+
+        # 全局出现次数太少的特征丢掉
+        overall: Counter = Counter()
+        for counts in feature_counts.values():
+            overall.update(counts)
+        kept = {f for f, n in overall.items() if n >= MIN_FEATURE_COUNT}
+        vocab = max(len(kept), 1)
+
+        classes = sorted(doc_counts)
+        log_priors, log_probs, unseen = {}, {}, {}
+        for label in classes:
+            counts = feature_counts[label]
+            total = sum(n for f, n in counts.items() if f in kept)
+            denominator = math.log(total + alpha * vocab)
+            log_priors[label] = math.log(doc_counts[label] / total_docs)
+            log_probs[label] = {
+                f: math.log(n + alpha) - denominator for f, n in counts.items() if f in kept
+            }
+            unseen[label] = math.log(alpha) - denominator
+
+        return cls(classes, log_priors, log_probs, unseen, {
+            'samples': total_docs,
+            'class_counts': dict(doc_counts),
+            'features': len(kept),
+            'trained_at': time.time(),
+        })
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """返回 (分类, 后验概率)"""
+        feats = features(text)
+        scores = {}
+        for label in self.classes:
+            probs, default = self.log_probs[label], self.unseen[label]
+            scores[label] = self.log_priors[label] + sum(probs.get(f, default) for f in feats)
+
+        best = max(scores, key=scores.get)
+        # softmax（减去最大值防溢出）
+        total = sum(math.exp(s - scores[best]) for s in scores.values())
+        return best, 1.0 / total
+
+    def save(self, path: str):
+        """原子写入 JSON"""
+        data = {
+            'version': MODEL_VERSION,
+            'buckets': FEATURE_BUCKETS,
+            'classes': self.classes,
+            'log_priors': self.log_priors,
+            'log_probs': {c: {str(f): round(p, 5) for f, p in probs.items()}
+                          for c, probs in self.log_probs.items()},
+            'unseen': self.unseen,
+            'meta': self.meta,
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['NaiveBayesClassifier']:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != MODEL_VERSION or data.get('buckets') != FEATURE_BUCKETS:
+            logger.warning(f"Ignoring incompatible category model {path}")
+            return None
+        return cls(
+            data['classes'],
+            data['log_priors'],
+            {c: {int(f): p for f, p in probs.items()} for c, probs in data['log_probs'].items()},
+            data['unseen'],
+            data.get('meta'),
+        )
+
+
+# ============================================
+# 训练数据 / 模型管理
+# ============================================
+
+def load_samples(db, item_ids: Sequence[int] = None) -> List[Tuple[int, str, str]]:
+    """从数据库取训练样本 (item_id, 标题 + 正文, 分类)"""
+    rows = db.get_category_labels(CATEGORIES, item_ids)
+    return [
+        (row['item_id'], f"{row['title'] or ''}\n{row['content'] or ''}", row['category'])
+        for row in rows
+    ]
+
+
+def train_from_db(db, path: str = None) -> Optional[NaiveBayesClassifier]:
+    """用数据库中的标签训练并保存，样本不足 CATEGORY_MIN_SAMPLES 时返回 None"""
+    samples = load_samples(db)
+    if len(samples) < Config.CATEGORY_MIN_SAMPLES:
+        logger.info(f"Not enough labeled items to train classifier ({len(samples)})")
+        return None
+
+    start = time.perf_counter()
+    model = NaiveBayesClassifier.train((text, label) for _, text, label in samples)
+    model.save(path or model_path(db.db_path))
+    logger.info(f"Trained category classifier on {len(samples)} items "
+                f"in {time.perf_counter() - start:.1f}s")
+    return model
+
+
+class _ModelCache:
+    """按模型文件缓存已加载的分类器，文件修改后重新加载"""
+
+    def __init__(self):
+        self._models: Dict[str, Tuple[float, Optional[NaiveBayesClassifier]]] = {}
+        self._lock = threading.Lock()
+        self._training = set()
+        self._attempted: Dict[str, float] = {}
+
+    def get(self, path: str) -> Optional[NaiveBayesClassifier]:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        cached = self._models.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with self._lock:
+            cached = self._models.get(path)
+            if not cached or cached[0] != mtime:
+                try:
+                    cached = (mtime, NaiveBayesClassifier.load(path))
+                except (OSError, ValueError, KeyError) as e:
+                    logger.error(f"Failed to load category model {path}: {e}")
+                    cached = (mtime, None)
+                self._models[path] = cached
+        return cached[1]
+
+    def retrain_if_stale(self, db_path: str):
+        """模型不存在或超过 CATEGORY_RETRAIN_HOURS 时在后台重新训练（同一模型只跑一个）"""
+        path = model_path(db_path)
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            age = float('inf')
+        if age < Config.CATEGORY_RETRAIN_HOURS * 3600:
+            return
+
+        now = time.time()
+        with self._lock:
+            if path in self._training or now - self._attempted.get(path, 0) < RETRAIN_RETRY_SECONDS:
+                return
+            self._training.add(path)
+            self._attempted[path] = now
+
+        def _train():
+            from core.database import DatabaseManager
+            db = DatabaseManager(db_path)
+            try:
+                train_from_db(db, path)
+            except Exception as e:
+                logger.error(f"Category classifier training failed: {e}")
+            finally:
+                db.close()
+                with self._lock:
+                    self._training.discard(path)
+
+        threading.Thread(target=_train, name='category-train', daemon=True).start()
+
+
+_cache = _ModelCache()
+
+
+def get_classifier(db_path: str = None) -> Optional[NaiveBayesClassifier]:
+    """当前数据库对应的分类器（未训练时为 None），顺带检查是否需要重新训练"""
+    db_path = db_path or Config.DATABASE_PATH
+    _cache.retrain_if_stale(db_path)
+    return _cache.get(model_path(db_path))
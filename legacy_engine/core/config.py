@@ -15,14 +15,74 @@ class Config:
     # 数据库
     DATABASE_PATH = os.getenv('DATABASE_PATH', 'database/neofeed.db')
     
+    # 正文存储：inline（items.content）/ compressed（item_contents 压缩存储）
+    CONTENT_STORE = os.getenv('CONTENT_STORE', 'inline')
+    CONTENT_COMPRESSION_LEVEL = int(os.getenv('CONTENT_COMPRESSION_LEVEL', '6'))
+    
     # OpenAI
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
     OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', '')  # 留空使用官方地址
+    
+    # 长文摘要（token 预算）：不超过 SUMMARY_DIRECT_TOKENS 直接摘要，
+    # 否则按 SUMMARY_CHUNK_TOKENS 分块并发摘要后再归并
+    SUMMARY_DIRECT_TOKENS = int(os.getenv('SUMMARY_DIRECT_TOKENS', '3000'))
+    SUMMARY_CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', '2000'))
+    SUMMARY_REDUCE_TOKENS = int(os.getenv('SUMMARY_REDUCE_TOKENS', '3000'))
+    SUMMARY_MAP_CONCURRENCY = int(os.getenv('SUMMARY_MAP_CONCURRENCY', '4'))
+    # 分类 / 关键词的输入上限
+    CLASSIFY_INPUT_TOKENS = int(os.getenv('CLASSIFY_INPUT_TOKENS', '1500'))
+    # 关键词提取：llm / local（本地 TF-IDF + TextRank）/ hybrid（本地置信度低时再调模型）
+    KEYWORD_EXTRACTOR = os.getenv('KEYWORD_EXTRACTOR', 'hybrid')
+    KEYWORD_CONFIDENCE_THRESHOLD = float(os.getenv('KEYWORD_CONFIDENCE_THRESHOLD', '0.3'))
+    # 分类：llm / local（本地朴素贝叶斯）/ hybrid（本地置信度低或还没有模型时再调模型）
+    CATEGORY_CLASSIFIER = os.getenv('CATEGORY_CLASSIFIER', 'hybrid')
+    CATEGORY_CONFIDENCE_THRESHOLD = float(os.getenv('CATEGORY_CONFIDENCE_THRESHOLD', '0.9'))
+    CATEGORY_MODEL_PATH = os.getenv('CATEGORY_MODEL_PATH', '')  # 留空时放在数据库旁
+    CATEGORY_RETRAIN_HOURS = float(os.getenv('CATEGORY_RETRAIN_HOURS', '24'))
+    CATEGORY_MIN_SAMPLES = int(os.getenv('CATEGORY_MIN_SAMPLES', '50'))
+    # 重要性评分：特征权重覆盖（如 "recency=0.3,starred=0"），时间衰减半衰期
+    IMPORTANCE_WEIGHTS = os.getenv('IMPORTANCE_WEIGHTS', '')
+    IMPORTANCE_HALF_LIFE_DAYS = float(os.getenv('IMPORTANCE_HALF_LIFE_DAYS', '30'))
+    # 精选信息流排序：重要性 × 2^(-距今天数 / RANK_HALF_LIFE_DAYS)，修改后运行 rescore.py --rank-only
+    RANK_HALF_LIFE_DAYS = float(os.getenv('RANK_HALF_LIFE_DAYS', '7'))
+    
+    # 网页抓取（Jina Reader）
+    JINA_API_URL = os.getenv('JINA_API_URL', 'https://r.jina.ai/')
+    FETCH_TIMEOUT = int(os.getenv('FETCH_TIMEOUT', '10'))
+    FETCH_WORKERS = int(os.getenv('FETCH_WORKERS', '4'))
+    FETCH_MAX_ATTEMPTS = int(os.getenv('FETCH_MAX_ATTEMPTS', '3'))
+    FETCH_RETRY_BASE_SECONDS = float(os.getenv('FETCH_RETRY_BASE_SECONDS', '2'))
+    
+    # 处理流水线：按阶段覆盖并发数，如 "fetch=8,summarize=2"
+    PIPELINE_CONCURRENCY = os.getenv('PIPELINE_CONCURRENCY', '')
     
     # 功能开关
     ENABLE_AI_PROCESSING = os.getenv('ENABLE_AI_PROCESSING', 'false').lower() == 'true'
     ENABLE_WEB_SCRAPING = os.getenv('ENABLE_WEB_SCRAPING', 'true').lower() == 'true'
     
+    # 事件推送：memory（单进程）/ sqlite（多 worker，经 events 表轮询）
+    EVENT_BUS = os.getenv('EVENT_BUS', 'memory')
+    EVENT_POLL_INTERVAL_MS = int(os.getenv('EVENT_POLL_INTERVAL_MS', '200'))
+    
+    # 合并提交：写操作交给单写线程，按时间窗口 / 批大小合并到一个事务（见 core.writer）
+    # 窗口为 0 时只合并上一次提交期间排队的操作，不额外等待
+    GROUP_COMMIT = os.getenv('GROUP_COMMIT', 'false').lower() == 'true'
+    GROUP_COMMIT_WINDOW_MS = float(os.getenv('GROUP_COMMIT_WINDOW_MS', '0'))
+    GROUP_COMMIT_MAX_OPS = int(os.getenv('GROUP_COMMIT_MAX_OPS', '64'))
+    GROUP_COMMIT_RETRIES = int(os.getenv('GROUP_COMMIT_RETRIES', '5'))
+    
+    # 读缓存：条目详情 / 首页列表（LRU + TTL，按 change_counters 版本校验，TTL=0 关闭）
+    READ_CACHE_TTL_SECONDS = float(os.getenv('READ_CACHE_TTL_SECONDS', '60'))
+    READ_CACHE_ITEMS = int(os.getenv('READ_CACHE_ITEMS', '1000'))
+    READ_CACHE_PAGES = int(os.getenv('READ_CACHE_PAGES', '200'))
+    
+    # SQL 剖析：记录每条语句的耗时 / 行数并按规范化 SQL 汇总（见 core.profiler），
+    # 超过 QUERY_SLOW_MS 的语句连同查询计划记入慢查询日志（QUERY_SLOW_LOG 为 JSON Lines 文件，留空只写应用日志）
+    QUERY_PROFILING = os.getenv('QUERY_PROFILING', 'false').lower() == 'true'
+    QUERY_SLOW_MS = float(os.getenv('QUERY_SLOW_MS', '100'))
+    QUERY_SLOW_LOG = os.getenv('QUERY_SLOW_LOG', '')
+    
     # 日志
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     
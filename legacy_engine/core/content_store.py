@@ -0,0 +1,140 @@
+"""
+正文压缩存储
+
+开启 CONTENT_STORE=compressed 后，条目正文压缩后写入独立的 item_contents 表，
+items.content 只留空串，items 的 B-tree 不再被长正文撑大。
+- 优先使用 zstd（可选依赖 zstandard），可训练字典提升中文短网页的压缩率
+- 未安装 zstandard 时退回标准库 zlib
+- 只有 get_item 会读取，列表查询不访问该表
+"""
+
+import sqlite3
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from core.config import Config
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖
+    zstandard = None
+
+# 字典只增不改，按 (数据库, 字典 ID) 缓存
+_dict_cache: Dict[Tuple[str, int], 'zstandard.ZstdCompressionDict'] = {}
+_dict_lock = threading.Lock()
+
+DICT_SIZE = 112 * 1024
+
+
+def is_enabled() -> bool:
+    """是否启用压缩存储"""
+    return Config.CONTENT_STORE == 'compressed'
+
+
+class ContentStore:
+    """正文压缩存储（item_contents 表）"""
+
+    def __init__(self, conn: sqlite3.Connection, db_path: str, level: int = None):
+        self.conn = conn
+        self.db_path = db_path
+        self.level = level if level is not None else Config.CONTENT_COMPRESSION_LEVEL
+
+    # ============================================
+    # 编解码
+    # ============================================
+
+    def _load_dict(self, dict_id: int):
+        key = (self.db_path, dict_id)
+        zdict = _dict_cache.get(key)
+        if zdict is None:
+            row = self.conn.execute(
+                "SELECT data FROM content_dicts WHERE id = ?", (dict_id,)
+            ).fetchone()
+            if not row:
+                raise LookupError(f"Content dictionary {dict_id} not found")
+            zdict = zstandard.ZstdCompressionDict(bytes(row[0]))
+            with _dict_lock:
+                _dict_cache[key] = zdict
+        return zdict
+
+    def latest_dict_id(self) -> Optional[int]:
+        """最新训练的字典 ID"""
+        if zstandard is None:
+            return None
+        row = self.conn.execute("SELECT MAX(id) FROM content_dicts").fetchone()
+        return row[0] if row else None
+
+    def compress(self, content: str, dict_id: int = None) -> Tuple[str, Optional[int], bytes]:
+        """压缩正文，返回 (codec, dict_id, data)"""
+        raw = content.encode('utf-8')
+
+        if zstandard is None:
+            return 'zlib', None, zlib.compress(raw, min(max(self.level, 1), 9))
+
+        if dict_id is not None:
+            compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self._load_dict(dict_id))
+            return 'zstd', dict_id, compressor.compress(raw)
+
+        return 'zstd', None, zstandard.ZstdCompressor(level=self.level).compress(raw)
+
+    def decompress(self, codec: str, dict_id: Optional[int], data: bytes) -> str:
+        """解压正文"""
+        data = bytes(data)
+
+        if codec == 'zlib':
+            return zlib.decompress(data).decode('utf-8')
+
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd-compressed content")
+            if dict_id is not None:
+                decompressor = zstandard.ZstdDecompressor(dict_data=self._load_dict(dict_id))
+            else:
+                decompressor = zstandard.ZstdDecompressor()
+            return decompressor.decompress(data).decode('utf-8')
+
+        raise ValueError(f"Unknown content codec: {codec}")
+
+    # ============================================
+    # 读写
+    # ============================================
+
+    def put(self, item_id: int, content: str, dict_id: int = None):
+        """写入正文（不提交事务）"""
+        if dict_id is None:
+            dict_id = self.latest_dict_id()
+        codec, dict_id, data = self.compress(content, dict_id)
+        self.conn.execute("""
+            INSERT OR REPLACE INTO item_contents (item_id, codec, dict_id, raw_size, data)
+            VALUES (?, ?, ?, ?, ?)
+        """, (item_id, codec, dict_id, len(content.encode('utf-8')), data))
+
+    def delete(self, item_id: int):
+        """删除正文（正文改回写入 items.content 时调用，不提交事务）"""
+        self.conn.execute("DELETE FROM item_contents WHERE item_id = ?", (item_id,))
+
+    def get(self, item_id: int) -> Optional[str]:
+        """读取正文"""
+        row = self.conn.execute("""
+            SELECT codec, dict_id, data FROM item_contents WHERE item_id = ?
+        """, (item_id,)).fetchone()
+        if not row:
+            return None
+        return self.decompress(row[0], row[1], row[2])
+
+    def train_dictionary(self, samples: List[str], dict_size: int = DICT_SIZE) -> int:
+        """用样本正文训练 zstd 字典，返回新字典 ID"""
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to train a dictionary")
+
+        zdict = zstandard.train_dictionary(
+            dict_size,
+            [s.encode('utf-8') for s in samples if s],
+            level=self.level
+        )
+        cursor = self.conn.execute(
+            "INSERT INTO content_dicts (codec, data) VALUES ('zstd', ?)",
+            (zdict.as_bytes(),)
+        )
+        return cursor.lastrowid
@@ -2,61 +2,192 @@
 数据库操作封装
 """
 
+import functools
 import sqlite3
 import json
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterable, List, Tuple
 from pathlib import Path
 
 from core.config import Config
+from core import content_store
+from core.cache import get_read_cache
+from core.dedup import canonicalize_url, content_hash, get_seen_filter, url_key, hash_key
+from core.importance import rank_key
+from core.keywords import keyword_terms
+from core.migrations import apply_migrations
+from core.profiler import connection_factory
+from core.writer import get_writer
+
+# 默认用户邮箱（MVP 单用户，users.email 唯一）
+DEFAULT_USER_EMAIL = 'user@neofeed.local'
+
+# 预览长度（字符）
+PREVIEW_LENGTH = 200
+
+# 读出的 source_metadata 一律是合法 JSON 文本：旧数据 / 导入数据里的非法 JSON 由 SQLite
+# 转成 JSON 字符串（json_quote），API 层不必解析、原样嵌入响应（见 api.responses.raw_json）
+SOURCE_METADATA_JSON = (
+    "CASE WHEN i.source_metadata IS NULL OR json_valid(i.source_metadata) "
+    "THEN i.source_metadata ELSE json_quote(i.source_metadata) END"
+)
+
+# 列表可选字段 -> SQL 列；也是完整视图 / 详情对外返回的条目字段（去重哈希、抓取错误等内部列不在其中）
+LIST_FIELDS = {
+    'id': 'i.id',
+    'user_id': 'i.user_id',
+    'title': 'i.title',
+    'content': 'i.content',
+    'preview': 'i.preview',
+    'url': 'i.url',
+    'source_type': 'i.source_type',
+    'source_metadata': SOURCE_METADATA_JSON,
+    'domain': 'i.domain',
+    'original_url': 'i.original_url',
+    'word_count': 'i.word_count',
+    'language': 'i.language',
+    'status': 'i.status',
+    'fetch_status': 'i.fetch_status',
+    'created_at': 'i.created_at',
+    'updated_at': 'i.updated_at',
+    'summary': 'a.summary',
+    'category': 'a.category',
+    'keywords': 'a.keywords',
+    'importance_score': 'a.importance_score',
+}
+
+# 精简视图：信息流卡片所需字段（不含 content）
+COMPACT_FIELDS = [
+    'id', 'title', 'preview', 'url', 'source_type', 'status', 'fetch_status', 'word_count',
+    'created_at', 'summary', 'category', 'keywords', 'importance_score',
+]
+
+
+# 写入 ai_results 时冗余的来源类型和排序键（参数：item_id, importance_score, item_id）
+_RANK_VALUES = (
+    "(SELECT source_type FROM items WHERE id = ?), "
+    "rank_key(?, (SELECT created_at FROM items WHERE id = ?))"
+)
+
+
+# 列表筛选：名称 → (表别名, 条件)，keyword 另行处理（见 DatabaseManager._filter_clauses）
+# 索引设计见 migrations._m015_list_indexes / _m016_metadata_columns，check_query_plans.py 校验各组合的查询计划
+ITEM_FILTERS = {
+    'status': ('i', 'i.status = ?'),
+    'source_type': ('i', 'i.source_type = ?'),
+    'since': ('i', 'i.created_at >= ?'),
+    'until': ('i', 'i.created_at < ?'),
+    'domain': ('i', 'i.domain = ?'),
+    'category': ('a', 'a.category = ?'),
+    'min_importance': ('a', 'a.importance_score >= ?'),
+}
+
+# 分面维度：名称 → (表别名, 取值表达式)
+FACETS = {
+    'status': ('i', 'i.status'),
+    'source_type': ('i', 'i.source_type'),
+    'domain': ('i', 'i.domain'),
+    'category': ('a', 'a.category'),
+}
+
+# 低基数筛选：列表查询（按时间取一页）时用一元 + 禁止走其索引，让 SQLite 沿
+# (user_id, created_at) 顺序扫描、逐条探测，取满一页即停，而不是取出全部命中再排序
+_ORDERED_SCAN_FILTERS = {'category'}
+
+# 命中条目数超过该值的关键词改为按时间顺序扫描 + 逐条探测，避免对全部命中排序
+KEYWORD_PROBE_THRESHOLD = 2000
+
+
+def make_preview(content: str, length: int = PREVIEW_LENGTH) -> str:
+    """生成内容预览（折叠空白后截断）"""
+    if not content:
+        return ''
+    text = ' '.join(content.split())
+    return text if len(text) <= length else text[:length] + '…'
+
+
+def group_commit(method):
+    """
+    写方法：开启 GROUP_COMMIT 时转交写线程，与其他写入合并到同一事务提交（见 core.writer）
+    
+    方法内用 self._commit() 提交；调用方照常同步拿到返回值 / 异常。
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.writer is None:
+            return method(self, *args, **kwargs)
+        return self.writer.submit(method, *args, **kwargs).result()
+    return wrapper
 
 
 class DatabaseManager:
     """数据库管理器"""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, batched: bool = False):
+        """batched=True 为写线程自己的实例：写方法不提交，由写线程整批提交"""
         self.db_path = db_path or Config.DATABASE_PATH
         self.conn = None
         self.cursor = None
+        self._batched = batched
         self._connect()
+        self.content_store = content_store.ContentStore(self.conn, self.db_path)
+        self.read_cache = get_read_cache(self.db_path)
+        self.writer = None if batched else get_writer(self.db_path)
     
     def _connect(self):
         """连接数据库"""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # QUERY_PROFILING 开启时为计时的连接（见 core.profiler），否则就是 sqlite3.Connection
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=connection_factory())
         self.conn.row_factory = sqlite3.Row
         self.cursor = self.conn.cursor()
         # 启用外键约束
         self.cursor.execute("PRAGMA foreign_keys = ON;")
+        # 精选排序键（迁移和写入 ai_results 时使用）
+        self.conn.create_function('rank_key', 2, rank_key, deterministic=True)
+        # 应用 schema 迁移（每个进程每个数据库只执行一次）
+        apply_migrations(self.conn, self.db_path)
     
     def close(self):
         """关闭连接"""
         if self.conn:
             self.conn.close()
     
+    def _commit(self):
+        """提交（写线程的实例由写线程整批提交）"""
+        if not self._batched:
+            self.conn.commit()
+    
     # ============================================
     # 用户管理（MVP 简化版，单用户）
     # ============================================
     
     def get_or_create_default_user(self) -> Dict:
-        """获取或创建默认用户（MVP 单用户）"""
-        self.cursor.execute("SELECT * FROM users LIMIT 1")
+        """
+        获取或创建默认用户（MVP 单用户）
+        
+        已有用户时取最早的一个；没有时按固定邮箱 INSERT OR IGNORE（email 唯一），
+        并发的首次请求（含多个 worker）也只会建出一个。每次调用都查库，
+        API 请求经 api.users.current_user 解析（进程内缓存）。
+        """
+        self.cursor.execute("SELECT * FROM users ORDER BY id LIMIT 1")
         user = self.cursor.fetchone()
+        if user:
+            return dict(user)
         
-        if not user:
-            # 创建默认用户
-            self.cursor.execute("""
-                INSERT INTO users (email, preferences)
-                VALUES (?, ?)
-            """, ('user@neofeed.local', '{}'))
-            self.conn.commit()
-            return self.get_or_create_default_user()
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO users (email, preferences)
+            VALUES (?, ?)
+        """, (DEFAULT_USER_EMAIL, '{}'))
+        self.conn.commit()
         
-        return dict(user)
+        self.cursor.execute("SELECT * FROM users ORDER BY id LIMIT 1")
+        return dict(self.cursor.fetchone())
     
     # ============================================
     # 信息条目管理
     # ============================================
     
+    @group_commit
     def create_item(
         self,
         user_id: int,
@@ -64,27 +195,101 @@ class DatabaseManager:
         title: str = None,
         url: str = None,
         source_type: str = 'web',
-        source_metadata: Dict = None
+        source_metadata: Dict = None,
+        fetch_status: str = None
     ) -> int:
-        """创建信息条目"""
+        """
+        创建信息条目
+        
+        同一用户下规范化 URL 或内容哈希重复时抛出 sqlite3.IntegrityError，
+        调用方可用 find_duplicate_item 取回已有条目。
+        fetch_status='queued' 表示正文待后台抓取（见 core.stages 的 fetch 阶段）。
+        """
         word_count = len(content) if content else 0
         
         # 序列化 metadata
         metadata_json = json.dumps(source_metadata) if source_metadata else None
         
+        # 去重键
+        c_url = canonicalize_url(url) if url else None
+        c_hash = content_hash(content)
+        
+        # 启用压缩存储时正文写入 item_contents，items.content 留空
+        external = content_store.is_enabled() and bool(content)
+        
         self.cursor.execute("""
             INSERT INTO items 
-            (user_id, title, content, url, source_type, source_metadata, word_count, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')
-        """, (user_id, title, content, url, source_type, metadata_json, word_count))
+            (user_id, title, content, preview, url, source_type, source_metadata, word_count,
+             status, canonical_url, content_hash, fetch_status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending', ?, ?, ?)
+        """, (user_id, title, '' if external else content, make_preview(content), url,
+              source_type, metadata_json, word_count, c_url, c_hash, fetch_status))
+        item_id = self.cursor.lastrowid
         
-        self.conn.commit()
-        return self.cursor.lastrowid
+        if external:
+            self.content_store.put(item_id, content)
+        
+        self._commit()
+        self.read_cache.invalidate_user(user_id)
+        
+        bloom = get_seen_filter(self.db_path, self.conn)
+        if c_url:
+            bloom.add(url_key(user_id, c_url))
+        if c_hash:
+            bloom.add(hash_key(user_id, c_hash))
+        
+        return item_id
+    
+    def find_duplicate_item(
+        self,
+        user_id: int,
+        url: str = None,
+        content: str = None,
+        use_filter: bool = True
+    ) -> Optional[int]:
+        """
+        查找重复条目，返回已有条目 ID
+        
+        默认先查 Bloom Filter，确定从未见过时不访问数据库。
+        其他进程写入的条目不在本进程的过滤器里，处理唯一索引冲突时
+        应传 use_filter=False 直接查库。
+        """
+        c_url = canonicalize_url(url) if url else None
+        c_hash = content_hash(content) if content else None
+        bloom = get_seen_filter(self.db_path, self.conn) if use_filter else None
+        
+        if c_url and (bloom is None or url_key(user_id, c_url) in bloom):
+            self.cursor.execute("""
+                SELECT id FROM items WHERE user_id = ? AND canonical_url = ?
+            """, (user_id, c_url))
+            row = self.cursor.fetchone()
+            if row:
+                return row['id']
+        
+        if c_hash and (bloom is None or hash_key(user_id, c_hash) in bloom):
+            self.cursor.execute("""
+                SELECT id FROM items WHERE user_id = ? AND content_hash = ?
+            """, (user_id, c_hash))
+            row = self.cursor.fetchone()
+            if row:
+                return row['id']
+        
+        return None
     
     def get_item(self, item_id: int) -> Optional[Dict]:
-        """获取信息条目"""
-        self.cursor.execute("""
-            SELECT * FROM items WHERE id = ?
+        """
+        获取信息条目（压缩存储的正文透明解压）
+        
+        source_metadata 保持 JSON 文本（非法 JSON 转成 JSON 字符串，见 SOURCE_METADATA_JSON），
+        列表接口同理：多数调用方用不到它，需要时由调用方解析（API 层见
+        api.responses.raw_json），常用的键另有生成列 domain / original_url。
+        """
+        self.cursor.execute(f"""
+            SELECT i.*, {SOURCE_METADATA_JSON} AS _metadata,
+                   c.codec AS _codec, c.dict_id AS _dict_id, c.data AS _data
+            FROM items i
+            LEFT JOIN item_contents c ON c.item_id = i.id
+            WHERE i.id = ?
         """, (item_id,))
         
         row = self.cursor.fetchone()
@@ -92,82 +297,770 @@ class DatabaseManager:
             return None
         
         item = dict(row)
-        # 解析 JSON 字段
-        if item.get('source_metadata'):
-            try:
-                item['source_metadata'] = json.loads(item['source_metadata'])
-            except:
-                pass
+        item['source_metadata'] = item.pop('_metadata')
+        codec, dict_id, data = item.pop('_codec'), item.pop('_dict_id'), item.pop('_data')
+        if codec:
+            item['content'] = self.content_store.decompress(codec, dict_id, data)
         
         return item
     
+    def _filter_clauses(
+        self,
+        user_id: int,
+        filters: Dict,
+        exclude: str = None,
+        ordered: bool = False
+    ) -> Optional[Tuple[set, List[str], list]]:
+        """
+        列表筛选条件 → (涉及的表别名, WHERE 子句, 参数)
+        
+        筛选的关键词不存在时返回 None（结果必然为空）。命中条目多的关键词用
+        EXISTS 逐条探测（配合按时间顺序的索引扫描，取满一页即停），少的用 IN
+        子查询驱动（只需对命中的条目排序）。ordered 为列表查询，见 _ORDERED_SCAN_FILTERS。
+        """
+        aliases, clauses, params = set(), [], []
+        for name, value in filters.items():
+            if value is None or value == '' or name == exclude:
+                continue
+            if name == 'keyword':
+                row = self.conn.execute("""
+                    SELECT id, item_count FROM keywords WHERE user_id = ? AND key = ?
+                """, (user_id, value.strip().lower())).fetchone()
+                if not row:
+                    return None
+                if row['item_count'] > KEYWORD_PROBE_THRESHOLD:
+                    clauses.append(
+                        "EXISTS (SELECT 1 FROM item_keywords ik WHERE ik.keyword_id = ? AND ik.item_id = i.id)"
+                    )
+                else:
+                    clauses.append("i.id IN (SELECT item_id FROM item_keywords WHERE keyword_id = ?)")
+                aliases.add('i')
+                params.append(row['id'])
+                continue
+            if name not in ITEM_FILTERS:
+                raise ValueError(f"Unknown filter: {name}")
+            alias, clause = ITEM_FILTERS[name]
+            if ordered and name in _ORDERED_SCAN_FILTERS:
+                clause = '+' + clause
+            aliases.add(alias)
+            clauses.append(clause)
+            params.append(value)
+        return aliases, clauses, params
+    
+    @staticmethod
+    def _from_clause(user_id: int, aliases: set) -> Tuple[str, list]:
+        """筛选只涉及一张表时不 JOIN；a.user_id 条件让 ai_results 上以 user_id 开头的索引可用"""
+        if aliases == {'a'}:
+            return "FROM ai_results a WHERE a.user_id = ?", [user_id]
+        if 'a' in aliases:
+            return ("FROM items i JOIN ai_results a ON a.item_id = i.id "
+                    "WHERE i.user_id = ? AND a.user_id = ?"), [user_id, user_id]
+        return "FROM items i WHERE i.user_id = ?", [user_id]
+    
     def get_items(
         self,
         user_id: int,
         limit: int = 20,
         offset: int = 0,
-        status: str = None
+        status: str = None,
+        fields: List[str] = None,
+        **filters
     ) -> List[Dict]:
-        """获取信息列表"""
-        query = """
-            SELECT 
-                i.*,
-                a.summary,
-                a.category,
-                a.keywords,
-                a.importance_score
-            FROM items i
-            LEFT JOIN ai_results a ON a.item_id = i.id
-            WHERE i.user_id = ?
         """
+        获取信息列表，按保存时间从新到旧
+        
+        fields 为空时返回完整视图（LIST_FIELDS 的全部字段）；否则只查询指定字段，
+        不涉及 AI 字段时不 JOIN ai_results。
+        filters 见 ITEM_FILTERS，另有 keyword（关键词 / 主题，大小写不敏感）。
+        source_metadata 为未解析的 JSON 文本（见 get_item）。
+        列表查询不读取压缩存储，存在 item_contents 中的正文这里 content 为空串，
+        需要全文时用 get_item。
+        """
+        fields = fields or list(LIST_FIELDS)
+        unknown = [f for f in fields if f not in LIST_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        
+        columns = ', '.join(f"{LIST_FIELDS[f]} AS {f}" for f in fields)
+        needs_ai = any(LIST_FIELDS[f].startswith('a.') for f in fields)
+        
+        where = self._filter_clauses(user_id, dict(filters, status=status), ordered=True)
+        if where is None:
+            return []
+        aliases, clauses, filter_params = where
         
+        query = f"""
+            SELECT {columns}
+            FROM items i
+        """
         params = [user_id]
+        if 'a' in aliases:
+            query += " JOIN ai_results a ON a.item_id = i.id AND a.user_id = ?"
+            params.insert(0, user_id)
+        elif needs_ai:
+            query += " LEFT JOIN ai_results a ON a.item_id = i.id"
+        query += " WHERE i.user_id = ?"
         
-        if status:
-            query += " AND i.status = ?"
-            params.append(status)
+        for clause in clauses:
+            query += f" AND {clause}"
+        params.extend(filter_params)
         
         query += " ORDER BY i.created_at DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
         
         self.cursor.execute(query, params)
         
-        items = []
-        for row in self.cursor.fetchall():
-            item = dict(row)
-            # 解析 metadata
-            if item.get('source_metadata'):
-                try:
-                    item['source_metadata'] = json.loads(item['source_metadata'])
-                except:
-                    pass
-            items.append(item)
-        
-        return items
-    
-    def get_items_count(self, user_id: int, status: str = None) -> int:
-        """获取条目总数"""
-        query = "SELECT COUNT(*) as count FROM items WHERE user_id = ?"
-        params = [user_id]
+        return [dict(row) for row in self.cursor.fetchall()]
+    
+    def get_items_count(self, user_id: int, status: str = None, **filters) -> int:
+        """获取条目总数（筛选条件同 get_items；只按关键词筛选时直接读 keywords 的计数列）"""
+        filters = {k: v for k, v in dict(filters, status=status).items() if v not in (None, '')}
+        if list(filters) == ['keyword']:
+            self.cursor.execute("""
+                SELECT item_count FROM keywords WHERE user_id = ? AND key = ?
+            """, (user_id, filters['keyword'].strip().lower()))
+            row = self.cursor.fetchone()
+            return row['item_count'] if row else 0
         
-        if status:
-            query += " AND status = ?"
-            params.append(status)
+        where = self._filter_clauses(user_id, filters)
+        if where is None:
+            return 0
+        aliases, clauses, filter_params = where
         
-        self.cursor.execute(query, params)
+        from_clause, params = self._from_clause(user_id, aliases or {'i'})
+        query = f"SELECT COUNT(*) as count {from_clause}"
+        for clause in clauses:
+            query += f" AND {clause}"
+        
+        self.cursor.execute(query, params + filter_params)
         return self.cursor.fetchone()['count']
     
+    def get_facets(self, user_id: int, dimensions: List[str], limit: int = 20, **filters) -> Dict[str, List[Dict]]:
+        """
+        分面计数：每个维度（见 FACETS）在其余筛选条件下各取值的条目数
+        
+        某维度自身的筛选条件不参与该维度的计数，前端可以直接展示"切换到其他取值"的数量。
+        """
+        unknown = [d for d in dimensions if d not in FACETS]
+        if unknown:
+            raise ValueError(f"Unknown facets: {', '.join(unknown)}")
+        
+        facets = {}
+        for dimension in dimensions:
+            where = self._filter_clauses(user_id, filters, exclude=dimension)
+            if where is None:
+                facets[dimension] = []
+                continue
+            aliases, clauses, filter_params = where
+            alias, expr = FACETS[dimension]
+            
+            from_clause, params = self._from_clause(user_id, aliases | {alias})
+            query = f"SELECT {expr} AS value, COUNT(*) AS count {from_clause} AND {expr} IS NOT NULL"
+            for clause in clauses:
+                query += f" AND {clause}"
+            query += " GROUP BY value ORDER BY count DESC LIMIT ?"
+            
+            self.cursor.execute(query, params + filter_params + [limit])
+            facets[dimension] = [dict(row) for row in self.cursor.fetchall()]
+        return facets
+
+    def get_domains(self, user_id: int, limit: int = 50) -> List[Dict]:
+        """
+        按来源域名统计：条目数和最近保存时间，条目数降序
+
+        沿 idx_items_user_domain 按域名顺序分组（不排序），只统计有域名的条目。
+        """
+        self.cursor.execute("""
+            SELECT domain, COUNT(*) AS count, MAX(created_at) AS last_seen
+            FROM items
+            WHERE user_id = ? AND domain IS NOT NULL
+            GROUP BY domain
+            ORDER BY count DESC, domain
+            LIMIT ?
+        """, (user_id, limit))
+        return [dict(row) for row in self.cursor.fetchall()]
+
+    def get_top_items(
+        self,
+        user_id: int,
+        limit: int = 20,
+        after: Tuple[float, int] = None,
+        category: str = None,
+        source_type: str = None,
+        fields: List[str] = None
+    ) -> List[Dict]:
+        """
+        精选条目：按 rank_key（重要性叠加时间衰减）降序
+        
+        走 (user_id[, category | source_type], rank_key DESC, item_id DESC) 索引的范围扫描，
+        只有返回的一页需要回表。after 为上一页最后一条的 (rank_key, item_id)。
+        每条附带 _rank_key / _item_id，供调用方生成下一页游标。
+        """
+        fields = fields or COMPACT_FIELDS
+        unknown = [f for f in fields if f not in LIST_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        columns = ', '.join(f"{LIST_FIELDS[f]} AS {f}" for f in fields)
+        
+        query = f"""
+            SELECT {columns}, a.rank_key AS _rank_key, a.item_id AS _item_id
+            FROM ai_results a
+            JOIN items i ON i.id = a.item_id
+            WHERE a.user_id = ? AND a.rank_key IS NOT NULL
+        """
+        params: list = [user_id]
+        if category:
+            query += " AND a.category = ?"
+            params.append(category)
+        if source_type:
+            query += " AND a.source_type = ?"
+            params.append(source_type)
+        if after:
+            query += " AND (a.rank_key, a.item_id) < (?, ?)"
+            params.extend(after)
+        query += " ORDER BY a.rank_key DESC, a.item_id DESC LIMIT ?"
+        params.append(limit)
+        
+        return [dict(row) for row in self.conn.execute(query, params)]
+    
+    @group_commit
     def update_item_status(self, item_id: int, status: str):
         """更新条目状态"""
         self.cursor.execute("""
-            UPDATE items SET status = ? WHERE id = ?
+            UPDATE items SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ? RETURNING user_id
         """, (status, item_id))
+        row = self.cursor.fetchone()
+        self._commit()
+        if row:
+            self.read_cache.invalidate_item(item_id, row['user_id'])
+    
+    @group_commit
+    def increment_duplicate_count(self, item_id: int):
+        """条目被重复保存一次"""
+        self.cursor.execute(
+            "UPDATE items SET duplicate_count = COALESCE(duplicate_count, 0) + 1 WHERE id = ?",
+            (item_id,)
+        )
+        self._commit()
+    
+    def get_item_owners(self, item_ids: List[int]) -> Dict[int, int]:
+        """条目 ID -> 用户 ID"""
+        if not item_ids:
+            return {}
+        placeholders = ','.join('?' * len(item_ids))
+        self.cursor.execute(
+            f"SELECT id, user_id FROM items WHERE id IN ({placeholders})", item_ids
+        )
+        return {row['id']: row['user_id'] for row in self.cursor.fetchall()}
+    
+    # ============================================
+    # 后台抓取
+    # ============================================
+    
+    @group_commit
+    def update_fetch_status(self, item_id: int, fetch_status: str, error: str = None):
+        """更新抓取状态（进入 fetching 时累计尝试次数）"""
+        self.cursor.execute("""
+            UPDATE items
+            SET fetch_status = ?,
+                fetch_error = ?,
+                fetch_attempts = fetch_attempts + (CASE WHEN ? = 'fetching' THEN 1 ELSE 0 END)
+            WHERE id = ?
+        """, (fetch_status, error, fetch_status, item_id))
+        self._commit()
+    
+    @group_commit
+    def update_item_content(
+        self,
+        item_id: int,
+        content: str,
+        title: str = None,
+        source_metadata: Dict = None
+    ) -> bool:
+        """
+        抓取完成后写入正文
+        
+        重新计算预览、字数和内容哈希。正文与已有条目重复时不写哈希
+        （条目本身保留，链接不同），返回 False。
+        """
+        row = self.cursor.execute(
+            "SELECT user_id FROM items WHERE id = ?", (item_id,)
+        ).fetchone()
+        if not row:
+            return False
+        user_id = row['user_id']
+        
+        metadata_json = json.dumps(source_metadata) if source_metadata else None
+        c_hash = content_hash(content)
+        external = content_store.is_enabled() and bool(content)
+        
+        def _update(hash_value):
+            self.cursor.execute("""
+                UPDATE items
+                SET content = ?, title = COALESCE(?, title), preview = ?, word_count = ?,
+                    source_metadata = COALESCE(?, source_metadata), content_hash = ?,
+                    fetch_status = 'fetched', fetch_error = NULL
+                WHERE id = ?
+            """, ('' if external else content, title, make_preview(content), len(content),
+                  metadata_json, hash_value, item_id))
+        
+        unique = True
+        try:
+            _update(c_hash)
+        except sqlite3.IntegrityError:
+            unique = False
+            _update(None)
+        
+        if external:
+            self.content_store.put(item_id, content)
+        else:
+            # 正文写回了 items.content：之前压缩存储的旧正文不删，get_item 会继续读它
+            self.content_store.delete(item_id)
+        
+        self._commit()
+        self.read_cache.invalidate_item(item_id, user_id)
+        
+        if unique and c_hash:
+            get_seen_filter(self.db_path, self.conn).add(hash_key(user_id, c_hash))
+        
+        return unique
+    
+    # ============================================
+    # 流水线检查点
+    # ============================================
+    
+    def get_stage_checkpoints(self, item_id: int) -> Dict[str, Dict]:
+        """条目各阶段的检查点（output 已解析）"""
+        self.cursor.execute("""
+            SELECT stage, status, attempts, output, error
+            FROM pipeline_checkpoints WHERE item_id = ?
+        """, (item_id,))
+        
+        checkpoints = {}
+        for row in self.cursor.fetchall():
+            cp = dict(row)
+            cp['output'] = json.loads(cp['output']) if cp['output'] else None
+            checkpoints[cp.pop('stage')] = cp
+        return checkpoints
+    
+    @group_commit
+    def queue_stages(self, item_id: int, stages: List[str]):
+        """登记待执行阶段（保留已有的尝试次数）"""
+        self.cursor.executemany("""
+            INSERT INTO pipeline_checkpoints (item_id, stage, status)
+            VALUES (?, ?, 'queued')
+            ON CONFLICT(item_id, stage) DO UPDATE SET
+                status = 'queued', error = NULL, updated_at = CURRENT_TIMESTAMP
+        """, [(item_id, stage) for stage in stages])
+        self._commit()
+    
+    @group_commit
+    def start_stage(self, item_id: int, stage: str):
+        """阶段开始执行，尝试次数 +1"""
+        self.cursor.execute("""
+            INSERT INTO pipeline_checkpoints (item_id, stage, status, attempts)
+            VALUES (?, ?, 'running', 1)
+            ON CONFLICT(item_id, stage) DO UPDATE SET
+                status = 'running', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+        """, (item_id, stage))
+        self._commit()
+    
+    @group_commit
+    def save_stage_checkpoint(
+        self,
+        item_id: int,
+        stage: str,
+        status: str,
+        output: Dict = None,
+        error: str = None
+    ):
+        """保存阶段结果"""
+        output_json = json.dumps(output, ensure_ascii=False) if output is not None else None
+        self.cursor.execute("""
+            INSERT INTO pipeline_checkpoints (item_id, stage, status, output, error)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(item_id, stage) DO UPDATE SET
+                status = excluded.status,
+                output = COALESCE(excluded.output, output),
+                error = excluded.error,
+                updated_at = CURRENT_TIMESTAMP
+        """, (item_id, stage, status, output_json, error))
+        self._commit()
+    
+    def get_unfinished_stages(self) -> List[Dict]:
+        """
+        未完成的条目及其阶段（进程重启后恢复）
+        
+        包括排队/执行中的检查点，以及还没有检查点的待抓取条目。
+        """
+        self.cursor.execute("""
+            SELECT c.item_id, i.user_id, GROUP_CONCAT(c.stage) AS stages
+            FROM pipeline_checkpoints c
+            JOIN items i ON i.id = c.item_id
+            WHERE c.status IN ('queued', 'running')
+            GROUP BY c.item_id
+            UNION ALL
+            SELECT i.id, i.user_id, 'fetch'
+            FROM items i
+            WHERE i.fetch_status IN ('queued', 'fetching')
+              AND NOT EXISTS (
+                  SELECT 1 FROM pipeline_checkpoints c
+                  WHERE c.item_id = i.id AND c.status IN ('queued', 'running')
+              )
+        """)
+        return [
+            {'item_id': row['item_id'], 'user_id': row['user_id'], 'stages': row['stages'].split(',')}
+            for row in self.cursor.fetchall()
+        ]
+    
+    # ============================================
+    # 分块摘要缓存
+    # ============================================
+    
+    def get_chunk_summaries(self, chunk_hashes: List[str], model: str) -> Dict[str, str]:
+        """按分块哈希取缓存的摘要"""
+        if not chunk_hashes:
+            return {}
+        placeholders = ','.join('?' * len(chunk_hashes))
+        self.cursor.execute(f"""
+            SELECT chunk_hash, summary FROM chunk_summaries
+            WHERE model = ? AND chunk_hash IN ({placeholders})
+        """, [model, *chunk_hashes])
+        return {row['chunk_hash']: row['summary'] for row in self.cursor.fetchall()}
+    
+    @group_commit
+    def save_chunk_summary(self, chunk_hash: str, model: str, summary: str, input_tokens: int = None):
+        """缓存分块摘要"""
+        self.cursor.execute("""
+            INSERT OR REPLACE INTO chunk_summaries (chunk_hash, model, summary, input_tokens)
+            VALUES (?, ?, ?, ?)
+        """, (chunk_hash, model, summary, input_tokens))
+        self._commit()
+    
+    # ============================================
+    # 关键词语料
+    # ============================================
+    
+    @group_commit
+    def add_keyword_documents(self, docs: List[Tuple[int, Iterable[str]]]) -> int:
+        """把条目的候选词计入文档频率（已计入的条目跳过），返回新计入的条目数"""
+        added = 0
+        counts: Dict[str, int] = {}
+        for item_id, terms in docs:
+            self.cursor.execute(
+                "INSERT OR IGNORE INTO keyword_docs (item_id) VALUES (?)", (item_id,)
+            )
+            if self.cursor.rowcount:
+                added += 1
+                for term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+        
+        self.cursor.executemany("""
+            INSERT INTO keyword_df (term, df) VALUES (?, ?)
+            ON CONFLICT(term) DO UPDATE SET df = df + excluded.df
+        """, list(counts.items()))
+        self._commit()
+        return added
+    
+    def get_keyword_df(self, terms: Iterable[str]) -> Dict[str, int]:
+        """查询候选词的文档频率"""
+        terms = list(terms)
+        df = {}
+        # 分批查询，避免超出 SQLite 参数上限
+        for i in range(0, len(terms), 500):
+            batch = terms[i:i + 500]
+            placeholders = ','.join('?' * len(batch))
+            self.cursor.execute(
+                f"SELECT term, df FROM keyword_df WHERE term IN ({placeholders})", batch
+            )
+            df.update((row['term'], row['df']) for row in self.cursor.fetchall())
+        return df
+    
+    def get_keyword_doc_count(self) -> int:
+        """已计入语料的条目数"""
+        self.cursor.execute("SELECT COUNT(*) FROM keyword_docs")
+        return self.cursor.fetchone()[0]
+    
+    def save_keywords(self, rows: List[Tuple[int, int, str, str]]):
+        """批量写入 (item_id, user_id, keywords, topics)，已有 AI 结果时只更新这两列"""
+        self.cursor.executemany(f"""
+            INSERT INTO ai_results
+            (item_id, user_id, keywords, topics, model_used, source_type, rank_key)
+            VALUES (?, ?, ?, ?, 'local', {_RANK_VALUES})
+            ON CONFLICT(item_id) DO UPDATE SET
+                keywords = excluded.keywords,
+                topics = excluded.topics
+        """, [(item_id, user_id, keywords, topics, item_id, 0.0, item_id)
+              for item_id, user_id, keywords, topics in rows])
+        for item_id, user_id, keywords, topics in rows:
+            self._index_keywords(item_id, user_id, keywords, topics)
         self.conn.commit()
     
+    # ============================================
+    # 关键词索引
+    # ============================================
+    
+    def _index_keywords(self, item_id: int, user_id: int, keywords: Optional[str], topics: Optional[str]):
+        """用条目当前的关键词 / 主题重建 item_keywords（不提交，随调用方的事务）"""
+        topic_terms = keyword_terms(topics or '')
+        terms = {**topic_terms, **keyword_terms(keywords or '')}
+        
+        self.cursor.execute("DELETE FROM item_keywords WHERE item_id = ?", (item_id,))
+        if not terms:
+            return
+        self.cursor.executemany("""
+            INSERT OR IGNORE INTO keywords (user_id, key, name) VALUES (?, ?, ?)
+        """, [(user_id, key, name) for key, name in terms.items()])
+        self.cursor.executemany("""
+            INSERT INTO item_keywords (keyword_id, item_id, is_topic)
+            SELECT id, ?, ? FROM keywords WHERE user_id = ? AND key = ?
+        """, [(item_id, int(key in topic_terms), user_id, key) for key in terms])
+    
+    def get_top_keywords(self, user_id: int, limit: int = 50, kind: str = 'keyword') -> List[Dict]:
+        """
+        关键词（kind='keyword'，含主题）或主题（kind='topic'）按条目数降序
+        
+        计数是 keywords 上触发器维护的计数列，沿 (user_id, count DESC) 索引取前 N 个，
+        不随条目数增长。
+        """
+        column = {'keyword': 'item_count', 'topic': 'topic_count'}.get(kind)
+        if column is None:
+            raise ValueError(f"Unknown keyword kind: {kind}")
+        
+        self.cursor.execute(f"""
+            SELECT name, {column} AS count FROM keywords
+            WHERE user_id = ? AND {column} > 0
+            ORDER BY {column} DESC
+            LIMIT ?
+        """, (user_id, limit))
+        return [dict(row) for row in self.cursor.fetchall()]
+    
+    # ============================================
+    # 分类标签
+    # ============================================
+    
+    def get_category_labels(self, categories: List[str], item_ids: List[int] = None) -> List[Dict]:
+        """
+        取分类训练样本（item_id, title, content, category）
+        
+        只要落在 categories 内、且不是本地分类器自己给出的标签。
+        """
+        query = f"""
+            SELECT i.id AS item_id, i.title, i.content, a.category,
+                   c.codec AS _codec, c.dict_id AS _dict_id, c.data AS _data
+            FROM ai_results a
+            JOIN items i ON i.id = a.item_id
+            LEFT JOIN item_contents c ON c.item_id = i.id
+            WHERE a.category IN ({','.join('?' * len(categories))})
+              AND (a.category_source IS NULL OR a.category_source != 'local')
+        """
+        params = list(categories)
+        if item_ids is not None:
+            query += f" AND i.id IN ({','.join('?' * len(item_ids))})"
+            params += list(item_ids)
+        query += " ORDER BY i.id"
+        
+        rows = []
+        for row in self.conn.execute(query, params):
+            row = dict(row)
+            codec, dict_id, data = row.pop('_codec'), row.pop('_dict_id'), row.pop('_data')
+            if codec:
+                row['content'] = self.content_store.decompress(codec, dict_id, data)
+            rows.append(row)
+        return rows
+    
+    # ============================================
+    # 重要性评分
+    # ============================================
+    
+    def get_scoring_rows(self, user_id: int, item_ids: List[int] = None) -> List[Dict]:
+        """评分特征：保存天数、字数、来源、重复次数、关键词 / 主题、是否打过标签"""
+        query = """
+            SELECT i.id AS item_id,
+                   julianday('now') - julianday(i.created_at) AS age_days,
+                   i.word_count, i.source_type, i.duplicate_count,
+                   a.keywords, a.topics, a.id IS NOT NULL AS has_result,
+                   EXISTS (SELECT 1 FROM item_tags t WHERE t.item_id = i.id) AS starred
+            FROM items i
+            LEFT JOIN ai_results a ON a.item_id = i.id
+            WHERE i.user_id = ?
+        """
+        params: list = [user_id]
+        if item_ids is not None:
+            query += f" AND i.id IN ({','.join('?' * len(item_ids))})"
+            params += list(item_ids)
+        query += " ORDER BY i.id"
+        return [dict(row) for row in self.conn.execute(query, params)]
+    
+    def update_importance_scores(self, scores: List[Tuple[int, float]]):
+        """批量写入 (item_id, importance_score) 并刷新排序键，一个事务"""
+        self.cursor.executemany("""
+            UPDATE ai_results SET
+                importance_score = ?,
+                rank_key = rank_key(?, (SELECT created_at FROM items WHERE id = ai_results.item_id))
+            WHERE item_id = ?
+        """, [(score, score, item_id) for item_id, score in scores])
+        self.conn.commit()
+    
+    def refresh_rank_keys(self, user_id: int = None) -> int:
+        """按当前 RANK_HALF_LIFE_DAYS 重算排序键（半衰期变更后），返回更新行数"""
+        query = """
+            UPDATE ai_results SET
+                rank_key = rank_key(importance_score, (SELECT created_at FROM items WHERE id = ai_results.item_id))
+        """
+        params = []
+        if user_id is not None:
+            query += " WHERE user_id = ?"
+            params.append(user_id)
+        self.cursor.execute(query, params)
+        self.conn.commit()
+        return self.cursor.rowcount
+    
+    # ============================================
+    # 标签
+    # ============================================
+    
+    @group_commit
+    def create_tag(
+        self,
+        user_id: int,
+        name: str,
+        category: str = None,
+        color: str = None,
+        description: str = None
+    ) -> int:
+        """创建标签，同名标签已存在时抛出 sqlite3.IntegrityError"""
+        try:
+            self.cursor.execute("""
+                INSERT INTO tags (user_id, name, category, color, description)
+                VALUES (?, ?, ?, COALESCE(?, '#3b82f6'), ?)
+            """, (user_id, name, category, color, description))
+        except sqlite3.IntegrityError:
+            # 失败的 INSERT 仍开着隐式事务，不回滚会一直占着写锁（写线程里由 SAVEPOINT 回滚）
+            if not self._batched:
+                self.conn.rollback()
+            raise
+        self._commit()
+        return self.cursor.lastrowid
+    
+    def get_tag(self, user_id: int, tag_id: int) -> Optional[Dict]:
+        """获取标签（不属于该用户时返回 None）"""
+        self.cursor.execute("""
+            SELECT id, name, category, color, description, item_count, created_at
+            FROM tags WHERE id = ? AND user_id = ?
+        """, (tag_id, user_id))
+        row = self.cursor.fetchone()
+        return dict(row) if row else None
+    
+    def get_tags(self, user_id: int) -> List[Dict]:
+        """用户的全部标签及条目数（计数列由触发器维护，不做 COUNT）"""
+        self.cursor.execute("""
+            SELECT id, name, category, color, description, item_count, created_at
+            FROM tags WHERE user_id = ?
+            ORDER BY item_count DESC, name
+        """, (user_id,))
+        return [dict(row) for row in self.cursor.fetchall()]
+    
+    @group_commit
+    def delete_tag(self, user_id: int, tag_id: int) -> bool:
+        """删除标签（关联随外键级联删除）"""
+        self.cursor.execute("DELETE FROM tags WHERE id = ? AND user_id = ?", (tag_id, user_id))
+        self._commit()
+        return self.cursor.rowcount > 0
+    
+    @group_commit
+    def tag_items(self, user_id: int, tag_id: int, item_ids: Iterable[int]) -> int:
+        """
+        批量打标签，返回新增关联数
+        
+        条目 ID 作为一个 JSON 数组参数传入，一条 INSERT ... SELECT 完成（不受参数个数
+        上限限制）；只关联该用户自己的条目，已有关联忽略。
+        """
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO item_tags (item_id, tag_id)
+            SELECT i.id, ? FROM items i
+            WHERE i.id IN (SELECT value FROM json_each(?)) AND i.user_id = ?
+        """, (tag_id, json.dumps(list(item_ids)), user_id))
+        self._commit()
+        return self.cursor.rowcount
+    
+    @group_commit
+    def untag_items(self, tag_id: int, item_ids: Iterable[int]) -> int:
+        """批量移除标签，返回删除的关联数"""
+        self.cursor.execute("""
+            DELETE FROM item_tags
+            WHERE tag_id = ? AND item_id IN (SELECT value FROM json_each(?))
+        """, (tag_id, json.dumps(list(item_ids))))
+        self._commit()
+        return self.cursor.rowcount
+    
+    def get_items_by_tag(
+        self,
+        tag_id: int,
+        limit: int = 20,
+        before: int = None,
+        fields: List[str] = None
+    ) -> List[Dict]:
+        """
+        标签下的条目，按条目 ID 从新到旧
+        
+        沿 idx_item_tags_tag_item (tag_id, item_id DESC) 顺序扫描，只回表取一页；
+        before 为上一页最后一条的 ID。
+        """
+        fields = fields or COMPACT_FIELDS
+        unknown = [f for f in fields if f not in LIST_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        columns = ', '.join(f"{LIST_FIELDS[f]} AS {f}" for f in fields)
+        
+        query = f"""
+            SELECT {columns}, t.item_id AS _item_id
+            FROM item_tags t
+            JOIN items i ON i.id = t.item_id
+            LEFT JOIN ai_results a ON a.item_id = t.item_id
+            WHERE t.tag_id = ?
+        """
+        params: list = [tag_id]
+        if before:
+            query += " AND t.item_id < ?"
+            params.append(before)
+        query += " ORDER BY t.item_id DESC LIMIT ?"
+        params.append(limit)
+        
+        return [dict(row) for row in self.conn.execute(query, params)]
+    
+    # ============================================
+    # 幂等键
+    # ============================================
+    
+    def get_idempotent_item(self, user_id: int, key: str) -> Optional[int]:
+        """根据幂等键获取之前创建的条目 ID"""
+        self.cursor.execute("""
+            SELECT item_id FROM idempotency_keys
+            WHERE user_id = ? AND key = ?
+            AND created_at >= datetime('now', '-1 day')
+        """, (user_id, key))
+        
+        row = self.cursor.fetchone()
+        return row['item_id'] if row else None
+    
+    @group_commit
+    def save_idempotency_key(self, user_id: int, key: str, item_id: int):
+        """记录幂等键（保留 24 小时）"""
+        self.cursor.execute("""
+            DELETE FROM idempotency_keys WHERE created_at < datetime('now', '-1 day')
+        """)
+        self.cursor.execute("""
+            INSERT OR REPLACE INTO idempotency_keys (user_id, key, item_id)
+            VALUES (?, ?, ?)
+        """, (user_id, key, item_id))
+        self._commit()
+    
     # ============================================
     # AI 处理结果
     # ============================================
     
+    @group_commit
     def create_ai_result(
         self,
         item_id: int,
@@ -176,22 +1069,68 @@ class DatabaseManager:
         category: str = None,
         keywords: str = None,
         importance_score: float = 0.0,
+        topics: str = None,
+        category_source: str = None,
         **kwargs
     ) -> int:
-        """保存 AI 处理结果"""
-        self.cursor.execute("""
+        """
+        保存 AI 处理结果
+        
+        条目已有结果（例如流式摘要先写入了 summary）时覆盖更新；
+        未给出 topics 时保留原有主题。
+        """
+        self.cursor.execute(f"""
             INSERT INTO ai_results
-            (item_id, user_id, summary, category, keywords, importance_score,
-             model_used, processing_time_ms)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            (item_id, user_id, summary, category, category_source, keywords, topics,
+             importance_score, model_used, processing_time_ms, source_type, rank_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {_RANK_VALUES})
+            ON CONFLICT(item_id) DO UPDATE SET
+                summary = excluded.summary,
+                category = excluded.category,
+                category_source = excluded.category_source,
+                keywords = excluded.keywords,
+                topics = COALESCE(excluded.topics, ai_results.topics),
+                importance_score = excluded.importance_score,
+                model_used = excluded.model_used,
+                processing_time_ms = excluded.processing_time_ms,
+                source_type = excluded.source_type,
+                rank_key = excluded.rank_key,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING id, keywords, topics
         """, (
-            item_id, user_id, summary, category, keywords, importance_score,
-            kwargs.get('model_used', 'gpt-4o-mini'),
-            kwargs.get('processing_time_ms', 0)
+            item_id, user_id, summary, category, category_source, keywords, topics,
+            importance_score, kwargs.get('model_used', 'gpt-4o-mini'),
+            kwargs.get('processing_time_ms', 0),
+            item_id, importance_score, item_id
         ))
         
-        self.conn.commit()
-        return self.cursor.lastrowid
+        row = self.cursor.fetchone()
+        self._index_keywords(item_id, user_id, row['keywords'], row['topics'])
+        self._commit()
+        self.read_cache.invalidate_item(item_id, user_id)
+        return row['id']
+    
+    @group_commit
+    def save_summary(
+        self,
+        item_id: int,
+        user_id: int,
+        summary: str,
+        model_used: str = None,
+        processing_time_ms: int = 0
+    ):
+        """写入摘要（已有 AI 结果时只更新摘要）"""
+        self.cursor.execute(f"""
+            INSERT INTO ai_results
+            (item_id, user_id, summary, model_used, processing_time_ms, source_type, rank_key)
+            VALUES (?, ?, ?, ?, ?, {_RANK_VALUES})
+            ON CONFLICT(item_id) DO UPDATE SET summary = excluded.summary
+        """, (
+            item_id, user_id, summary, model_used or Config.OPENAI_MODEL, processing_time_ms,
+            item_id, 0.0, item_id
+        ))
+        self._commit()
+        self.read_cache.invalidate_item(item_id, user_id)
     
     def get_ai_result_by_item(self, item_id: int) -> Optional[Dict]:
         """获取条目的 AI 结果"""
@@ -202,6 +1141,26 @@ class DatabaseManager:
         row = self.cursor.fetchone()
         return dict(row) if row else None
     
+    # ============================================
+    # 变更计数（HTTP ETag）
+    # ============================================
+    
+    def get_change_version(self, user_id: int = None) -> int:
+        """
+        获取数据变更计数
+        
+        user_id 为空时返回所有用户计数之和（不知道条目归属时使用）。
+        """
+        if user_id is None:
+            self.cursor.execute("SELECT COALESCE(SUM(version), 0) AS version FROM change_counters")
+        else:
+            self.cursor.execute("""
+                SELECT version FROM change_counters WHERE user_id = ?
+            """, (user_id,))
+        
+        row = self.cursor.fetchone()
+        return row['version'] if row else 0
+    
     # ============================================
     # 统计查询
     # ============================================
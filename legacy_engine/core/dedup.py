@@ -0,0 +1,150 @@
+"""
+条目去重
+
+- URL 规范化 + 内容哈希，配合 items 上的唯一索引做精确去重
+- 进程内 Bloom Filter 挡在数据库前面，"从未见过" 的判断无需查询
+"""
+
+import hashlib
+import math
+import re
+import threading
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+# 追踪参数（另有 utm_* 前缀），不影响页面内容。只收专用于追踪的键：from / source / ref
+# 之类在很多站点是正文参数（搜索、代码浏览页的 ?source=），去掉会把不同页面并成一条
+TRACKING_PARAMS = {
+    'spm', 'share_token', 'fbclid', 'gclid', 'igshid', 'mc_cid', 'mc_eid',
+}
+
+# 只在特定站点上是追踪参数的键（域名及其子域名）
+HOST_TRACKING_PARAMS = {
+    'mp.weixin.qq.com': {
+        'scene', 'srcid', 'sharer_sharetime', 'sharer_shareid', 'clicktime', 'enterid',
+        'chksm', 'sessionid', 'from', 'isappinstalled',
+    },
+    'twitter.com': {'ref_src'},
+    'x.com': {'ref_src'},
+}
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _tracking_params(host: str) -> set:
+    """该域名下要去掉的追踪参数"""
+    params = TRACKING_PARAMS
+    for domain, extra in HOST_TRACKING_PARAMS.items():
+        if host == domain or host.endswith('.' + domain):
+            params = params | extra
+    return params
+
+
+def canonicalize_url(url: str) -> Optional[str]:
+    """规范化 URL：小写 scheme/host、去默认端口、去 fragment、去追踪参数、参数排序"""
+    if not url:
+        return None
+
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return None
+
+    if not parsed.scheme or not parsed.netloc:
+        return None
+
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or \
+            (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+
+    path = parsed.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    tracking = _tracking_params(parsed.hostname or '')
+    query = [
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in tracking
+    ]
+    query.sort()
+
+    return urlunparse((scheme, netloc, path, '', urlencode(query), ''))
+
+
+def content_hash(content: str) -> Optional[str]:
+    """内容哈希（折叠空白后 SHA-256）"""
+    if not content:
+        return None
+
+    normalized = _WHITESPACE.sub(' ', content).strip()
+    if not normalized:
+        return None
+
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class BloomFilter:
+    """简单的 Bloom Filter（双重哈希）"""
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+def url_key(user_id: int, canonical_url: str) -> str:
+    return f"{user_id}:u:{canonical_url}"
+
+
+def hash_key(user_id: int, c_hash: str) -> str:
+    return f"{user_id}:h:{c_hash}"
+
+
+# 每个数据库文件一个过滤器（进程内共享）
+_filters: Dict[str, BloomFilter] = {}
+_filters_lock = threading.Lock()
+
+
+def get_seen_filter(db_path: str, conn) -> BloomFilter:
+    """获取数据库对应的 Bloom Filter，首次使用时从 items 预热"""
+    bloom = _filters.get(db_path)
+    if bloom is not None:
+        return bloom
+
+    with _filters_lock:
+        bloom = _filters.get(db_path)
+        if bloom is None:
+            total = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            bloom = BloomFilter(capacity=max(100_000, total * 2))
+            rows = conn.execute("""
+                SELECT user_id, canonical_url, content_hash FROM items
+                WHERE canonical_url IS NOT NULL OR content_hash IS NOT NULL
+            """)
+            for user_id, c_url, c_hash in rows:
+                if c_url:
+                    bloom.add(url_key(user_id, c_url))
+                if c_hash:
+                    bloom.add(hash_key(user_id, c_hash))
+            _filters[db_path] = bloom
+
+    return bloom
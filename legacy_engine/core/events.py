@@ -0,0 +1,188 @@
+"""
+事件发布/订阅
+
+AI 处理在线程里完成，前端通过 SSE（GET /api/events）订阅状态变化，
+不再轮询。两种实现：
+- MemoryEventBus：进程内，单 worker 足够
+- SQLiteEventBus：事件写入 events 表，每个进程一个轮询线程分发，
+  适用于多个 uvicorn worker（发布和订阅不在同一进程）
+
+通过 Config.EVENT_BUS 选择（memory / sqlite）。
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from core.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """单个订阅者（一个 SSE 连接）"""
+
+    __slots__ = ('user_id', 'item_id', 'queue', 'loop', 'dropped')
+
+    def __init__(self, user_id: int, item_id: Optional[int], loop: asyncio.AbstractEventLoop,
+                 max_queue: int = 100):
+        self.user_id = user_id
+        self.item_id = item_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def matches(self, event: Dict) -> bool:
+        if event['user_id'] != self.user_id:
+            return False
+        return self.item_id is None or event['data'].get('item_id') == self.item_id
+
+    def _put(self, event: Dict):
+        # 在事件循环线程中执行；慢消费者丢弃事件而不是无限占用内存
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def deliver(self, event: Dict):
+        """线程安全投递"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # 事件循环已关闭（连接已断开）
+            pass
+
+    async def get(self, timeout: float) -> Optional[Dict]:
+        """等待下一个事件，超时返回 None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class MemoryEventBus:
+    """进程内事件总线"""
+
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, user_id: int, item_id: int = None) -> Subscription:
+        sub = Subscription(user_id, item_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, user_id: int, event: str, data: Dict):
+        """发布事件（可在任意线程调用）"""
+        self._dispatch({'id': next(self._ids), 'user_id': user_id, 'event': event, 'data': data})
+
+    def _dispatch(self, event: Dict):
+        with self._lock:
+            targets = [s for s in self._subscribers if s.matches(event)]
+        for sub in targets:
+            sub.deliver(event)
+
+
+class SQLiteEventBus(MemoryEventBus):
+    """
+    跨进程事件总线
+
+    publish 写入 events 表；有订阅者时后台线程按 EVENT_POLL_INTERVAL_MS
+    拉取新事件并分发给本进程的订阅者。
+    """
+
+    RETENTION_SECONDS = 3600
+
+    def __init__(self, db_path: str = None, poll_interval_ms: int = None):
+        super().__init__()
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.poll_interval = (poll_interval_ms or Config.EVENT_POLL_INTERVAL_MS) / 1000
+        self._poller: Optional[threading.Thread] = None
+        self._last_id = None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, check_same_thread=False, timeout=5)
+
+    def publish(self, user_id: int, event: str, data: Dict):
+        conn = self._connect()
+        try:
+            now = time.time()
+            conn.execute(
+                "INSERT INTO events (user_id, event, data, created_at) VALUES (?, ?, ?, ?)",
+                (user_id, event, json.dumps(data, ensure_ascii=False), now)
+            )
+            conn.execute("DELETE FROM events WHERE created_at < ?", (now - self.RETENTION_SECONDS,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def subscribe(self, user_id: int, item_id: int = None) -> Subscription:
+        sub = super().subscribe(user_id, item_id)
+        self._ensure_poller()
+        return sub
+
+    def _ensure_poller(self):
+        with self._lock:
+            if self._poller is not None:
+                return
+            self._poller = threading.Thread(target=self._poll_loop, daemon=True)
+            self._poller.start()
+
+    def _poll_loop(self):
+        conn = self._connect()
+
+        try:
+            if self._last_id is None:
+                # 只分发订阅之后产生的事件
+                self._last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+            while True:
+                # 没有订阅者时退出；与 _ensure_poller 同一把锁，避免漏启动
+                with self._lock:
+                    if not self._subscribers:
+                        self._poller = None
+                        self._last_id = None
+                        return
+
+                rows = conn.execute(
+                    "SELECT id, user_id, event, data FROM events WHERE id > ? ORDER BY id",
+                    (self._last_id,)
+                ).fetchall()
+                for event_id, user_id, event, data in rows:
+                    self._last_id = event_id
+                    self._dispatch({
+                        'id': event_id, 'user_id': user_id, 'event': event, 'data': json.loads(data)
+                    })
+                time.sleep(self.poll_interval)
+        except Exception as e:
+            logger.error(f"Event poller stopped: {e}")
+            with self._lock:
+                self._poller = None
+        finally:
+            conn.close()
+
+
+def create_event_bus() -> MemoryEventBus:
+    """按配置创建事件总线"""
+    if Config.EVENT_BUS == 'sqlite':
+        return SQLiteEventBus()
+    return MemoryEventBus()
+
+
+# 全局实例
+event_bus = create_event_bus()
@@ -14,8 +14,8 @@ class WebFetcher:
     """网页内容抓取器"""
     
     def __init__(self):
-        self.jina_api_url = "https://r.jina.ai/"
-        self.timeout = 10
+        self.jina_api_url = Config.JINA_API_URL.rstrip('/') + '/'
+        self.timeout = Config.FETCH_TIMEOUT
     
     def is_url(self, text: str) -> bool:
         """判断文本是否为 URL"""
@@ -51,23 +51,30 @@ class WebFetcher:
             
             if response.status_code == 200:
                 data = response.json()
+                # Jina JSON 响应把结果放在 data 字段中
+                if isinstance(data.get('data'), dict):
+                    data = data['data']
                 return {
                     'title': data.get('title', ''),
                     'content': data.get('content', ''),
-                    'error': None
+                    'error': None,
+                    'retryable': False
                 }
             else:
                 return {
                     'title': '',
                     'content': '',
-                    'error': f"HTTP {response.status_code}"
+                    'error': f"HTTP {response.status_code}",
+                    # 限流和服务端错误可以重试，其余 4xx 重试也没用
+                    'retryable': response.status_code == 429 or response.status_code >= 500
                 }
         
         except Exception as e:
             return {
                 'title': '',
                 'content': '',
-                'error': str(e)
+                'error': str(e),
+                'retryable': True
             }
     
     def fetch(self, url: str) -> Dict[str, str]:
@@ -76,7 +83,8 @@ class WebFetcher:
             return {
                 'title': '',
                 'content': '',
-                'error': 'Web scraping disabled'
+                'error': 'Web scraping disabled',
+                'retryable': False
             }
         
         return self.fetch_with_jina(url)
@@ -0,0 +1,237 @@
+"""
+重要性评分
+
+各特征归一化到 0-1 后按权重（IMPORTANCE_WEIGHTS）加权平均：
+- recency：保存时间，按 IMPORTANCE_HALF_LIFE_DAYS 半衰
+- length：字数（对数，LENGTH_SATURATION 字封顶）
+- source：来源类型权重
+- interest：关键词 / 主题与用户全部条目关键词频次（历史兴趣）的余弦相似度
+- duplicates：重复保存次数（再次保存说明用户在意）
+- starred：与用户标记过的条目（打过标签的条目）关键词的余弦相似度
+
+interest / starred 按该用户的最大值归一化。批量重算（rescore）用 NumPy（可选依赖）
+对用户全部条目一次算完，未安装时逐条计算，结果一致；处理流水线中的单条评分
+复用按用户缓存的兴趣画像（PROFILE_TTL 秒）。精选信息流另按 rank_key（重要性叠加
+时间衰减）排序。
+"""
+
+import math
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖
+    np = None
+
+from core.config import Config
+from core.keywords import keyword_set
+
+DEFAULT_WEIGHTS = {
+    'recency': 0.25,
+    'length': 0.1,
+    'source': 0.1,
+    'interest': 0.25,
+    'duplicates': 0.1,
+    'starred': 0.2,
+}
+SOURCE_WEIGHTS = {'manual': 0.8, 'wechat': 0.7, 'web': 0.6, 'telegram': 0.5, 'gpt': 0.4}
+LENGTH_SATURATION = 3000
+PROFILE_TTL = 600
+# 重要性为 0 的条目也要有有限的排序键
+RANK_MIN_SCORE = 1e-3
+_EPOCH = datetime(1970, 1, 1)
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """解析 IMPORTANCE_WEIGHTS（如 "recency=0.3,starred=0"），未给出的特征用默认权重"""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in (spec or '').split(','):
+        if '=' in part:
+            name, value = part.split('=', 1)
+            if name.strip() in weights:
+                weights[name.strip()] = float(value)
+    return weights
+
+
+def terms(row: Dict) -> List[str]:
+    """条目的关键词 + 主题（规范化去重）"""
+    return sorted(keyword_set(row.get('keywords') or '') | keyword_set(row.get('topics') or ''))
+
+
+def age_days(created_at: str) -> float:
+    """SQLite CURRENT_TIMESTAMP（UTC）距今天数"""
+    try:
+        created = datetime.strptime(created_at[:19], '%Y-%m-%d %H:%M:%S')
+    except (TypeError, ValueError):
+        return 0.0
+    return max(0.0, (datetime.utcnow() - created).total_seconds() / 86400)
+
+
+def rank_key(importance: Optional[float], created_at: Optional[str]) -> float:
+    """
+    排序键（ai_results.rank_key）：log2(重要性) + 保存时刻(天) / RANK_HALF_LIFE_DAYS
+
+    按它排序等价于按 重要性 × 2^(-距今天数 / 半衰期) 排序，且不随当前时间变化，
+    只在重要性或半衰期变更时需要刷新。注册为 SQLite 函数 rank_key(score, created_at)。
+    """
+    try:
+        created = datetime.strptime((created_at or '')[:19], '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        created = datetime.utcnow()
+    days = (created - _EPOCH).total_seconds() / 86400
+    return math.log2(max(importance or 0.0, RANK_MIN_SCORE)) + days / Config.RANK_HALF_LIFE_DAYS
+
+
+# ============================================
+# 逐条计算
+# ============================================
+
+class Profile:
+    """用户兴趣画像：全部条目 / 标记条目的关键词频次，以及归一化用的最大值"""
+
+    def __init__(self, rows: Sequence[Dict]):
+        self.counts: Counter = Counter()
+        self.starred: Counter = Counter()
+        self.included: Dict[int, bool] = {}
+        item_terms = []
+        for row in rows:
+            t = terms(row)
+            item_terms.append(t)
+            self.counts.update(t)
+            if row.get('starred'):
+                self.starred.update(t)
+            self.included[row['item_id']] = bool(row.get('starred'))
+
+        self.norm = math.sqrt(sum(v * v for v in self.counts.values())) or 1.0
+        self.starred_norm = math.sqrt(sum(v * v for v in self.starred.values())) or 1.0
+        self.max_interest = self.max_starred = 0.0
+        for row, t in zip(rows, item_terms):
+            interest, starred = self.raw_similarity(row['item_id'], t)
+            self.max_interest = max(self.max_interest, interest)
+            self.max_starred = max(self.max_starred, starred)
+        self.built_at = time.monotonic()
+
+    def raw_similarity(self, item_id: int, item_terms: List[str]) -> Tuple[float, float]:
+        """与兴趣画像 / 标记条目的余弦相似度（画像中已包含该条目时扣除其自身贡献）"""
+        if not item_terms:
+            return 0.0, 0.0
+        own = 1 if item_id in self.included else 0
+        own_starred = 1 if self.included.get(item_id) else 0
+        size = math.sqrt(len(item_terms))
+        interest = sum(self.counts[t] - own for t in item_terms) / (size * self.norm)
+        starred = sum(self.starred[t] - own_starred for t in item_terms) / (size * self.starred_norm)
+        return max(interest, 0.0), max(starred, 0.0)
+
+
+def _features(row: Dict, profile: Profile) -> Dict[str, float]:
+    interest, starred = profile.raw_similarity(row['item_id'], terms(row))
+    return {
+        'recency': math.exp(-math.log(2) * (row.get('age_days') or 0) / Config.IMPORTANCE_HALF_LIFE_DAYS),
+        'length': min(1.0, math.log1p(row.get('word_count') or 0) / math.log1p(LENGTH_SATURATION)),
+        'source': SOURCE_WEIGHTS.get(row.get('source_type'), 0.5),
+        'interest': min(1.0, interest / profile.max_interest) if profile.max_interest else 0.0,
+        'duplicates': 1 - math.exp(-(row.get('duplicate_count') or 0)),
+        'starred': min(1.0, starred / profile.max_starred) if profile.max_starred else 0.0,
+    }
+
+
+def score_row(row: Dict, profile: Profile, weights: Dict[str, float] = None) -> float:
+    """单条评分"""
+    weights = weights or parse_weights(Config.IMPORTANCE_WEIGHTS)
+    features = _features(row, profile)
+    total = sum(weights.values()) or 1.0
+    score = sum(weights[name] * value for name, value in features.items()) / total
+    return round(min(1.0, max(0.0, score)), 4)
+
+
+# ============================================
+# 批量计算
+# ============================================
+
+def _score_numpy(rows: Sequence[Dict], weights: Dict[str, float]) -> List[float]:
+    """关键词展开成 (条目, 词) 稀疏坐标，相似度用 bincount 一次算完"""
+    n = len(rows)
+    vocab: Dict[str, int] = {}
+    item_idx, term_idx = [], []
+    for i, row in enumerate(rows):
+        for t in terms(row):
+            item_idx.append(i)
+            term_idx.append(vocab.setdefault(t, len(vocab)))
+    item_idx = np.asarray(item_idx, dtype=np.int64)
+    term_idx = np.asarray(term_idx, dtype=np.int64)
+
+    starred = np.array([bool(row.get('starred')) for row in rows], dtype=np.float64)
+    sizes = np.sqrt(np.maximum(np.bincount(item_idx, minlength=n), 1))
+
+    def similarity(counts, own):
+        norm = np.linalg.norm(counts) or 1.0
+        raw = np.bincount(item_idx, weights=counts[term_idx] - own, minlength=n) / (sizes * norm)
+        raw = np.maximum(raw, 0.0)
+        top = raw.max() if n else 0.0
+        return raw / top if top > 0 else np.zeros(n)
+
+    counts = np.bincount(term_idx, minlength=len(vocab)).astype(np.float64)
+    starred_counts = np.bincount(term_idx, weights=starred[item_idx], minlength=len(vocab))
+
+    age = np.array([row.get('age_days') or 0 for row in rows], dtype=np.float64)
+    words = np.array([row.get('word_count') or 0 for row in rows], dtype=np.float64)
+    duplicates = np.array([row.get('duplicate_count') or 0 for row in rows], dtype=np.float64)
+
+    features = {
+        'recency': np.exp(-np.log(2) * age / Config.IMPORTANCE_HALF_LIFE_DAYS),
+        'length': np.minimum(1.0, np.log1p(words) / np.log1p(LENGTH_SATURATION)),
+        'source': np.array([SOURCE_WEIGHTS.get(row.get('source_type'), 0.5) for row in rows]),
+        'interest': similarity(counts, 1.0),
+        'duplicates': 1 - np.exp(-duplicates),
+        'starred': similarity(starred_counts, starred[item_idx]),
+    }
+    total = sum(weights.values()) or 1.0
+    scores = sum(weights[name] * values for name, values in features.items()) / total
+    return np.round(np.clip(scores, 0.0, 1.0), 4).tolist()
+
+
+def score_rows(rows: Sequence[Dict], weights: Dict[str, float] = None) -> List[float]:
+    """同一用户全部条目的批量评分（rows 来自 DatabaseManager.get_scoring_rows）"""
+    if not rows:
+        return []
+    weights = weights or parse_weights(Config.IMPORTANCE_WEIGHTS)
+    if np is not None:
+        return _score_numpy(rows, weights)
+    profile = Profile(rows)
+    return [score_row(row, profile, weights) for row in rows]
+
+
+# ============================================
+# 单条评分（处理流水线）
+# ============================================
+
+_profiles: Dict[Tuple[str, int], Profile] = {}
+_profiles_lock = threading.Lock()
+
+
+def get_profile(db, user_id: int) -> Profile:
+    """按 (数据库, 用户) 缓存的兴趣画像"""
+    key = (db.db_path, user_id)
+    profile = _profiles.get(key)
+    if profile is None or time.monotonic() - profile.built_at > PROFILE_TTL:
+        profile = Profile(db.get_scoring_rows(user_id))
+        with _profiles_lock:
+            _profiles[key] = profile
+    return profile
+
+
+def score_item(db, item: Dict, keywords: Optional[str], topics: Optional[str]) -> float:
+    """为刚处理完的条目评分（关键词 / 主题用本次结果）"""
+    rows = db.get_scoring_rows(item['user_id'], [item['id']])
+    row = rows[0] if rows else {
+        'item_id': item['id'],
+        'age_days': age_days(item.get('created_at')),
+        'word_count': item.get('word_count'),
+        'source_type': item.get('source_type'),
+    }
+    row = dict(row, keywords=keywords, topics=topics)
+    return score_row(row, get_profile(db, item['user_id']))
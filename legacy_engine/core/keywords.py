@@ -0,0 +1,284 @@
+"""
+本地关键词提取
+
+不调用模型：分词 → 候选词打分（TF-IDF + TextRank 各占一半）→ 去掉被更高分词包含的子串。
+- 有 jieba（可选依赖）时用其分词；未安装时按虚词切开中文短语，再取 2-5 字 n-gram，
+  只在更长片段里出现的子串（"语言模" 之于 "语言模型"）不作为候选
+- 文档频率存 keyword_df 表，随条目增量维护（keyword_docs 保证每个条目只计一次）；
+  只统计每篇的候选词池，表大小与条目数线性相关
+- 按批处理：一批文档共用一次文档频率查询和一个写事务
+- confidence：TF-IDF 与 TextRank 前 k 名的重合度，两种方法结论不一致时偏低，
+  hybrid 模式下低于阈值的条目再交给模型
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import jieba
+except ImportError:  # 可选依赖
+    jieba = None
+
+# 未安装 jieba 时中文短语切出的 n-gram 长度
+NGRAM_SIZES = (2, 3, 4, 5)
+# 参与打分 / 计入文档频率的正文上限
+MAX_CHARS = 20000
+# TextRank 只看前若干个词
+TEXTRANK_TOKENS = 4000
+TEXTRANK_WINDOW = 5
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 20
+# 每篇按 TF、TextRank 各取前 POOL_SIZE 个作为候选词池
+POOL_SIZE = 50
+# 语料少于该篇数时 IDF 没有意义，主题直接取关键词
+MIN_CORPUS_DOCS = 5
+
+_TOKENS = re.compile(r'[\u4e00-\u9fff]+|[A-Za-z][A-Za-z0-9]*(?:[+#.\-][A-Za-z0-9]+)*[+#]*')
+_CJK = re.compile(r'[\u4e00-\u9fff]')
+# 切开中文短语的虚词（单字）
+_STOP_CHARS = re.compile(r'[的了是在和与及或等也都就而被把对从为以之其这那着过吗呢吧啊将并还又很让给但]')
+
+STOPWORDS = {
+    # 中文
+    '我们', '你们', '他们', '她们', '它们', '这个', '那个', '一个', '没有', '可以', '因为', '所以',
+    '如果', '但是', '而且', '就是', '还是', '什么', '怎么', '这样', '那样', '已经', '自己', '通过',
+    '进行', '以及', '非常', '需要', '可能', '以后', '之后', '时候', '其中', '一些', '这些', '那些',
+    '不是', '不会', '只是', '也是', '一种', '作为', '对于', '关于', '这种', '其实', '然后', '一样',
+    '现在', '今天', '大家', '一下', '很多', '更多', '真正', '不同', '方面', '问题', '东西', '事情',
+    # 英文
+    'the', 'and', 'for', 'with', 'that', 'this', 'from', 'are', 'was', 'were', 'you', 'your',
+    'have', 'has', 'had', 'not', 'but', 'can', 'will', 'what', 'when', 'how', 'all', 'any',
+    'our', 'their', 'its', 'into', 'about', 'more', 'than', 'then', 'also', 'just', 'one',
+    'which', 'who', 'they', 'them', 'there', 'been', 'being', 'out', 'use', 'using', 'via',
+    'why', 'is', 'it', 'of', 'to', 'in', 'on', 'at', 'by', 'as', 'or', 'an', 'be',
+    'http', 'https', 'www', 'com', 'html',
+}
+_STOP_BIGRAMS = {w for w in STOPWORDS if len(w) == 2 and _CJK.match(w)}
+
+
+# ============================================
+# 分词
+# ============================================
+
+def _keep_latin(word: str) -> bool:
+    return (len(word) >= 3 or word.isupper()) and word.lower() not in STOPWORDS
+
+
+def _keep_cjk(word: str) -> bool:
+    if len(word) < 2 or word in STOPWORDS:
+        return False
+    # n-gram 中含虚词组合（如 "我们的产品" 切出的 "们的"）的不要
+    return not any(word[i:i + 2] in _STOP_BIGRAMS for i in range(len(word) - 1))
+
+
+def segment(text: str) -> List[str]:
+    """分词，返回按原文顺序排列的候选词（保留重复）"""
+    text = (text or '')[:MAX_CHARS]
+    words: List[str] = []
+
+    if jieba is not None:
+        for word in jieba.cut(text):
+            word = word.strip()
+            if _CJK.match(word):
+                if _keep_cjk(word):
+                    words.append(word)
+            elif _TOKENS.fullmatch(word) and _keep_latin(word):
+                words.append(word)
+        return words
+
+    for match in _TOKENS.finditer(text):
+        token = match.group()
+        if not _CJK.match(token):
+            if _keep_latin(token):
+                words.append(token)
+            continue
+        for phrase in _STOP_CHARS.split(token):
+            if len(phrase) <= NGRAM_SIZES[-1]:
+                if _keep_cjk(phrase):
+                    words.append(phrase)
+                continue
+            for n in NGRAM_SIZES:
+                for i in range(len(phrase) - n + 1):
+                    gram = phrase[i:i + n]
+                    if _keep_cjk(gram):
+                        words.append(gram)
+    return words
+
+
+# ============================================
+# 打分
+# ============================================
+
+def textrank(words: Sequence[str]) -> Dict[str, float]:
+    """TextRank：窗口内共现建无向图，迭代 PageRank（收敛即停）"""
+    words = words[:TEXTRANK_TOKENS]
+    index: Dict[str, int] = {}
+    ids = [index.setdefault(word, len(index)) for word in words]
+    edges: List[Dict[int, float]] = [defaultdict(float) for _ in index]
+    for i, a in enumerate(ids):
+        for b in ids[i + 1:i + TEXTRANK_WINDOW]:
+            if a != b:
+                edges[a][b] += 1.0
+                edges[b][a] += 1.0
+
+    # 预先把边权除以邻居的出度，迭代时只剩乘加
+    out_weight = [sum(e.values()) or 1.0 for e in edges]
+    inbound = [[(b, w / out_weight[b]) for b, w in e.items()] for e in edges]
+    scores = [1.0] * len(index)
+    for _ in range(TEXTRANK_ITERATIONS):
+        updated = [
+            (1 - TEXTRANK_DAMPING) + TEXTRANK_DAMPING * sum(scores[b] * w for b, w in links)
+            for links in inbound
+        ]
+        delta = max((abs(x - y) for x, y in zip(updated, scores)), default=0)
+        scores = updated
+        if delta < 1e-4:
+            break
+    return {word: scores[i] for word, i in index.items()}
+
+
+def _normalize(scores: Dict[str, float]) -> Dict[str, float]:
+    top = max(scores.values(), default=0)
+    return {k: v / top for k, v in scores.items()} if top > 0 else scores
+
+
+def _top(scores: Dict[str, float], k: int) -> List[str]:
+    return sorted(scores, key=scores.get, reverse=True)[:k]
+
+
+class _Document:
+    """一篇文档的分词结果和候选词池"""
+
+    def __init__(self, text: str):
+        words = segment(text)
+        # 英文词不区分大小写计数，展示用首次出现的写法
+        self.display: Dict[str, str] = {}
+        keys = []
+        for word in words:
+            key = word.lower()
+            self.display.setdefault(key, word)
+            keys.append(key)
+
+        self.length = len(keys)
+        self.tf = Counter(keys)
+        self.rank = textrank(keys)
+        candidates = _maximal(self.tf) if jieba is None else self.tf
+        self.pool = set(_top(candidates, POOL_SIZE)) | \
+            set(_top({k: v for k, v in self.rank.items() if k in candidates}, POOL_SIZE))
+
+
+def _maximal(tf: Counter) -> Dict[str, int]:
+    """去掉出现次数与某个更长 n-gram 相同的中文子串（它只作为那个片段的一部分出现）"""
+    covered = set()
+    for gram, count in tf.items():
+        if len(gram) < 3 or not _CJK.match(gram):
+            continue
+        for sub in (gram[:-1], gram[1:]):
+            if tf.get(sub) == count:
+                covered.add(sub)
+    return {k: v for k, v in tf.items() if k not in covered}
+
+
+def _overlaps(a: str, b: str) -> bool:
+    if a in b or b in a:
+        return True
+    return len(a) >= 3 and any(a[i:i + 3] in b for i in range(len(a) - 2))
+
+
+def _score(doc: _Document, df: Dict[str, int], total_docs: int, top_k: int, topics_k: int) -> Dict:
+    """合并 TF-IDF 与 TextRank，选出关键词和主题"""
+    if not doc.pool:
+        return {'keywords': [], 'topics': [], 'confidence': 0.0}
+
+    idf = {
+        term: math.log((total_docs + 1) / (df.get(term, 0) + 1)) + 1
+        for term in doc.pool
+    }
+    tfidf = {term: doc.tf[term] / doc.length * idf[term] for term in doc.pool}
+    # TextRank 同样乘 IDF，压低各篇都有的套话
+    rank = {term: doc.rank.get(term, 0.0) * idf[term] for term in doc.pool}
+    tfidf_n, rank_n = _normalize(tfidf), _normalize(rank)
+    combined = {term: 0.5 * tfidf_n[term] + 0.5 * rank_n[term] for term in doc.pool}
+
+    # 与更高分词重叠的候选跳过：互相包含，或共享三字片段（n-gram 会切出大量错位片段）
+    keywords: List[str] = []
+    for term in sorted(combined, key=lambda t: (-combined[t], t)):
+        if any(_overlaps(term, kept) for kept in keywords):
+            continue
+        keywords.append(term)
+        if len(keywords) >= top_k:
+            break
+
+    # 两种方法的前 k 名重合越多越可信；候选太少时按比例打折
+    k = min(top_k, len(doc.pool))
+    agreement = len(set(_top(tfidf, k)) & set(_top(rank, k))) / k
+    confidence = agreement * min(1.0, len(doc.pool) / top_k)
+
+    # 主题：在其他条目中也出现过的高分词（跨条目的共同话题）
+    if total_docs >= MIN_CORPUS_DOCS:
+        shared = [t for t in keywords if df.get(t, 0) >= 2]
+        topics = (shared or keywords)[:topics_k]
+    else:
+        topics = keywords[:topics_k]
+
+    return {
+        'keywords': [doc.display[t] for t in keywords],
+        'topics': [doc.display[t] for t in topics],
+        'confidence': round(confidence, 3),
+    }
+
+
+# ============================================
+# 入口
+# ============================================
+
+def extract_batch(
+    db,
+    docs: Sequence[Tuple[Optional[int], str]],
+    top_k: int = 8,
+    topics_k: int = 3,
+    update_corpus: bool = True
+) -> List[Dict]:
+    """
+    批量提取关键词
+
+    docs 为 (item_id, 正文) 列表；item_id 不为空且 update_corpus 时先把文档计入语料，
+    已计入过的条目不会重复计数。返回与 docs 对应的
+    {'keywords': [...], 'topics': [...], 'confidence': float} 列表。
+    """
+    parsed = [_Document(text) for _, text in docs]
+
+    if update_corpus:
+        db.add_keyword_documents([
+            (item_id, doc.pool) for (item_id, _), doc in zip(docs, parsed) if item_id is not None
+        ])
+
+    terms = set().union(*(doc.pool for doc in parsed)) if parsed else set()
+    df = db.get_keyword_df(terms)
+    total_docs = db.get_keyword_doc_count()
+
+    return [_score(doc, df, total_docs, top_k, topics_k) for doc in parsed]
+
+
+def extract(db, text: str, item_id: int = None, **kwargs) -> Dict:
+    """单篇提取（见 extract_batch）"""
+    return extract_batch(db, [(item_id, text)], **kwargs)[0]
+
+
+def keyword_set(keywords: Iterable[str]) -> set:
+    """规范化关键词集合（比较用）"""
+    return set(keyword_terms(keywords))
+
+
+def keyword_terms(keywords: Iterable[str]) -> Dict[str, str]:
+    """规范化关键词 → 首次出现时的写法（keywords 表的 key / name）"""
+    if isinstance(keywords, str):
+        keywords = re.split(r'[,，、;；]', keywords)
+    terms: Dict[str, str] = {}
+    for k in keywords or ():
+        k = (k or '').strip()
+        if k:
+            terms.setdefault(k.lower(), k)
+    return terms
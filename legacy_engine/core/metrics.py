@@ -0,0 +1,75 @@
+"""
+进程内指标
+
+计数器 + 耗时分布（保留最近 N 个样本计算分位数），通过 GET /api/metrics 暴露。
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+
+class Timer:
+    """耗时分布（毫秒）"""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value_ms: float):
+        self.count += 1
+        self.total += value_ms
+        self.samples.append(value_ms)
+
+    def snapshot(self) -> Dict:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 2)
+
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 2) if self.count else 0.0,
+            'p50_ms': pct(0.5),
+            'p95_ms': pct(0.95),
+            'p99_ms': pct(0.99),
+        }
+
+
+class Metrics:
+    """指标注册表"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._timers: Dict[str, Timer] = {}
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value_ms: float):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = Timer()
+            timer.observe(value_ms)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'timers': {name: t.snapshot() for name, t in self._timers.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+# 全局实例
+metrics = Metrics()
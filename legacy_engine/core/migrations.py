@@ -0,0 +1,555 @@
+"""
+数据库 Schema 迁移
+
+schema.sql 只负责全新数据库；已有数据库在 DatabaseManager 连接时
+按 PRAGMA user_version 依次执行这里的迁移。每个迁移都必须是幂等的，
+这样由最新 schema.sql 初始化的数据库也能安全地再跑一遍。
+"""
+
+import sqlite3
+import threading
+from typing import Callable, List, Tuple
+
+# 已完成迁移的数据库路径（进程内缓存，避免每个请求都检查）
+_migrated_paths = set()
+_lock = threading.Lock()
+
+
+def column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    """检查列是否存在"""
+    rows = conn.execute(f"PRAGMA table_xinfo({table})").fetchall()
+    return any(row[1] == column for row in rows)
+
+
+def add_column(conn: sqlite3.Connection, table: str, column: str, ddl: str):
+    """列不存在时添加"""
+    if not column_exists(conn, table, column):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+# ============================================
+# 迁移定义
+# ============================================
+
+def _m001_dedup(conn: sqlite3.Connection):
+    """
+    条目去重：规范化 URL / 内容哈希 + 幂等键
+
+    加列、回填和唯一索引在一个显式事务里（sqlite3 不会为 DDL 自动开事务，
+    executescript 还会先提交），由 apply_migrations 连同 user_version 一起提交；
+    中途失败整体回滚，不会留下回填了一半、没有唯一索引的库。
+    """
+    from core.dedup import canonicalize_url, content_hash
+
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    add_column(conn, 'items', 'canonical_url', 'TEXT')
+    add_column(conn, 'items', 'content_hash', 'TEXT')
+
+    # 回填历史数据；重复条目只保留最早的一条的哈希，避免唯一索引创建失败
+    seen = set()
+    rows = conn.execute("""
+        SELECT id, user_id, url, content FROM items
+        WHERE content_hash IS NULL
+        ORDER BY id
+    """).fetchall()
+    for item_id, user_id, url, content in rows:
+        c_url = canonicalize_url(url) if url else None
+        c_hash = content_hash(content)
+        if (user_id, 'u', c_url) in seen:
+            c_url = None
+        if (user_id, 'h', c_hash) in seen:
+            c_hash = None
+        seen.add((user_id, 'u', c_url))
+        seen.add((user_id, 'h', c_hash))
+        conn.execute(
+            "UPDATE items SET canonical_url = ?, content_hash = ? WHERE id = ?",
+            (c_url, c_hash, item_id)
+        )
+
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_items_user_canonical_url
+            ON items(user_id, canonical_url) WHERE canonical_url IS NOT NULL
+    """)
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_items_user_content_hash
+            ON items(user_id, content_hash) WHERE content_hash IS NOT NULL
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            user_id INTEGER NOT NULL,
+            key TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, key),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created
+            ON idempotency_keys(created_at)
+    """)
+
+
+def _m002_preview(conn: sqlite3.Connection):
+    """列表预览列：避免列表查询读取完整 content"""
+    from core.database import make_preview
+
+    add_column(conn, 'items', 'preview', 'TEXT')
+
+    rows = conn.execute("SELECT id, content FROM items WHERE preview IS NULL").fetchall()
+    conn.executemany(
+        "UPDATE items SET preview = ? WHERE id = ?",
+        ((make_preview(content), item_id) for item_id, content in rows)
+    )
+
+
+def _m003_content_store(conn: sqlite3.Connection):
+    """正文压缩存储表"""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS content_dicts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            codec TEXT NOT NULL,
+            data BLOB NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS item_contents (
+            item_id INTEGER PRIMARY KEY,
+            codec TEXT NOT NULL,
+            dict_id INTEGER,
+            raw_size INTEGER,
+            data BLOB NOT NULL,
+            FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE CASCADE,
+            FOREIGN KEY (dict_id) REFERENCES content_dicts(id)
+        );
+    """)
+
+
+def _m004_change_counters(conn: sqlite3.Connection):
+    """每个用户的数据变更计数，用于 HTTP ETag"""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS change_counters (
+            user_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TRIGGER IF NOT EXISTS bump_version_items_insert
+        AFTER INSERT ON items
+        BEGIN
+            INSERT INTO change_counters (user_id, version) VALUES (NEW.user_id, 1)
+            ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bump_version_items_update
+        AFTER UPDATE ON items
+        BEGIN
+            INSERT INTO change_counters (user_id, version) VALUES (NEW.user_id, 1)
+            ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bump_version_items_delete
+        AFTER DELETE ON items
+        BEGIN
+            INSERT INTO change_counters (user_id, version) VALUES (OLD.user_id, 1)
+            ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bump_version_ai_results_insert
+        AFTER INSERT ON ai_results
+        BEGIN
+            INSERT INTO change_counters (user_id, version) VALUES (NEW.user_id, 1)
+            ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bump_version_ai_results_update
+        AFTER UPDATE ON ai_results
+        BEGIN
+            INSERT INTO change_counters (user_id, version) VALUES (NEW.user_id, 1)
+            ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bump_version_ai_results_delete
+        AFTER DELETE ON ai_results
+        BEGIN
+            INSERT INTO change_counters (user_id, version) VALUES (OLD.user_id, 1)
+            ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+        END;
+    """)
+
+
+def _m005_events(conn: sqlite3.Connection):
+    """跨进程事件表（EVENT_BUS=sqlite）"""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            event TEXT NOT NULL,
+            data TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_events_created ON events(created_at);
+    """)
+
+
+def _m006_fetch_state(conn: sqlite3.Connection):
+    """后台抓取状态：URL 先入库，抓取在队列中完成"""
+    # 抓取线程和 API 并发写入；WAL 下读不阻塞写（设置持久保存在数据库文件中，
+    # 必须在事务外执行）
+    conn.execute("PRAGMA journal_mode = WAL").fetchone()
+
+    add_column(conn, 'items', 'fetch_status',
+               "TEXT CHECK(fetch_status IN ('queued', 'fetching', 'fetched', 'failed'))")
+    add_column(conn, 'items', 'fetch_attempts', 'INTEGER DEFAULT 0')
+    add_column(conn, 'items', 'fetch_error', 'TEXT')
+
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_items_fetch_pending
+            ON items(fetch_status) WHERE fetch_status IN ('queued', 'fetching')
+    """)
+
+
+def _m007_pipeline_checkpoints(conn: sqlite3.Connection):
+    """流水线阶段检查点"""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS pipeline_checkpoints (
+            item_id INTEGER NOT NULL,
+            stage TEXT NOT NULL,
+            status TEXT NOT NULL CHECK(status IN ('queued', 'running', 'done', 'failed', 'skipped')),
+            attempts INTEGER NOT NULL DEFAULT 0,
+            output TEXT,
+            error TEXT,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (item_id, stage),
+            FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE CASCADE
+        );
+        CREATE INDEX IF NOT EXISTS idx_pipeline_checkpoints_unfinished
+            ON pipeline_checkpoints(status) WHERE status IN ('queued', 'running');
+    """)
+
+
+def _m008_chunk_summaries(conn: sqlite3.Connection):
+    """长文分块摘要缓存"""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS chunk_summaries (
+            chunk_hash TEXT NOT NULL,
+            model TEXT NOT NULL,
+            summary TEXT NOT NULL,
+            input_tokens INTEGER,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (chunk_hash, model)
+        );
+    """)
+
+
+def _m009_keyword_corpus(conn: sqlite3.Connection):
+    """本地关键词提取的文档频率语料"""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS keyword_df (
+            term TEXT PRIMARY KEY,
+            df INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS keyword_docs (
+            item_id INTEGER PRIMARY KEY,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE CASCADE
+        );
+    """)
+
+
+def _m010_category_source(conn: sqlite3.Connection):
+    """分类来源：本地分类器训练时排除自己给出的标签"""
+    add_column(conn, 'ai_results', 'category_source',
+               "TEXT CHECK(category_source IN ('llm', 'local'))")
+
+
+def _m011_duplicate_count(conn: sqlite3.Connection):
+    """重复保存次数（重要性评分特征）"""
+    add_column(conn, 'items', 'duplicate_count', 'INTEGER DEFAULT 0')
+
+
+def _m012_rank_key(conn: sqlite3.Connection):
+    """精选信息流：ai_results 上的排序键 + 冗余来源类型，按 (user_id, rank_key) 索引"""
+    from core.importance import rank_key
+    conn.create_function('rank_key', 2, rank_key, deterministic=True)
+
+    add_column(conn, 'ai_results', 'source_type', 'TEXT')
+    add_column(conn, 'ai_results', 'rank_key', 'REAL')
+    conn.execute("""
+        UPDATE ai_results SET
+            source_type = (SELECT source_type FROM items WHERE id = ai_results.item_id),
+            rank_key = rank_key(importance_score, (SELECT created_at FROM items WHERE id = ai_results.item_id))
+    """)
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_ai_results_rank
+            ON ai_results(user_id, rank_key DESC, item_id DESC);
+        CREATE INDEX IF NOT EXISTS idx_ai_results_category_rank
+            ON ai_results(user_id, category, rank_key DESC, item_id DESC);
+        CREATE INDEX IF NOT EXISTS idx_ai_results_source_rank
+            ON ai_results(user_id, source_type, rank_key DESC, item_id DESC);
+    """)
+
+
+def _m013_keyword_index(conn: sqlite3.Connection):
+    """关键词 / 主题规范化为 keywords + item_keywords，替代逗号分隔列上的 LIKE 全表扫描"""
+    from core.keywords import keyword_terms
+
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS keywords (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            key TEXT NOT NULL,
+            name TEXT NOT NULL,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            topic_count INTEGER NOT NULL DEFAULT 0,
+            UNIQUE(user_id, key),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        );
+        CREATE INDEX IF NOT EXISTS idx_keywords_user_count ON keywords(user_id, item_count DESC);
+        CREATE INDEX IF NOT EXISTS idx_keywords_user_topic_count ON keywords(user_id, topic_count DESC);
+
+        CREATE TABLE IF NOT EXISTS item_keywords (
+            keyword_id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            is_topic INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (keyword_id, item_id),
+            FOREIGN KEY (keyword_id) REFERENCES keywords(id) ON DELETE CASCADE,
+            FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_item_keywords_item ON item_keywords(item_id);
+    """)
+
+    # 回填：先写关联再一次性算计数，最后建计数触发器（比逐行触发快得多）
+    if not conn.execute("SELECT 1 FROM item_keywords LIMIT 1").fetchone():
+        rows = conn.execute("""
+            SELECT item_id, user_id, keywords, topics FROM ai_results
+            WHERE keywords IS NOT NULL OR topics IS NOT NULL
+        """).fetchall()
+        for item_id, user_id, keywords, topics in rows:
+            topic_keys = keyword_terms(topics or '')
+            terms = {**topic_keys, **keyword_terms(keywords or '')}
+            for key, name in terms.items():
+                conn.execute(
+                    "INSERT OR IGNORE INTO keywords (user_id, key, name) VALUES (?, ?, ?)",
+                    (user_id, key, name)
+                )
+                conn.execute("""
+                    INSERT OR IGNORE INTO item_keywords (keyword_id, item_id, is_topic)
+                    SELECT id, ?, ? FROM keywords WHERE user_id = ? AND key = ?
+                """, (item_id, int(key in topic_keys), user_id, key))
+        conn.execute("""
+            UPDATE keywords SET
+                item_count = (SELECT COUNT(*) FROM item_keywords WHERE keyword_id = keywords.id),
+                topic_count = (SELECT COUNT(*) FROM item_keywords WHERE keyword_id = keywords.id AND is_topic = 1)
+        """)
+    conn.executescript("""
+        CREATE TRIGGER IF NOT EXISTS count_item_keywords_insert
+        AFTER INSERT ON item_keywords
+        BEGIN
+            UPDATE keywords SET
+                item_count = item_count + 1,
+                topic_count = topic_count + NEW.is_topic
+            WHERE id = NEW.keyword_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS count_item_keywords_delete
+        AFTER DELETE ON item_keywords
+        BEGIN
+            UPDATE keywords SET
+                item_count = item_count - 1,
+                topic_count = topic_count - OLD.is_topic
+            WHERE id = OLD.keyword_id;
+        END;
+    """)
+
+
+
+def _m014_tag_counts(conn: sqlite3.Connection):
+    """标签计数列（触发器维护）+ 按标签列条目的覆盖索引"""
+    add_column(conn, 'tags', 'item_count', 'INTEGER NOT NULL DEFAULT 0')
+    conn.execute("""
+        UPDATE tags SET item_count = (SELECT COUNT(*) FROM item_tags WHERE tag_id = tags.id)
+    """)
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_item_tags_tag_item ON item_tags(tag_id, item_id DESC);
+        DROP INDEX IF EXISTS idx_item_tags_tag;
+
+        CREATE TRIGGER IF NOT EXISTS count_item_tags_insert
+        AFTER INSERT ON item_tags
+        BEGIN
+            UPDATE tags SET item_count = item_count + 1 WHERE id = NEW.tag_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS count_item_tags_delete
+        AFTER DELETE ON item_tags
+        BEGIN
+            UPDATE tags SET item_count = item_count - 1 WHERE id = OLD.tag_id;
+        END;
+    """)
+
+
+
+def _m015_list_indexes(conn: sqlite3.Connection):
+    """
+    列表筛选的复合索引（均以 user_id 开头，按 created_at 倒序）
+    
+    替换单列索引：SQLite 一次只能用一个索引，单列的 user_id / status / source_type
+    无法组合，筛选加排序都要回表扫描该用户的全部条目再排序。
+    - 无筛选 / 时间范围：(user_id, created_at, status)，也覆盖统计查询
+    - status / source_type：各自 (user_id, 维度, created_at)，分面计数走覆盖索引
+    - 域名：由 m016 建在生成列 domain 上。这里不建 json_extract 表达式索引——已有库里
+      只要一行 source_metadata 不是合法 JSON，建索引就报 malformed JSON，迁移卡住
+    - 分类 / 重要性：ai_results 上 (user_id, ...)，分类复用 m012 的排序索引
+    """
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_items_user_created
+            ON items(user_id, created_at DESC, status);
+        CREATE INDEX IF NOT EXISTS idx_items_user_status
+            ON items(user_id, status, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_items_user_source
+            ON items(user_id, source_type, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_ai_results_user_importance
+            ON ai_results(user_id, importance_score DESC);
+
+        DROP INDEX IF EXISTS idx_items_user;
+        DROP INDEX IF EXISTS idx_items_status;
+        DROP INDEX IF EXISTS idx_items_source_type;
+        DROP INDEX IF EXISTS idx_ai_results_user;
+        DROP INDEX IF EXISTS idx_ai_results_category;
+        DROP INDEX IF EXISTS idx_ai_results_importance;
+    """)
+    conn.execute("ANALYZE")
+
+
+def _m016_metadata_columns(conn: sqlite3.Connection):
+    """
+    source_metadata 上的生成列：domain（建索引）、original_url
+    
+    VIRTUAL 列不占表空间（ALTER TABLE 只能加 VIRTUAL），读取时由 JSON1 现算；
+    索引里存的是写入时算好的值。查询直接写列名即可命中索引，不必逐字匹配
+    json_extract 表达式。非法 JSON 视为空，避免写入报错。
+    替换早期版本 m015 建的 json_extract 表达式索引。
+    """
+    for column, path in (('domain', '$.domain'), ('original_url', '$.original_url')):
+        add_column(conn, 'items', column, (
+            f"TEXT GENERATED ALWAYS AS (CASE WHEN json_valid(source_metadata) "
+            f"THEN json_extract(source_metadata, '{path}') END) VIRTUAL"
+        ))
+
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'idx_items_user_domain'"
+    ).fetchone()
+    if row and 'json_extract' in row[0]:
+        conn.execute("DROP INDEX idx_items_user_domain")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_items_user_domain
+            ON items(user_id, domain, created_at DESC)
+    """)
+    conn.execute("ANALYZE")
+
+
+def _m017_timestamp_triggers(conn: sqlite3.Connection):
+    """
+    updated_at 触发器只在语句没有自己更新 updated_at 时补一次 UPDATE
+    
+    原触发器每次 UPDATE 都再执行一次 UPDATE（连带变更计数触发器再跑一遍）；
+    热路径的写方法（update_item_status / create_ai_result）在语句里直接设置 updated_at。
+    """
+    for table in ('items', 'ai_results'):
+        conn.executescript(f"""
+            DROP TRIGGER IF EXISTS update_{table}_timestamp;
+            CREATE TRIGGER update_{table}_timestamp
+            AFTER UPDATE ON {table}
+            WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+            END;
+        """)
+
+
+def _m018_canonical_urls(conn: sqlite3.Connection):
+    """
+    按收窄后的追踪参数表重算 canonical_url
+
+    早期版本把 from / source / ref 等通用参数也当追踪参数去掉，不同页面算出同一个
+    规范化 URL，回填时后保存的那条被当成重复、canonical_url 置空。按现在的规则重算；
+    仍然冲突的只保留最早一条。先把要改的行置空再写新值，避免中途撞上唯一索引。
+    """
+    from core.dedup import canonicalize_url
+
+    seen = set()
+    changes = []
+    rows = conn.execute("""
+        SELECT id, user_id, url, canonical_url FROM items
+        WHERE url IS NOT NULL AND url != ''
+        ORDER BY id
+    """).fetchall()
+    for item_id, user_id, url, current in rows:
+        c_url = canonicalize_url(url)
+        if c_url is not None and (user_id, c_url) in seen:
+            c_url = None
+        seen.add((user_id, c_url))
+        if c_url != current:
+            changes.append((c_url, item_id))
+
+    conn.executemany("UPDATE items SET canonical_url = NULL WHERE id = ?",
+                     [(item_id,) for _, item_id in changes])
+    conn.executemany("UPDATE items SET canonical_url = ? WHERE id = ?",
+                     [change for change in changes if change[0] is not None])
+
+
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Connection], None]]] = [
+    (1, _m001_dedup),
+    (2, _m002_preview),
+    (3, _m003_content_store),
+    (4, _m004_change_counters),
+    (5, _m005_events),
+    (6, _m006_fetch_state),
+    (7, _m007_pipeline_checkpoints),
+    (8, _m008_chunk_summaries),
+    (9, _m009_keyword_corpus),
+    (10, _m010_category_source),
+    (11, _m011_duplicate_count),
+    (12, _m012_rank_key),
+    (13, _m013_keyword_index),
+    (14, _m014_tag_counts),
+    (15, _m015_list_indexes),
+    (16, _m016_metadata_columns),
+    (17, _m017_timestamp_triggers),
+    (18, _m018_canonical_urls),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def apply_migrations(conn: sqlite3.Connection, db_path: str = None):
+    """执行所有未应用的迁移"""
+    if db_path and db_path in _migrated_paths:
+        return
+
+    with _lock:
+        if db_path and db_path in _migrated_paths:
+            return
+
+        # 未初始化的数据库（没有 items 表）交给 init_db.py 处理
+        has_items = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items'"
+        ).fetchone()
+
+        if has_items:
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+            for version, migrate in MIGRATIONS:
+                if version <= current:
+                    continue
+                try:
+                    migrate(conn)
+                    conn.execute(f"PRAGMA user_version = {version}")
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            if db_path:
+                _migrated_paths.add(db_path)
@@ -0,0 +1,484 @@
+"""
+条目处理流水线
+
+每个阶段（Stage）声明依赖的上游阶段、执行方式（thread / process / async）
+和并发上限；流水线按依赖关系调度，互不依赖的阶段并行执行。
+- 每个阶段的结果按 (item_id, stage) 写入 pipeline_checkpoints，
+  重试或重新提交时已完成的阶段直接复用输出，不再重做
+- 阶段失败按指数退避重试，用尽后标记 failed，下游阶段标记 skipped
+- 进程重启后 recover() 继续未完成的阶段
+
+默认阶段定义见 core.stages。
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from core.config import Config
+from core.database import DatabaseManager
+from core.events import event_bus
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+EXECUTORS = ('thread', 'process', 'async')
+
+
+class StageError(Exception):
+    """阶段执行失败；retryable=False 时不再重试"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+@dataclass
+class StageContext:
+    """阶段执行上下文（process 执行方式下会被序列化到子进程）"""
+    item_id: int
+    user_id: int
+    stage: str
+    attempt: int
+    max_attempts: int
+    forced: bool
+    started_at: float
+    outputs: Dict[str, Dict] = field(default_factory=dict)
+    db_path: Optional[str] = None
+
+    @property
+    def final_attempt(self) -> bool:
+        return self.attempt >= self.max_attempts
+
+    def db(self) -> DatabaseManager:
+        """新建数据库连接（调用方负责关闭）"""
+        return DatabaseManager(self.db_path)
+
+    def load_item(self) -> Optional[Dict]:
+        db = self.db()
+        try:
+            return db.get_item(self.item_id)
+        finally:
+            db.close()
+
+
+class Stage:
+    """
+    流水线阶段
+
+    子类设置 name / requires，并实现 run（thread、process）或 arun（async），
+    返回可 JSON 序列化的输出字典，作为检查点保存并传给下游阶段。
+    """
+
+    name: str = ''
+    requires: tuple = ()
+    executor: str = 'thread'
+    concurrency: int = 4
+    max_attempts: int = 3
+    retry_base: float = 1.0
+
+    def run(self, ctx: StageContext) -> Optional[Dict]:
+        raise NotImplementedError
+
+    async def arun(self, ctx: StageContext) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def on_start(self, ctx: StageContext):
+        """阶段开始前调用（调度线程中执行，应当很快）"""
+
+    def on_failure(self, ctx: StageContext, error: Exception):
+        """重试用尽后调用"""
+
+    def is_retryable(self, error: Exception) -> bool:
+        return getattr(error, 'retryable', True)
+
+    def retry_delay(self, attempt: int) -> float:
+        """第 attempt 次失败后的等待时间：base * 2^(attempt-1)，±50% 抖动"""
+        return self.retry_base * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+
+def _run_in_process(stage: Stage, ctx: StageContext) -> Optional[Dict]:
+    """子进程入口（模块级函数才能被 pickle）"""
+    return stage.run(ctx)
+
+
+class _AsyncRunner:
+    """async 阶段共用的事件循环线程"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        threading.Thread(target=self.loop.run_forever, name='pipeline-async', daemon=True).start()
+
+    def submit(self, stage: Stage, ctx: StageContext, limit: int) -> Future:
+        async def _guarded():
+            sem = self._semaphores.get(stage.name)
+            if sem is None:
+                sem = self._semaphores[stage.name] = asyncio.Semaphore(limit)
+            async with sem:
+                return await stage.arun(ctx)
+
+        return asyncio.run_coroutine_threadsafe(_guarded(), self.loop)
+
+
+class _ItemRun:
+    """单个条目的一次流水线执行"""
+
+    def __init__(self, item_id: int, user_id: int, plan: List[str], force: Set[str]):
+        self.item_id = item_id
+        self.user_id = user_id
+        self.plan = plan
+        self.force = force
+        self.status: Dict[str, str] = {}
+        self.outputs: Dict[str, Dict] = {}
+        self.attempts: Dict[str, int] = {}
+        self.errors: Dict[str, str] = {}
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+        self.future: Future = Future()
+
+
+def parse_concurrency(spec: str) -> Dict[str, int]:
+    """解析 PIPELINE_CONCURRENCY（如 "fetch=8,summarize=2"）"""
+    limits = {}
+    for part in (spec or '').split(','):
+        if '=' in part:
+            name, value = part.split('=', 1)
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class Pipeline:
+    """阶段注册与调度"""
+
+    def __init__(self, stages: Iterable[Stage] = (), db_path: str = None):
+        self.db_path = db_path
+        self.stages: Dict[str, Stage] = {}
+        self._limits = parse_concurrency(Config.PIPELINE_CONCURRENCY)
+        self._executors: Dict[str, object] = {}
+        self._async_runner: Optional[_AsyncRunner] = None
+        self._lock = threading.Lock()
+        self._runs: Dict[int, _ItemRun] = {}
+        for stage in stages:
+            self.register(stage)
+
+    # ============================================
+    # 注册与规划
+    # ============================================
+
+    def register(self, stage: Stage):
+        """注册阶段（依赖必须已注册，因此不会成环）"""
+        if not stage.name or stage.name in self.stages:
+            raise ValueError(f"Invalid or duplicate stage name: {stage.name!r}")
+        missing = [r for r in stage.requires if r not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {stage.name} requires unknown stages: {', '.join(missing)}")
+        if stage.executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor for stage {stage.name}: {stage.executor}")
+        self.stages[stage.name] = stage
+
+    def plan(self, targets: Iterable[str] = None) -> List[str]:
+        """目标阶段及其所有上游，按注册（拓扑）顺序返回"""
+        if not targets:
+            return list(self.stages)
+
+        needed: Set[str] = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.stages[name].requires)
+        return [name for name in self.stages if name in needed]
+
+    def downstream(self, name: str) -> List[str]:
+        """某阶段及所有依赖它的下游阶段"""
+        result = {name}
+        for stage in self.stages.values():
+            if any(r in result for r in stage.requires):
+                result.add(stage.name)
+        return [n for n in self.stages if n in result]
+
+    # ============================================
+    # 提交
+    # ============================================
+
+    def submit(
+        self,
+        item_id: int,
+        user_id: int,
+        targets: Iterable[str] = None,
+        force: Iterable[str] = (),
+        only: Iterable[str] = None
+    ) -> Future:
+        """
+        提交条目，返回在所有计划阶段结束后完成的 Future
+
+        targets: 要完成的阶段（自动带上上游）；默认全部
+        force:   即使已有 done 检查点也重新执行的阶段
+        only:    只执行这些阶段，其余上游直接使用已有检查点（没有则视为空输出）
+        """
+        plan = list(only) if only is not None else self.plan(targets)
+        plan = [name for name in self.stages if name in set(plan)]
+        run = _ItemRun(item_id, user_id, plan, set(force))
+
+        with self._lock:
+            current = self._runs.get(item_id)
+            if current is None:
+                self._runs[item_id] = run
+
+        if current is not None:
+            # 同一条目已在执行中：等它结束后再提交，避免两次执行交错写检查点
+            chained: Future = Future()
+
+            def _resubmit(_):
+                try:
+                    inner = self.submit(item_id, user_id, targets, force, only)
+                    inner.add_done_callback(lambda f: chained.set_result(f.result()))
+                except Exception as e:
+                    chained.set_exception(e)
+
+            current.future.add_done_callback(_resubmit)
+            return chained
+
+        db = DatabaseManager(self.db_path)
+        try:
+            checkpoints = db.get_stage_checkpoints(item_id)
+            queued = []
+            for name in plan:
+                cp = checkpoints.get(name)
+                if cp and cp['status'] == 'done' and name not in run.force:
+                    run.status[name] = 'done'
+                    run.outputs[name] = cp['output'] or {}
+                else:
+                    run.status[name] = 'queued'
+                    queued.append(name)
+
+            # 计划外的上游直接用已有输出
+            for name, cp in checkpoints.items():
+                if name not in run.status and cp['status'] == 'done':
+                    run.outputs[name] = cp['output'] or {}
+
+            if queued:
+                db.queue_stages(item_id, queued)
+        except Exception:
+            with self._lock:
+                self._runs.pop(item_id, None)
+            raise
+        finally:
+            db.close()
+
+        self._advance(run)
+        return run.future
+
+    def rerun(self, stage_name: str, item_ids: Iterable[int], downstream: bool = True) -> List[Future]:
+        """对一批条目重新执行某个阶段（及其下游），上游复用检查点"""
+        names = self.downstream(stage_name) if downstream else [stage_name]
+        db = DatabaseManager(self.db_path)
+        try:
+            owners = db.get_item_owners(list(item_ids))
+        finally:
+            db.close()
+        return [
+            self.submit(item_id, user_id, force=names, only=names)
+            for item_id, user_id in owners.items()
+        ]
+
+    def recover(self) -> int:
+        """继续上次退出时未完成的阶段，返回条目数"""
+        db = DatabaseManager(self.db_path)
+        try:
+            unfinished = db.get_unfinished_stages()
+        finally:
+            db.close()
+
+        for row in unfinished:
+            self.submit(row['item_id'], row['user_id'], targets=row['stages'])
+        if unfinished:
+            logger.info(f"Recovered {len(unfinished)} unfinished pipeline runs")
+        return len(unfinished)
+
+    @property
+    def pending(self) -> int:
+        """执行中的条目数"""
+        return len(self._runs)
+
+    def join(self, timeout: float = None) -> bool:
+        """等待所有条目结束，超时返回 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._runs:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    # ============================================
+    # 调度
+    # ============================================
+
+    def concurrency(self, name: str) -> int:
+        """阶段并发上限（PIPELINE_CONCURRENCY 优先）"""
+        return self._limits.get(name, self.stages[name].concurrency)
+
+    def _executor(self, stage: Stage):
+        limit = self.concurrency(stage.name)
+        with self._lock:
+            if stage.executor == 'async':
+                if self._async_runner is None:
+                    self._async_runner = _AsyncRunner()
+                return self._async_runner, limit
+            executor = self._executors.get(stage.name)
+            if executor is None:
+                if stage.executor == 'process':
+                    executor = ProcessPoolExecutor(max_workers=limit)
+                else:
+                    executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"stage-{stage.name}")
+                self._executors[stage.name] = executor
+            return executor, limit
+
+    def _advance(self, run: _ItemRun):
+        """派发依赖已满足的阶段；全部结束时完成 Future"""
+        ready = []
+        with run.lock:
+            for name in run.plan:
+                if run.status[name] != 'queued':
+                    continue
+                deps = [d for d in self.stages[name].requires if d in run.status]
+                if any(run.status[d] in ('failed', 'skipped') for d in deps):
+                    run.status[name] = 'skipped'
+                elif all(run.status[d] == 'done' for d in deps):
+                    run.status[name] = 'running'
+                    ready.append(name)
+
+            finished = all(s in ('done', 'failed', 'skipped') for s in run.status.values())
+
+        skipped = [n for n in run.plan if run.status[n] == 'skipped']
+        if skipped:
+            self._save_checkpoints(run, skipped, 'skipped', error='upstream stage failed')
+
+        for name in ready:
+            self._dispatch(run, name)
+
+        if finished and not ready:
+            self._finish(run)
+
+    def _dispatch(self, run: _ItemRun, name: str):
+        stage = self.stages[name]
+        run.attempts[name] = run.attempts.get(name, 0) + 1
+        ctx = StageContext(
+            item_id=run.item_id,
+            user_id=run.user_id,
+            stage=name,
+            attempt=run.attempts[name],
+            max_attempts=stage.max_attempts,
+            forced=name in run.force,
+            started_at=run.started_at,
+            outputs=dict(run.outputs),
+            db_path=self.db_path,
+        )
+
+        try:
+            db = DatabaseManager(self.db_path)
+            try:
+                db.start_stage(run.item_id, name)
+            finally:
+                db.close()
+            stage.on_start(ctx)
+
+            executor, limit = self._executor(stage)
+            start = time.perf_counter()
+            if stage.executor == 'async':
+                future = executor.submit(stage, ctx, limit)
+            elif stage.executor == 'process':
+                future = executor.submit(_run_in_process, stage, ctx)
+            else:
+                future = executor.submit(stage.run, ctx)
+        except Exception as e:
+            self._on_done(run, stage, ctx, None, e)
+            return
+
+        future.add_done_callback(
+            lambda f: self._on_done(
+                run, stage, ctx, f, None, (time.perf_counter() - start) * 1000
+            )
+        )
+
+    def _on_done(self, run: _ItemRun, stage: Stage, ctx: StageContext,
+                 future: Optional[Future], error: Optional[Exception], elapsed_ms: float = 0.0):
+        if error is None and future is not None:
+            error = future.exception()
+
+        if error is None:
+            output = future.result() or {}
+            metrics.observe(f"stage.{stage.name}", elapsed_ms)
+            with run.lock:
+                run.outputs[stage.name] = output
+                run.status[stage.name] = 'done'
+            self._save_checkpoints(run, [stage.name], 'done', output=output)
+            self._publish(run, stage.name, 'done')
+            self._advance(run)
+            return
+
+        if stage.is_retryable(error) and not ctx.final_attempt:
+            metrics.incr(f"stage.{stage.name}.retried")
+            logger.warning(
+                f"Stage {stage.name} failed for item {run.item_id} "
+                f"(attempt {ctx.attempt}/{ctx.max_attempts}): {error}"
+            )
+            timer = threading.Timer(stage.retry_delay(ctx.attempt), self._dispatch, (run, stage.name))
+            timer.daemon = True
+            timer.start()
+            return
+
+        metrics.incr(f"stage.{stage.name}.failed")
+        logger.error(f"Stage {stage.name} failed for item {run.item_id}: {error}")
+        try:
+            stage.on_failure(ctx, error)
+        except Exception as e:
+            logger.error(f"on_failure of stage {stage.name} raised: {e}")
+        with run.lock:
+            run.status[stage.name] = 'failed'
+            run.errors[stage.name] = str(error)
+        self._save_checkpoints(run, [stage.name], 'failed', error=str(error))
+        self._publish(run, stage.name, 'failed', str(error))
+        self._advance(run)
+
+    def _save_checkpoints(self, run: _ItemRun, names: List[str], status: str,
+                          output: Dict = None, error: str = None):
+        db = DatabaseManager(self.db_path)
+        try:
+            for name in names:
+                db.save_stage_checkpoint(run.item_id, name, status, output=output, error=error)
+        except Exception as e:
+            logger.error(f"Failed to save checkpoint for item {run.item_id}: {e}")
+        finally:
+            db.close()
+
+    def _publish(self, run: _ItemRun, stage: str, status: str, error: str = None):
+        data = {'item_id': run.item_id, 'stage': stage, 'status': status}
+        if error:
+            data['error'] = error
+        event_bus.publish(run.user_id, 'item.stage', data)
+
+    def _finish(self, run: _ItemRun):
+        with self._lock:
+            if self._runs.get(run.item_id) is not run:
+                return
+            del self._runs[run.item_id]
+
+        failed = [n for n in run.plan if run.status[n] == 'failed']
+        if not run.future.done():
+            run.future.set_result({
+                'item_id': run.item_id,
+                'success': not failed,
+                'stages': dict(run.status),
+                'outputs': dict(run.outputs),
+                'errors': dict(run.errors),
+            })
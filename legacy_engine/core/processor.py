@@ -3,35 +3,152 @@ AI 处理模块
 """
 
 import time
+import hashlib
 import logging
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Tuple
+import anyio
 import openai
 
+from core.classifier import CATEGORIES
 from core.config import Config
 from core.database import get_db
+from core.metrics import metrics
+from core.tokenizer import count_tokens, split_into_chunks, truncate_tokens
 
 logger = logging.getLogger(__name__)
 
 # 配置 OpenAI
 if Config.OPENAI_API_KEY:
     openai.api_key = Config.OPENAI_API_KEY
+if Config.OPENAI_BASE_URL:
+    # 模块级客户端直接拼接路径，需要结尾的 /
+    openai.base_url = Config.OPENAI_BASE_URL.rstrip('/') + '/'
+
+# 重试也不会成功的模型调用错误（鉴权、权限、请求本身有误、模型不存在）
+PERMANENT_ERRORS = (
+    openai.AuthenticationError,
+    openai.PermissionDeniedError,
+    openai.BadRequestError,
+    openai.NotFoundError,
+)
 
 
 class AIProcessor:
     """AI 处理器"""
     
+    # 分块摘要提示词变更时升级版本，使缓存失效
+    CHUNK_PROMPT_VERSION = 'v1'
+    
     def __init__(self):
         self.model = Config.OPENAI_MODEL
+        self._async_client = None
     
-    def generate_summary(self, content: str) -> str:
-        """生成摘要"""
-        if not Config.OPENAI_API_KEY:
-            return ""
+    @property
+    def async_client(self) -> openai.AsyncOpenAI:
+        """异步客户端（流式摘要使用，首次访问时创建）"""
+        if self._async_client is None:
+            self._async_client = openai.AsyncOpenAI(
+                api_key=Config.OPENAI_API_KEY,
+                base_url=Config.OPENAI_BASE_URL or None
+            )
+        return self._async_client
+    
+    def _complete(self, messages: List[Dict], max_tokens: int, temperature: float) -> str:
+        """同步调用模型，记录调用次数和 token 用量"""
+        metrics.incr('llm.calls')
+        metrics.incr('llm.input_tokens', sum(count_tokens(m['content'], self.model) for m in messages))
+        
+        response = openai.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        
+        text = response.choices[0].message.content.strip()
+        metrics.incr('llm.output_tokens', count_tokens(text, self.model))
+        return text
+    
+    # ============================================
+    # 摘要（长文 map-reduce）
+    # ============================================
+    
+    def _chunk_messages(self, chunk: str, index: int, total: int) -> List[Dict]:
+        """分块摘要提示词"""
+        prompt = f"""
+以下是一篇长文的第 {index}/{total} 部分，请用2-3句话概括这一部分的要点：
+
+{chunk}
+
+只返回概括内容。
+"""
+        return [
+            {"role": "system", "content": "你是一个专业的内容摘要助手。"},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _summarize_chunks(self, chunks: List[str]) -> List[str]:
+        """并发摘要各分块（并发数 SUMMARY_MAP_CONCURRENCY），命中缓存的分块不再调用模型"""
+        keys = [
+            hashlib.sha256(f"{self.CHUNK_PROMPT_VERSION}\n{chunk}".encode('utf-8')).hexdigest()
+            for chunk in chunks
+        ]
+        
+        db = get_db()
+        try:
+            summaries = db.get_chunk_summaries(keys, self.model)
+            missing = [i for i, key in enumerate(keys) if key not in summaries]
+            metrics.incr('summary.chunk_cache_hits', len(chunks) - len(missing))
+            
+            if missing:
+                def _map(i: int) -> str:
+                    return self._complete(self._chunk_messages(chunks[i], i + 1, len(chunks)), 200, 0.3)
+                
+                workers = max(1, min(Config.SUMMARY_MAP_CONCURRENCY, len(missing)))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_map, missing))
+                
+                for i, summary in zip(missing, results):
+                    summaries[keys[i]] = summary
+                    db.save_chunk_summary(keys[i], self.model, summary, count_tokens(chunks[i], self.model))
+        finally:
+            db.close()
+        
+        return [summaries[key] for key in keys]
+    
+    def prepare_summary_input(self, content: str) -> Tuple[str, bool]:
+        """
+        准备最终摘要的输入
+        
+        不超过 SUMMARY_DIRECT_TOKENS 时原文直接摘要；否则分块并发摘要（map），
+        分块摘要合起来仍超过 SUMMARY_REDUCE_TOKENS 时再分块归并一轮。
+        返回 (文本, 是否为分块摘要)。
+        """
+        text = content
+        budget = Config.SUMMARY_DIRECT_TOKENS
+        reduced = False
+        
+        for _ in range(4):
+            if count_tokens(text, self.model) <= budget:
+                return text, reduced
+            chunks = split_into_chunks(text, Config.SUMMARY_CHUNK_TOKENS, self.model)
+            if len(chunks) <= 1:
+                break
+            partials = self._summarize_chunks(chunks)
+            text = '\n'.join(f"[{i}] {summary}" for i, summary in enumerate(partials, 1))
+            budget = Config.SUMMARY_REDUCE_TOKENS
+            reduced = True
         
+        return truncate_tokens(text, budget, self.model), reduced
+    
+    def _summary_messages(self, content: str, reduced: bool = False) -> List[Dict]:
+        """摘要提示词"""
+        source = "以下是一篇长文各部分的要点（按原文顺序）" if reduced else "以下内容"
         prompt = f"""
-请用3句话概括以下内容的核心要点：
+请用3句话概括{source}的核心要点：
 
-{content[:3000]}
+{content}
 
 要求：
 1. 第一句话：整体概括
@@ -40,71 +157,104 @@ class AIProcessor:
 
 只返回摘要内容。
 """
+        return [
+            {"role": "system", "content": "你是一个专业的内容摘要助手。"},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def generate_summary(self, content: str, strict: bool = False) -> str:
+        """
+        生成摘要
+        
+        模型调用失败时记日志返回空串；strict=True（处理流水线）时抛出，由阶段重试。
+        """
+        if not Config.OPENAI_API_KEY:
+            return ""
         
         try:
-            response = openai.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的内容摘要助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=300
-            )
-            
-            return response.choices[0].message.content.strip()
+            start = time.perf_counter()
+            text, reduced = self.prepare_summary_input(content)
+            summary = self._complete(self._summary_messages(text, reduced), 300, 0.7)
+            metrics.observe('summary.total', (time.perf_counter() - start) * 1000)
+            return summary
         
         except Exception as e:
             logger.error(f"Failed to generate summary: {e}")
+            if strict:
+                raise
             return ""
     
-    def classify_content(self, content: str) -> str:
-        """内容分类"""
+    async def stream_summary(self, content: str) -> AsyncIterator[str]:
+        """
+        流式生成摘要，逐段产出 token
+        
+        调用方停止迭代（客户端断开）时关闭上游连接，不再消耗 token。
+        首 token 延迟记录到 summary.ttft 指标。长文先在线程中完成分块摘要，
+        只有最终归并这一步是流式的。
+        """
+        start = time.perf_counter()
+        text, reduced = await anyio.to_thread.run_sync(self.prepare_summary_input, content)
+        stream = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=self._summary_messages(text, reduced),
+            temperature=0.7,
+            max_tokens=300,
+            stream=True
+        )
+        
+        first = True
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if first:
+                    metrics.observe('summary.ttft', (time.perf_counter() - start) * 1000)
+                    first = False
+                yield delta
+            metrics.observe('summary.stream_total', (time.perf_counter() - start) * 1000)
+        finally:
+            # 请求被取消时也要关闭上游连接
+            with anyio.CancelScope(shield=True):
+                await stream.close()
+    
+    def classify_content(self, content: str, strict: bool = False) -> str:
+        """内容分类（模型调用失败时返回"其他"，strict=True 时抛出）"""
         if not Config.OPENAI_API_KEY:
             return "未分类"
         
-        categories = [
-            "AI趋势", "产品思考", "技术分享", "设计", 
-            "创业", "个人成长", "知识管理", "工作方法", "其他"
-        ]
-        
         prompt = f"""
 请将以下内容分类到这些主题之一：
-{', '.join(categories)}
+{', '.join(CATEGORIES)}
 
 内容：
-{content[:2000]}
+{truncate_tokens(content, Config.CLASSIFY_INPUT_TOKENS, self.model)}
 
 只返回一个分类名称。
 """
         
         try:
-            response = openai.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的内容分类助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=20
-            )
-            
-            category = response.choices[0].message.content.strip()
-            return category if category in categories else "其他"
+            category = self._complete([
+                {"role": "system", "content": "你是一个专业的内容分类助手。"},
+                {"role": "user", "content": prompt}
+            ], 20, 0.3)
+            return category if category in CATEGORIES else "其他"
         
         except Exception as e:
             logger.error(f"Failed to classify content: {e}")
+            if strict:
+                raise
             return "其他"
     
-    def extract_keywords(self, content: str) -> str:
-        """提取关键词"""
+    def extract_keywords(self, content: str, strict: bool = False) -> str:
+        """提取关键词（模型调用失败时返回空串，strict=True 时抛出）"""
         if not Config.OPENAI_API_KEY:
             return ""
         
         prompt = f"""
 从以下内容中提取5-8个关键词：
 
-{content[:2000]}
+{truncate_tokens(content, Config.CLASSIFY_INPUT_TOKENS, self.model)}
 
 只返回关键词，用逗号分隔。
 
@@ -112,89 +262,54 @@ class AIProcessor:
 """
         
         try:
-            response = openai.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的关键词提取助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=100
-            )
-            
-            return response.choices[0].message.content.strip()
+            return self._complete([
+                {"role": "system", "content": "你是一个专业的关键词提取助手。"},
+                {"role": "user", "content": prompt}
+            ], 100, 0.3)
         
         except Exception as e:
             logger.error(f"Failed to extract keywords: {e}")
+            if strict:
+                raise
             return ""
     
     def process_item(self, item_id: int) -> Dict:
-        """处理单个条目"""
-        start_time = time.time()
+        """
+        处理单个条目（阻塞到完成）
         
-        db = get_db()
+        实际执行交给处理流水线（core.stages）：摘要、分类、关键词并行，
+        抓取和去重结果复用已有检查点。
+        """
+        from core.stages import pipeline, AI_TARGETS, AI_STAGES
         
+        db = get_db()
         try:
             item = db.get_item(item_id)
-            
-            if not item or not item['content']:
-                return {'success': False, 'error': 'Invalid item'}
-            
-            content = item['content']
-            
-            # 生成摘要
-            summary = self.generate_summary(content)
-            
-            # 分类
-            category = self.classify_content(content)
-            
-            # 提取关键词
-            keywords = self.extract_keywords(content)
-            
-            # 计算重要性（简化版）
-            importance_score = 0.5
-            if len(content) > 1000:
-                importance_score += 0.2
-            
-            # 保存结果
-            processing_time = int((time.time() - start_time) * 1000)
-            
-            db.create_ai_result(
-                item_id=item_id,
-                user_id=item['user_id'],
-                summary=summary,
-                category=category,
-                keywords=keywords,
-                importance_score=importance_score,
-                model_used=self.model,
-                processing_time_ms=processing_time
-            )
-            
-            # 更新条目状态
-            db.update_item_status(item_id, 'processed')
-            
-            logger.info(f"Successfully processed item {item_id}")
-            
-            return {
-                'success': True,
-                'item_id': item_id,
-                'summary': summary,
-                'category': category,
-                'keywords': keywords
-            }
+        finally:
+            db.close()
         
-        except Exception as e:
-            logger.error(f"Failed to process item {item_id}: {e}")
-            db.update_item_status(item_id, 'failed')
-            
+        if not item or not item['content']:
+            return {'success': False, 'error': 'Invalid item'}
+        
+        result = pipeline.submit(
+            item_id, item['user_id'], targets=AI_TARGETS, force=AI_STAGES
+        ).result()
+        
+        if not result['success']:
             return {
                 'success': False,
                 'item_id': item_id,
-                'error': str(e)
+                'error': '; '.join(f"{k}: {v}" for k, v in result['errors'].items())
             }
         
-        finally:
-            db.close()
+        ai_result = result['outputs'].get('index', {})
+        return {
+            'success': True,
+            'item_id': item_id,
+            'summary': ai_result.get('summary'),
+            'category': ai_result.get('category'),
+            'keywords': ai_result.get('keywords')
+        }
 
 
 # 全局实例
@@ -202,19 +317,15 @@ ai_processor = AIProcessor()
 
 
 def process_item_async(item_id: int, user_id: int):
-    """异步处理条目（简化版）"""
-    import threading
+    """提交条目到处理流水线（不阻塞）"""
+    from core.stages import pipeline, AI_TARGETS, AI_STAGES
     
-    def _process():
+    def _done(future):
         try:
-            result = ai_processor.process_item(item_id)
-            logger.info(f"Async processing result: {result}")
+            logger.info(f"Async processing result: {future.result()['stages']}")
         except Exception as e:
             logger.error(f"Async processing error: {e}")
     
-    thread = threading.Thread(target=_process)
-    thread.daemon = True
-    thread.start()
+    pipeline.submit(item_id, user_id, targets=AI_TARGETS, force=AI_STAGES).add_done_callback(_done)
     
     logger.info(f"Started async processing for item {item_id}")
-
@@ -0,0 +1,300 @@
+"""
+SQL 执行剖析（QUERY_PROFILING）
+
+开启后 DatabaseManager 的连接是 ProfiledConnection：每条语句记录规范化 SQL（字面量
+换成 ?、IN 列表折叠、空白合并）、参数个数、耗时和行数，按规范化 SQL 汇总，
+GET /api/metrics/queries 取总耗时最多的前 N 条，DELETE 同一路径清零。SELECT 的耗时和行数包含取结果：
+语句的结果取完、游标执行下一条或关闭时才计入。
+
+耗时不低于 QUERY_SLOW_MS 的语句记入慢查询日志（应用日志一行摘要；配置了
+QUERY_SLOW_LOG 时另追加一行 JSON），附带当时的 EXPLAIN QUERY PLAN。日志里只有
+规范化 SQL，不含参数值。
+
+关闭时连接就是普通的 sqlite3.Connection，执行路径上没有任何额外代码；开关在建立
+连接时读取，改动后对新连接生效。
+"""
+
+import functools
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional
+
+from core.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 汇总的不同语句数上限，超出后的新语句计入 OTHER
+MAX_STATEMENTS = 1000
+OTHER = '<other>'
+# /api/metrics/queries 返回的最近慢查询条数
+RECENT_SLOW = 50
+ORDERS = ('total_ms', 'count', 'mean_ms', 'max_ms', 'rows')
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize(sql: str) -> str:
+    """规范化 SQL：字面量 -> ?，IN (?, ?, ...) -> IN (...)，空白合并"""
+    sql = _LITERALS.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def _param_count(parameters) -> int:
+    return len(parameters) if parameters else 0
+
+
+class StatementStats:
+    """一条规范化语句的累计值"""
+
+    __slots__ = ('sql', 'count', 'total_ms', 'max_ms', 'rows', 'params', 'slow')
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.params = 0
+        self.slow = 0
+
+    def add(self, duration_ms: float, rows: int, params: int, slow: bool):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.rows += rows
+        self.params = params
+        self.slow += slow
+
+    def snapshot(self) -> Dict:
+        return {
+            'sql': self.sql,
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'rows': self.rows,
+            'params': self.params,
+            'slow': self.slow,
+        }
+
+
+class QueryProfiler:
+    """进程内的语句汇总和最近的慢查询"""
+
+    def __init__(self, max_statements: int = MAX_STATEMENTS, recent_slow: int = RECENT_SLOW):
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._stats: Dict[str, StatementStats] = {}
+        self.slow: Deque[Dict] = deque(maxlen=recent_slow)
+
+    def record(self, conn: sqlite3.Connection, sql: str, parameters, duration_ms: float,
+               rows: int, params: int = None, explain: bool = True):
+        key = normalize(sql)
+        params = _param_count(parameters) if params is None else params
+        slow = duration_ms >= Config.QUERY_SLOW_MS
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_statements:
+                    key = OTHER
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = StatementStats(key)
+            stats.add(duration_ms, rows, params, slow)
+        if slow:
+            plan = _explain(conn, sql, parameters) if explain else None
+            self._log_slow(normalize(sql), duration_ms, rows, params, plan)
+
+    def _log_slow(self, sql: str, duration_ms: float, rows: int, params: int, plan: Optional[List[str]]):
+        entry = {
+            'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'sql': sql,
+            'duration_ms': round(duration_ms, 3),
+            'rows': rows,
+            'params': params,
+            'plan': plan,
+        }
+        self.slow.append(entry)
+        logger.warning(f"Slow query {duration_ms:.1f}ms ({rows} rows): {sql[:200]}")
+        if Config.QUERY_SLOW_LOG:
+            try:
+                with self._log_lock, open(Config.QUERY_SLOW_LOG, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            except OSError as e:
+                logger.error(f"Failed to write slow query log: {e}")
+
+    def top(self, limit: int = 20, order: str = 'total_ms') -> List[Dict]:
+        """按 order 降序的前 limit 条语句，附占全部耗时的比例"""
+        if order not in ORDERS:
+            raise ValueError(f"Unknown order: {order}")
+        with self._lock:
+            rows = [stats.snapshot() for stats in self._stats.values()]
+        total = sum(row['total_ms'] for row in rows) or 1.0
+        rows.sort(key=lambda row: row[order], reverse=True)
+        for row in rows[:limit]:
+            row['share'] = round(row['total_ms'] / total, 4)
+        return rows[:limit]
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                'statements': len(self._stats),
+                'executions': sum(s.count for s in self._stats.values()),
+                'total_ms': round(sum(s.total_ms for s in self._stats.values()), 3),
+                'slow': sum(s.slow for s in self._stats.values()),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.slow.clear()
+
+
+def _explain(conn: sqlite3.Connection, sql: str, parameters) -> Optional[List[str]]:
+    """慢查询的 EXPLAIN QUERY PLAN（用普通游标执行，不再计入统计）"""
+    try:
+        rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", parameters or ()).fetchall()
+    except sqlite3.Error:
+        return None
+    return [row[3] for row in rows]
+
+
+class _Pending:
+    """执行了但结果还没取完的语句"""
+
+    __slots__ = ('sql', 'parameters', 'elapsed', 'rows')
+
+    def __init__(self, sql: str, parameters, elapsed: float):
+        self.sql = sql
+        self.parameters = parameters
+        self.elapsed = elapsed
+        self.rows = 0
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """计时的游标：execute 和取结果的耗时都计入该语句"""
+
+    _pending: Optional[_Pending] = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._pending = _Pending(sql, parameters, time.perf_counter() - start)
+        if self.description is None:
+            # 没有结果集（写语句 / PRAGMA 等）：立即计入，行数为影响的行数
+            self._pending.rows = max(self.rowcount, 0)
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        seq_of_parameters = list(seq_of_parameters)
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        elapsed = (time.perf_counter() - start) * 1000
+        profiler.record(self.connection, sql, None, elapsed, max(self.rowcount, 0),
+                        params=sum(_param_count(p) for p in seq_of_parameters), explain=False)
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(start, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(start, 0, True)
+            raise
+        self._fetched(start, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def _fetched(self, start: float, rows: int, done: bool):
+        pending = self._pending
+        if pending is None:
+            return
+        pending.elapsed += time.perf_counter() - start
+        pending.rows += rows
+        if done:
+            self._finish()
+
+    def _finish(self):
+        pending = self._pending
+        if pending is None:
+            return
+        self._pending = None
+        profiler.record(self.connection, pending.sql, pending.parameters,
+                        pending.elapsed * 1000, pending.rows)
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """游标都是 ProfiledCursor；关闭前把还没取完的语句计入"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = weakref.WeakSet()
+
+    def cursor(self, factory=ProfiledCursor):
+        cursor = super().cursor(factory)
+        if isinstance(cursor, ProfiledCursor):
+            self._cursors.add(cursor)
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close(self):
+        for cursor in list(self._cursors):
+            cursor._finish()
+        super().close()
+
+
+def connection_factory():
+    """DatabaseManager 建立连接时使用的连接类"""
+    return ProfiledConnection if Config.QUERY_PROFILING else sqlite3.Connection
+
+
+# 全局实例
+profiler = QueryProfiler()
@@ -0,0 +1,368 @@
+"""
+默认处理流水线
+
+    fetch → dedup → summarize ┐
+                  → classify  ├→ index
+                  → keywords  ┘
+
+- fetch：URL 条目后台抓取正文（网络错误 / 429 / 5xx 退避重试）
+- dedup：抓取后的正文与已有条目重复时，AI 阶段直接复用已有结果
+- summarize / classify / keywords：互不依赖，并行执行（分类、关键词默认先走本地模型）
+- index：合并结果、计算重要性（core.importance）写入 ai_results，条目标记为 processed
+
+新阶段继承 core.pipeline.Stage，声明 requires 后 pipeline.register 即可。
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+from core.classifier import get_classifier
+from core.config import Config
+from core.events import event_bus
+from core.fetcher import web_fetcher
+from core.importance import score_item
+from core.keywords import extract as extract_keywords
+from core.metrics import metrics
+from core.pipeline import Pipeline, Stage, StageContext, StageError
+from core.processor import ai_processor, PERMANENT_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# 只抓取正文
+FETCH_TARGETS = ('fetch',)
+# 完整 AI 处理
+AI_TARGETS = ('index',)
+# 重新 AI 处理时强制执行的阶段（抓取和去重结果复用）
+AI_STAGES = ('summarize', 'classify', 'keywords', 'index')
+
+
+class FetchStage(Stage):
+    """抓取 URL 正文"""
+
+    name = 'fetch'
+    concurrency = Config.FETCH_WORKERS
+    max_attempts = Config.FETCH_MAX_ATTEMPTS
+    retry_base = Config.FETCH_RETRY_BASE_SECONDS
+
+    def run(self, ctx: StageContext) -> Optional[Dict]:
+        db = ctx.db()
+        try:
+            item = db.get_item(ctx.item_id)
+            if not item:
+                raise StageError(f"Item {ctx.item_id} not found", retryable=False)
+
+            # 非 URL 条目、或已抓取过（未强制重跑）时跳过
+            pending = item.get('fetch_status') in ('queued', 'fetching', 'failed')
+            if not item.get('url') or not (pending or ctx.forced):
+                return {'fetched': False, 'skipped': True}
+
+            db.update_fetch_status(ctx.item_id, 'fetching')
+            self._publish(ctx, 'fetching')
+
+            start = time.perf_counter()
+            result = web_fetcher.fetch(item['url'])
+            metrics.observe('fetch.duration', (time.perf_counter() - start) * 1000)
+
+            if result['content']:
+                unique = db.update_item_content(
+                    ctx.item_id,
+                    content=result['content'],
+                    title=result['title'] or None,
+                    source_metadata={
+                        'domain': web_fetcher.get_domain(item['url']),
+                        'original_url': item['url']
+                    }
+                )
+                metrics.incr('fetch.succeeded')
+                self._publish(ctx, 'fetched')
+                logger.info(f"Fetched item {ctx.item_id} (attempt {ctx.attempt})")
+                return {'fetched': True, 'unique': unique}
+
+            error = result.get('error') or 'Empty content'
+            if result.get('retryable') and not ctx.final_attempt:
+                db.update_fetch_status(ctx.item_id, 'queued', error)
+                self._publish(ctx, 'queued', error)
+                raise StageError(error)
+
+            # 抓取失败时保留原始文本，后续阶段照常执行
+            db.update_fetch_status(ctx.item_id, 'failed', error)
+            metrics.incr('fetch.failed')
+            self._publish(ctx, 'failed', error)
+            logger.warning(f"Giving up fetching item {ctx.item_id}: {error}")
+            return {'fetched': False, 'error': error}
+        finally:
+            db.close()
+
+    def _publish(self, ctx: StageContext, fetch_status: str, error: str = None):
+        data = {'item_id': ctx.item_id, 'fetch_status': fetch_status, 'attempt': ctx.attempt}
+        if error:
+            data['error'] = error
+        event_bus.publish(ctx.user_id, 'item.fetch', data)
+
+
+class DedupStage(Stage):
+    """查找正文相同的已有条目"""
+
+    name = 'dedup'
+    requires = ('fetch',)
+
+    def run(self, ctx: StageContext) -> Optional[Dict]:
+        db = ctx.db()
+        try:
+            item = db.get_item(ctx.item_id)
+            if not item:
+                raise StageError(f"Item {ctx.item_id} not found", retryable=False)
+            existing = db.find_duplicate_item(ctx.user_id, content=item['content'], use_filter=False)
+            return {'duplicate_of': existing if existing and existing != ctx.item_id else None}
+        finally:
+            db.close()
+
+
+class AIStage(Stage):
+    """
+    AI 阶段公共逻辑：状态推送、失败标记、复用重复条目的结果
+
+    模型调用失败（服务不可用、限流等）不当作空结果成功：generate 以 strict 方式调用
+    处理器，异常转成 StageError，按 max_attempts 退避重试，最后一次仍失败时走
+    on_failure；鉴权 / 请求错误（PERMANENT_ERRORS）不重试。
+    """
+
+    requires = ('dedup',)
+    max_attempts = 2
+    field = ''
+
+    def on_start(self, ctx: StageContext):
+        event_bus.publish(ctx.user_id, 'item.status', {
+            'item_id': ctx.item_id, 'status': 'processing', 'stage': self.name
+        })
+
+    def on_failure(self, ctx: StageContext, error: Exception):
+        db = ctx.db()
+        try:
+            db.update_item_status(ctx.item_id, 'failed')
+        finally:
+            db.close()
+        event_bus.publish(ctx.user_id, 'item.status', {
+            'item_id': ctx.item_id, 'status': 'failed', 'error': str(error)
+        })
+
+    def reuse(self, ctx: StageContext) -> Optional[Dict]:
+        """重复条目（未强制重跑）已有该字段时返回原条目的 AI 结果"""
+        duplicate_of = ctx.outputs.get('dedup', {}).get('duplicate_of')
+        if not duplicate_of or ctx.forced:
+            return None
+        db = ctx.db()
+        try:
+            existing = db.get_ai_result_by_item(duplicate_of)
+        finally:
+            db.close()
+        if existing and existing.get(self.field):
+            return existing
+        return None
+
+    def run(self, ctx: StageContext) -> Optional[Dict]:
+        existing = self.reuse(ctx)
+        if existing:
+            return {self.field: existing[self.field], 'reused_from': existing['item_id']}
+
+        item = ctx.load_item()
+        if not item or not item['content']:
+            raise StageError('Invalid item', retryable=False)
+        return {self.field: self.generate(item['content'])}
+
+    def generate(self, content: str) -> str:
+        """调用模型；失败时抛出 StageError"""
+        try:
+            return self.call_model(content)
+        except Exception as e:
+            metrics.incr(f'{self.name}.llm_failed')
+            raise StageError(f"{self.name} model call failed: {e}",
+                             retryable=not isinstance(e, PERMANENT_ERRORS)) from e
+
+    def call_model(self, content: str) -> str:
+        raise NotImplementedError
+
+
+class SummarizeStage(AIStage):
+    name = 'summarize'
+    field = 'summary'
+
+    def call_model(self, content: str) -> str:
+        return ai_processor.generate_summary(content, strict=True)
+
+
+class ClassifyStage(AIStage):
+    """
+    分类
+
+    CATEGORY_CLASSIFIER=local 只用本地分类器（core.classifier）；hybrid 时本地
+    置信度低于 CATEGORY_CONFIDENCE_THRESHOLD 才调用模型；还没有训练好的模型时都用模型。
+    """
+
+    name = 'classify'
+    field = 'category'
+
+    def run(self, ctx: StageContext) -> Optional[Dict]:
+        existing = self.reuse(ctx)
+        if existing:
+            return {
+                'category': existing['category'],
+                'source': existing.get('category_source'),
+                'reused_from': existing['item_id']
+            }
+
+        item = ctx.load_item()
+        if not item or not item['content']:
+            raise StageError('Invalid item', retryable=False)
+
+        mode = Config.CATEGORY_CLASSIFIER
+        if mode != 'llm':
+            model = get_classifier(ctx.db_path)
+            if model:
+                category, confidence = model.predict(f"{item.get('title') or ''}\n{item['content']}")
+                if mode == 'local' or confidence >= Config.CATEGORY_CONFIDENCE_THRESHOLD \
+                        or not Config.OPENAI_API_KEY:
+                    metrics.incr('classify.local')
+                    return {'category': category, 'source': 'local', 'confidence': round(confidence, 3)}
+
+        metrics.incr('classify.llm')
+        return {'category': self.generate(item['content']), 'source': 'llm'}
+
+    def call_model(self, content: str) -> str:
+        return ai_processor.classify_content(content, strict=True)
+
+
+class KeywordsStage(AIStage):
+    """
+    关键词和主题
+
+    KEYWORD_EXTRACTOR=local 只用本地提取（core.keywords）；hybrid 时本地结果
+    置信度低于 KEYWORD_CONFIDENCE_THRESHOLD 才调用模型；llm 为原来的做法。
+    """
+
+    name = 'keywords'
+    field = 'keywords'
+
+    def run(self, ctx: StageContext) -> Optional[Dict]:
+        existing = self.reuse(ctx)
+        if existing:
+            return {
+                'keywords': existing['keywords'],
+                'topics': existing.get('topics'),
+                'reused_from': existing['item_id']
+            }
+
+        item = ctx.load_item()
+        if not item or not item['content']:
+            raise StageError('Invalid item', retryable=False)
+
+        mode = Config.KEYWORD_EXTRACTOR
+        if mode == 'llm':
+            return {'keywords': self.generate(item['content']), 'source': 'llm'}
+
+        db = ctx.db()
+        try:
+            result = extract_keywords(db, item['content'], item_id=ctx.item_id)
+        finally:
+            db.close()
+
+        keywords, source = ','.join(result['keywords']), 'local'
+        if mode == 'hybrid' and result['confidence'] < Config.KEYWORD_CONFIDENCE_THRESHOLD:
+            # 已有本地结果：模型调用失败时沿用本地关键词，不让整个阶段失败
+            generated = ai_processor.extract_keywords(item['content'])
+            if generated:
+                keywords, source = generated, 'llm'
+        metrics.incr(f'keywords.{source}')
+
+        return {
+            'keywords': keywords,
+            'topics': ','.join(result['topics']) or None,
+            'source': source,
+            'confidence': result['confidence']
+        }
+
+    def call_model(self, content: str) -> str:
+        return ai_processor.extract_keywords(content, strict=True)
+
+
+class IndexStage(AIStage):
+    """合并 AI 结果写入 ai_results"""
+
+    name = 'index'
+    requires = ('summarize', 'classify', 'keywords')
+
+    def on_start(self, ctx: StageContext):
+        pass
+
+    def run(self, ctx: StageContext) -> Optional[Dict]:
+        db = ctx.db()
+        try:
+            item = db.get_item(ctx.item_id)
+            if not item:
+                raise StageError(f"Item {ctx.item_id} not found", retryable=False)
+
+            # 只重跑部分阶段时，其余字段沿用已有结果
+            existing = db.get_ai_result_by_item(ctx.item_id) or {}
+
+            def pick(stage: str, field: str):
+                if stage in ctx.outputs:
+                    return ctx.outputs[stage].get(field)
+                return existing.get(field)
+
+            summary = pick('summarize', 'summary')
+            category = pick('classify', 'category')
+            category_source = ctx.outputs['classify'].get('source') if 'classify' in ctx.outputs \
+                else existing.get('category_source')
+            keywords = pick('keywords', 'keywords')
+            topics = pick('keywords', 'topics')
+
+            importance_score = score_item(db, item, keywords, topics)
+
+            db.create_ai_result(
+                item_id=ctx.item_id,
+                user_id=ctx.user_id,
+                summary=summary,
+                category=category,
+                category_source=category_source,
+                keywords=keywords,
+                topics=topics,
+                importance_score=importance_score,
+                model_used=ai_processor.model,
+                processing_time_ms=int((time.time() - ctx.started_at) * 1000)
+            )
+            db.update_item_status(ctx.item_id, 'processed')
+        finally:
+            db.close()
+
+        logger.info(f"Successfully processed item {ctx.item_id}")
+
+        ai_result = {
+            'summary': summary,
+            'category': category,
+            'keywords': keywords,
+            'topics': topics,
+            'importance_score': importance_score
+        }
+        event_bus.publish(ctx.user_id, 'item.processed', {
+            'item_id': ctx.item_id,
+            'status': 'processed',
+            'ai_result': ai_result
+        })
+        return ai_result
+
+
+def create_default_pipeline(db_path: str = None) -> Pipeline:
+    """默认流水线（注册顺序即拓扑顺序）"""
+    return Pipeline([
+        FetchStage(),
+        DedupStage(),
+        SummarizeStage(),
+        ClassifyStage(),
+        KeywordsStage(),
+        IndexStage(),
+    ], db_path=db_path)
+
+
+# 全局实例
+pipeline = create_default_pipeline()
@@ -0,0 +1,99 @@
+"""
+Token 计数与分块
+
+优先使用 tiktoken（可选依赖）按模型编码精确计数；未安装时用本地估算：
+中日韩字符约 1 token / 字，其余按约 4 字符 / token。
+分块按段落 → 句子逐级切分，尽量不在句子中间断开。
+"""
+
+import re
+from functools import lru_cache
+from typing import List
+
+try:
+    import tiktoken
+except ImportError:  # 可选依赖
+    tiktoken = None
+
+_CJK = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]')
+_PARAGRAPHS = re.compile(r'\n\s*\n')
+_SENTENCES = re.compile(r'(?<=[。！？!?；;\n])|(?<=[.])\s+')
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+
+
+def count_tokens(text: str, model: str = 'gpt-4o-mini') -> int:
+    """估算文本 token 数"""
+    if not text:
+        return 0
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text, disallowed_special=()))
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = 'gpt-4o-mini') -> str:
+    """截断到不超过 max_tokens"""
+    if not text or count_tokens(text, model) <= max_tokens:
+        return text
+    if tiktoken is not None:
+        encoding = _encoding(model)
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+    # 二分查找最长前缀
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid], model) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
+
+
+def _split(text: str, max_tokens: int, model: str) -> List[str]:
+    """切成不超过 max_tokens 的片段：段落 → 句子 → 硬切"""
+    if count_tokens(text, model) <= max_tokens:
+        return [text]
+
+    for pattern in (_PARAGRAPHS, _SENTENCES):
+        parts = [p for p in pattern.split(text) if p and p.strip()]
+        if len(parts) > 1:
+            pieces = []
+            for part in parts:
+                pieces.extend(_split(part, max_tokens, model))
+            return pieces
+
+    pieces = []
+    while text:
+        head = truncate_tokens(text, max_tokens, model) or text[:1]
+        pieces.append(head)
+        text = text[len(head):]
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: int, model: str = 'gpt-4o-mini') -> List[str]:
+    """按 token 预算把长文本切成块（相邻小片段合并到同一块）"""
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for piece in _split(text, max_tokens, model):
+        piece = piece.strip()
+        # +1 预留换行分隔符
+        tokens = count_tokens(piece, model) + 1
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append('\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+
+    if current:
+        chunks.append('\n'.join(current))
+    return chunks
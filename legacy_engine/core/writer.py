@@ -0,0 +1,193 @@
+"""
+合并提交的单写线程（group commit）
+
+并发保存 / 处理时每个写操作各自提交，SQLite 的时间都花在 fsync 和争抢写锁
+（database is locked）上。GROUP_COMMIT=true 时，DatabaseManager 中标了
+group_commit 的写方法改为交给每个数据库一个的写线程：
+- 写线程从队列取操作，凑满 GROUP_COMMIT_MAX_OPS 个或等待 GROUP_COMMIT_WINDOW_MS
+  后在一个事务（BEGIN IMMEDIATE）里依次执行，一次提交。窗口默认 0：不额外等待，
+  只合并上一次提交期间排队的操作——并发越高批越大，单线程写入几乎不增加延迟
+- 每个操作在自己的 SAVEPOINT 里执行，失败（如去重唯一索引冲突）只回滚自己
+- 调用方拿到 Future，事务提交后才解析为操作的返回值或异常
+- 拿不到写锁 / 提交遇到 busy 时整批退避重试
+
+走写线程的是请求和流水线路径上的全部写方法：保存 / 去重计数 / 幂等键、抓取状态和
+正文、流水线检查点、分块摘要和关键词语料、AI 结果 / 摘要、标签的增删和批量打标签。
+离线维护的批量写入（extract_keywords 的 save_keywords、rescore 的
+update_importance_scores / refresh_rank_keys）和首次创建默认用户仍在调用方连接上直接
+提交：它们不与请求并发、单次写很多行，放进写线程反而会长时间占住批次。
+
+写线程之外仍可直接写库（其他进程、维护脚本），busy 重试保证不会因此失败。
+调用方不要在自己的连接上持有未提交的写事务时等待 Future，否则写线程拿不到锁。
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from core.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 写线程连接的 busy_timeout（毫秒），超时后由写线程自己退避重试
+BUSY_TIMEOUT_MS = 1000
+
+
+def is_busy(error: Exception) -> bool:
+    """写锁被占用（database is locked / busy）"""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+
+class GroupCommitWriter:
+    """单写线程：批量执行写操作，一个事务提交"""
+
+    def __init__(
+        self,
+        db_path: str,
+        window_ms: float = None,
+        max_ops: int = None,
+        retries: int = None
+    ):
+        self.db_path = db_path
+        self.window = (Config.GROUP_COMMIT_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_ops = max_ops or Config.GROUP_COMMIT_MAX_OPS
+        self.retries = Config.GROUP_COMMIT_RETRIES if retries is None else retries
+        self.batches = 0
+        self.ops = 0
+        self.busy_retries = 0
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='group-commit-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        提交写操作：fn(db, *args, **kwargs) 在写线程上执行
+
+        db 是写线程自己的 DatabaseManager（batched=True，方法内不提交）。
+        """
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def execute(self, sql: str, params=()) -> Future:
+        """单条写 SQL，Future 解析为 lastrowid"""
+        return self.submit(lambda db: db.conn.execute(sql, params).lastrowid)
+
+    def close(self):
+        """处理完队列中已有的操作后停止"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self) -> Dict:
+        return {
+            'batches': self.batches,
+            'ops': self.ops,
+            'ops_per_batch': round(self.ops / self.batches, 2) if self.batches else 0.0,
+            'busy_retries': self.busy_retries,
+            'queued': self._queue.qsize(),
+        }
+
+    # ============================================
+    # 写线程
+    # ============================================
+
+    def _run(self):
+        from core.database import DatabaseManager
+
+        db = DatabaseManager(self.db_path, batched=True)
+        db.conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        try:
+            while True:
+                op = self._queue.get()
+                if op is None:
+                    break
+                batch, stop = self._collect(op)
+                self._commit_batch(db, batch)
+                if stop:
+                    break
+        finally:
+            db.close()
+
+    def _collect(self, first) -> tuple:
+        """从第一个操作起凑一批：满 max_ops 或窗口到期为止"""
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_ops:
+            remaining = deadline - time.monotonic()
+            try:
+                op = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if op is None:
+                return batch, True
+            batch.append(op)
+        return batch, False
+
+    def _commit_batch(self, db, batch: List[tuple]):
+        results: List[tuple] = []
+        for attempt in range(self.retries + 1):
+            try:
+                db.conn.execute("BEGIN IMMEDIATE")
+                results = [self._apply(db, n, op) for n, op in enumerate(batch)]
+                db.conn.commit()
+                break
+            except Exception as e:
+                if db.conn.in_transaction:
+                    db.conn.rollback()
+                if not is_busy(e) or attempt == self.retries:
+                    logger.error(f"Group commit failed ({len(batch)} ops): {e}")
+                    results = [(future, None, e) for future, *_ in batch]
+                    break
+                self.busy_retries += 1
+                time.sleep(min(0.5, 0.01 * 2 ** attempt))
+
+        self.batches += 1
+        self.ops += len(batch)
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    @staticmethod
+    def _apply(db, n: int, op: tuple) -> tuple:
+        """在 SAVEPOINT 里执行一个操作；busy 向上抛出（整批重试），其他异常只回滚该操作"""
+        future, fn, args, kwargs = op
+        db.conn.execute(f"SAVEPOINT op{n}")
+        try:
+            result = fn(db, *args, **kwargs)
+        except Exception as e:
+            if is_busy(e):
+                raise
+            db.conn.execute(f"ROLLBACK TO op{n}")
+            db.conn.execute(f"RELEASE op{n}")
+            return future, None, e
+        db.conn.execute(f"RELEASE op{n}")
+        return future, result, None
+
+
+_writers: Dict[str, GroupCommitWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path: str) -> Optional[GroupCommitWriter]:
+    """数据库对应的写线程（GROUP_COMMIT 关闭时为 None）"""
+    if not Config.GROUP_COMMIT:
+        return None
+    writer = _writers.get(db_path)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(db_path)
+            if writer is None:
+                writer = _writers[db_path] = GroupCommitWriter(db_path)
+    return writer
+
+
+def writer_stats() -> Dict[str, Dict]:
+    """各写线程的统计"""
+    return {path: writer.stats() for path, writer in list(_writers.items())}
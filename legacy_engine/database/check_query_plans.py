@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列表筛选查询计划检查
+
+对 get_items / get_items_count / get_facets 的常用筛选组合，记录 DatabaseManager
+实际执行的 SQL（参数已展开），逐条 EXPLAIN QUERY PLAN：
+- 出现全表 / 全索引扫描（SCAN）视为失败，退出码 1
+- 需要临时 B 树对原始行排序 / 分组（USE TEMP B-TREE）的只提示，不算失败
+
+不给数据库路径时生成一个临时数据集并 ANALYZE（查询计划依赖统计信息）。
+tests/test_query_plans.py 用同样的 explain 检查 DatabaseManager 的全部读查询。
+
+用法:
+    python check_query_plans.py
+    python check_query_plans.py --items 100000 --verbose
+    python check_query_plans.py path/to/neofeed.db
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.database import DatabaseManager, COMPACT_FIELDS, FACETS
+
+SCHEMA_PATH = Path(__file__).resolve().parent / 'schema.sql'
+CATEGORIES = ["AI趋势", "产品思考", "技术分享", "设计", "知识管理", "创业", "其他"]
+SOURCES = ['web', 'wechat', 'telegram', 'manual', 'gpt']
+STATUSES = ['processed', 'processed', 'processed', 'pending', 'failed']
+DOMAINS = [f"site{n}.com" for n in range(50)]
+KEYWORDS = [f"词{n}" for n in range(500)]
+
+# 全表 / 全索引扫描
+_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW)')
+
+
+def build_db(items: int, seed: int = 42) -> str:
+    """生成临时数据集（直接批量写入）"""
+    path = os.path.join(tempfile.mkdtemp(prefix='neofeed_plans_'), 'neofeed.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_PATH.read_text(encoding='utf-8'))
+    conn.close()
+
+    db = DatabaseManager(path)
+    user_id = db.get_or_create_default_user()['id']
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    item_rows, ai_rows, keyword_rows = [], [], []
+    for n in range(1, items + 1):
+        source = rng.choice(SOURCES)
+        metadata = json.dumps({'domain': rng.choice(DOMAINS)}) if source == 'web' else None
+        created = (now - timedelta(seconds=rng.random() * 365 * 86400)).strftime('%Y-%m-%d %H:%M:%S')
+        item_rows.append((n, user_id, f"条目 {n}", "正文", source, metadata, rng.choice(STATUSES), created))
+        ai_rows.append((n, user_id, source, rng.choice(CATEGORIES), round(rng.random(), 3)))
+        # 词0 出现在大部分条目里（热门词），其余按长尾分布
+        chosen = {0} if rng.random() < 0.5 else set()
+        chosen.update(int(rng.paretovariate(1)) % len(KEYWORDS) for _ in range(3))
+        keyword_rows.extend((k + 1, n) for k in chosen)
+
+    with db.conn:
+        db.conn.executemany(
+            "INSERT INTO keywords (id, user_id, key, name) VALUES (?, ?, ?, ?)",
+            [(n + 1, user_id, k, k) for n, k in enumerate(KEYWORDS)]
+        )
+        db.conn.executemany("""
+            INSERT INTO items (id, user_id, title, content, source_type, source_metadata, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, item_rows)
+        db.conn.executemany("""
+            INSERT INTO ai_results (item_id, user_id, source_type, category, importance_score)
+            VALUES (?, ?, ?, ?, ?)
+        """, ai_rows)
+        db.conn.executemany("INSERT INTO item_keywords (keyword_id, item_id) VALUES (?, ?)", keyword_rows)
+    db.conn.execute("ANALYZE")
+    db.close()
+    return path
+
+
+def explain(db: DatabaseManager, call: Callable) -> List[Dict]:
+    """
+    执行 call，对其间执行的每条 SELECT（参数已展开）做 EXPLAIN QUERY PLAN
+
+    返回 [{'sql', 'plan', 'scans', 'sort'}]：scans 为全表 / 全索引扫描的计划行，
+    sort 表示需要临时 B 树对原始行排序 / 分组（分组后对少量分组排序不算）。
+    """
+    statements: List[str] = []
+    db.conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        db.conn.set_trace_callback(None)
+    return explain_statements(db.conn, statements)
+
+
+def explain_statements(conn: sqlite3.Connection, statements: List[str]) -> List[Dict]:
+    """对记录下的 SQL 中的 SELECT 逐条 EXPLAIN QUERY PLAN（结果格式同 explain）"""
+    results = []
+    for sql in statements:
+        if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            continue
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        grouped = ' GROUP BY ' in sql.upper()
+        results.append({
+            'sql': sql,
+            'plan': plan,
+            'scans': [line for line in plan if _SCAN.match(line)],
+            'sort': any('TEMP B-TREE' in line and not (grouped and 'ORDER BY' in line) for line in plan),
+        })
+    return results
+
+
+def cases(db: DatabaseManager, user_id: int, domain: str = 'site7.com',
+          hot_keyword: str = '词0', rare_keyword: str = '词300'):
+    """
+    (名称, 调用)；每组筛选同时检查列表页和总数
+
+    默认的域名 / 关键词对应 build_db 的数据集，其他数据集（如 generate_data.py
+    生成的）传入其中实际存在的值。
+    """
+    since = (datetime.utcnow() - timedelta(days=30)).strftime('%Y-%m-%d')
+    filter_sets = {
+        '无筛选': {},
+        'status': {'status': 'pending'},
+        'source_type': {'source_type': 'wechat'},
+        '时间范围': {'since': since},
+        'domain': {'domain': domain},
+        'category': {'category': '设计'},
+        'min_importance': {'min_importance': 0.9},
+        'keyword 热门': {'keyword': hot_keyword},
+        'keyword 长尾': {'keyword': rare_keyword},
+        'category + source_type': {'category': '设计', 'source_type': 'wechat'},
+        'source_type + 时间范围': {'source_type': 'web', 'since': since},
+        'status + category + min_importance': {'status': 'processed', 'category': '创业', 'min_importance': 0.5},
+        'domain + 时间范围': {'domain': domain, 'since': since},
+        'keyword + category': {'keyword': hot_keyword, 'category': '设计'},
+    }
+    for name, filters in filter_sets.items():
+        yield f"列表 {name}", lambda f=filters: db.get_items(user_id, limit=20, fields=COMPACT_FIELDS, **f)
+        yield f"深分页 {name}", lambda f=filters: db.get_items(user_id, limit=20, offset=200, fields=['id'], **f)
+        yield f"总数 {name}", lambda f=filters: db.get_items_count(user_id, **f)
+
+    dimensions = list(FACETS)
+    yield "分面 无筛选", lambda: db.get_facets(user_id, dimensions)
+    yield "分面 source_type", lambda: db.get_facets(user_id, dimensions, source_type='web')
+    yield "分面 category + 时间范围", lambda: db.get_facets(user_id, dimensions, category='设计', since=since)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列表筛选查询计划检查')
+    parser.add_argument('db_path', nargs='?', default=None, help='已有数据库（默认生成临时数据集）')
+    parser.add_argument('--items', type=int, default=20000, help='临时数据集条目数')
+    parser.add_argument('--verbose', action='store_true', help='打印每条查询的计划')
+    args = parser.parse_args()
+
+    db_path = args.db_path
+    if not db_path:
+        print(f"📦 生成临时数据集: {args.items} 条...")
+        db_path = build_db(args.items)
+
+    db = DatabaseManager(db_path)
+    user_id = db.get_or_create_default_user()['id']
+
+    failures, sorts, total = 0, 0, 0
+    for name, call in cases(db, user_id):
+        for query in explain(db, call):
+            total += 1
+            failures += bool(query['scans'])
+            sorts += query['sort']
+
+            mark = '❌' if query['scans'] else ('⚠️ ' if query['sort'] else '✅')
+            print(f"{mark} {name}")
+            if query['scans'] or args.verbose:
+                print(f"      {' '.join(query['sql'].split())[:200]}")
+                for line in query['plan']:
+                    print(f"      {line}")
+
+    db.close()
+    print(f"\n{total} 条查询：全表扫描 {failures}，临时排序 {sorts}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
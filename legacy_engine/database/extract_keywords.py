@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地批量提取关键词（不调用模型）
+
+按批读取条目正文，先计入关键词语料（文档频率），再写回 ai_results.keywords / topics。
+首次启用本地提取时先跑一遍 --corpus-only，让 IDF 基于全部已有条目。
+
+用法:
+    python extract_keywords.py [db_path]                # 只处理还没有关键词的条目
+    python extract_keywords.py --all --batch-size 500   # 全部重算
+    python extract_keywords.py --corpus-only            # 只建语料，不改 ai_results
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.database import DatabaseManager
+from core.keywords import extract_batch, jieba
+
+
+def _pending_filter(args) -> Tuple[str, str]:
+    """按参数给出 (JOIN, WHERE 条件)：默认只选还没有关键词的条目"""
+    if args.all or args.corpus_only:
+        return '', '1'
+    return "LEFT JOIN ai_results a ON a.item_id = i.id", "(a.keywords IS NULL OR a.keywords = '')"
+
+
+def count_items(db: DatabaseManager, args) -> int:
+    """待处理的条目数"""
+    join, where = _pending_filter(args)
+    total = db.conn.execute(f"SELECT COUNT(*) FROM items i {join} WHERE {where}").fetchone()[0]
+    return min(total, args.limit) if args.limit else total
+
+
+def iter_batches(db: DatabaseManager, args) -> Iterator[List[Tuple[int, int, str]]]:
+    """
+    按 ID 顺序分批取 (item_id, user_id, 正文)
+
+    每批一条查询连同正文一起读出（压缩存储的正文 LEFT JOIN item_contents 后在这里解压，
+    同 get_item），按上一批最后的 ID 继续，不逐条 get_item，也不一次把全部正文读进内存。
+    """
+    join, where = _pending_filter(args)
+    query = f"""
+        SELECT i.id, i.user_id, i.content, c.codec, c.dict_id, c.data
+        FROM items i
+        LEFT JOIN item_contents c ON c.item_id = i.id
+        {join}
+        WHERE i.id > ? AND {where}
+        ORDER BY i.id
+        LIMIT ?
+    """
+    last_id, remaining = 0, args.limit
+    while remaining is None or remaining > 0:
+        size = args.batch_size if remaining is None else min(args.batch_size, remaining)
+        rows = db.conn.execute(query, (last_id, size)).fetchall()
+        if not rows:
+            return
+        yield [
+            (item_id, user_id,
+             db.content_store.decompress(codec, dict_id, data) if codec else content or '')
+            for item_id, user_id, content, codec, dict_id, data in rows
+        ]
+        last_id = rows[-1][0]
+        if remaining is not None:
+            remaining -= len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地批量提取关键词')
+    parser.add_argument('db_path', nargs='?', default=None, help='数据库路径（默认 DATABASE_PATH）')
+    parser.add_argument('--all', action='store_true', help='重算全部条目（默认只处理没有关键词的）')
+    parser.add_argument('--corpus-only', action='store_true', help='只把条目计入语料')
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--limit', type=int, help='最多处理多少条')
+    parser.add_argument('--dry-run', action='store_true', help='只打印前几条结果，不写库')
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db_path)
+    try:
+        total = count_items(db, args)
+        if not total:
+            print("✅ 没有需要处理的条目")
+            return
+
+        print(f"🔑 {'建语料' if args.corpus_only else '提取关键词'}：{total} 条"
+              f"（分词: {'jieba' if jieba else 'n-gram'}）")
+
+        start = time.time()
+        done = 0
+        for batch in iter_batches(db, args):
+            docs = [(item_id, content) for item_id, _, content in batch]
+            results = extract_batch(db, docs, update_corpus=not args.dry_run)
+
+            if args.dry_run:
+                for (item_id, _, _), result in list(zip(batch, results))[:5]:
+                    print(f"   {item_id}: {','.join(result['keywords'])} "
+                          f"| 主题 {','.join(result['topics'])} | 置信度 {result['confidence']}")
+                return
+
+            if not args.corpus_only:
+                db.save_keywords([
+                    (item_id, user_id, ','.join(result['keywords']), ','.join(result['topics']) or None)
+                    for (item_id, user_id, _), result in zip(batch, results)
+                ])
+            done += len(batch)
+            print(f"   进度: {done}/{total}")
+
+        elapsed = time.time() - start
+        print(f"\n✅ 完成：{done} 条，耗时 {elapsed:.1f}s（{done / max(elapsed, 1e-6):.0f} 条/秒），"
+              f"语料 {db.get_keyword_doc_count()} 篇")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大规模测试数据生成
+
+生成 N 个用户、百万级条目（中 / 英文正文，长度按对数正态分布）及其 ai_results、
+标签、关键词索引、周报和处理日志，供基准测试 / 查询计划检查使用：
+- 固定种子：条目按 CHUNK_ITEMS 分块，每块用 (seed, 块号) 派生自己的 RNG，
+  同样的参数得到同样的数据，与并行进程数无关
+- 加载期间 journal_mode=OFF、synchronous=OFF，先删掉二级索引和触发器，
+  每块一个大事务 executemany 写入，写完再重建索引、触发器
+- 触发器维护的计数（change_counters / tags.item_count / keywords 计数）写完后用 SQL 一次汇总
+- --workers N：各进程把分到的块写进自己的分片库，最后 ATTACH 依次合并
+- 写完 ANALYZE 并把 user_version 设为当前 schema 版本，打开时不再跑迁移
+
+第 1 个用户的邮箱是默认用户邮箱，API 直接读到最大的那份数据。
+关键词语料（keyword_df）不生成，需要时运行 extract_keywords.py --corpus-only。
+
+用法:
+    python generate_data.py /tmp/neofeed_1m.db --items 1000000 --workers 4
+    python generate_data.py /tmp/small.db --items 20000 --users 3 --days 90 --force
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.classifier import CATEGORIES
+from core.database import DEFAULT_USER_EMAIL, make_preview
+from core.dedup import canonicalize_url, content_hash
+from core.importance import rank_key
+from core.migrations import SCHEMA_VERSION
+
+SCHEMA_PATH = Path(__file__).resolve().parent / 'schema.sql'
+
+# 每块条目数（RNG 派生和事务的单位）
+CHUNK_ITEMS = 10_000
+
+ZH_SENTENCES = [
+    "人工智能正在重塑个人生产力工具的形态。",
+    "产品的核心价值在于解决用户真实的痛点。",
+    "知识管理不是收集信息，而是形成洞察。",
+    "增长是系统性工程，留存比拉新更重要。",
+    "数据驱动的决策需要可靠的指标体系。",
+    "大语言模型让信息处理的成本大幅下降。",
+    "好的设计让复杂的功能看起来理所当然。",
+    "创业早期最重要的是找到产品与市场的契合点。",
+    "每周复盘一次，比每天记录更能看清趋势。",
+    "向量检索让语义搜索在个人笔记里变得可行。",
+    "工具的价值不在功能多少，而在是否融入日常流程。",
+    "团队协作的瓶颈往往是上下文的传递，而不是执行。",
+    "本文整理了近期阅读中印象最深的几个观点。",
+    "从用户访谈中可以看到，大家真正在意的是节省时间。",
+    "模型能力的提升正在改变软件的交互方式。",
+    "把输入变成输出，才是学习真正发生的时刻。",
+]
+
+EN_SENTENCES = [
+    "Large language models are changing how we read and write.",
+    "Retention matters more than acquisition for sustainable growth.",
+    "Good tools reduce the cost of capturing information.",
+    "Design is how it works, not just how it looks.",
+    "Most productivity systems fail because they are too complex to maintain.",
+    "The best products remove a step rather than add a feature.",
+    "Embedding search makes personal knowledge bases far more useful.",
+    "Weekly reviews turn scattered notes into a coherent picture.",
+    "Latency budgets should be set before the architecture is chosen.",
+    "Small teams win by shipping faster feedback loops.",
+    "Every abstraction leaks eventually, so keep the layers thin.",
+    "Reading widely is cheap; synthesizing what you read is the hard part.",
+]
+
+ZH_TITLES = ["深度解读", "观察", "笔记", "周刊", "访谈", "复盘", "实践", "思考"]
+EN_TITLES = ["Notes on", "Thoughts on", "A Guide to", "Lessons from", "Why", "Rethinking"]
+SUBJECTS = [
+    "AI Agent", "个人知识库", "产品增长", "RAG", "设计系统", "远程协作",
+    "SQLite", "用户留存", "Prompt Engineering", "创业融资", "效率工具", "LLM 评测",
+]
+KEYWORD_POOL = [
+    "AI", "GPT", "LLM", "Agent", "RAG", "向量数据库", "产品", "增长", "留存", "设计",
+    "用户体验", "知识管理", "效率", "自动化", "创业", "融资", "开源", "Python", "SQLite",
+    "Prompt", "多模态", "数据分析", "指标", "写作", "阅读", "复盘", "团队", "远程办公",
+    "搜索", "推荐", "商业模式", "定价", "SaaS", "移动端", "交互", "可视化", "隐私", "安全",
+]
+# 与 KEYWORD_POOL 不重叠（同一用户下关键词 / 主题共用 keywords 表的 key）
+TOPIC_POOL = ["人工智能", "产品策略", "用户增长", "交互设计", "个人知识管理", "创业公司", "软件工程", "生产力"]
+WECHAT_ACCOUNTS = ["产品经理思考", "机器之心", "少数派", "36氪", "人人都是产品经理", "晚点 LatePost"]
+AUTHORS = ["张三", "李四", "王五", "赵六", "Alex", "Sam"]
+
+# (来源, 权重)
+SOURCES = [('web', 50), ('wechat', 25), ('telegram', 10), ('manual', 10), ('gpt', 5)]
+STATUSES = [('processed', 85), ('pending', 10), ('failed', 5)]
+SENTIMENTS = ['positive', 'neutral', 'neutral', 'negative', None]
+TAG_NAMES = [
+    "待读", "精读", "灵感", "工作", "项目A", "项目B", "写作素材", "收藏",
+    "复盘", "方法论", "工具", "案例", "数据", "访谈", "引用", "长期",
+]
+TAG_CATEGORIES = ['topic', 'project', 'source']
+COLORS = ['#3b82f6', '#ef4444', '#10b981', '#f59e0b', '#8b5cf6', '#ec4899']
+TASKS = ['summarize', 'classify', 'extract_keywords']
+
+# 各表写入 / 合并的列（生成列 domain / original_url 不写）
+COLUMNS = {
+    'items': (
+        'id', 'user_id', 'title', 'content', 'preview', 'url', 'source_type', 'source_metadata',
+        'word_count', 'language', 'status', 'canonical_url', 'content_hash', 'duplicate_count',
+        'fetch_status', 'created_at', 'updated_at',
+    ),
+    'ai_results': (
+        'id', 'item_id', 'user_id', 'source_type', 'summary', 'category', 'category_source',
+        'sub_category', 'topics', 'keywords', 'importance_score', 'rank_key', 'sentiment',
+        'model_used', 'processing_time_ms', 'created_at', 'updated_at',
+    ),
+    'item_keywords': ('keyword_id', 'item_id', 'is_topic'),
+    'item_tags': ('item_id', 'tag_id', 'created_at'),
+    'processing_logs': (
+        'item_id', 'task_type', 'status', 'error_message', 'retry_count',
+        'processing_time_ms', 'created_at',
+    ),
+}
+
+
+def _insert_sql(table: str) -> str:
+    columns = COLUMNS[table]
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def _ts(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _cumulative(weights) -> List[float]:
+    total, result = 0.0, []
+    for w in weights:
+        total += w
+        result.append(total)
+    return result
+
+
+class Plan:
+    """生成参数（可 pickle，分给各进程）"""
+
+    def __init__(
+        self,
+        items: int,
+        users: int = 1,
+        days: int = 365,
+        content_length: int = 1500,
+        tags_per_user: int = 16,
+        keywords_per_user: int = 500,
+        seed: int = 42,
+        end: datetime = None
+    ):
+        self.items = items
+        self.users = max(users, 1)
+        self.days = max(days, 1)
+        self.content_length = content_length
+        self.tags_per_user = min(tags_per_user, len(TAG_NAMES) * 4)
+        self.keywords_per_user = max(keywords_per_user, len(KEYWORD_POOL))
+        self.seed = seed
+        self.end = end or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.start = self.end - timedelta(days=self.days)
+
+    @property
+    def chunks(self) -> int:
+        return math.ceil(self.items / CHUNK_ITEMS)
+
+    # 用户 k（从 1 起）的标签 / 关键词 ID 连续编号，各进程不查库即可引用
+    def tag_id(self, user_id: int, n: int) -> int:
+        return (user_id - 1) * self.tags_per_user + n + 1
+
+    def keyword_id(self, user_id: int, n: int) -> int:
+        return (user_id - 1) * self.keywords_per_user + n + 1
+
+    def keyword_name(self, n: int) -> str:
+        if n < len(KEYWORD_POOL):
+            return KEYWORD_POOL[n]
+        return f"{KEYWORD_POOL[n % len(KEYWORD_POOL)]}{n // len(KEYWORD_POOL)}"
+
+
+# ============================================
+# 逐块生成
+# ============================================
+
+def _content(rng: random.Random, length: int, english: bool) -> str:
+    """约 length 字符的正文：中文条目夹少量英文句子，按段落分隔"""
+    pool, other = (EN_SENTENCES, ZH_SENTENCES) if english else (ZH_SENTENCES, EN_SENTENCES)
+    avg = sum(map(len, pool)) / len(pool)
+    sentences = rng.choices(pool, k=max(1, int(length / avg)))
+    for n in range(0, len(sentences), 7):
+        if rng.random() < 0.15:
+            sentences[n] = rng.choice(other)
+    separator = ' ' if english else ''
+    paragraphs = [separator.join(sentences[n:n + 5]) for n in range(0, len(sentences), 5)]
+    return '\n\n'.join(paragraphs)
+
+
+def generate_chunk(plan: Plan, chunk: int) -> Dict[str, List[tuple]]:
+    """生成第 chunk 块的各表数据（条目 ID 连续）"""
+    rng = random.Random(f"{plan.seed}:{chunk}")
+    first = chunk * CHUNK_ITEMS + 1
+    last = min(first + CHUNK_ITEMS - 1, plan.items)
+    span = (plan.end - plan.start).total_seconds()
+
+    # 用户条目数长尾分布（用户 1 最多）
+    user_weights = _cumulative(1 / u for u in range(1, plan.users + 1))
+    source_weights = _cumulative(w for _, w in SOURCES)
+    status_weights = _cumulative(w for _, w in STATUSES)
+    vocab = plan.keywords_per_user - len(TOPIC_POOL)
+    keyword_weights = _cumulative(1 / (n + 1) for n in range(vocab))
+    domain_weights = _cumulative(1 / (n + 1) for n in range(200))
+    # 对数正态：中位数约为 content_length 的 0.6 倍，长尾到数万字
+    mu = math.log(max(plan.content_length, 50)) - 0.5
+
+    rows = {table: [] for table in COLUMNS}
+    for item_id in range(first, last + 1):
+        user_id = rng.choices(range(1, plan.users + 1), cum_weights=user_weights)[0]
+        source = rng.choices(SOURCES, cum_weights=source_weights)[0][0]
+        status = rng.choices(STATUSES, cum_weights=status_weights)[0][0]
+        english = rng.random() < 0.3
+        # 条目 ID 与保存时间同序
+        created = plan.start + timedelta(seconds=span * (item_id - rng.random()) / plan.items)
+
+        subject = rng.choice(SUBJECTS)
+        if english:
+            title = f"{rng.choice(EN_TITLES)} {subject} #{item_id}"
+        else:
+            title = f"{subject}{rng.choice(ZH_TITLES)} #{item_id}"
+        length = min(int(rng.lognormvariate(mu, 1.0)), 60_000)
+        content = f"{title}\n\n{_content(rng, length, english)}"
+
+        url, metadata, fetch_status = None, None, None
+        if source == 'web':
+            domain = f"site{rng.choices(range(200), cum_weights=domain_weights)[0]}.com"
+            url = f"https://{domain}/posts/{item_id}?utm_source=neofeed"
+            metadata = json.dumps({'domain': domain, 'original_url': url}, ensure_ascii=False)
+            fetch_status = 'fetched'
+        elif source == 'wechat':
+            url = f"https://mp.weixin.qq.com/s/{hashlib.md5(str(item_id).encode()).hexdigest()[:16]}"
+            metadata = json.dumps({'公众号': rng.choice(WECHAT_ACCOUNTS), '作者': rng.choice(AUTHORS)},
+                                  ensure_ascii=False)
+
+        created_at = updated_at = _ts(created)
+        if status != 'pending':
+            updated_at = _ts(created + timedelta(seconds=rng.uniform(2, 120)))
+
+        rows['items'].append((
+            item_id, user_id, title, content, make_preview(content), url, source, metadata,
+            len(content), 'en' if english else 'zh', status, canonicalize_url(url) if url else None,
+            content_hash(content), 1 if rng.random() < 0.03 else 0, fetch_status,
+            created_at, updated_at,
+        ))
+
+        if status == 'failed':
+            rows['processing_logs'].append((
+                item_id, 'summarize', 'failed', 'OpenAI API error: Request timed out',
+                rng.randint(1, 3), rng.randint(10_000, 60_000), updated_at,
+            ))
+            continue
+        if status == 'pending':
+            continue
+
+        # AI 结果：关键词按用户词表长尾分布，主题取自 TOPIC_POOL
+        chosen = set(rng.choices(range(vocab), cum_weights=keyword_weights, k=rng.randint(3, 6)))
+        topics = set(rng.sample(range(len(TOPIC_POOL)), rng.randint(1, 3)))
+        keyword_names = [plan.keyword_name(n) for n in sorted(chosen)]
+        topic_names = [TOPIC_POOL[n] for n in sorted(topics)]
+        importance = round(rng.betavariate(2, 5), 3)
+        summary = ''.join(rng.choices(ZH_SENTENCES, k=rng.randint(3, 6)))
+
+        rows['ai_results'].append((
+            item_id, item_id, user_id, source, summary, rng.choice(CATEGORIES),
+            'local' if rng.random() < 0.2 else 'llm', None, ','.join(topic_names),
+            ','.join(keyword_names), importance, rank_key(importance, created_at),
+            rng.choice(SENTIMENTS), 'gpt-4o-mini', rng.randint(800, 9000), updated_at, updated_at,
+        ))
+
+        # 关键词索引（与 DatabaseManager._index_keywords 一致）：主题词在词表末尾
+        for n in chosen:
+            rows['item_keywords'].append((plan.keyword_id(user_id, n), item_id, 0))
+        for n in topics:
+            rows['item_keywords'].append((plan.keyword_id(user_id, vocab + n), item_id, 1))
+
+        if rng.random() < 0.3:
+            for n in rng.sample(range(plan.tags_per_user), rng.randint(1, min(3, plan.tags_per_user))):
+                rows['item_tags'].append((item_id, plan.tag_id(user_id, n), updated_at))
+
+        for task in TASKS[:rng.randint(1, len(TASKS))]:
+            rows['processing_logs'].append((
+                item_id, task, 'success', None, 0, rng.randint(300, 5000), updated_at,
+            ))
+
+    return rows
+
+
+def write_chunk(conn: sqlite3.Connection, rows: Dict[str, List[tuple]]):
+    with conn:
+        for table, values in rows.items():
+            conn.executemany(_insert_sql(table), values)
+
+
+# ============================================
+# 加载
+# ============================================
+
+def _open_for_load(path: str) -> Tuple[sqlite3.Connection, List[str]]:
+    """建库并进入加载模式，返回连接和被删掉的索引 / 触发器定义（稍后重建）"""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA_PATH.read_text(encoding='utf-8'))
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -262144")  # 256MB
+    conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+
+    deferred = [row for row in conn.execute("""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE type IN ('index', 'trigger') AND sql IS NOT NULL
+    """)]
+    for kind, name, _ in deferred:
+        conn.execute(f"DROP {kind.upper()} {name}")
+    return conn, [sql for _, _, sql in deferred]
+
+
+def _build_shard(plan: Plan, chunks: List[int], path: str) -> str:
+    """子进程：把分到的块写进分片库"""
+    conn, _ = _open_for_load(path)
+    for chunk in chunks:
+        write_chunk(conn, generate_chunk(plan, chunk))
+    conn.close()
+    return path
+
+
+def _merge_shard(conn: sqlite3.Connection, path: str):
+    conn.execute("ATTACH DATABASE ? AS shard", (path,))
+    with conn:
+        for table, columns in COLUMNS.items():
+            names = ', '.join(columns)
+            conn.execute(f"INSERT INTO main.{table} ({names}) SELECT {names} FROM shard.{table}")
+    conn.execute("DETACH DATABASE shard")
+
+
+def _insert_users(conn: sqlite3.Connection, plan: Plan):
+    created = _ts(plan.start)
+    with conn:
+        conn.executemany("""
+            INSERT INTO users (id, email, telegram_id, telegram_username, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (u, DEFAULT_USER_EMAIL if u == 1 else f"user{u}@neofeed.local", str(100_000_000 + u),
+             f"neofeed_user{u}", created, created)
+            for u in range(1, plan.users + 1)
+        ])
+        tag_names = [TAG_NAMES[n % len(TAG_NAMES)] + (str(n // len(TAG_NAMES)) if n >= len(TAG_NAMES) else '')
+                     for n in range(plan.tags_per_user)]
+        conn.executemany("""
+            INSERT INTO tags (id, user_id, name, category, color, created_at) VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (plan.tag_id(u, n), u, name, TAG_CATEGORIES[n % len(TAG_CATEGORIES)], COLORS[n % len(COLORS)], created)
+            for u in range(1, plan.users + 1) for n, name in enumerate(tag_names)
+        ])
+        # 词表末尾 len(TOPIC_POOL) 个位置留给主题词
+        conn.executemany("INSERT INTO keywords (id, user_id, key, name) VALUES (?, ?, ?, ?)", [
+            (plan.keyword_id(u, n), u, name.lower(), name)
+            for u in range(1, plan.users + 1)
+            for n, name in enumerate(
+                [plan.keyword_name(n) for n in range(plan.keywords_per_user - len(TOPIC_POOL))] + TOPIC_POOL
+            )
+        ])
+
+
+def _insert_reports(conn: sqlite3.Connection, plan: Plan):
+    """每个用户每周一份周报，收录当周重要性最高的 20 条"""
+    with conn:
+        for user_id in range(1, plan.users + 1):
+            week = plan.start
+            while week + timedelta(days=7) <= plan.end:
+                week_end = week + timedelta(days=7)
+                by_category = dict(conn.execute("""
+                    SELECT a.category, COUNT(*) FROM items i JOIN ai_results a ON a.item_id = i.id
+                    WHERE i.user_id = ? AND i.created_at >= ? AND i.created_at < ?
+                    GROUP BY a.category
+                """, (user_id, _ts(week), _ts(week_end))).fetchall())
+                total = sum(by_category.values())
+                if total:
+                    label = f"{week:%Y.%m.%d}–{week_end - timedelta(days=1):%Y.%m.%d}"
+                    report_id = conn.execute("""
+                        INSERT INTO weekly_reports
+                        (user_id, week_start, week_end, week_range, title, content, summary,
+                         stats, item_count, status, created_at, published_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'published', ?, ?)
+                    """, (
+                        user_id, f"{week:%Y-%m-%d}", f"{week_end - timedelta(days=1):%Y-%m-%d}", label,
+                        f"第{week.isocalendar()[1]}周知识周报", f"# {label}\n\n本周共收藏 {total} 条。",
+                        f"本周共收藏 {total} 条。", json.dumps({'total': total, 'by_category': by_category},
+                                                      ensure_ascii=False),
+                        total, _ts(week_end), _ts(week_end),
+                    )).lastrowid
+                    conn.execute("""
+                        INSERT INTO report_items (report_id, item_id, cluster_name, created_at)
+                        SELECT ?, i.id, a.category, ? FROM items i JOIN ai_results a ON a.item_id = i.id
+                        WHERE i.user_id = ? AND i.created_at >= ? AND i.created_at < ?
+                        ORDER BY a.importance_score DESC, i.id LIMIT 20
+                    """, (report_id, _ts(week_end), user_id, _ts(week), _ts(week_end)))
+                week = week_end
+
+
+def _finish(conn: sqlite3.Connection, deferred: List[str], plan: Plan):
+    """重建索引 / 触发器，汇总计数，生成周报，ANALYZE"""
+    for sql in deferred:
+        conn.execute(sql)
+
+    with conn:
+        conn.execute("""
+            INSERT INTO change_counters (user_id, version)
+            SELECT user_id, COUNT(*) FROM (
+                SELECT user_id FROM items UNION ALL SELECT user_id FROM ai_results
+            ) GROUP BY user_id
+        """)
+        conn.execute("""
+            UPDATE tags SET item_count = (SELECT COUNT(*) FROM item_tags t WHERE t.tag_id = tags.id)
+        """)
+        conn.execute("""
+            UPDATE keywords SET
+                item_count = (SELECT COUNT(*) FROM item_keywords k WHERE k.keyword_id = keywords.id),
+                topic_count = (SELECT COUNT(*) FROM item_keywords k
+                               WHERE k.keyword_id = keywords.id AND k.is_topic)
+        """)
+
+    _insert_reports(conn, plan)
+    conn.execute("ANALYZE")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def generate(path: str, plan: Plan, workers: int = 1, progress: bool = False) -> Dict[str, int]:
+    """生成数据库（path 不能已存在），返回各表行数"""
+    if os.path.exists(path):
+        raise FileExistsError(path)
+
+    conn, deferred = _open_for_load(path)
+    _insert_users(conn, plan)
+
+    chunks = list(range(plan.chunks))
+    if workers > 1 and len(chunks) > 1:
+        shard_dir = tempfile.mkdtemp(prefix='neofeed_shards_', dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            # 连续的块分给同一个分片，按分片顺序合并后条目仍按 ID 递增写入
+            size = math.ceil(len(chunks) / workers)
+            groups = [chunks[n:n + size] for n in range(0, len(chunks), size)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                shards = pool.map(_build_shard, [plan] * len(groups), groups,
+                                  [os.path.join(shard_dir, f"shard{n}.db") for n in range(len(groups))])
+                for n, shard in enumerate(shards):
+                    _merge_shard(conn, shard)
+                    os.remove(shard)
+                    if progress:
+                        print(f"   合并分片 {n + 1}/{len(groups)}")
+        finally:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+    else:
+        for chunk in chunks:
+            write_chunk(conn, generate_chunk(plan, chunk))
+            if progress and (chunk + 1) % 10 == 0:
+                print(f"   {min((chunk + 1) * CHUNK_ITEMS, plan.items)}/{plan.items}")
+
+    if progress:
+        print("🔧 重建索引 / 触发器、汇总计数、生成周报...")
+    _finish(conn, deferred, plan)
+
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ('users', 'items', 'ai_results', 'tags', 'item_tags', 'keywords', 'item_keywords',
+                      'weekly_reports', 'report_items', 'processing_logs')
+    }
+    conn.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='大规模测试数据生成')
+    parser.add_argument('db_path', help='输出数据库路径（不能是已有文件，除非 --force）')
+    parser.add_argument('--items', type=int, default=100_000, help='条目总数')
+    parser.add_argument('--users', type=int, default=1, help='用户数（条目数按长尾分布）')
+    parser.add_argument('--days', type=int, default=365, help='保存时间跨度（天，截止今天）')
+    parser.add_argument('--content-length', type=int, default=1500, help='正文平均长度（字符）')
+    parser.add_argument('--tags-per-user', type=int, default=16)
+    parser.add_argument('--keywords-per-user', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=1, help='并行生成的进程数（分片后合并）')
+    parser.add_argument('--force', action='store_true', help='覆盖已有文件')
+    args = parser.parse_args()
+
+    if os.path.exists(args.db_path):
+        if not args.force:
+            print(f"❌ {args.db_path} 已存在（覆盖请加 --force）")
+            sys.exit(1)
+        os.remove(args.db_path)
+
+    plan = Plan(
+        items=args.items, users=args.users, days=args.days, content_length=args.content_length,
+        tags_per_user=args.tags_per_user, keywords_per_user=args.keywords_per_user, seed=args.seed
+    )
+    print(f"📦 生成 {args.items} 条 / {args.users} 个用户 → {args.db_path}（{args.workers} 个进程）")
+    start = time.perf_counter()
+    counts = generate(args.db_path, plan, workers=args.workers, progress=True)
+    elapsed = time.perf_counter() - start
+
+    for table, count in counts.items():
+        print(f"   {table:<16} {count:>10}")
+    size = os.path.getsize(args.db_path) / 1024 / 1024
+    print(f"\n✅ 完成：{elapsed:.1f}s（{args.items / elapsed:.0f} 条/秒），数据库 {size:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
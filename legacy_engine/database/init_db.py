@@ -96,7 +96,11 @@ def verify_database(db_path='neofeed.db'):
         
         # 检查每个表的列
         tables = ['users', 'items', 'ai_results', 'tags', 'item_tags', 
-                  'weekly_reports', 'report_items', 'processing_logs']
+                  'weekly_reports', 'report_items', 'processing_logs',
+                  'idempotency_keys', 'content_dicts', 'item_contents',
+                  'change_counters', 'events', 'pipeline_checkpoints',
+                  'chunk_summaries', 'keyword_df', 'keyword_docs', 'keywords',
+                  'item_keywords']
         
         for table in tables:
             cursor.execute(f"PRAGMA table_info({table});")
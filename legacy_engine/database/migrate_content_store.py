@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文压缩存储迁移脚本
+把 items.content 中的正文搬到 item_contents（压缩），或反向还原
+
+用法:
+    python migrate_content_store.py [db_path] [--train-dict] [--vacuum]
+    python migrate_content_store.py [db_path] --inline
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.content_store import zstandard
+from core.database import DatabaseManager
+
+
+def train_dictionary(db: DatabaseManager, samples: int = 2000) -> int:
+    """从现有正文中随机抽样训练字典"""
+    rows = db.conn.execute("""
+        SELECT content FROM items
+        WHERE content != ''
+        ORDER BY RANDOM()
+        LIMIT ?
+    """, (samples,)).fetchall()
+
+    if len(rows) < 10:
+        print("⚠️  样本太少，跳过字典训练")
+        return None
+
+    if zstandard is None:
+        print("⚠️  未安装 zstandard，跳过字典训练（将使用 zlib）")
+        return None
+
+    dict_id = db.content_store.train_dictionary([r[0] for r in rows])
+    db.conn.commit()
+    print(f"📖 字典训练完成 (ID: {dict_id}, 样本 {len(rows)} 条)")
+    return dict_id
+
+
+def migrate_to_compressed(db: DatabaseManager, batch_size: int = 500):
+    """items.content → item_contents"""
+    dict_id = db.content_store.latest_dict_id()
+    moved = 0
+    raw_bytes = 0
+    last_id = 0
+    start = time.time()
+
+    while True:
+        rows = db.conn.execute("""
+            SELECT id, content FROM items
+            WHERE id > ? AND content != ''
+            ORDER BY id
+            LIMIT ?
+        """, (last_id, batch_size)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        for item_id, content in rows:
+            db.content_store.put(item_id, content, dict_id)
+            raw_bytes += len(content.encode('utf-8'))
+
+        db.conn.executemany(
+            "UPDATE items SET content = '' WHERE id = ?",
+            [(r[0],) for r in rows]
+        )
+        db.conn.commit()
+        moved += len(rows)
+        print(f"   ✅ 已迁移 {moved} 条", end='\r')
+
+    stored_bytes = db.conn.execute(
+        "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM item_contents"
+    ).fetchone()[0]
+
+    print(f"\n📦 迁移完成: {moved} 条，耗时 {time.time() - start:.1f}s")
+    if raw_bytes:
+        print(f"📉 本次原文 {raw_bytes / 1024 / 1024:.2f} MB，"
+              f"压缩存储共 {stored_bytes / 1024 / 1024:.2f} MB")
+
+
+def migrate_to_inline(db: DatabaseManager, batch_size: int = 500):
+    """item_contents → items.content"""
+    restored = 0
+
+    while True:
+        rows = db.conn.execute(
+            "SELECT item_id, codec, dict_id, data FROM item_contents LIMIT ?",
+            (batch_size,)
+        ).fetchall()
+        if not rows:
+            break
+
+        for item_id, codec, dict_id, data in rows:
+            content = db.content_store.decompress(codec, dict_id, data)
+            db.conn.execute("UPDATE items SET content = ? WHERE id = ?", (content, item_id))
+            db.conn.execute("DELETE FROM item_contents WHERE item_id = ?", (item_id,))
+
+        db.conn.commit()
+        restored += len(rows)
+        print(f"   ✅ 已还原 {restored} 条", end='\r')
+
+    print(f"\n📦 还原完成: {restored} 条")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='NeoFeed 正文压缩存储迁移')
+    parser.add_argument('db_path', nargs='?', default='neofeed.db')
+    parser.add_argument('--train-dict', action='store_true', help='迁移前训练 zstd 字典')
+    parser.add_argument('--samples', type=int, default=2000, help='字典训练样本数')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--inline', action='store_true', help='还原为 items.content 内联存储')
+    parser.add_argument('--vacuum', action='store_true', help='完成后 VACUUM 回收空间')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🗜️  NeoFeed 正文压缩存储迁移")
+    print("=" * 60)
+
+    db = DatabaseManager(args.db_path)
+    try:
+        if args.inline:
+            migrate_to_inline(db, args.batch_size)
+        else:
+            if args.train_dict:
+                train_dictionary(db, args.samples)
+            migrate_to_compressed(db, args.batch_size)
+
+        if args.vacuum:
+            print("🧹 VACUUM...")
+            db.conn.execute("VACUUM")
+    finally:
+        db.close()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重新执行流水线中的某个阶段
+
+对选中的条目重跑指定阶段（默认连同下游阶段，例如重跑 classify 后 index
+会把新分类写回 ai_results）；上游阶段复用已有检查点，不会重新抓取或重复调用模型。
+
+用法:
+    python rerun_stage.py classify [db_path]
+    python rerun_stage.py fetch --status failed --no-downstream
+    python rerun_stage.py summarize --ids 12,15,18
+    python rerun_stage.py --list
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.database import DatabaseManager
+from core.stages import create_default_pipeline
+
+
+def select_items(db: DatabaseManager, args) -> list:
+    """按参数选出条目 ID"""
+    if args.ids:
+        return [int(x) for x in args.ids.split(',') if x.strip()]
+
+    query = "SELECT i.id FROM items i"
+    params = []
+    if args.failed_only:
+        # 只挑该阶段失败（或被上游失败跳过）的条目
+        query += """
+            JOIN pipeline_checkpoints c ON c.item_id = i.id
+            WHERE c.stage = ? AND c.status IN ('failed', 'skipped')
+        """
+        params.append(args.stage)
+    else:
+        query += " WHERE 1 = 1"
+    if args.status:
+        query += " AND i.status = ?"
+        params.append(args.status)
+    query += " ORDER BY i.id"
+    if args.limit:
+        query += " LIMIT ?"
+        params.append(args.limit)
+
+    return [row[0] for row in db.conn.execute(query, params).fetchall()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='重新执行流水线阶段')
+    parser.add_argument('stage', nargs='?', help='阶段名')
+    parser.add_argument('db_path', nargs='?', default=None, help='数据库路径（默认 DATABASE_PATH）')
+    parser.add_argument('--ids', help='逗号分隔的条目 ID')
+    parser.add_argument('--status', help='只处理该 items.status 的条目')
+    parser.add_argument('--failed-only', action='store_true', help='只处理该阶段失败/跳过的条目')
+    parser.add_argument('--limit', type=int, help='最多处理多少条')
+    parser.add_argument('--no-downstream', action='store_true', help='不重跑下游阶段')
+    parser.add_argument('--list', action='store_true', help='列出所有阶段')
+    args = parser.parse_args()
+
+    pipeline = create_default_pipeline(args.db_path)
+
+    if args.list or not args.stage:
+        print("📋 流水线阶段:")
+        for name, stage in pipeline.stages.items():
+            requires = ', '.join(stage.requires) or '-'
+            print(f"   {name:<10} 依赖: {requires:<30} {stage.executor} × {pipeline.concurrency(name)}")
+        return
+
+    if args.stage not in pipeline.stages:
+        print(f"❌ 未知阶段: {args.stage}")
+        sys.exit(1)
+
+    db = DatabaseManager(args.db_path)
+    try:
+        item_ids = select_items(db, args)
+    finally:
+        db.close()
+
+    if not item_ids:
+        print("✅ 没有需要处理的条目")
+        return
+
+    stages = [args.stage] if args.no_downstream else pipeline.downstream(args.stage)
+    print(f"🔄 重跑 {' → '.join(stages)}，共 {len(item_ids)} 条")
+
+    start = time.time()
+    futures = []
+    # 分批查询所属用户，避免超出 SQLite 参数上限
+    for i in range(0, len(item_ids), 500):
+        futures += pipeline.rerun(args.stage, item_ids[i:i + 500], downstream=not args.no_downstream)
+
+    succeeded = failed = 0
+    for n, future in enumerate(futures, 1):
+        result = future.result()
+        if result['success']:
+            succeeded += 1
+        else:
+            failed += 1
+            print(f"   ⚠️  条目 {result['item_id']}: {result['errors']}")
+        if n % 100 == 0:
+            print(f"   进度: {n}/{len(futures)}")
+
+    print(f"\n✅ 完成：成功 {succeeded}，失败 {failed}，耗时 {time.time() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重算重要性评分
+
+评分公式或权重（IMPORTANCE_WEIGHTS）变更后、或定期（时间衰减）运行：
+按用户一次取出全部条目的特征批量计算（有 NumPy 时向量化），
+分批事务写回 ai_results.importance_score（同时刷新精选排序键 rank_key）。
+只改了 RANK_HALF_LIFE_DAYS 时用 --rank-only，不重算评分只刷新排序键。
+
+用法:
+    python rescore.py [db_path]
+    python rescore.py --user 1 --batch-size 5000
+    python rescore.py --dry-run
+    python rescore.py --rank-only
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import Config
+from core.database import DatabaseManager
+from core.importance import np, parse_weights, score_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='重算重要性评分')
+    parser.add_argument('db_path', nargs='?', default=None, help='数据库路径（默认 DATABASE_PATH）')
+    parser.add_argument('--user', type=int, help='只重算该用户')
+    parser.add_argument('--batch-size', type=int, default=5000, help='每个写事务的条数')
+    parser.add_argument('--dry-run', action='store_true', help='只计算不写库')
+    parser.add_argument('--rank-only', action='store_true', help='只按当前半衰期刷新排序键')
+    args = parser.parse_args()
+
+    if args.rank_only:
+        db = DatabaseManager(args.db_path)
+        try:
+            start = time.perf_counter()
+            updated = db.refresh_rank_keys(args.user)
+            print(f"✅ 已刷新 {updated} 条排序键（半衰期 {Config.RANK_HALF_LIFE_DAYS} 天，"
+                  f"{(time.perf_counter() - start) * 1000:.0f} ms）")
+        finally:
+            db.close()
+        return
+
+    weights = parse_weights(Config.IMPORTANCE_WEIGHTS)
+    print(f"⚖️  权重: {', '.join(f'{k}={v}' for k, v in weights.items())}"
+          f"（计算: {'NumPy' if np is not None else '逐条'}）")
+
+    db = DatabaseManager(args.db_path)
+    try:
+        if args.user:
+            users = [args.user]
+        else:
+            users = [row[0] for row in db.conn.execute("SELECT id FROM users ORDER BY id")]
+
+        total = 0
+        for user_id in users:
+            start = time.perf_counter()
+            # 只有已处理（有 ai_results）的条目需要写回，但画像用全部条目
+            rows = db.get_scoring_rows(user_id)
+            scores = score_rows(rows, weights)
+            computed = time.perf_counter() - start
+
+            updates = [
+                (row['item_id'], score) for row, score in zip(rows, scores)
+                if row['has_result']
+            ]
+            if not updates:
+                continue
+
+            if not args.dry_run:
+                for i in range(0, len(updates), args.batch_size):
+                    db.update_importance_scores(updates[i:i + args.batch_size])
+
+            values = sorted(score for _, score in updates)
+            print(f"   用户 {user_id}: {len(updates)} 条，计算 {computed * 1000:.0f} ms，"
+                  f"总计 {(time.perf_counter() - start) * 1000:.0f} ms | "
+                  f"p10 {values[len(values) // 10]:.3f} / p50 {values[len(values) // 2]:.3f} / "
+                  f"p90 {values[len(values) * 9 // 10]:.3f}")
+            total += len(updates)
+
+        print(f"\n✅ {'试算' if args.dry_run else '已更新'} {total} 条")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
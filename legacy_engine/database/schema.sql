@@ -33,11 +33,19 @@ CREATE TABLE items (
     -- 内容信息
     title TEXT,                    -- 标题（可为空）
     content TEXT NOT NULL,         -- 原文内容（必填）
+    preview TEXT,                  -- 内容预览（前 200 字，列表展示用）
     url TEXT,                      -- 原始链接（可为空）
     
     -- 来源信息
     source_type TEXT NOT NULL CHECK(source_type IN ('telegram', 'wechat', 'web', 'gpt', 'manual')),
     source_metadata TEXT,          -- JSON格式：{"公众号": "xxx", "作者": "xxx"}
+    -- 从 source_metadata 派生的生成列（VIRTUAL，不占表空间；domain 有索引）
+    domain TEXT GENERATED ALWAYS AS (
+        CASE WHEN json_valid(source_metadata) THEN json_extract(source_metadata, '$.domain') END
+    ) VIRTUAL,
+    original_url TEXT GENERATED ALWAYS AS (
+        CASE WHEN json_valid(source_metadata) THEN json_extract(source_metadata, '$.original_url') END
+    ) VIRTUAL,
     
     -- 元数据
     word_count INTEGER,            -- 字数统计
@@ -46,6 +54,16 @@ CREATE TABLE items (
     -- 状态管理
     status TEXT DEFAULT 'pending' CHECK(status IN ('pending', 'processed', 'failed')),
     
+    -- 去重键
+    canonical_url TEXT,            -- 规范化 URL（去追踪参数、排序 query）
+    content_hash TEXT,             -- 内容 SHA-256（折叠空白后）
+    duplicate_count INTEGER DEFAULT 0,  -- 重复保存次数（重要性评分用）
+    
+    -- 后台抓取（URL 先入库后抓取）
+    fetch_status TEXT CHECK(fetch_status IN ('queued', 'fetching', 'fetched', 'failed')),
+    fetch_attempts INTEGER DEFAULT 0,
+    fetch_error TEXT,
+    
     -- 时间戳
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
@@ -54,11 +72,22 @@ CREATE TABLE items (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
--- 索引优化
-CREATE INDEX idx_items_user ON items(user_id);
+-- 索引优化（列表筛选用复合索引，均以 user_id 开头、按 created_at 倒序）
 CREATE INDEX idx_items_created ON items(created_at DESC);
-CREATE INDEX idx_items_status ON items(status);
-CREATE INDEX idx_items_source_type ON items(source_type);
+CREATE INDEX idx_items_user_created ON items(user_id, created_at DESC, status);  -- 无筛选 / 时间范围 / 统计
+CREATE INDEX idx_items_user_status ON items(user_id, status, created_at DESC);
+CREATE INDEX idx_items_user_source ON items(user_id, source_type, created_at DESC);
+CREATE INDEX idx_items_user_domain ON items(user_id, domain, created_at DESC);
+
+-- 去重唯一索引
+CREATE UNIQUE INDEX idx_items_user_canonical_url
+    ON items(user_id, canonical_url) WHERE canonical_url IS NOT NULL;
+CREATE UNIQUE INDEX idx_items_user_content_hash
+    ON items(user_id, content_hash) WHERE content_hash IS NOT NULL;
+
+-- 待抓取条目（重启后恢复队列）
+CREATE INDEX idx_items_fetch_pending
+    ON items(fetch_status) WHERE fetch_status IN ('queued', 'fetching');
 
 -- ============================================
 -- 3. AI 处理结果表 (ai_results)
@@ -67,18 +96,21 @@ CREATE TABLE ai_results (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     item_id INTEGER NOT NULL UNIQUE,  -- 一对一关系
     user_id INTEGER NOT NULL,          -- 冗余字段，便于查询
+    source_type TEXT,                  -- 冗余 items.source_type，精选信息流按来源筛选
     
     -- AI 生成内容
     summary TEXT,                      -- 摘要（100-300字）
     
     -- 分类信息（逗号分隔）
     category TEXT,                     -- 主分类："AI趋势"
+    category_source TEXT CHECK(category_source IN ('llm', 'local')),  -- 分类来源（NULL 为历史数据）
     sub_category TEXT,                 -- 次分类："产品应用"
     topics TEXT,                       -- 相关主题，逗号分隔："产品,设计,增长"
     keywords TEXT,                     -- 关键词，逗号分隔："AI,GPT,自动化"
     
     -- 评分
     importance_score REAL DEFAULT 0.0 CHECK(importance_score >= 0 AND importance_score <= 1),
+    rank_key REAL,                     -- 精选排序键：log2(重要性) + 保存天数 / 半衰期（core.importance.rank_key）
     sentiment TEXT CHECK(sentiment IN ('positive', 'neutral', 'negative', NULL)),
     
     -- AI 元信息
@@ -96,9 +128,12 @@ CREATE TABLE ai_results (
 
 -- 索引优化
 CREATE INDEX idx_ai_results_item ON ai_results(item_id);
-CREATE INDEX idx_ai_results_user ON ai_results(user_id);
-CREATE INDEX idx_ai_results_category ON ai_results(category);
-CREATE INDEX idx_ai_results_importance ON ai_results(importance_score DESC);
+CREATE INDEX idx_ai_results_user_importance ON ai_results(user_id, importance_score DESC);
+
+-- 精选信息流：Top N 为索引范围扫描，按分类 / 来源筛选各有一个
+CREATE INDEX idx_ai_results_rank ON ai_results(user_id, rank_key DESC, item_id DESC);
+CREATE INDEX idx_ai_results_category_rank ON ai_results(user_id, category, rank_key DESC, item_id DESC);
+CREATE INDEX idx_ai_results_source_rank ON ai_results(user_id, source_type, rank_key DESC, item_id DESC);
 
 -- ============================================
 -- 4. 标签表 (tags)
@@ -110,6 +145,7 @@ CREATE TABLE tags (
     category TEXT,                     -- 'topic', 'project', 'source'
     color TEXT DEFAULT '#3b82f6',      -- 颜色（hex）
     description TEXT,                  -- 标签描述
+    item_count INTEGER NOT NULL DEFAULT 0,  -- 关联条目数（触发器维护）
     
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     
@@ -136,7 +172,7 @@ CREATE TABLE item_tags (
 );
 
 CREATE INDEX idx_item_tags_item ON item_tags(item_id);
-CREATE INDEX idx_item_tags_tag ON item_tags(tag_id);
+CREATE INDEX idx_item_tags_tag_item ON item_tags(tag_id, item_id DESC);  -- 按标签列条目（新到旧）
 
 -- ============================================
 -- 6. 周报表 (weekly_reports)
@@ -226,8 +262,153 @@ CREATE INDEX idx_processing_logs_item ON processing_logs(item_id);
 CREATE INDEX idx_processing_logs_status ON processing_logs(status);
 CREATE INDEX idx_processing_logs_created ON processing_logs(created_at DESC);
 
+-- ============================================
+-- 9. 幂等键表 (idempotency_keys)
+-- ============================================
+CREATE TABLE idempotency_keys (
+    user_id INTEGER NOT NULL,
+    key TEXT NOT NULL,                 -- 客户端 Idempotency-Key 请求头
+    item_id INTEGER NOT NULL,          -- 首次请求创建的条目
+    
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (user_id, key),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_idempotency_keys_created ON idempotency_keys(created_at);
+
+-- ============================================
+-- 10. 正文压缩存储 (content_dicts / item_contents)
+-- CONTENT_STORE=compressed 时正文存这里，items.content 为空串
+-- ============================================
+CREATE TABLE content_dicts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    codec TEXT NOT NULL,               -- 'zstd'
+    data BLOB NOT NULL,                -- 训练好的压缩字典
+    
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE item_contents (
+    item_id INTEGER PRIMARY KEY,
+    codec TEXT NOT NULL,               -- 'zstd' / 'zlib'
+    dict_id INTEGER,                   -- 使用的字典（可为空）
+    raw_size INTEGER,                  -- 原文字节数
+    data BLOB NOT NULL,                -- 压缩后的正文
+    
+    FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE CASCADE,
+    FOREIGN KEY (dict_id) REFERENCES content_dicts(id)
+);
+
+-- ============================================
+-- 11. 数据变更计数 (change_counters)
+-- 每个用户一行，items / ai_results 任何写入都会 +1，用于 HTTP ETag
+-- ============================================
+CREATE TABLE change_counters (
+    user_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+-- ============================================
+-- 12. 事件表 (events)
+-- EVENT_BUS=sqlite 时用于跨 worker 推送处理状态，保留 1 小时
+-- ============================================
+CREATE TABLE events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    event TEXT NOT NULL,               -- 'item.status' / 'item.processed'
+    data TEXT NOT NULL,                -- JSON 负载
+    created_at REAL NOT NULL           -- Unix 时间戳
+);
+
+CREATE INDEX idx_events_created ON events(created_at);
+
+-- ============================================
+-- 13. 流水线检查点 (pipeline_checkpoints)
+-- 每个条目每个阶段一行，output 为阶段输出 JSON；重试时跳过已完成的阶段
+-- ============================================
+CREATE TABLE pipeline_checkpoints (
+    item_id INTEGER NOT NULL,
+    stage TEXT NOT NULL,               -- 阶段名：fetch / dedup / summarize ...
+    status TEXT NOT NULL CHECK(status IN ('queued', 'running', 'done', 'failed', 'skipped')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    output TEXT,                       -- JSON
+    error TEXT,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (item_id, stage),
+    FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_pipeline_checkpoints_unfinished
+    ON pipeline_checkpoints(status) WHERE status IN ('queued', 'running');
+
+-- ============================================
+-- 14. 分块摘要缓存 (chunk_summaries)
+-- 长文 map-reduce 摘要的中间结果，按分块内容哈希 + 模型缓存
+-- ============================================
+CREATE TABLE chunk_summaries (
+    chunk_hash TEXT NOT NULL,          -- 分块文本（含提示词版本）的 SHA-256
+    model TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    input_tokens INTEGER,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (chunk_hash, model)
+);
+
+-- ============================================
+-- 15. 关键词语料 (keyword_df / keyword_docs)
+-- 本地关键词提取的文档频率，随条目增量维护
+-- ============================================
+CREATE TABLE keyword_df (
+    term TEXT PRIMARY KEY,             -- 候选词（英文小写）
+    df INTEGER NOT NULL DEFAULT 0      -- 出现在多少个条目的候选词池中
+) WITHOUT ROWID;
+
+CREATE TABLE keyword_docs (
+    item_id INTEGER PRIMARY KEY,       -- 已计入语料的条目（避免重复计数）
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE CASCADE
+);
+
+-- ============================================
+-- 16. 关键词索引 (keywords / item_keywords)
+-- ai_results.keywords / topics 的规范化形式，按关键词筛选条目和统计走索引
+-- ============================================
+CREATE TABLE keywords (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    key TEXT NOT NULL,                 -- 规范化形式（去空白、英文小写）
+    name TEXT NOT NULL,                -- 展示用写法（首次出现时）
+    item_count INTEGER NOT NULL DEFAULT 0,   -- 关联条目数（触发器维护）
+    topic_count INTEGER NOT NULL DEFAULT 0,  -- 其中作为主题的条目数
+    
+    UNIQUE(user_id, key),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_keywords_user_count ON keywords(user_id, item_count DESC);
+CREATE INDEX idx_keywords_user_topic_count ON keywords(user_id, topic_count DESC);
+
+CREATE TABLE item_keywords (
+    keyword_id INTEGER NOT NULL,
+    item_id INTEGER NOT NULL,
+    is_topic INTEGER NOT NULL DEFAULT 0,     -- 是否出现在 topics 中
+    
+    PRIMARY KEY (keyword_id, item_id),       -- 关键词 → 条目
+    FOREIGN KEY (keyword_id) REFERENCES keywords(id) ON DELETE CASCADE,
+    FOREIGN KEY (item_id) REFERENCES items(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE INDEX idx_item_keywords_item ON item_keywords(item_id);  -- 条目 → 关键词
+
 -- ============================================
 -- 触发器：自动更新 updated_at
+-- （items / ai_results：语句自己更新了 updated_at 时不再补一次 UPDATE）
 -- ============================================
 
 -- users 表
@@ -240,6 +421,7 @@ END;
 -- items 表
 CREATE TRIGGER update_items_timestamp 
 AFTER UPDATE ON items
+WHEN NEW.updated_at IS OLD.updated_at
 BEGIN
     UPDATE items SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
@@ -247,10 +429,95 @@ END;
 -- ai_results 表
 CREATE TRIGGER update_ai_results_timestamp 
 AFTER UPDATE ON ai_results
+WHEN NEW.updated_at IS OLD.updated_at
 BEGIN
     UPDATE ai_results SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
 
+-- ============================================
+-- 触发器：变更计数
+-- ============================================
+
+CREATE TRIGGER bump_version_items_insert
+AFTER INSERT ON items
+BEGIN
+    INSERT INTO change_counters (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER bump_version_items_update
+AFTER UPDATE ON items
+BEGIN
+    INSERT INTO change_counters (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER bump_version_items_delete
+AFTER DELETE ON items
+BEGIN
+    INSERT INTO change_counters (user_id, version) VALUES (OLD.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER bump_version_ai_results_insert
+AFTER INSERT ON ai_results
+BEGIN
+    INSERT INTO change_counters (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER bump_version_ai_results_update
+AFTER UPDATE ON ai_results
+BEGIN
+    INSERT INTO change_counters (user_id, version) VALUES (NEW.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER bump_version_ai_results_delete
+AFTER DELETE ON ai_results
+BEGIN
+    INSERT INTO change_counters (user_id, version) VALUES (OLD.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+END;
+
+-- ============================================
+-- 触发器：关键词计数
+-- ============================================
+
+CREATE TRIGGER count_item_keywords_insert
+AFTER INSERT ON item_keywords
+BEGIN
+    UPDATE keywords SET
+        item_count = item_count + 1,
+        topic_count = topic_count + NEW.is_topic
+    WHERE id = NEW.keyword_id;
+END;
+
+CREATE TRIGGER count_item_keywords_delete
+AFTER DELETE ON item_keywords
+BEGIN
+    UPDATE keywords SET
+        item_count = item_count - 1,
+        topic_count = topic_count - OLD.is_topic
+    WHERE id = OLD.keyword_id;
+END;
+
+-- ============================================
+-- 触发器：标签计数
+-- ============================================
+
+CREATE TRIGGER count_item_tags_insert
+AFTER INSERT ON item_tags
+BEGIN
+    UPDATE tags SET item_count = item_count + 1 WHERE id = NEW.tag_id;
+END;
+
+CREATE TRIGGER count_item_tags_delete
+AFTER DELETE ON item_tags
+BEGIN
+    UPDATE tags SET item_count = item_count - 1 WHERE id = OLD.tag_id;
+END;
+
 -- ============================================
 -- 视图：便捷查询
 -- ============================================
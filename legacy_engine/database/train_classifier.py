@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+训练 / 评估本地分类器
+
+用 ai_results 中模型给出的分类训练朴素贝叶斯，保存到模型文件（服务进程检测到
+文件更新后自动重新加载）。--eval 先按比例留出测试集，报告准确率，以及不同置信度
+阈值下本地能直接回答的比例（即省下的模型调用）和 hybrid 模式的整体准确率。
+
+用法:
+    python train_classifier.py [db_path]
+    python train_classifier.py --eval --holdout 0.2
+    python train_classifier.py --eval --no-save --thresholds 0.6,0.8,0.9,0.95
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.classifier import NaiveBayesClassifier, load_samples, model_path
+from core.config import Config
+from core.database import DatabaseManager
+
+
+def evaluate(samples: list, args):
+    """留出法评估"""
+    rng = random.Random(args.seed)
+    shuffled = samples[:]
+    rng.shuffle(shuffled)
+    split = max(1, int(len(shuffled) * args.holdout))
+    test, train = shuffled[:split], shuffled[split:]
+
+    start = time.perf_counter()
+    model = NaiveBayesClassifier.train((text, label) for _, text, label in train)
+    train_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = [model.predict(text) for _, text, _ in test]
+    predict_us = (time.perf_counter() - start) / len(test) * 1e6
+
+    correct = [p[0] == label for p, (_, _, label) in zip(predictions, test)]
+    print(f"\n📊 留出评估：训练 {len(train)} 条，测试 {len(test)} 条，"
+          f"训练 {train_seconds:.1f}s，预测 {predict_us:.0f} µs/条")
+    print(f"   整体准确率: {sum(correct) / len(test):.1%}")
+
+    print(f"\n   {'阈值':<6}{'本地回答(省调用)':<18}{'本地准确率':<12}{'hybrid 准确率':<14}")
+    for threshold in (float(x) for x in args.thresholds.split(',')):
+        local = [ok for (_, conf), ok in zip(predictions, correct) if conf >= threshold]
+        coverage = len(local) / len(test)
+        local_acc = sum(local) / len(local) if local else 0.0
+        # 低于阈值的交给模型，按模型标签为准计为正确
+        hybrid_acc = (sum(local) + len(test) - len(local)) / len(test)
+        print(f"   {threshold:<8.2f}{coverage:<20.1%}{local_acc:<14.1%}{hybrid_acc:<14.1%}")
+
+    errors = Counter((label, p[0]) for p, (_, _, label), ok in zip(predictions, test, correct) if not ok)
+    if errors:
+        print("\n   常见误判（实际 → 预测）:")
+        for (actual, predicted), n in errors.most_common(5):
+            print(f"   {actual} → {predicted}: {n}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='训练 / 评估本地分类器')
+    parser.add_argument('db_path', nargs='?', default=None, help='数据库路径（默认 DATABASE_PATH）')
+    parser.add_argument('--eval', action='store_true', help='训练前先做留出评估')
+    parser.add_argument('--holdout', type=float, default=0.2, help='测试集比例')
+    parser.add_argument('--thresholds', default='0.5,0.7,0.8,0.9,0.95,0.99')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-save', action='store_true', help='不保存模型')
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db_path)
+    try:
+        samples = load_samples(db)
+        path = model_path(db.db_path)
+    finally:
+        db.close()
+
+    counts = Counter(label for _, _, label in samples)
+    print(f"🏷️  已标注条目 {len(samples)} 条: " +
+          ', '.join(f"{label} {n}" for label, n in counts.most_common()))
+    if len(samples) < Config.CATEGORY_MIN_SAMPLES:
+        print(f"❌ 样本不足 CATEGORY_MIN_SAMPLES={Config.CATEGORY_MIN_SAMPLES}")
+        sys.exit(1)
+
+    if args.eval:
+        evaluate(samples, args)
+
+    if args.no_save:
+        return
+
+    start = time.perf_counter()
+    model = NaiveBayesClassifier.train((text, label) for _, text, label in samples)
+    model.save(path)
+    print(f"\n✅ 已保存模型 {path}（{model.meta['features']} 个特征，"
+          f"{os.path.getsize(path) / 1024:.0f} KB，{time.perf_counter() - start:.1f}s）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3 @@
+"""
+本地测试桩服务（无需真实 API Key 和外网）
+"""
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地 Jina Reader 桩服务
+
+GET /<目标 URL> 按 Jina 的 JSON 格式（{"code": 200, "data": {...}}）返回
+固定的中文正文，可配置响应延迟、失败率和限流（429，见 stubs.faults），
+用于验证后台抓取和重试。
+
+用法:
+    python -m stubs.fake_jina --port 9200 --latency-ms 2000
+    python -m stubs.fake_jina --latency-ms 800 --jitter-ms 400 --error-rate 0.05 --rate-limit 20
+    JINA_API_URL=http://127.0.0.1:9200/ ...
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from stubs import faults
+
+PARAGRAPH = (
+    "信息过载的时代，收藏不等于阅读，阅读也不等于吸收。"
+    "一个好的个人信息系统应该尽量降低输入成本，把整理、分类和回顾交给自动化流程，"
+    "让人把注意力留给思考本身。"
+)
+
+
+def fake_page(url: str) -> dict:
+    """按 URL 生成确定的标题和正文（不同 URL 正文不同，避免被内容去重）"""
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]
+    return {
+        'title': f"示例文章 {digest}",
+        'url': url,
+        'content': f"# 示例文章 {digest}\n\n" + "\n\n".join([PARAGRAPH] * 5) + f"\n\n来源：{url}",
+    }
+
+
+class FakeJinaHandler(BaseHTTPRequestHandler):
+    """GET /<url>"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeJina/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        injected = self.server.faults
+        target = self.path.lstrip('/')
+
+        if not target.startswith(('http://', 'https://')):
+            self._json(400, {'code': 400, 'message': 'invalid url'})
+            return
+
+        status = injected.check()
+        if status == 429:
+            self._json(429, {'code': 429, 'message': 'rate limit exceeded'},
+                       {'Retry-After': str(injected.retry_after)})
+            return
+
+        injected.delay()
+        if status:
+            self._json(status, {'code': status, 'message': 'service unavailable'})
+            return
+
+        self._json(200, {'code': 200, 'status': 20000, 'data': fake_page(target)})
+
+
+class FakeJinaServer(ThreadingHTTPServer):
+    """可在测试/基准中嵌入启动的桩服务"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_ms: int = 0,
+                 error_rate: float = 0.0, jitter_ms: int = 0, rate_limit: float = 0, burst: int = None):
+        super().__init__((host, port), FakeJinaHandler)
+        self.faults = faults.Faults(latency_ms, jitter_ms, error_rate, 503, rate_limit, burst)
+
+    @property
+    def requests(self) -> int:
+        return self.faults.requests
+
+    @property
+    def errors(self) -> int:
+        return self.faults.errors
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> 'FakeJinaServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='本地 Jina Reader 桩服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9200)
+    faults.add_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeJinaServer(args.host, args.port, args.latency_ms, args.error_rate,
+                            args.jitter_ms, args.rate_limit, args.burst)
+    print(f"📄 Fake Jina listening on {server.base_url}")
+    server.serve_forever()
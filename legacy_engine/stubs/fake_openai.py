@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地 OpenAI Chat Completions 桩服务
+
+支持普通和 stream=True 两种响应，返回固定格式的中文摘要/分类/关键词。
+可配置首字节延迟、失败率（500）和限流（429 + Retry-After，见 stubs.faults），
+openai 客户端会按真实服务的方式重试。
+
+用法:
+    python -m stubs.fake_openai --port 9100 --token-delay-ms 20
+    python -m stubs.fake_openai --latency-ms 300 --jitter-ms 200 --error-rate 0.02 --rate-limit 50
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=sk-fake ...
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from stubs import faults
+
+SUMMARY = "这篇文章讨论了个人信息管理的核心问题。作者认为降低输入成本比功能丰富更重要。自动化处理和定期回顾是形成洞察的关键。"
+
+
+def fake_reply(messages) -> str:
+    """根据 system 提示返回对应类型的回复"""
+    system = ' '.join(m.get('content', '') for m in messages if m.get('role') == 'system')
+    if '分类' in system:
+        return "知识管理"
+    if '关键词' in system:
+        return "信息管理,自动化,知识管理,效率,AI"
+    return SUMMARY
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """/v1/chat/completions"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeOpenAI/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._json(404, {'error': {'message': 'not found'}})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        reply = fake_reply(request.get('messages', []))
+        model = request.get('model', 'gpt-4o-mini')
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        config = self.server.config
+        injected = self.server.faults
+
+        status = injected.check()
+        if status == 429:
+            self._json(429, {'error': {
+                'message': 'Rate limit reached for requests',
+                'type': 'requests',
+                'code': 'rate_limit_exceeded',
+            }}, {'Retry-After': str(injected.retry_after)})
+            return
+
+        injected.delay()
+        if status:
+            self._json(status, {'error': {'message': 'The server had an error', 'type': 'server_error'}})
+            return
+
+        if not request.get('stream'):
+            # 非流式：等整段生成完（与流式总耗时一致）再返回
+            tokens = -(-len(reply) // config['chars_per_token'])
+            time.sleep(tokens * config['token_delay_ms'] / 1000)
+            self._json(200, {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': reply},
+                    'finish_reason': 'stop',
+                }],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': len(reply), 'total_tokens': len(reply)},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta: dict, finish_reason=None):
+            payload = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        try:
+            chunk({'role': 'assistant', 'content': ''})
+            step = config['chars_per_token']
+            for i in range(0, len(reply), step):
+                time.sleep(config['token_delay_ms'] / 1000)
+                chunk({'content': reply[i:i + step]})
+            chunk({}, finish_reason='stop')
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端中途断开
+            self.server.cancelled_streams += 1
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """可在测试/基准中嵌入启动的桩服务"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_ms: int = 0,
+                 token_delay_ms: int = 20, chars_per_token: int = 2, error_rate: float = 0.0,
+                 jitter_ms: int = 0, rate_limit: float = 0, burst: int = None):
+        super().__init__((host, port), FakeOpenAIHandler)
+        self.config = {
+            'token_delay_ms': token_delay_ms,
+            'chars_per_token': chars_per_token,
+        }
+        self.faults = faults.Faults(latency_ms, jitter_ms, error_rate, 500, rate_limit, burst)
+        self.cancelled_streams = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'FakeOpenAIServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='本地 OpenAI 桩服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--token-delay-ms', type=int, default=20, help='流式每个 token 的间隔')
+    faults.add_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.host, args.port, args.latency_ms, args.token_delay_ms,
+                              error_rate=args.error_rate, jitter_ms=args.jitter_ms,
+                              rate_limit=args.rate_limit, burst=args.burst)
+    print(f"🤖 Fake OpenAI listening on {server.base_url}")
+    server.serve_forever()
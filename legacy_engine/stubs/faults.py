@@ -0,0 +1,80 @@
+"""
+桩服务的故障注入：延迟（含抖动）、失败率、限流
+
+两个桩服务共用。限流是令牌桶：每秒补充 rate_limit 个令牌，桶容量 burst，
+没有令牌时返回 429 并带 Retry-After（秒），和真实服务一样由客户端退避重试。
+"""
+
+import math
+import random
+import threading
+import time
+from typing import Optional
+
+
+class Faults:
+    """每个请求先 delay() 再 check()，check() 返回要注入的状态码（None 为正常响应）"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        rate_limit: float = 0,
+        burst: int = None
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.burst = burst or max(1, int(math.ceil(rate_limit)))
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+
+    def delay(self):
+        """模拟响应延迟：latency_ms ± jitter_ms 均匀分布"""
+        delay = self.latency_ms + (random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def check(self) -> Optional[int]:
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit > 0:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate_limit)
+                self._refilled = now
+                if self._tokens < 1:
+                    self.throttled += 1
+                    return 429
+                self._tokens -= 1
+            if self.error_rate and random.random() < self.error_rate:
+                self.errors += 1
+                return self.error_status
+        return None
+
+    @property
+    def retry_after(self) -> int:
+        """429 的 Retry-After（秒，向上取整）"""
+        if self.rate_limit <= 0:
+            return 1
+        with self._lock:
+            return max(1, math.ceil((1 - self._tokens) / self.rate_limit))
+
+    def stats(self) -> dict:
+        return {'requests': self.requests, 'errors': self.errors, 'throttled': self.throttled}
+
+
+def add_arguments(parser):
+    """桩服务命令行的故障注入参数"""
+    parser.add_argument('--latency-ms', type=int, default=0, help='每个请求的响应延迟')
+    parser.add_argument('--jitter-ms', type=int, default=0, help='延迟抖动（±）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 5xx 的比例（0-1）')
+    parser.add_argument('--rate-limit', type=float, default=0, help='每秒允许的请求数，超出返回 429（0 不限流）')
+    parser.add_argument('--burst', type=int, default=None, help='限流令牌桶容量（默认等于每秒请求数）')
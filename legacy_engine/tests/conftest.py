@@ -0,0 +1,151 @@
+"""
+测试公共夹具
+
+数据集用 database/generate_data.py 生成，默认两个规模（--sizes / NEOFEED_TEST_SIZES），
+3 个用户，生成后已 ANALYZE。生成结果按规模 / 种子 / schema 版本缓存在 --dataset-dir
+（默认 tests/.datasets），schema 变化后自动重新生成；数据集测试只读，不修改缓存的库。
+需要写入的测试用 fresh_db（每个测试一个新的小数据集）。
+
+安装了 pytest-benchmark 时，耗时记录在 tests/benchmarks（不入库，基线在本机用
+--benchmark-save=baseline 生成）。与基线对比需要显式开启（--bench-baseline 或
+NEOFEED_BENCH_BASELINE=1）：对比本机平台（如 Linux-CPython-3.11-64bit）最新的
+*_baseline.json，中位数比基线慢 BENCH_TOLERANCE 以上即失败；还没有基线时给出警告。
+命令行给出 --benchmark-compare / --benchmark-compare-fail 时以命令行为准。
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / 'database'))
+
+from core.migrations import SCHEMA_VERSION
+from generate_data import Plan, generate
+
+DEFAULT_SIZES = '2000,20000'
+USERS = 3
+SEED = 42
+
+BENCH_STORAGE = BASE_DIR / 'tests' / 'benchmarks'
+BENCH_TOLERANCE = 'median:100%'
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('neofeed')
+    group.addoption('--sizes', default=os.getenv('NEOFEED_TEST_SIZES', DEFAULT_SIZES),
+                    help=f'逗号分隔的数据集条目数（默认 {DEFAULT_SIZES}）')
+    group.addoption('--dataset-dir', default=str(BASE_DIR / 'tests' / '.datasets'),
+                    help='生成数据集的缓存目录')
+    group.addoption('--bench-baseline', action='store_true',
+                    default=os.getenv('NEOFEED_BENCH_BASELINE', '').lower() in ('1', 'true', 'yes'),
+                    help='与 tests/benchmarks 中本机平台的基线对比（默认不对比）')
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """pytest-benchmark 的存储目录和显式开启的基线对比（插件在 trylast 的 pytest_configure 里读取选项）"""
+    if not hasattr(config.option, 'benchmark_storage'):
+        return
+    from pytest_benchmark.utils import get_machine_id, parse_compare_fail
+
+    option = config.option
+    if option.benchmark_storage == 'file://./.benchmarks':
+        option.benchmark_storage = f"file://{BENCH_STORAGE}"
+    if not option.bench_baseline or option.benchmark_compare or option.benchmark_disable:
+        return
+    baseline = sorted((BENCH_STORAGE / get_machine_id()).glob('*_baseline.json'))
+    if not baseline:
+        config.issue_config_time_warning(pytest.PytestConfigWarning(
+            f"--bench-baseline: {BENCH_STORAGE / get_machine_id()} 中没有基线，"
+            f"先运行 pytest tests/test_performance.py --benchmark-save=baseline"
+        ), stacklevel=2)
+        return
+    option.benchmark_compare = baseline[-1].name.split('_')[0]
+    if not option.benchmark_compare_fail:
+        option.benchmark_compare_fail = [parse_compare_fail(BENCH_TOLERANCE)]
+
+
+def pytest_generate_tests(metafunc):
+    if 'dataset' in metafunc.fixturenames:
+        sizes = [int(n) for n in metafunc.config.getoption('sizes').split(',') if n.strip()]
+        metafunc.parametrize('dataset', sizes, indirect=True, scope='session', ids=lambda n: f"{n}items")
+
+
+def _build(path: Path, items: int):
+    tmp = path.with_suffix('.tmp')
+    if tmp.exists():
+        tmp.unlink()
+    generate(str(tmp), Plan(items=items, users=USERS, content_length=300, seed=SEED))
+    tmp.rename(path)
+
+
+@pytest.fixture(scope='session')
+def dataset(request) -> str:
+    """生成的数据集路径（按规模参数化，只读）"""
+    items = request.param
+    directory = Path(request.config.getoption('dataset_dir'))
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"items{items}_users{USERS}_seed{SEED}_v{SCHEMA_VERSION}.db"
+    if not path.exists():
+        _build(path, items)
+    return str(path)
+
+
+@pytest.fixture(scope='session')
+def dataset_db(dataset):
+    """数据集上的 DatabaseManager（读缓存关闭，每次都查库）"""
+    from core.cache import get_read_cache
+    from core.database import DatabaseManager
+
+    cache = get_read_cache(dataset)
+    cache.items.ttl = cache.pages.ttl = 0
+    db = DatabaseManager(dataset)
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope='session')
+def user_id() -> int:
+    """数据集中条目最多的用户（用户 1，也是 API 的默认用户）"""
+    return 1
+
+
+@pytest.fixture
+def fresh_db(tmp_path):
+    """新生成的小数据集（200 条），测试可以随意写入"""
+    from core.database import DatabaseManager
+
+    path = tmp_path / 'neofeed.db'
+    generate(str(path), Plan(items=200, users=2, content_length=200, seed=SEED))
+    db = DatabaseManager(str(path))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def fresh_client(fresh_db, monkeypatch):
+    """指向 fresh_db 的 API TestClient（读缓存按默认配置开启），测试可以写入"""
+    from fastapi.testclient import TestClient
+    from api.main import app
+    from core.config import Config
+
+    monkeypatch.setattr(Config, 'DATABASE_PATH', fresh_db.db_path)
+    return TestClient(app)
+
+
+@pytest.fixture(scope='session')
+def client(dataset, dataset_db):
+    """指向数据集的 API TestClient（读缓存关闭）"""
+    from fastapi.testclient import TestClient
+    from api.main import app
+    from core.config import Config
+
+    original = Config.DATABASE_PATH
+    Config.DATABASE_PATH = dataset
+    # 不进入 with：不触发启动时的流水线恢复
+    yield TestClient(app)
+    Config.DATABASE_PATH = original
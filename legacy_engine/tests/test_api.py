@@ -0,0 +1,91 @@
+"""
+API 列表 / 详情 / 统计路径：响应内容和请求期间执行的查询计划
+
+读缓存关闭（见 conftest 的 dataset_db），每个请求都实际查库；请求期间所有连接执行的
+SQL 记录下来，在数据集上逐条 EXPLAIN QUERY PLAN，不能出现全表 / 全索引扫描。
+"""
+
+import pytest
+
+from check_query_plans import explain_statements
+from core.database import LIST_FIELDS, DatabaseManager
+
+pytestmark = pytest.mark.api
+
+# 请求期间允许出现的扫描（SQL 片段 -> 原因），与 test_query_plans.ALLOWED_SCANS 对应
+ALLOWED_SCANS = {
+    'FROM users ORDER BY id LIMIT 1': '默认用户每个进程解析一次（api.users），LIMIT 1 只读一行',
+    'FROM change_counters': '详情页的 ETag 用全部用户的变更计数之和，change_counters 每个用户一行',
+}
+
+
+@pytest.fixture
+def traced(monkeypatch):
+    """记录请求期间新建连接上执行的全部 SQL"""
+    statements = []
+    connect = DatabaseManager._connect
+
+    def traced_connect(self):
+        connect(self)
+        self.conn.set_trace_callback(statements.append)
+
+    monkeypatch.setattr(DatabaseManager, '_connect', traced_connect)
+    return statements
+
+
+def _assert_no_scans(dataset_db, statements):
+    results = explain_statements(dataset_db.conn, statements)
+    assert results
+    for r in results:
+        if any(fragment in r['sql'] for fragment in ALLOWED_SCANS):
+            continue
+        assert not r['scans'], f"出现扫描 {r['scans']}\n{r['sql']}\n" + '\n'.join(r['plan'])
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'view': 'compact'},
+    {'view': 'compact', 'offset': 200},
+    {'view': 'compact', 'category': '设计', 'source_type': 'wechat'},
+    {'view': 'compact', 'min_importance': 0.8, 'facets': 'status,source_type,category,domain'},
+], ids=['full', 'compact', 'offset', 'filters', 'facets'])
+def test_list(client, dataset_db, user_id, traced, params):
+    response = client.get('/api/items', params=params)
+    assert response.status_code == 200
+    body = response.json()
+    assert body['items']
+    assert all(set(item) <= set(LIST_FIELDS) for item in body['items'])
+    assert body['total'] == dataset_db.get_items_count(
+        user_id, **{k: v for k, v in params.items() if k not in ('view', 'offset', 'facets')})
+    _assert_no_scans(dataset_db, traced)
+
+
+def test_detail(client, dataset_db, user_id, traced):
+    item_id = dataset_db.get_items(user_id, limit=1, fields=['id'])[0]['id']
+    traced.clear()
+    response = client.get(f'/api/items/{item_id}')
+    assert response.status_code == 200
+    item = response.json()['item']
+    assert item['id'] == item_id
+    assert item['content'] == dataset_db.get_item(item_id)['content']
+    # 内部列（去重哈希、抓取重试、压缩存储的列）不出现在响应里
+    assert set(item) <= set(LIST_FIELDS) | {'topics'}
+    assert 'content_hash' not in item and 'duplicate_count' not in item
+    _assert_no_scans(dataset_db, traced)
+
+    etag = response.headers['ETag']
+    assert client.get(f'/api/items/{item_id}', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/items/999999999').status_code == 404
+
+
+def test_stats(client, dataset_db, user_id, traced):
+    response = client.get('/api/stats', params={'days': 30})
+    assert response.status_code == 200
+    assert response.json()['stats'] == dataset_db.get_user_stats(user_id, 30)
+    _assert_no_scans(dataset_db, traced)
+
+
+@pytest.mark.parametrize('path', ['/api/items/top', '/api/keywords', '/api/domains', '/api/tags'])
+def test_other_reads(client, dataset_db, traced, path):
+    assert client.get(path).status_code == 200
+    _assert_no_scans(dataset_db, traced)
@@ -0,0 +1,127 @@
+"""
+API 写入后的行为：重复保存、ETag / 304、读缓存失效、标签计数
+
+每个测试用独立的 fresh_db（见 conftest 的 fresh_client），读缓存按默认配置开启。
+"""
+
+import pytest
+
+from core.config import Config
+
+pytestmark = pytest.mark.api
+
+
+@pytest.fixture
+def api(fresh_client, monkeypatch):
+    monkeypatch.setattr(Config, 'ENABLE_WEB_SCRAPING', False)
+    monkeypatch.setattr(Config, 'ENABLE_AI_PROCESSING', False)
+    return fresh_client
+
+
+@pytest.fixture
+def user_id(fresh_db) -> int:
+    return fresh_db.get_or_create_default_user()['id']
+
+
+def test_duplicate_save_returns_existing(api, fresh_db):
+    first = api.post('/api/items', json={'content': '第一次保存的内容'}).json()
+    again = api.post('/api/items', json={'content': '第一次保存的内容'}).json()
+    assert again['duplicate'] and again['item_id'] == first['item_id']
+
+    # 只差跟踪参数的链接视为同一条目
+    saved = api.post('/api/items', json={
+        'content': '链接的正文', 'url': 'https://example.com/post?utm_source=feed'
+    }).json()
+    again = api.post('/api/items', json={
+        'content': '另一段正文', 'url': 'https://example.com/post'
+    }).json()
+    assert again['duplicate'] and again['item_id'] == saved['item_id']
+    assert fresh_db.get_item(saved['item_id'])['duplicate_count'] == 1
+
+
+def test_idempotent_retry(api, fresh_db):
+    headers = {'Idempotency-Key': 'retry-1'}
+    first = api.post('/api/items', json={'content': '带幂等键的保存'}, headers=headers).json()
+    retry = api.post('/api/items', json={'content': '带幂等键的保存'}, headers=headers).json()
+
+    assert retry['duplicate'] and retry['item_id'] == first['item_id']
+    # 幂等重试不算再次保存
+    assert fresh_db.get_item(first['item_id'])['duplicate_count'] == 0
+
+
+def test_list_etag_changes_after_write(api):
+    response = api.get('/api/items')
+    etag = response.headers['ETag']
+    assert api.get('/api/items', headers={'If-None-Match': etag}).status_code == 304
+
+    item_id = api.post('/api/items', json={'content': '新保存的条目'}).json()['item_id']
+
+    response = api.get('/api/items', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.json()['items'][0]['id'] == item_id
+
+
+def test_detail_etag_changes_after_update(api, fresh_db, user_id):
+    item_id = fresh_db.get_items(user_id, limit=1, fields=['id'])[0]['id']
+    response = api.get(f'/api/items/{item_id}')
+    etag = response.headers['ETag']
+    assert api.get(f'/api/items/{item_id}', headers={'If-None-Match': etag}).status_code == 304
+
+    fresh_db.update_item_status(item_id, 'failed')
+
+    response = api.get(f'/api/items/{item_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.json()['item']['status'] == 'failed'
+
+
+def test_cache_invalidated_after_update(api, fresh_db, user_id):
+    item_id = fresh_db.get_items(user_id, limit=1, fields=['id'])[0]['id']
+    # 第一次请求写入读缓存
+    api.get(f'/api/items/{item_id}')
+    listing = api.get('/api/items', params={'view': 'compact'}).json()
+
+    fresh_db.update_item_content(item_id, '更新后的正文', title='更新后的标题')
+    fresh_db.save_summary(item_id, user_id, '更新后的摘要')
+
+    item = api.get(f'/api/items/{item_id}').json()['item']
+    assert item['title'] == '更新后的标题'
+    assert item['content'] == '更新后的正文'
+    assert item['summary'] == '更新后的摘要'
+
+    new_id = api.post('/api/items', json={'content': '缓存之后保存的条目'}).json()['item_id']
+    updated = api.get('/api/items', params={'view': 'compact'}).json()
+    assert updated['total'] == listing['total'] + 1
+    assert updated['items'][0]['id'] == new_id
+
+
+def _tag_count(api, tag_id):
+    counts = {tag['id']: tag['item_count'] for tag in api.get('/api/tags').json()['tags']}
+    return counts.get(tag_id)
+
+
+def test_tag_counts_after_untag_and_delete(api, fresh_db, user_id):
+    item_ids = [row['id'] for row in fresh_db.get_items(user_id, limit=3, fields=['id'])]
+    tag_id = api.post('/api/tags', json={'name': '计数测试'}).json()['tag']['id']
+
+    response = api.post(f'/api/tags/{tag_id}/items', json={'item_ids': item_ids + item_ids})
+    assert response.json()['changed'] == 3
+    assert _tag_count(api, tag_id) == 3
+
+    response = api.post(f'/api/tags/{tag_id}/items/remove', json={'item_ids': item_ids[:1]})
+    assert response.json()['item_count'] == 2
+    # 重复移除不再减少计数
+    api.post(f'/api/tags/{tag_id}/items/remove', json={'item_ids': item_ids[:1]})
+    assert _tag_count(api, tag_id) == 2
+
+    # 删除条目时关联级联删除，计数随之减少
+    fresh_db.conn.execute("DELETE FROM items WHERE id = ?", (item_ids[1],))
+    fresh_db.conn.commit()
+    assert _tag_count(api, tag_id) == 1
+    tagged = api.get(f'/api/tags/{tag_id}/items').json()['items']
+    assert [item['id'] for item in tagged] == [item_ids[2]]
+
+    assert api.delete(f'/api/tags/{tag_id}').status_code == 200
+    assert _tag_count(api, tag_id) is None
+    assert api.get(f'/api/tags/{tag_id}/items').status_code == 404
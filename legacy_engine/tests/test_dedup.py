@@ -0,0 +1,37 @@
+"""
+去重：URL 规范化只去掉追踪参数，不同页面不会被并成一条
+"""
+
+import pytest
+
+from core.dedup import canonicalize_url
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('HTTPS://Example.com:443/a/?utm_source=x&b=2&a=1#top', 'https://example.com/a?a=1&b=2'),
+    ('https://example.com/a?fbclid=1&gclid=2&spm=3', 'https://example.com/a'),
+    ('https://mp.weixin.qq.com/s?__biz=M&mid=1&idx=1&sn=s&scene=21&chksm=c&from=timeline',
+     'https://mp.weixin.qq.com/s?__biz=M&idx=1&mid=1&sn=s'),
+    ('https://twitter.com/u/status/1?ref_src=twsrc', 'https://twitter.com/u/status/1'),
+    # 通用名字的参数在普通站点上是正文参数
+    ('https://github.com/o/r/search?q=x&source=code', 'https://github.com/o/r/search?q=x&source=code'),
+    ('https://example.com/list?from=2024-01-01&ref=main', 'https://example.com/list?from=2024-01-01&ref=main'),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_distinct_pages_do_not_merge(fresh_db):
+    user_id = fresh_db.get_or_create_default_user()['id']
+    urls = [
+        'https://example.com/search?q=sqlite&source=web',
+        'https://example.com/search?q=sqlite&source=news',
+        'https://example.com/blame?ref=v1',
+        'https://example.com/blame?ref=v2',
+    ]
+    ids = [fresh_db.create_item(user_id, f"页面 {n}", url=url) for n, url in enumerate(urls)]
+    assert len(set(ids)) == len(urls)
+    for item_id, url in zip(ids, urls):
+        assert fresh_db.find_duplicate_item(user_id, url=url) == item_id
+    # 只差追踪参数的仍是同一条
+    assert fresh_db.find_duplicate_item(user_id, url=urls[0] + '&utm_medium=rss') == ids[0]
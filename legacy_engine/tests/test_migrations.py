@@ -0,0 +1,69 @@
+"""
+schema 迁移：旧版本的库升级到 SCHEMA_VERSION
+"""
+
+import json
+import sqlite3
+
+from core import migrations
+from core.database import DatabaseManager
+from core.migrations import SCHEMA_VERSION
+
+
+def _downgrade_to_v14(path: str):
+    """把最新 schema 的库退回 m015 之前的样子（没有域名生成列和复合索引）"""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        DROP INDEX idx_items_user_domain;
+        ALTER TABLE items DROP COLUMN domain;
+        ALTER TABLE items DROP COLUMN original_url;
+        PRAGMA user_version = 14;
+    """)
+    conn.close()
+    # 进程内已记为迁移完成，重新连接时要再检查一遍
+    migrations._migrated_paths.discard(path)
+
+
+def test_upgrade_with_malformed_metadata(fresh_db):
+    path = fresh_db.db_path
+    item_id = fresh_db.get_items(1, limit=1, fields=['id'])[0]['id']
+    fresh_db.close()
+    _downgrade_to_v14(path)
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE items SET source_metadata = 'not json' WHERE id = ?", (item_id,))
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(path)
+    try:
+        assert db.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        index = db.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'idx_items_user_domain'"
+        ).fetchone()[0]
+        assert 'json_extract' not in index
+        item = db.get_item(item_id)
+        assert json.loads(item['source_metadata']) == 'not json' and item['domain'] is None
+    finally:
+        db.close()
+
+
+def test_canonical_urls_recomputed(fresh_db):
+    """早期规则去掉了 ?source= 等通用参数：重算后不同页面各有自己的 canonical_url"""
+    db = fresh_db
+    user_id = db.get_or_create_default_user()['id']
+    first = db.create_item(user_id, '第一页', url='https://example.com/s?q=a&source=web')
+    second = db.create_item(user_id, '第二页', url='https://example.com/s?q=a&source=news')
+    # 模拟旧规则回填的结果：第一条规范化成去掉 source 的 URL，第二条当成重复置空
+    db.conn.execute("UPDATE items SET canonical_url = 'https://example.com/s?q=a' WHERE id = ?", (first,))
+    db.conn.execute("UPDATE items SET canonical_url = NULL WHERE id = ?", (second,))
+    db.conn.execute("PRAGMA user_version = 17")
+    db.conn.commit()
+    migrations._migrated_paths.discard(db.db_path)
+
+    upgraded = DatabaseManager(db.db_path)
+    try:
+        assert upgraded.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert upgraded.get_item(first)['canonical_url'] == 'https://example.com/s?q=a&source=web'
+        assert upgraded.get_item(second)['canonical_url'] == 'https://example.com/s?q=a&source=news'
+    finally:
+        upgraded.close()
@@ -0,0 +1,60 @@
+"""
+查询耗时（pytest-benchmark）
+
+每个数据集规模上测列表 / 总数 / 分面 / 精选 / 统计等查询和 API 的列表、详情、统计路径。
+加 --bench-baseline（或 NEOFEED_BENCH_BASELINE=1）时与本机生成的基线对比，
+中位数慢于基线超过阈值即失败（见 conftest）；默认只计时不对比。
+
+生成 / 更新本机基线（tests/benchmarks，不入库；确认变慢是预期的之后再更新）:
+    pytest tests/test_performance.py --benchmark-save=baseline
+"""
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from core.database import COMPACT_FIELDS, FACETS
+
+QUERIES = {
+    'get_items': lambda db, u: db.get_items(u, limit=20, fields=COMPACT_FIELDS),
+    'get_items 深分页': lambda db, u: db.get_items(u, limit=20, offset=1000, fields=COMPACT_FIELDS),
+    'get_items 筛选': lambda db, u: db.get_items(u, limit=20, fields=COMPACT_FIELDS, category='设计', source_type='web'),
+    'get_items_count': lambda db, u: db.get_items_count(u),
+    'get_items_count 筛选': lambda db, u: db.get_items_count(u, category='设计', min_importance=0.5),
+    'get_facets': lambda db, u: db.get_facets(u, list(FACETS)),
+    'get_top_items': lambda db, u: db.get_top_items(u),
+    'get_domains': lambda db, u: db.get_domains(u),
+    'get_top_keywords': lambda db, u: db.get_top_keywords(u),
+    'get_tags': lambda db, u: db.get_tags(u),
+    'get_user_stats': lambda db, u: db.get_user_stats(u, 30),
+}
+
+API_PATHS = {
+    'list': '/api/items?view=compact',
+    'list full': '/api/items',
+    'stats': '/api/stats?days=30',
+    'top': '/api/items/top',
+}
+
+
+@pytest.mark.parametrize('name', QUERIES)
+def test_query(benchmark, dataset_db, user_id, name):
+    benchmark.group = f"query {name}"
+    call = QUERIES[name]
+    benchmark(call, dataset_db, user_id)
+
+
+@pytest.mark.api
+@pytest.mark.parametrize('name', API_PATHS)
+def test_api(benchmark, client, name):
+    benchmark.group = f"api {name}"
+    response = benchmark(client.get, API_PATHS[name])
+    assert response.status_code == 200
+
+
+@pytest.mark.api
+def test_api_detail(benchmark, client, dataset_db, user_id):
+    benchmark.group = 'api detail'
+    item_id = dataset_db.get_items(user_id, limit=1, offset=100, fields=['id'])[0]['id']
+    response = benchmark(client.get, f'/api/items/{item_id}')
+    assert response.status_code == 200
@@ -0,0 +1,95 @@
+"""
+处理流水线（core.pipeline / core.stages）：模型调用失败时的重试和失败标记
+"""
+
+import httpx
+import openai
+import pytest
+
+from core.config import Config
+from core.pipeline import StageError
+from core.processor import ai_processor
+from core.stages import AI_TARGETS, AIStage, SummarizeStage, create_default_pipeline
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """替换模型调用：calls 记录调用次数，error 不为空时抛出"""
+    monkeypatch.setattr(Config, 'OPENAI_API_KEY', 'test-key')
+    monkeypatch.setattr(Config, 'CATEGORY_CLASSIFIER', 'llm')
+    monkeypatch.setattr(Config, 'KEYWORD_EXTRACTOR', 'local')
+    monkeypatch.setattr(AIStage, 'retry_base', 0.01)
+    state = {'calls': 0, 'error': None}
+
+    def complete(messages, max_tokens, temperature):
+        state['calls'] += 1
+        if state['error'] is not None:
+            raise state['error']
+        return '设计'
+
+    monkeypatch.setattr(ai_processor, '_complete', complete)
+    return state
+
+
+def _permanent_error() -> openai.AuthenticationError:
+    response = httpx.Response(401, request=httpx.Request('POST', 'https://api.example.com'))
+    return openai.AuthenticationError('invalid api key', response=response, body=None)
+
+
+def test_model_error_is_retryable(model):
+    model['error'] = RuntimeError('upstream unavailable')
+    with pytest.raises(StageError) as info:
+        SummarizeStage().generate('正文')
+    assert info.value.retryable
+
+    model['error'] = _permanent_error()
+    with pytest.raises(StageError) as info:
+        SummarizeStage().generate('正文')
+    assert not info.value.retryable
+
+    # 流水线之外的调用方照旧拿到空结果
+    assert ai_processor.generate_summary('正文') == ''
+
+
+def test_outage_fails_stage_after_retries(fresh_db, model):
+    model['error'] = RuntimeError('upstream unavailable')
+    user_id = fresh_db.get_or_create_default_user()['id']
+    item_id = fresh_db.create_item(user_id, '模型不可用时处理的条目')
+    pipeline = create_default_pipeline(fresh_db.db_path)
+
+    result = pipeline.submit(item_id, user_id, targets=AI_TARGETS).result(timeout=30)
+
+    assert not result['success']
+    assert result['stages']['summarize'] == 'failed'
+    assert result['stages']['index'] == 'skipped'
+    checkpoints = fresh_db.get_stage_checkpoints(item_id)
+    assert checkpoints['summarize']['status'] == 'failed'
+    assert checkpoints['summarize']['attempts'] == SummarizeStage.max_attempts
+    assert 'upstream unavailable' in checkpoints['summarize']['error']
+    assert fresh_db.get_item(item_id)['status'] == 'failed'
+    assert fresh_db.get_ai_result_by_item(item_id) is None
+
+
+def test_recover_resumes_after_crash(fresh_db, model):
+    user_id = fresh_db.get_or_create_default_user()['id']
+    item_id = fresh_db.create_item(user_id, '处理到一半进程退出的条目')
+
+    # 上次进程：fetch / dedup 已完成，summarize 执行中时退出
+    fresh_db.queue_stages(item_id, ['fetch', 'dedup', 'summarize', 'classify', 'keywords', 'index'])
+    for stage in ('fetch', 'dedup'):
+        fresh_db.start_stage(item_id, stage)
+        fresh_db.save_stage_checkpoint(item_id, stage, 'done', output={})
+    fresh_db.start_stage(item_id, 'summarize')
+
+    pipeline = create_default_pipeline(fresh_db.db_path)
+    assert pipeline.recover() == 1
+    assert pipeline.join(timeout=30)
+
+    checkpoints = fresh_db.get_stage_checkpoints(item_id)
+    assert {c['status'] for c in checkpoints.values()} == {'done'}
+    # 已完成的阶段沿用检查点，中断的阶段接着重试
+    assert checkpoints['dedup']['attempts'] == 1
+    assert checkpoints['summarize']['attempts'] == 2
+    assert fresh_db.get_item(item_id)['status'] == 'processed'
+    assert fresh_db.get_ai_result_by_item(item_id)['summary'] == '设计'
+    assert not fresh_db.get_unfinished_stages()
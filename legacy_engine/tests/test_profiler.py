@@ -0,0 +1,94 @@
+"""
+SQL 剖析（core.profiler）：语句汇总、慢查询日志、关闭时的连接类型和 /api/metrics/queries
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from core.config import Config
+from core.database import DatabaseManager
+from core.profiler import ProfiledConnection, normalize, profiler
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    """开启剖析（慢查询阈值很高），每个测试从空统计开始"""
+    monkeypatch.setattr(Config, 'QUERY_PROFILING', True)
+    monkeypatch.setattr(Config, 'QUERY_SLOW_MS', 1e9)
+    monkeypatch.setattr(Config, 'QUERY_SLOW_LOG', str(tmp_path / 'slow.jsonl'))
+    profiler.reset()
+    yield tmp_path / 'slow.jsonl'
+    profiler.reset()
+
+
+def _stats(sql_prefix: str) -> dict:
+    return next(row for row in profiler.top(1000) if row['sql'].startswith(sql_prefix))
+
+
+def test_normalize():
+    assert normalize("SELECT *  FROM t\n WHERE a = 'x''y' AND b IN (1, 2,3) AND c = 1.5 AND op1 = ?") == \
+        "SELECT * FROM t WHERE a = ? AND b IN (...) AND c = ? AND op1 = ?"
+    assert normalize("SELECT id FROM items WHERE id IN (?,?,?)") == "SELECT id FROM items WHERE id IN (...)"
+
+
+def test_disabled_uses_plain_connection(dataset):
+    db = DatabaseManager(dataset)
+    assert type(db.conn) is sqlite3.Connection
+    assert type(db.cursor) is sqlite3.Cursor
+    db.close()
+
+
+def test_records_statements(profiling, dataset, user_id):
+    db = DatabaseManager(dataset)
+    assert isinstance(db.conn, ProfiledConnection)
+    for _ in range(3):
+        db.get_items(user_id, limit=20, fields=['id'])
+    ids = [row[0] for row in db.conn.execute("SELECT id FROM items WHERE id IN (1, 2, 3)")]
+    db.get_user_stats(user_id)
+    db.close()
+
+    listing = _stats('SELECT i.id AS id FROM items i')
+    assert listing['count'] == 3
+    assert listing['rows'] == 60
+    assert listing['params'] == 3
+    assert _stats('SELECT id FROM items WHERE id IN (...)')['rows'] == len(ids)
+    # 只 fetchone 的语句在连接关闭时计入
+    assert _stats('SELECT COUNT(*) as total')['count'] == 1
+    assert profiler.top(1, order='count')[0]['count'] >= 3
+    assert sum(row['share'] for row in profiler.top(1000)) == pytest.approx(1, abs=0.01)
+
+
+def test_slow_query_log(profiling, dataset, user_id, monkeypatch):
+    monkeypatch.setattr(Config, 'QUERY_SLOW_MS', 0)
+    db = DatabaseManager(dataset)
+    db.get_items_count(user_id, category='设计')
+    db.close()
+
+    entries = [json.loads(line) for line in profiling.read_text(encoding='utf-8').splitlines()]
+    entry = next(e for e in entries if e['sql'].startswith('SELECT COUNT(*) as count'))
+    assert entry['plan'] and any(line.startswith('SEARCH') for line in entry['plan'])
+    assert "'设计'" not in entry['sql'] and '设计' not in json.dumps(entry, ensure_ascii=False)
+    assert profiler.slow
+
+
+@pytest.mark.api
+def test_query_metrics_endpoint(profiling, client):
+    assert client.get('/api/items', params={'view': 'compact'}).status_code == 200
+    body = client.get('/api/metrics/queries', params={'limit': 5}).json()
+    assert body['enabled'] is True
+    assert 0 < len(body['queries']) <= 5
+    totals = [row['total_ms'] for row in body['queries']]
+    assert totals == sorted(totals, reverse=True)
+    # GET 只读，清零用 DELETE
+    executions = profiler.summary()['executions']
+    assert executions > 0
+    assert client.get('/api/metrics/queries', params={'reset': True}).status_code == 200
+    assert profiler.summary()['executions'] >= executions
+
+    cleared = client.delete('/api/metrics/queries').json()
+    assert cleared['summary']['executions'] >= executions
+    assert profiler.summary()['executions'] == 0
+
+    assert client.get('/api/metrics/queries', params={'order': 'nope'}).status_code == 400
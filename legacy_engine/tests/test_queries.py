@@ -0,0 +1,167 @@
+"""
+DatabaseManager 的 CRUD 和常用查询
+
+写入的测试用 fresh_db；只读的一致性检查（计数列、分面、分页）用生成的数据集。
+"""
+
+import sqlite3
+
+import pytest
+
+from core.database import COMPACT_FIELDS
+
+
+@pytest.fixture
+def user(fresh_db):
+    return fresh_db.get_or_create_default_user()['id']
+
+
+# ============================================
+# CRUD
+# ============================================
+
+def test_create_and_get_item(fresh_db, user):
+    item_id = fresh_db.create_item(user, '测试正文', title='测试条目', url='https://example.com/a?utm_source=x')
+    item = fresh_db.get_item(item_id)
+    assert item['title'] == '测试条目'
+    assert item['content'] == '测试正文'
+    assert item['status'] == 'pending'
+    assert item['canonical_url'] == 'https://example.com/a'
+
+
+def test_duplicate_item_rejected(fresh_db, user):
+    item_id = fresh_db.create_item(user, '重复正文', url='https://example.com/dup')
+    with pytest.raises(sqlite3.IntegrityError):
+        fresh_db.create_item(user, '另一段正文', url='https://example.com/dup/')
+    with pytest.raises(sqlite3.IntegrityError):
+        fresh_db.create_item(user, '重复正文')
+    assert fresh_db.find_duplicate_item(user, url='https://example.com/dup') == item_id
+    assert fresh_db.find_duplicate_item(user, content='重复正文', use_filter=False) == item_id
+    assert fresh_db.find_duplicate_item(user, content='没见过的正文') is None
+
+
+def test_update_status_and_stats(fresh_db, user):
+    before = fresh_db.get_user_stats(user)
+    item_id = fresh_db.create_item(user, '状态测试')
+    fresh_db.update_item_status(item_id, 'processed')
+    after = fresh_db.get_user_stats(user)
+    assert fresh_db.get_item(item_id)['status'] == 'processed'
+    assert after['total'] == before['total'] + 1
+    assert after['processed'] == before['processed'] + 1
+
+
+def test_ai_result_indexes_keywords(fresh_db, user):
+    item_id = fresh_db.create_item(user, '关键词测试')
+    fresh_db.create_ai_result(item_id, user, summary='摘要', category='设计',
+                              keywords='新词甲,新词乙', importance_score=0.8, topics='新主题')
+    result = fresh_db.get_ai_result_by_item(item_id)
+    assert result['category'] == '设计'
+    assert result['importance_score'] == 0.8
+
+    assert fresh_db.get_items_count(user, keyword='新词甲') == 1
+    assert [i['id'] for i in fresh_db.get_items(user, keyword='新词乙', fields=['id'])] == [item_id]
+    assert {'name': '新主题', 'count': 1} in fresh_db.get_top_keywords(user, limit=100, kind='topic')
+
+    # 覆盖更新：旧关键词的计数回退
+    fresh_db.create_ai_result(item_id, user, summary='摘要', category='设计', keywords='新词乙')
+    assert fresh_db.get_items_count(user, keyword='新词甲') == 0
+    assert fresh_db.get_items_count(user, keyword='新词乙') == 1
+
+
+def test_tags(fresh_db, user):
+    tag_id = fresh_db.create_tag(user, '测试标签')
+    with pytest.raises(sqlite3.IntegrityError):
+        fresh_db.create_tag(user, '测试标签')
+
+    item_ids = [i['id'] for i in fresh_db.get_items(user, limit=5, fields=['id'])]
+    assert fresh_db.tag_items(user, tag_id, item_ids) == 5
+    assert fresh_db.tag_items(user, tag_id, item_ids) == 0
+    assert fresh_db.get_tag(user, tag_id)['item_count'] == 5
+    assert [i['_item_id'] for i in fresh_db.get_items_by_tag(tag_id)] == sorted(item_ids, reverse=True)
+
+    assert fresh_db.untag_items(tag_id, item_ids[:2]) == 2
+    assert fresh_db.get_tag(user, tag_id)['item_count'] == 3
+    assert fresh_db.delete_tag(user, tag_id)
+    assert fresh_db.get_tag(user, tag_id) is None
+
+
+def test_change_version_increments(fresh_db, user):
+    version = fresh_db.get_change_version(user)
+    fresh_db.create_item(user, '版本测试')
+    assert fresh_db.get_change_version(user) > version
+    assert fresh_db.get_change_version() >= fresh_db.get_change_version(user)
+
+
+def test_idempotency_key(fresh_db, user):
+    item_id = fresh_db.create_item(user, '幂等测试')
+    fresh_db.save_idempotency_key(user, 'key-1', item_id)
+    assert fresh_db.get_idempotent_item(user, 'key-1') == item_id
+    assert fresh_db.get_idempotent_item(user, 'key-2') is None
+
+
+
+def test_content_store_toggle(fresh_db, user, monkeypatch):
+    from core.config import Config
+
+    monkeypatch.setattr(Config, 'CONTENT_STORE', 'compressed')
+    item_id = fresh_db.create_item(user, '压缩存储的正文' * 20, url='https://example.com/store')
+    assert fresh_db.get_item(item_id)['content'] == '压缩存储的正文' * 20
+    assert fresh_db.conn.execute("SELECT content FROM items WHERE id = ?", (item_id,)).fetchone()[0] == ''
+
+    # 关闭压缩存储后重新抓取：正文写回 items.content，旧的压缩正文不再返回
+    monkeypatch.setattr(Config, 'CONTENT_STORE', 'inline')
+    fresh_db.update_item_content(item_id, '重新抓取的正文')
+    assert fresh_db.get_item(item_id)['content'] == '重新抓取的正文'
+    assert fresh_db.content_store.get(item_id) is None
+
+# ============================================
+# 数据集上的一致性
+# ============================================
+
+def test_counts_match_list(dataset_db, user_id):
+    total = dataset_db.get_items_count(user_id)
+    assert total == dataset_db.get_user_stats(user_id, days=3650)['total']
+    for status in ('processed', 'pending', 'failed'):
+        count = dataset_db.get_items_count(user_id, status=status)
+        assert count == len(dataset_db.get_items(user_id, limit=total, status=status, fields=['id']))
+
+
+def test_keyword_counter_matches_index(dataset_db, user_id):
+    for keyword in dataset_db.get_top_keywords(user_id, limit=5):
+        indexed = dataset_db.get_items(user_id, limit=100000, keyword=keyword['name'], fields=['id'])
+        assert len(indexed) == keyword['count']
+
+
+def test_tag_counter_matches_items(dataset_db, user_id):
+    for tag in dataset_db.get_tags(user_id)[:3]:
+        assert len(dataset_db.get_items_by_tag(tag['id'], limit=100000)) == tag['item_count']
+
+
+def test_facets_sum_to_count(dataset_db, user_id):
+    facets = dataset_db.get_facets(user_id, ['source_type', 'status'], limit=100)
+    total = dataset_db.get_items_count(user_id)
+    assert sum(v['count'] for v in facets['source_type']) == total
+    assert sum(v['count'] for v in facets['status']) == total
+
+
+def test_list_pages_are_ordered_and_disjoint(dataset_db, user_id):
+    first = dataset_db.get_items(user_id, limit=20, fields=COMPACT_FIELDS)
+    second = dataset_db.get_items(user_id, limit=20, offset=20, fields=COMPACT_FIELDS)
+    dates = [i['created_at'] for i in first + second]
+    assert dates == sorted(dates, reverse=True)
+    assert not {i['id'] for i in first} & {i['id'] for i in second}
+
+
+def test_top_items_cursor(dataset_db, user_id):
+    first = dataset_db.get_top_items(user_id, limit=20)
+    second = dataset_db.get_top_items(user_id, limit=20, after=(first[-1]['_rank_key'], first[-1]['_item_id']))
+    keys = [(i['_rank_key'], i['_item_id']) for i in first + second]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == len(keys)
+
+
+def test_domains_sorted(dataset_db, user_id):
+    domains = dataset_db.get_domains(user_id)
+    assert domains
+    assert [d['count'] for d in domains] == sorted((d['count'] for d in domains), reverse=True)
+    assert dataset_db.get_items_count(user_id, domain=domains[0]['domain']) == domains[0]['count']
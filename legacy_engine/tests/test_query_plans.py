@@ -0,0 +1,119 @@
+"""
+查询计划回归：DatabaseManager 的每个读查询在生成的数据集上不能全表 / 全索引扫描
+
+执行查询时记录实际的 SQL（参数已展开），逐条 EXPLAIN QUERY PLAN（见
+database/check_query_plans.py 的 explain）。确实需要扫描的查询列在 ALLOWED_SCANS，
+写明原因；新增读方法时在 QUERIES 里加一条。
+"""
+
+import pytest
+
+from check_query_plans import cases, explain
+
+# 允许扫描的查询 -> 原因
+ALLOWED_SCANS = {
+    'get_or_create_default_user': '按 rowid 顺序取第一个用户，LIMIT 1 只读一行',
+    'get_keyword_doc_count': 'COUNT(*) keyword_docs：只在关键词提取计算 IDF 时调用一次，行数等于已索引文档数',
+    'get_change_version 全部用户': 'change_counters 每个用户一行',
+    'get_scoring_rows 全部条目': '批量重新评分本来就要读该用户的全部条目（按 id 顺序）',
+}
+
+
+def _sample(db, user_id: int) -> dict:
+    """从数据集里取查询参数（用户 1 的条目 / 标签 / 关键词）"""
+    row = db.conn.execute("""
+        SELECT id, canonical_url, content FROM items
+        WHERE user_id = ? AND canonical_url IS NOT NULL ORDER BY id LIMIT 1
+    """, (user_id,)).fetchone()
+    item_ids = [r[0] for r in db.conn.execute(
+        "SELECT id FROM items WHERE user_id = ? ORDER BY id DESC LIMIT 50", (user_id,))]
+    top = db.get_top_items(user_id, limit=20)
+    keywords = db.conn.execute("""
+        SELECT name FROM keywords WHERE user_id = ? AND item_count > 0 ORDER BY item_count DESC
+    """, (user_id,)).fetchall()
+    return {
+        'item_id': row['id'],
+        'url': row['canonical_url'],
+        'content': db.get_item(row['id'])['content'],
+        'item_ids': item_ids,
+        'tag_id': db.get_tags(user_id)[0]['id'],
+        'after': (top[-1]['_rank_key'], top[-1]['_item_id']),
+        'terms': [k['name'] for k in keywords[:20]],
+        'filters': {
+            'domain': db.get_domains(user_id, limit=1)[0]['domain'],
+            'hot_keyword': keywords[0]['name'],
+            'rare_keyword': keywords[-1]['name'],
+        },
+    }
+
+
+QUERIES = [
+    ('get_or_create_default_user', lambda db, u, s: db.get_or_create_default_user()),
+    ('find_duplicate_item url', lambda db, u, s: db.find_duplicate_item(u, url=s['url'], use_filter=False)),
+    ('find_duplicate_item content',
+     lambda db, u, s: db.find_duplicate_item(u, content=s['content'] + '!', use_filter=False)),
+    ('get_item', lambda db, u, s: db.get_item(s['item_id'])),
+    ('get_domains', lambda db, u, s: db.get_domains(u)),
+    ('get_top_items', lambda db, u, s: db.get_top_items(u)),
+    ('get_top_items 翻页', lambda db, u, s: db.get_top_items(u, after=s['after'])),
+    ('get_top_items category', lambda db, u, s: db.get_top_items(u, category='设计')),
+    ('get_top_items source_type', lambda db, u, s: db.get_top_items(u, source_type='wechat')),
+    ('get_item_owners', lambda db, u, s: db.get_item_owners(s['item_ids'])),
+    ('get_stage_checkpoints', lambda db, u, s: db.get_stage_checkpoints(s['item_id'])),
+    ('get_unfinished_stages', lambda db, u, s: db.get_unfinished_stages()),
+    ('get_chunk_summaries', lambda db, u, s: db.get_chunk_summaries(['a' * 64, 'b' * 64], 'gpt-4o-mini')),
+    ('get_keyword_df', lambda db, u, s: db.get_keyword_df(s['terms'])),
+    ('get_keyword_doc_count', lambda db, u, s: db.get_keyword_doc_count()),
+    ('get_top_keywords', lambda db, u, s: db.get_top_keywords(u)),
+    ('get_top_keywords topic', lambda db, u, s: db.get_top_keywords(u, kind='topic')),
+    ('get_category_labels', lambda db, u, s: db.get_category_labels(['设计', '创业'], s['item_ids'])),
+    ('get_scoring_rows', lambda db, u, s: db.get_scoring_rows(u, s['item_ids'])),
+    ('get_scoring_rows 全部条目', lambda db, u, s: db.get_scoring_rows(u)),
+    ('get_tag', lambda db, u, s: db.get_tag(u, s['tag_id'])),
+    ('get_tags', lambda db, u, s: db.get_tags(u)),
+    ('get_items_by_tag', lambda db, u, s: db.get_items_by_tag(s['tag_id'])),
+    ('get_items_by_tag 翻页', lambda db, u, s: db.get_items_by_tag(s['tag_id'], before=s['item_id'] + 500)),
+    ('get_idempotent_item', lambda db, u, s: db.get_idempotent_item(u, 'missing-key')),
+    ('get_ai_result_by_item', lambda db, u, s: db.get_ai_result_by_item(s['item_id'])),
+    ('get_change_version', lambda db, u, s: db.get_change_version(u)),
+    ('get_change_version 全部用户', lambda db, u, s: db.get_change_version()),
+    ('get_user_stats', lambda db, u, s: db.get_user_stats(u)),
+    ('get_user_stats 30 天', lambda db, u, s: db.get_user_stats(u, days=30)),
+]
+
+# 列表筛选组合（get_items / get_items_count / get_facets），与 check_query_plans 共用
+LIST_CASES = [name for name, _ in cases(None, 1)]
+
+
+@pytest.fixture(scope='session')
+def sample(dataset_db, user_id):
+    return _sample(dataset_db, user_id)
+
+
+def _assert_no_scans(results, name):
+    assert results, f"{name} 没有执行任何 SELECT"
+    if name in ALLOWED_SCANS:
+        return
+    for r in results:
+        assert not r['scans'], f"{name} 出现扫描 {r['scans']}\n{r['sql']}\n" + '\n'.join(r['plan'])
+
+
+@pytest.mark.parametrize('name, call', QUERIES, ids=[name for name, _ in QUERIES])
+def test_query_plan(dataset_db, user_id, sample, name, call):
+    _assert_no_scans(explain(dataset_db, lambda: call(dataset_db, user_id, sample)), name)
+
+
+@pytest.mark.parametrize('name', LIST_CASES)
+def test_list_query_plan(dataset_db, user_id, sample, name):
+    call = dict(cases(dataset_db, user_id, **sample['filters']))[name]
+    _assert_no_scans(explain(dataset_db, call), name)
+
+
+def test_every_read_method_covered():
+    """新增的 get_* / find_* 读方法要在 QUERIES 或列表筛选组合里"""
+    from core.database import DatabaseManager
+
+    covered = {name.split()[0] for name, _ in QUERIES} | {'get_items', 'get_items_count', 'get_facets'}
+    methods = {m for m in vars(DatabaseManager) if m.startswith(('get_', 'find_'))}
+    assert methods - covered == set()
+
@@ -0,0 +1,65 @@
+"""
+响应序列化：数据库里的 source_metadata 原样嵌入（非法 JSON 在 SQL 里转成 JSON 字符串）
+"""
+
+import json
+
+import pytest
+
+from api import responses
+from api.responses import FastJSONResponse, embed_metadata, raw_json
+
+INVALID = '{"domain": "example.com",'
+
+
+def test_embed_metadata():
+    items = embed_metadata([
+        {'id': 1, 'source_metadata': '{"domain": "example.com"}'},
+        {'id': 2, 'source_metadata': json.dumps(INVALID)},
+        {'id': 3, 'source_metadata': None},
+    ])
+    body = json.loads(FastJSONResponse(items).body)
+    assert body[0]['source_metadata'] == {'domain': 'example.com'}
+    assert body[1]['source_metadata'] == INVALID
+    assert body[2]['source_metadata'] is None
+
+
+@pytest.mark.skipif(responses.orjson is None, reason='未安装 orjson')
+def test_fragment_without_decode(monkeypatch):
+    # 本机 orjson 没有 Fragment 时替换一个；有 Fragment 时不解析
+    monkeypatch.setattr(responses.orjson, 'Fragment', lambda text: ('fragment', text), raising=False)
+    monkeypatch.setattr(responses.orjson, 'loads', None)
+    assert raw_json('{"a": 1}') == ('fragment', '{"a": 1}')
+
+
+def test_database_quotes_invalid_metadata(fresh_db):
+    user_id = fresh_db.get_or_create_default_user()['id']
+    valid = fresh_db.create_item(user_id, '正常元数据', source_metadata={'domain': 'example.com'})
+    invalid = fresh_db.create_item(user_id, '损坏的元数据')
+    empty = fresh_db.create_item(user_id, '没有元数据')
+    fresh_db.conn.execute("UPDATE items SET source_metadata = ? WHERE id = ?", (INVALID, invalid))
+    fresh_db.conn.commit()
+
+    assert json.loads(fresh_db.get_item(valid)['source_metadata']) == {'domain': 'example.com'}
+    assert json.loads(fresh_db.get_item(invalid)['source_metadata']) == INVALID
+    assert fresh_db.get_item(empty)['source_metadata'] is None
+    rows = {row['id']: row['source_metadata']
+            for row in fresh_db.get_items(user_id, limit=3, fields=['id', 'source_metadata'])}
+    assert rows == {valid: '{"domain": "example.com"}', invalid: json.dumps(INVALID), empty: None}
+
+
+@pytest.mark.api
+def test_invalid_metadata_row(fresh_db, fresh_client):
+    user_id = fresh_db.get_or_create_default_user()['id']
+    item_id = fresh_db.create_item(user_id, '元数据损坏的旧条目', source_type='web')
+    fresh_db.conn.execute("UPDATE items SET source_metadata = ? WHERE id = ?", (INVALID, item_id))
+    fresh_db.conn.commit()
+
+    detail = fresh_client.get(f'/api/items/{item_id}')
+    assert detail.status_code == 200
+    assert detail.json()['item']['source_metadata'] == INVALID
+
+    listing = fresh_client.get('/api/items', params={'limit': 5})
+    assert listing.status_code == 200
+    item = next(i for i in listing.json()['items'] if i['id'] == item_id)
+    assert item['source_metadata'] == INVALID
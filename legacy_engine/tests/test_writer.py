@@ -0,0 +1,86 @@
+"""
+合并提交（GROUP_COMMIT）：请求 / 流水线上的写方法都经写线程提交
+"""
+
+import sqlite3
+
+import pytest
+
+from core import writer
+from core.config import Config
+from core.database import DatabaseManager
+
+
+@pytest.fixture
+def grouped(fresh_db, monkeypatch):
+    """开启 GROUP_COMMIT 的 DatabaseManager，结束时停掉写线程"""
+    monkeypatch.setattr(Config, 'GROUP_COMMIT', True)
+    db = DatabaseManager(fresh_db.db_path)
+    yield db
+    db.close()
+    writer._writers.pop(fresh_db.db_path).close()
+
+
+def test_writes_go_through_writer(grouped):
+    db = grouped
+    user_id = db.get_or_create_default_user()['id']
+    item_id = db.create_item(user_id, '合并提交的条目', source_type='web')
+
+    db.save_idempotency_key(user_id, 'key-1', item_id)
+    db.queue_stages(item_id, ['fetch'])
+    db.start_stage(item_id, 'fetch')
+    db.update_fetch_status(item_id, 'fetching')
+    assert db.update_item_content(item_id, '抓取到的正文', title='新标题')
+    db.save_stage_checkpoint(item_id, 'fetch', 'done', output={'ok': True})
+    db.save_summary(item_id, user_id, '摘要')
+    db.increment_duplicate_count(item_id)
+    tag_id = db.create_tag(user_id, '合并提交')
+    assert db.tag_items(user_id, tag_id, [item_id]) == 1
+    assert db.untag_items(tag_id, [item_id]) == 1
+
+    # 同名标签：异常照常抛给调用方，只回滚该操作，写线程继续工作
+    with pytest.raises(sqlite3.IntegrityError):
+        db.create_tag(user_id, '合并提交')
+    assert db.delete_tag(user_id, tag_id)
+
+    stats = db.writer.stats()
+    assert stats['ops'] >= 13 and stats['queued'] == 0
+    assert not db.conn.in_transaction
+
+    # 写线程已提交，新连接能看到全部结果
+    check = DatabaseManager(db.db_path, batched=True)
+    item = check.get_item(item_id)
+    assert item['title'] == '新标题' and item['duplicate_count'] == 1
+    assert check.get_idempotent_item(user_id, 'key-1') == item_id
+    assert check.get_stage_checkpoints(item_id)['fetch']['attempts'] == 1
+    assert check.get_ai_result_by_item(item_id)['summary'] == '摘要'
+    assert check.get_tag(user_id, tag_id) is None
+    check.close()
+
+
+def test_write_routes_off_event_loop():
+    """调用 group_commit 写方法的接口不能是 async def（等待写线程会阻塞事件循环）"""
+    import inspect
+    from api.main import app
+
+    writes = {('POST', '/api/items'), ('POST', '/api/tags'), ('DELETE', '/api/tags/{tag_id}'),
+              ('POST', '/api/tags/{tag_id}/items'), ('POST', '/api/tags/{tag_id}/items/remove'),
+              ('POST', '/api/items/{item_id}/process')}
+    routes = {(method, route.path): route.endpoint
+              for route in app.routes for method in getattr(route, 'methods', ())}
+    for key in writes:
+        assert not inspect.iscoroutinefunction(routes[key]), key
+
+
+@pytest.mark.api
+def test_tag_routes_with_group_commit(grouped, fresh_client):
+    client = fresh_client
+    user_id = grouped.get_or_create_default_user()['id']
+    item_ids = [row['id'] for row in grouped.get_items(user_id, limit=3, fields=['id'])]
+
+    tag_id = client.post('/api/tags', json={'name': '并发'}).json()['tag']['id']
+    assert client.post('/api/tags', json={'name': '并发'}).status_code == 409
+    body = client.post(f'/api/tags/{tag_id}/items', json={'item_ids': item_ids}).json()
+    assert body['changed'] == 3 and body['item_count'] == 3
+    assert client.delete(f'/api/tags/{tag_id}').status_code == 200
+    assert grouped.writer.stats()['ops'] >= 4